@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for hallucination scoring against a large manuscript.
+
+Scores the located captions, the data availability section and one caption
+per figure against a synthetic ~100-page manuscript, first with the raw HTML
+(normalized on every call) and then with a NormalizedSource built once.
+
+Usage:
+    python scripts/benchmark_hallucination_scoring.py [--pages 100] [--figures 10]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.soda_curation._main_utils import (  # noqa: E402
+    NormalizedSource,
+    calculate_hallucination_score,
+)
+
+WORDS_PER_PARAGRAPH = 80
+PARAGRAPHS_PER_PAGE = 6
+
+
+def build_manuscript(pages: int, seed: int = 0) -> list:
+    """Return the paragraphs of a synthetic manuscript with inline markup."""
+    rng = random.Random(seed)
+    vocabulary = [
+        "".join(rng.choice("abcdefghiklmnoprstuy") for _ in range(rng.randint(2, 10)))
+        for _ in range(5000)
+    ]
+    paragraphs = []
+    for _ in range(pages * PARAGRAPHS_PER_PAGE):
+        words = [rng.choice(vocabulary) for _ in range(WORDS_PER_PARAGRAPH)]
+        words[rng.randrange(len(words))] = "<em>Dyrk4</em><sup>-/-</sup>"
+        paragraphs.append(f"<p>{' '.join(words)}.</p>")
+    return paragraphs
+
+
+def build_extracts(paragraphs: list, figures: int, seed: int = 0) -> list:
+    """Verbatim, lightly edited and hallucinated extracts, like pipeline output."""
+    rng = random.Random(seed)
+    extracts = []
+    for index in range(figures + 2):
+        start = rng.randrange(len(paragraphs) - 2)
+        caption = " ".join(paragraphs[start : start + 2])
+        if index % 3 == 1:
+            caption = caption.replace(" a", " e", 3)
+        elif index % 3 == 2:
+            caption = " ".join(rng.sample(caption.split(), 60))
+        extracts.append(caption)
+    return extracts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--figures", type=int, default=10)
+    args = parser.parse_args()
+
+    paragraphs = build_manuscript(args.pages)
+    manuscript = "\n".join(paragraphs)
+    extracts = build_extracts(paragraphs, args.figures)
+
+    started = time.perf_counter()
+    before = [calculate_hallucination_score(text, manuscript) for text in extracts]
+    before_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    source = NormalizedSource(manuscript)
+    after = [calculate_hallucination_score(text, source) for text in extracts]
+    after_seconds = time.perf_counter() - started
+
+    print(f"Manuscript: {args.pages} pages, {len(manuscript):,} characters")
+    print(f"Scoring calls: {len(extracts)}")
+    print(f"Raw source:        {before_seconds * 1000:9.1f} ms")
+    print(f"NormalizedSource:  {after_seconds * 1000:9.1f} ms")
+    print(f"Speedup:           {before_seconds / after_seconds:9.1f}x")
+    print(f"Identical scores:  {before == after}")
+
+
+if __name__ == "__main__":
+    main()
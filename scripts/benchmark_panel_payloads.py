@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Compare panel-crop payload encodings and matching strategies.
+
+For every ground-truth manuscript whose ZIP is in ``--archives``, panels are
+detected once and matched against the ground-truth figure captions with each
+strategy and encoding setting. For every run the script reports the number of
+vision calls, the base64 bytes sent, the matching wall time, the prompt and
+completion tokens billed and the share of ground-truth panel labels that were
+assigned to a detected panel.
+
+Settings are ``FORMAT[:QUALITY[:MAX_EDGE[:DETAIL]]]``, for example ``png`` (the
+previous behaviour), ``jpeg:85:1024`` or ``webp:80:768:low``. With the
+``annotated_figure`` strategy the setting applies to the annotated figure
+instead of the crops. The response cache is disabled so every run is billed.
+The provider and model come from ``--config``; matching calls are real API
+calls.
+
+Usage:
+    python scripts/benchmark_panel_payloads.py --config config.dev.yaml
+        [--archives data/archives] [--ground-truth data/ground_truth]
+        [--manuscripts 3] [--settings png jpeg:85:1024 jpeg:80:768:low]
+        [--strategies per_panel annotated_figure]
+"""
+import argparse
+import copy
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.soda_curation.config import load_config  # noqa: E402
+from src.soda_curation.pipeline.image_payloads import ImageEncoding  # noqa: E402
+from src.soda_curation.pipeline.manuscript_structure.manuscript_structure import (  # noqa: E402
+    ProcessingCost,
+)
+from src.soda_curation.pipeline.manuscript_structure.manuscript_xml_parser import (  # noqa: E402
+    XMLStructureExtractor,
+)
+from src.soda_curation.pipeline.match_caption_panel.match_caption_panel_anthropic import (  # noqa: E402
+    MatchPanelCaptionAnthropic,
+)
+from src.soda_curation.pipeline.match_caption_panel.match_caption_panel_base import (  # noqa: E402
+    ANNOTATED_PROMPT_STEP,
+    MATCHING_STRATEGIES,
+)
+from src.soda_curation.pipeline.match_caption_panel.match_caption_panel_openai import (  # noqa: E402
+    MatchPanelCaptionOpenAI,
+)
+from src.soda_curation.pipeline.prompt_handler import PromptHandler  # noqa: E402
+
+DEFAULT_SETTINGS = ["png", "jpeg:85:1024", "jpeg:80:768:low", "webp:80:1024"]
+
+
+def parse_setting(setting: str) -> ImageEncoding:
+    """Parse ``FORMAT[:QUALITY[:MAX_EDGE[:DETAIL]]]`` into an ImageEncoding."""
+    parts = setting.split(":")
+    return ImageEncoding(
+        format=parts[0].upper(),
+        quality=int(parts[1]) if len(parts) > 1 and parts[1] else 85,
+        max_edge=int(parts[2]) if len(parts) > 2 and parts[2] else None,
+        detail=parts[3].lower() if len(parts) > 3 else "auto",
+    )
+
+
+def load_ground_truth(path: Path) -> dict:
+    """Return ground-truth captions and panel labels keyed by figure label."""
+    ground_truth = json.loads(path.read_text())
+    figures = {}
+    for figure in ground_truth["figures"]:
+        panels = figure.get("panels") or []
+        figures[figure["figure_label"]] = {
+            "caption": figure.get("figure_caption", ""),
+            "labels": {panel["panel_label"].upper() for panel in panels},
+        }
+    return figures
+
+
+def label_accuracy(structure, ground_truth: dict) -> tuple:
+    """Return (matched, expected) ground-truth labels assigned to a detection."""
+    matched = expected = 0
+    for figure in structure.figures:
+        labels = ground_truth.get(figure.figure_label, {}).get("labels", set())
+        detected = {
+            panel.panel_label.upper() for panel in figure.panels if panel.panel_bbox
+        }
+        matched += len(labels & detected)
+        expected += len(labels)
+    return matched, expected
+
+
+def benchmark_manuscript(config, prompt_handler, zip_path, ground_truth, runs):
+    matcher_class = (
+        MatchPanelCaptionAnthropic
+        if config.get("ai_provider", "openai").lower() == "anthropic"
+        else MatchPanelCaptionOpenAI
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        extractor = XMLStructureExtractor(str(zip_path), tmp)
+        structure = extractor.extract_structure()
+        structure.figures = [
+            figure
+            for figure in structure.figures
+            if figure.figure_label in ground_truth
+        ]
+        for figure in structure.figures:
+            figure.figure_caption = ground_truth[figure.figure_label]["caption"]
+            figure.panels = []
+
+        matcher = matcher_class(
+            config, prompt_handler, extractor.manuscript_extract_dir
+        )
+        matcher.detect_figure_panels(structure)
+        prepared = dict(matcher._prepared_figures)
+
+        sent = {"calls": 0, "bytes": 0}
+        match_panel_caption = matcher._match_panel_caption
+        match_annotated_figure = matcher._match_annotated_figure
+
+        def counting_match(encoded_image, figure_caption):
+            sent["calls"] += 1
+            sent["bytes"] += len(encoded_image)
+            return match_panel_caption(encoded_image, figure_caption)
+
+        def counting_annotated_match(encoded_image, figure_caption, box_count):
+            sent["calls"] += 1
+            sent["bytes"] += len(encoded_image)
+            return match_annotated_figure(encoded_image, figure_caption, box_count)
+
+        matcher._match_panel_caption = counting_match
+        matcher._match_annotated_figure = counting_annotated_match
+
+        results = []
+        for strategy, encoding in runs:
+            sent.update(calls=0, bytes=0)
+            matcher.strategy = strategy
+            matcher.panel_encoding = encoding
+            matcher.annotated_figure_encoding = encoding
+            matcher._prepared_figures = dict(prepared)
+            run = copy.deepcopy(structure)
+            run.cost = ProcessingCost()
+            started = time.perf_counter()
+            matcher.process_figures(run)
+            seconds = time.perf_counter() - started
+            matched, expected = label_accuracy(run, ground_truth)
+            results.append(
+                {
+                    "calls": sent["calls"],
+                    "bytes": sent["bytes"],
+                    "seconds": seconds,
+                    "prompt_tokens": run.cost.match_caption_panel.prompt_tokens,
+                    "completion_tokens": (
+                        run.cost.match_caption_panel.completion_tokens
+                    ),
+                    "matched": matched,
+                    "expected": expected,
+                }
+            )
+        return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--config", required=True)
+    parser.add_argument("--archives", default="data/archives")
+    parser.add_argument("--ground-truth", default="data/ground_truth")
+    parser.add_argument("--manuscripts", type=int, default=None)
+    parser.add_argument("--settings", nargs="+", default=DEFAULT_SETTINGS)
+    parser.add_argument(
+        "--strategies",
+        nargs="+",
+        choices=MATCHING_STRATEGIES,
+        default=["per_panel"],
+    )
+    args = parser.parse_args()
+
+    runs = [
+        (strategy, parse_setting(setting))
+        for strategy in args.strategies
+        for setting in args.settings
+    ]
+    names = [
+        f"{strategy}/{setting}"
+        for strategy in args.strategies
+        for setting in args.settings
+    ]
+    config = load_config(args.config)
+    config.pop("response_cache", None)
+    for step in ("match_caption_panel", ANNOTATED_PROMPT_STEP):
+        for provider_config in config["pipeline"].get(step, {}).values():
+            if isinstance(provider_config, dict):
+                provider_config["cache"] = False
+    if (
+        "annotated_figure" in args.strategies
+        and ANNOTATED_PROMPT_STEP not in config["pipeline"]
+    ):
+        sys.exit(f"{args.config} has no pipeline.{ANNOTATED_PROMPT_STEP} prompts")
+    prompt_handler = PromptHandler(config["pipeline"])
+
+    ground_truth_paths = sorted(Path(args.ground_truth).glob("*.json"))
+    pairs = [
+        (path, Path(args.archives) / f"{path.stem}.zip")
+        for path in ground_truth_paths
+        if (Path(args.archives) / f"{path.stem}.zip").exists()
+    ][: args.manuscripts]
+    if not pairs:
+        sys.exit(f"No ZIPs in {args.archives} match {args.ground_truth}")
+
+    totals = [
+        {
+            "calls": 0,
+            "bytes": 0,
+            "seconds": 0.0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "matched": 0,
+            "expected": 0,
+        }
+        for _ in runs
+    ]
+    for ground_truth_path, zip_path in pairs:
+        print(f"{zip_path.name}...", file=sys.stderr)
+        ground_truth = load_ground_truth(ground_truth_path)
+        results = benchmark_manuscript(
+            config, prompt_handler, zip_path, ground_truth, runs
+        )
+        for total, result in zip(totals, results):
+            for key, value in result.items():
+                total[key] += value
+
+    print(f"Manuscripts: {len(pairs)}")
+    print(
+        f"{'run':<34} {'calls':>6} {'MB sent':>8} {'KB/call':>8} {'seconds':>8} "
+        f"{'prompt tok':>11} {'compl tok':>10} {'label acc':>10}"
+    )
+    for name, total in zip(names, totals):
+        calls = max(total["calls"], 1)
+        accuracy = total["matched"] / max(total["expected"], 1)
+        print(
+            f"{name:<34} {total['calls']:>6} {total['bytes'] / 1e6:>8.2f} "
+            f"{total['bytes'] / 1e3 / calls:>8.1f} {total['seconds']:>8.1f} "
+            f"{total['prompt_tokens']:>11} {total['completion_tokens']:>10} "
+            f"{accuracy:>10.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Compare fixed-DPI and target-resolution rasterization of vector figures.
+
+Each PDF/EPS/AI figure is converted with convert_to_pil_image twice, in a
+fresh process each time: once rendering at the fixed ``--dpi`` and shrinking
+to ``--max-size`` afterwards (the previous behaviour), and once rendering at
+the DPI computed from the page size by target_raster_dpi. For every run the
+script reports wall time and peak RSS, for the Python process and for the
+converter subprocesses (Ghostscript, ImageMagick, pdftoppm).
+
+Without ``--figures``, large synthetic PDF and EPS pages are generated.
+
+Usage:
+    python scripts/benchmark_rasterization.py [--figures path/to/figures]
+        [--dpi 300] [--max-size 2048]
+"""
+import argparse
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.soda_curation.pipeline.match_caption_panel import (  # noqa: E402
+    object_detection,
+)
+
+VECTOR_SUFFIXES = {".pdf", ".eps", ".ai"}
+
+
+def build_figures(directory: Path) -> list:
+    """Write a 40x30 inch PDF and EPS page, as exported by some drawing tools."""
+    image = Image.new("RGB", (2880, 2160), "white")
+    draw = ImageDraw.Draw(image)
+    for column in range(4):
+        for row in range(3):
+            x0, y0 = column * 720 + 20, row * 720 + 20
+            draw.rectangle([x0, y0, x0 + 680, y0 + 680], outline="black", width=6)
+    paths = [directory / "synthetic.pdf", directory / "synthetic.eps"]
+    image.save(paths[0], resolution=72)
+    image.save(paths[1])
+    return paths
+
+
+def _convert(path: str, dpi: int, max_size: int, fixed: bool, queue) -> None:
+    """Convert one figure in this (fresh) process and report time and memory."""
+    started = time.perf_counter()
+    error = None
+    size = None
+    try:
+        if fixed:
+            with patch.object(
+                object_detection,
+                "target_raster_dpi",
+                side_effect=lambda path, max_size=2048, dpi=300: dpi,
+            ):
+                image, _ = object_detection.convert_to_pil_image(
+                    path, dpi=dpi, max_size=max_size
+                )
+        else:
+            image, _ = object_detection.convert_to_pil_image(
+                path, dpi=dpi, max_size=max_size
+            )
+        size = image.size
+    except Exception as e:
+        error = str(e)
+    queue.put(
+        {
+            "seconds": time.perf_counter() - started,
+            # ru_maxrss is in KiB on Linux
+            "self_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            "children_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+            / 1024,
+            "size": size,
+            "dpi": object_detection.target_raster_dpi(path, max_size, dpi)
+            if not fixed
+            else dpi,
+            "error": error,
+        }
+    )
+
+
+def measure(path: Path, dpi: int, max_size: int, fixed: bool) -> dict:
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    # Convert a copy so the PNG written next to the source does not leak between runs
+    with tempfile.TemporaryDirectory() as tmp:
+        copy = Path(tmp) / path.name
+        copy.write_bytes(path.read_bytes())
+        process = context.Process(
+            target=_convert, args=(str(copy), dpi, max_size, fixed, queue)
+        )
+        process.start()
+        result = queue.get()
+        process.join()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--figures", default=None)
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--max-size", type=int, default=2048)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.figures:
+            paths = sorted(
+                p
+                for p in Path(args.figures).rglob("*")
+                if p.suffix.lower() in VECTOR_SUFFIXES
+            )
+        else:
+            paths = build_figures(Path(tmp))
+
+        print(
+            f"{'figure':<28} {'mode':<7} {'dpi':>4} {'time s':>7} "
+            f"{'py MB':>7} {'conv MB':>8}  size"
+        )
+        for path in paths:
+            for fixed, mode in ((True, "fixed"), (False, "target")):
+                result = measure(path, args.dpi, args.max_size, fixed)
+                detail = result["error"] or result["size"]
+                print(
+                    f"{path.name[:28]:<28} {mode:<7} {result['dpi']:>4} "
+                    f"{result['seconds']:7.2f} {result['self_mb']:7.0f} "
+                    f"{result['children_mb']:8.0f}  {detail}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Export the panel detection model to ONNX and verify it against the torch model.
+
+Writes ``<model>.onnx`` next to the ``.pt`` weights (and, with ``--int8``, a
+dynamically quantized ``<model>.int8.onnx``), then runs the ultralytics model
+and each ONNX variant on the same figures. Boxes are matched by IoU and the
+script reports, per variant, how many torch boxes were reproduced, the mean
+IoU of the matches and the CPU time per figure. It exits non-zero when the
+agreement is below ``--min-agreement``.
+
+Figures are read from ``--figures`` (any format convert_to_pil_image accepts);
+without it, synthetic multi-panel figures are used.
+
+Requires ultralytics, onnx and onnxruntime.
+
+Usage:
+    python scripts/export_panel_detection_onnx.py
+        [--model data/models/panel_detection_model_no_labels.pt]
+        [--figures tests/figures] [--imgsz 512] [--int8] [--min-agreement 0.95]
+"""
+import argparse
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from benchmark_panel_detection import build_figures  # noqa: E402
+
+from src.soda_curation.pipeline.match_caption_panel.object_detection import (  # noqa: E402
+    ObjectDetection,
+    OnnxObjectDetection,
+    YOLOv10,
+    convert_to_pil_image,
+    onnx_model_path_for,
+)
+
+FIGURE_SUFFIXES = {".png", ".jpg", ".jpeg", ".tif", ".tiff", ".eps", ".pdf", ".ai"}
+
+
+def export_onnx(model_path: str, imgsz: int, dynamic: bool) -> str:
+    """Export the weights with ultralytics and move the file to its config path."""
+    exported = YOLOv10(model_path).export(
+        format="onnx", imgsz=imgsz, dynamic=dynamic, simplify=True
+    )
+    target = onnx_model_path_for(model_path)
+    if Path(exported).resolve() != Path(target).resolve():
+        shutil.move(exported, target)
+    return target
+
+
+def quantize_int8(onnx_path: str) -> str:
+    """Write a dynamically quantized INT8 copy of the ONNX model."""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    target = onnx_model_path_for(onnx_path, int8=True)
+    quantize_dynamic(onnx_path, target, weight_type=QuantType.QInt8)
+    return target
+
+
+def load_figures(figures_dir: str) -> List[Image.Image]:
+    """Decode every figure under a directory."""
+    figures = []
+    for path in sorted(Path(figures_dir).rglob("*")):
+        if path.suffix.lower() in FIGURE_SUFFIXES:
+            image, _ = convert_to_pil_image(str(path))
+            figures.append(image)
+    return figures
+
+
+def box_iou(a: Sequence[float], b: Sequence[float]) -> float:
+    """IoU of two xyxy boxes."""
+    width = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    height = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    intersection = width * height
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1])
+    return intersection / (union - intersection) if union > intersection else 0.0
+
+
+def match_boxes(
+    reference: List[Dict], candidate: List[Dict], threshold: float
+) -> Tuple[int, List[float]]:
+    """Greedily match candidate boxes to reference boxes; return count and IoUs."""
+    unmatched = list(candidate)
+    ious = []
+    for ref in reference:
+        scored = [(box_iou(ref["bbox"], c["bbox"]), c) for c in unmatched]
+        if not scored:
+            break
+        best_iou, best = max(scored, key=lambda pair: pair[0])
+        if best_iou >= threshold:
+            ious.append(best_iou)
+            unmatched.remove(best)
+    return len(ious), ious
+
+
+def timed_detections(detector: ObjectDetection, figures: List[Image.Image]):
+    detector.detect_panels(figures[0])  # warm up
+    started = time.perf_counter()
+    detections = [detector.detect_panels(figure) for figure in figures]
+    return detections, (time.perf_counter() - started) / len(figures)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--model", default="data/models/panel_detection_model_no_labels.pt"
+    )
+    parser.add_argument("--figures", default=None)
+    parser.add_argument("--imgsz", type=int, default=512)
+    parser.add_argument("--dynamic", action="store_true")
+    parser.add_argument("--int8", action="store_true")
+    parser.add_argument("--match-iou", type=float, default=0.5)
+    parser.add_argument("--min-agreement", type=float, default=0.95)
+    parser.add_argument("--threads", type=int, default=0)
+    args = parser.parse_args()
+
+    onnx_path = export_onnx(args.model, args.imgsz, args.dynamic)
+    print(f"Exported {onnx_path}")
+    variants = {"onnx": onnx_path}
+    if args.int8:
+        variants["onnx-int8"] = quantize_int8(onnx_path)
+        print(f"Quantized {variants['onnx-int8']}")
+
+    figures = load_figures(args.figures) if args.figures else build_figures(12)
+    if not figures:
+        sys.exit(f"No figures found under {args.figures}")
+
+    settings = {"image_size": args.imgsz}
+    reference, reference_seconds = timed_detections(
+        ObjectDetection(args.model, settings=settings), figures
+    )
+    reference_count = sum(len(found) for found in reference)
+    print(f"Figures: {len(figures)}, torch boxes: {reference_count}")
+    print(f"{'torch':<10} {reference_seconds * 1000:8.1f} ms/figure")
+
+    passed = True
+    for name, path in variants.items():
+        detector = OnnxObjectDetection(
+            path, settings=settings, num_threads=args.threads
+        )
+        detections, seconds = timed_detections(detector, figures)
+        matched, ious = 0, []
+        for ref, found in zip(reference, detections):
+            count, figure_ious = match_boxes(ref, found, args.match_iou)
+            matched += count
+            ious.extend(figure_ious)
+        candidate_count = sum(len(found) for found in detections)
+        agreement = matched / max(reference_count, candidate_count, 1)
+        mean_iou = sum(ious) / len(ious) if ious else 0.0
+        print(
+            f"{name:<10} {seconds * 1000:8.1f} ms/figure  "
+            f"boxes {candidate_count:4d}  agreement {agreement:6.1%}  "
+            f"mean IoU {mean_iou:.3f}"
+        )
+        if reference_count and agreement < args.min_agreement:
+            passed = False
+
+    if not passed:
+        sys.exit(f"Box agreement below {args.min_agreement:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,8 +8,9 @@ import shutil
 import string
 import tempfile
 import unicodedata
+from collections import Counter, defaultdict
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Union
 
 from bs4 import BeautifulSoup
 from rapidfuzz import fuzz
@@ -20,6 +21,15 @@ from src.soda_curation.pipeline.manuscript_structure.manuscript_structure import
 
 logger = logging.getLogger(__name__)
 
+# Word n-gram length used to locate candidate windows for fuzzy matching
+SHINGLE_WORDS = 4
+# Shingles occurring more often than this carry no location information
+MAX_SHINGLE_OCCURRENCES = 50
+# Number of candidate windows scored before falling back to a full scan
+MAX_CANDIDATE_WINDOWS = 3
+# Similarity at or above which extracted text is treated as verbatim
+VERBATIM_SIMILARITY = 98.0
+
 
 def validate_paths(
     zip_path: str, config_path: str, output_path: Optional[str] = None
@@ -274,13 +284,95 @@ def normalize_text(
     return normalize(text, do_not_remove=keep_chars, do=operations)
 
 
-def exact_match_check(extracted_text: str, source_text: str) -> bool:
+class NormalizedSource:
+    """
+    Source text normalized once for repeated hallucination checks.
+
+    Normalizing a full manuscript (including the BeautifulSoup parse) dominates
+    the cost of a hallucination check, so the pipeline builds one instance per
+    manuscript and passes it to every scoring call instead of the raw HTML.
+
+    Fuzzy matching only scores the windows of the source that share word
+    n-grams with the extracted text, and falls back to scanning the whole
+    source when no window reaches the verbatim threshold. Scores are therefore
+    the same as a full scan for the 0.0 decision and for everything below it.
+    """
+
+    def __init__(self, source_text: str):
+        self.source_text = source_text
+        self.text = normalize_text(source_text, strip_html=True)
+        self._shingles: Optional[Dict[str, List[int]]] = None
+
+    def __bool__(self) -> bool:
+        return bool(self.text)
+
+    @staticmethod
+    def _word_shingles(text: str) -> List[Tuple[str, int]]:
+        """Return (shingle, character offset) pairs for the words of a text."""
+        words = [(m.group(), m.start()) for m in re.finditer(r"\S+", text)]
+        return [
+            (" ".join(word for word, _ in words[i : i + SHINGLE_WORDS]), words[i][1])
+            for i in range(max(0, len(words) - SHINGLE_WORDS + 1))
+        ]
+
+    @property
+    def shingles(self) -> Dict[str, List[int]]:
+        """Character offsets of every word n-gram of the source, built lazily."""
+        if self._shingles is None:
+            index: Dict[str, List[int]] = defaultdict(list)
+            for shingle, offset in self._word_shingles(self.text):
+                index[shingle].append(offset)
+            self._shingles = dict(index)
+        return self._shingles
+
+    def contains(self, norm_extracted: str) -> bool:
+        """Check whether normalized extracted text occurs verbatim in the source."""
+        return norm_extracted in self.text
+
+    def _candidate_starts(self, norm_extracted: str) -> List[int]:
+        """Estimate where the extracted text aligns in the source, best first."""
+        bucket = max(1, len(norm_extracted) // 4)
+        votes: Counter = Counter()
+        for shingle, offset in self._word_shingles(norm_extracted):
+            positions = self.shingles.get(shingle, [])
+            if len(positions) > MAX_SHINGLE_OCCURRENCES:
+                continue
+            for position in positions:
+                votes[max(0, position - offset) // bucket] += 1
+        return [start * bucket for start, _ in votes.most_common(MAX_CANDIDATE_WINDOWS)]
+
+    def fuzzy_score(self, norm_extracted: str) -> float:
+        """Best partial-ratio similarity (0-100) of normalized text in the source."""
+        if not norm_extracted or not self.text:
+            return 0.0
+
+        length = len(norm_extracted)
+        if 3 * length < len(self.text):
+            best = 0.0
+            for start in self._candidate_starts(norm_extracted):
+                window = self.text[max(0, start - length) : start + 2 * length]
+                best = max(best, fuzz.partial_ratio(norm_extracted, window))
+            if best >= VERBATIM_SIMILARITY:
+                return best
+
+        return fuzz.partial_ratio(norm_extracted, self.text)
+
+
+def _normalized_source(source_text: Union[str, NormalizedSource]) -> NormalizedSource:
+    if isinstance(source_text, NormalizedSource):
+        return source_text
+    return NormalizedSource(source_text)
+
+
+def exact_match_check(
+    extracted_text: str, source_text: Union[str, NormalizedSource]
+) -> bool:
     """
     Check if normalized extracted text exists within normalized source text.
 
     Args:
         extracted_text: Text to check for hallucination
-        source_text: Original source text to compare against
+        source_text: Original source text, or a NormalizedSource built from it
 
     Returns:
         bool: True if extract is found in source, False otherwise
@@ -288,21 +380,19 @@ def exact_match_check(extracted_text: str, source_text: str) -> bool:
     if not extracted_text or not source_text:
         return False
 
-    # Create normalized versions of both texts
     norm_extracted = normalize_text(extracted_text, strip_html=True)
-    norm_source = normalize_text(source_text, strip_html=True)
-
-    # Check if the normalized extracted text is in the normalized source
-    return norm_extracted in norm_source
+    return _normalized_source(source_text).contains(norm_extracted)
 
 
-def fuzzy_match_score(extracted_text: str, source_text: str) -> float:
+def fuzzy_match_score(
+    extracted_text: str, source_text: Union[str, NormalizedSource]
+) -> float:
     """
     Calculate fuzzy match similarity score between extracted text and source text.
 
     Args:
         extracted_text: Text to check for hallucination
-        source_text: Original source text to compare against
+        source_text: Original source text, or a NormalizedSource built from it
 
     Returns:
         float: Similarity score between 0-100
@@ -310,22 +400,23 @@ def fuzzy_match_score(extracted_text: str, source_text: str) -> float:
     if not extracted_text or not source_text:
         return 0.0
 
-    # Create normalized versions for fuzzy matching
     norm_extracted = normalize_text(extracted_text, strip_html=True)
-    norm_source = normalize_text(source_text, strip_html=True)
-
-    # Get the best partial ratio score
-    return fuzz.partial_ratio(norm_extracted, norm_source)
+    return _normalized_source(source_text).fuzzy_score(norm_extracted)
 
 
-def calculate_hallucination_score(extracted_text: str, source_text: str) -> float:
+def calculate_hallucination_score(
+    extracted_text: str, source_text: Union[str, NormalizedSource]
+) -> float:
     """
     Calculate a 0-1 hallucination possibility score.
     0 = definitely not hallucinated, 1 = likely hallucinated
 
+    Pass a NormalizedSource when scoring several extracts against the same
+    manuscript so that it is only normalized once.
+
     Args:
         extracted_text: Text to check for hallucination
-        source_text: Original source text to compare against
+        source_text: Original source text, or a NormalizedSource built from it
 
     Returns:
         float: Hallucination possibility score (0-1)
@@ -334,17 +425,20 @@ def calculate_hallucination_score(extracted_text: str, source_text: str) -> floa
     if not extracted_text or not source_text:
         return 1.0
 
+    source = _normalized_source(source_text)
+    norm_extracted = normalize_text(extracted_text, strip_html=True)
+
     # First try exact match
-    if exact_match_check(extracted_text, source_text):
+    if source.contains(norm_extracted):
         return 0.0
 
     # If not exact match, use fuzzy matching
-    similarity = fuzzy_match_score(extracted_text, source_text)
+    similarity = source.fuzzy_score(norm_extracted)
 
     # Convert similarity (0-100) to hallucination score (0-1)
     # Higher similarity = lower hallucination score
     # If similarity is very high (≥98), treat as not hallucinated
-    if similarity >= 98.0:
+    if similarity >= VERBATIM_SIMILARITY:
         return 0.0
 
     return 1.0 - (similarity / 100.0)
@@ -0,0 +1,224 @@
+"""Batch processing of many manuscript ZIP files with shared, warm resources."""
+
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import List, Optional
+from uuid import uuid4
+
+from .config import ConfigurationLoader
+from .logging_config import setup_logging
+from .main import PipelineResources, StepFailure, load_pipeline_resources, run_pipeline
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_WORKERS = 4
+BATCH_SUMMARY_FILENAME = "batch_summary.json"
+
+
+@dataclass
+class ManuscriptResult:
+    """Outcome of processing one manuscript within a batch."""
+
+    zip_path: str
+    output_path: str
+    status: str
+    elapsed_s: float
+    recoverable_failures: List[dict] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def collect_batch_inputs(source: str) -> List[Path]:
+    """
+    Resolve the ZIP files to process from a directory or a manifest file.
+
+    A directory yields every ``*.zip`` it contains, sorted by name. A manifest
+    is a text file with one ZIP path per line; blank lines and lines starting
+    with ``#`` are ignored and relative paths are resolved against the
+    manifest's directory.
+
+    Args:
+        source: Directory of ZIP files or path to a manifest file
+
+    Returns:
+        Ordered list of ZIP paths
+
+    Raises:
+        FileNotFoundError: If the source or a manifest entry does not exist
+        ValueError: If no ZIP files are found
+    """
+    source_path = Path(source)
+    if not source_path.exists():
+        raise FileNotFoundError(f"Batch source not found: {source}")
+
+    if source_path.is_dir():
+        zip_paths = sorted(p for p in source_path.glob("*.zip") if p.is_file())
+    else:
+        zip_paths = []
+        for line in source_path.read_text(encoding="utf-8").splitlines():
+            entry = line.strip()
+            if not entry or entry.startswith("#"):
+                continue
+            zip_path = Path(entry)
+            if not zip_path.is_absolute():
+                zip_path = source_path.parent / zip_path
+            if not zip_path.is_file():
+                raise FileNotFoundError(f"Manifest entry not found: {zip_path}")
+            zip_paths.append(zip_path)
+
+    if not zip_paths:
+        raise ValueError(f"No ZIP files found in batch source: {source}")
+    return zip_paths
+
+
+def _process_manuscript(
+    zip_path: Path,
+    resources: PipelineResources,
+    output_dir: Path,
+    resume: bool = False,
+) -> ManuscriptResult:
+    """Run the pipeline for one ZIP, isolating any failure to this manuscript."""
+    run_id = uuid4().hex[:10]
+    output_path = output_dir / f"{zip_path.stem}.json"
+    recoverable_failures: List[StepFailure] = []
+    started = time.perf_counter()
+    try:
+        run_pipeline(
+            str(zip_path),
+            resources,
+            output_path=str(output_path),
+            run_id=run_id,
+            recoverable_failures=recoverable_failures,
+            resume=resume,
+        )
+        status = "completed_with_failures" if recoverable_failures else "completed"
+        error = None
+    except Exception as exc:
+        logger.error(
+            "Manuscript failed in batch; continuing with next manuscript",
+            extra={
+                "operation": "batch.process_manuscript",
+                "run_id": run_id,
+                "zip_path": str(zip_path),
+                "error": str(exc),
+            },
+        )
+        status = "failed"
+        error = str(exc)
+
+    return ManuscriptResult(
+        zip_path=str(zip_path),
+        output_path=str(output_path),
+        status=status,
+        elapsed_s=round(time.perf_counter() - started, 3),
+        recoverable_failures=[asdict(item) for item in recoverable_failures],
+        error=error,
+    )
+
+
+def run_batch(
+    source: str,
+    config_path: str,
+    output_dir: str,
+    workers: Optional[int] = None,
+    resume: bool = False,
+) -> dict:
+    """
+    Process every manuscript in a directory or manifest with a worker pool.
+
+    Configuration, prompts and the panel detection model are loaded once and
+    shared by all workers. Each manuscript writes ``<output_dir>/<zip stem>.json``
+    and keeps its own recoverable failure list; a manuscript that fails does
+    not stop the batch. A ``batch_summary.json`` is written to ``output_dir``.
+
+    Args:
+        source: Directory of ZIP files or path to a manifest file
+        config_path: Path to configuration file
+        output_dir: Directory receiving per-manuscript outputs and the summary
+        workers: Number of concurrent manuscripts; defaults to ``batch.workers``
+            from the configuration
+        resume: Reuse valid step checkpoints from earlier runs of each ZIP
+
+    Returns:
+        The batch summary dictionary
+    """
+    if not os.path.exists(config_path):
+        raise FileNotFoundError(f"Config file not found: {config_path}")
+    zip_paths = collect_batch_inputs(source)
+
+    config_loader = ConfigurationLoader(config_path)
+    config = config_loader.config
+    setup_logging(config)
+
+    if workers is None:
+        workers = config.get("batch", {}).get("workers", DEFAULT_BATCH_WORKERS)
+    workers = max(1, min(int(workers), len(zip_paths)))
+
+    output_dir_path = Path(output_dir)
+    output_dir_path.mkdir(parents=True, exist_ok=True)
+
+    batch_id = uuid4().hex[:10]
+    logger.info(
+        "Starting batch run",
+        extra={
+            "operation": "batch.run",
+            "run_id": batch_id,
+            "manuscript_count": len(zip_paths),
+            "workers": workers,
+        },
+    )
+    started = time.perf_counter()
+    resources = load_pipeline_resources(
+        config, run_id=batch_id, warm_object_detector=True
+    )
+
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="soda-batch"
+    ) as executor:
+        results = list(
+            executor.map(
+                lambda zip_path: _process_manuscript(
+                    zip_path, resources, output_dir_path, resume
+                ),
+                zip_paths,
+            )
+        )
+
+    elapsed_s = time.perf_counter() - started
+    status_counts: dict = {}
+    for result in results:
+        status_counts[result.status] = status_counts.get(result.status, 0) + 1
+
+    summary = {
+        "batch_id": batch_id,
+        "source": str(source),
+        "workers": workers,
+        "manuscript_count": len(results),
+        "status_counts": status_counts,
+        "elapsed_s": round(elapsed_s, 3),
+        "manuscripts_per_hour": (
+            round(len(results) * 3600 / elapsed_s, 2) if elapsed_s > 0 else None
+        ),
+        "manuscripts": [asdict(result) for result in results],
+    }
+    summary_path = output_dir_path / BATCH_SUMMARY_FILENAME
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+    logger.info(
+        "Batch run completed",
+        extra={
+            "operation": "batch.run",
+            "run_id": batch_id,
+            "manuscript_count": len(results),
+            "status_counts": status_counts,
+            "elapsed_s": summary["elapsed_s"],
+            "manuscripts_per_hour": summary["manuscripts_per_hour"],
+            "summary_path": str(summary_path),
+        },
+    )
+    return summary
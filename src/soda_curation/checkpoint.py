@@ -0,0 +1,139 @@
+"""Checkpoint storage so interrupted or partially failed runs can resume."""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 1
+CHECKPOINT_FILENAME = "checkpoint.pickle"
+DEFAULT_CHECKPOINT_DIR = "data/checkpoints"
+# Execution settings that do not change step outputs
+UNHASHED_CONFIG_KEYS = (
+    "checkpoint",
+    "scheduler",
+    "batch",
+    "worker",
+    "response_cache",
+    "figure_image_store",
+    "raster_cache",
+    "figure_conversion",
+    "http_clients",
+    "rate_limits",
+)
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_config(config: Dict[str, Any]) -> str:
+    """Return a stable SHA-256 hex digest of a configuration mapping."""
+    payload = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CheckpointStore:
+    """
+    Persist completed step results for one manuscript and configuration.
+
+    The run directory is keyed by the ZIP content hash and the configuration
+    hash, so a checkpoint is only reused for the same input processed with the
+    same settings. All step results are pickled together in one file; steps
+    share and mutate a single ZipStructure, and pickling them together keeps
+    that object shared when the results are restored.
+    """
+
+    def __init__(self, root: str, zip_path: str, config: Dict[str, Any]):
+        self.zip_sha256 = hash_file(zip_path)
+        self.config_sha256 = hash_config(config)
+        self.run_dir = Path(root) / f"{self.zip_sha256[:16]}-{self.config_sha256[:16]}"
+        self.path = self.run_dir / CHECKPOINT_FILENAME
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Return the checkpointed step results, or an empty dict if none are valid.
+
+        A checkpoint written by another checkpoint version, for another input or
+        configuration, or that cannot be unpickled is ignored.
+        """
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, "rb") as f:
+                payload = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable checkpoint {self.path}: {str(e)}")
+            return {}
+
+        if (
+            not isinstance(payload, dict)
+            or payload.get("version") != CHECKPOINT_VERSION
+            or payload.get("zip_sha256") != self.zip_sha256
+            or payload.get("config_sha256") != self.config_sha256
+        ):
+            logger.warning(f"Ignoring stale checkpoint {self.path}")
+            return {}
+
+        results: Dict[str, Any] = payload.get("results", {})
+        logger.info(
+            "Loaded pipeline checkpoint",
+            extra={
+                "operation": "checkpoint.load",
+                "checkpoint_dir": str(self.run_dir),
+                "completed_steps": sorted(results),
+            },
+        )
+        return results
+
+    def save(self, results: Dict[str, Any]) -> None:
+        """Atomically replace the checkpoint with the given step results."""
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": CHECKPOINT_VERSION,
+            "zip_sha256": self.zip_sha256,
+            "config_sha256": self.config_sha256,
+            "results": results,
+        }
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+        logger.debug(
+            "Saved pipeline checkpoint",
+            extra={
+                "operation": "checkpoint.save",
+                "checkpoint_dir": str(self.run_dir),
+                "completed_steps": sorted(results),
+            },
+        )
+
+
+def create_checkpoint_store(
+    config: Dict[str, Any], zip_path: str, resume: bool = False
+) -> Optional[CheckpointStore]:
+    """
+    Build the checkpoint store for a run, or None when checkpointing is off.
+
+    Checkpoints are written when ``checkpoint.enabled`` is set in the
+    configuration or when resuming. Execution-only sections such as
+    ``checkpoint`` and ``scheduler`` are left out of the configuration hash, so
+    changing them does not invalidate existing checkpoints.
+    """
+    checkpoint_config = config.get("checkpoint", {})
+    if not (resume or checkpoint_config.get("enabled", False)):
+        return None
+    hashed_config = {k: v for k, v in config.items() if k not in UNHASHED_CONFIG_KEYS}
+    return CheckpointStore(
+        checkpoint_config.get("dir", DEFAULT_CHECKPOINT_DIR), zip_path, hashed_config
+    )
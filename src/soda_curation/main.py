@@ -4,17 +4,20 @@ import argparse
 import json
 import logging
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from uuid import uuid4
 
 from ._main_utils import (
+    NormalizedSource,
     calculate_hallucination_score,
     cleanup_extract_dir,
     setup_extract_dir,
     validate_paths,
 )
+from .checkpoint import CheckpointStore, create_checkpoint_store
 from .config import ConfigurationLoader
 from .data_storage import save_figure_data, save_zip_structure
 from .logging_config import setup_logging
@@ -40,6 +43,7 @@ from .pipeline.extract_sections.extract_sections_anthropic import (
     SectionExtractorAnthropic,
 )
 from .pipeline.extract_sections.extract_sections_openai import SectionExtractorOpenAI
+from .pipeline.http_clients import log_http_client_stats
 from .pipeline.manuscript_structure.manuscript_structure import (
     CustomJSONEncoder,
     ZipStructure,
@@ -51,7 +55,12 @@ from .pipeline.match_caption_panel.match_caption_panel_anthropic import (
 from .pipeline.match_caption_panel.match_caption_panel_openai import (
     MatchPanelCaptionOpenAI,
 )
+from .pipeline.match_caption_panel.object_detection import (
+    ObjectDetection,
+    create_object_detection,
+)
 from .pipeline.prompt_handler import PromptHandler
+from .pipeline.rate_limits import configure_rate_limits
 
 # Import QC module (to be implemented)
 from .qc.qc_pipeline import QCPipeline
@@ -71,6 +80,7 @@ AI_PROVIDER_STEPS = (
     "match_caption_panel",
     "assign_panel_source",
 )
+DEFAULT_STEP_WORKERS = 4
 
 
 @dataclass
@@ -136,6 +146,197 @@ def _execute_pipeline_step(
         return None
 
 
+@dataclass
+class PipelineStep:
+    """
+    A pipeline step and the steps whose results it consumes.
+
+    Steps with ``checkpoint=False`` are never persisted and must not mutate
+    shared state, because checkpoints are written while they may be running.
+    """
+
+    name: str
+    runner: Callable[[Dict[str, Any]], Any]
+    critical: bool
+    requires: Tuple[str, ...] = ()
+    checkpoint: bool = True
+
+
+def _restorable_steps(
+    steps: List[PipelineStep], checkpointed: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Select checkpointed results that can be reused without re-running a step.
+
+    A result is reused only if every checkpointed step it depends on is reused
+    too, so nothing computed from a re-run step is taken from an older run.
+    """
+    by_name = {step.name: step for step in steps}
+    restorable: Dict[str, bool] = {}
+
+    def is_restorable(name: str) -> bool:
+        if name not in restorable:
+            step = by_name[name]
+            restorable[name] = (
+                step.checkpoint
+                and checkpointed.get(name) is not None
+                and all(
+                    is_restorable(dep) or not by_name[dep].checkpoint
+                    for dep in step.requires
+                )
+            )
+        return restorable[name]
+
+    return {
+        step.name: checkpointed[step.name] for step in steps if is_restorable(step.name)
+    }
+
+
+def _run_step_graph(
+    steps: List[PipelineStep],
+    run_id: str,
+    recoverable_failures: list[StepFailure],
+    max_workers: int = DEFAULT_STEP_WORKERS,
+    checkpoints: Optional[CheckpointStore] = None,
+    resume: bool = False,
+) -> Dict[str, Any]:
+    """
+    Run pipeline steps as soon as the steps they require have finished.
+
+    Independent steps overlap on a thread pool. Each runner receives the results
+    of completed steps keyed by step name. A recoverable failure stores None as
+    the step result so dependents still run, as in the sequential pipeline; a
+    critical failure stops scheduling, waits for in-flight steps and re-raises.
+    With ``max_workers=1`` steps run one at a time in declaration order.
+
+    With a checkpoint store, successful results of checkpointed steps are saved
+    whenever no checkpointed step is running, and before a critical failure is
+    re-raised. When resuming, valid checkpointed results are reused instead of
+    running their steps, and steps only needed by reused steps are skipped.
+
+    Returns:
+        Mapping of step name to step result
+    """
+    by_name = {step.name: step for step in steps}
+    for step in steps:
+        missing = [dep for dep in step.requires if dep not in by_name]
+        if missing:
+            raise ValueError(f"Step '{step.name}' requires unknown steps: {missing}")
+
+    results: Dict[str, Any] = {}
+    if checkpoints is not None and resume:
+        results.update(_restorable_steps(steps, checkpoints.load()))
+        # Skip unpersisted steps whose every dependent was restored
+        changed = True
+        while changed:
+            changed = False
+            for step in steps:
+                dependents = [s.name for s in steps if step.name in s.requires]
+                if (
+                    step.name not in results
+                    and dependents
+                    and all(name in results for name in dependents)
+                ):
+                    results[step.name] = None
+                    changed = True
+        for name, result in results.items():
+            logger.info(
+                "Pipeline step restored from checkpoint"
+                if result is not None
+                else "Pipeline step skipped; its dependents were restored",
+                extra={"run_id": run_id, "step": name},
+            )
+    checkpointed = {
+        name: result
+        for name, result in results.items()
+        if by_name[name].checkpoint and result is not None
+    }
+    checkpoint_dirty = False
+
+    step_elapsed_ms: Dict[str, int] = {}
+    pending = [step for step in steps if step.name not in results]
+    started = time.perf_counter()
+
+    def run_step(step: PipelineStep):
+        step_started = time.perf_counter()
+        try:
+            return _execute_pipeline_step(
+                step_name=step.name,
+                runner=lambda: step.runner(results),
+                run_id=run_id,
+                critical=step.critical,
+                recoverable_failures=recoverable_failures,
+            )
+        finally:
+            step_elapsed_ms[step.name] = int(
+                (time.perf_counter() - step_started) * 1000
+            )
+
+    def record(step: PipelineStep, result: Any) -> None:
+        nonlocal checkpoint_dirty
+        results[step.name] = result
+        if step.checkpoint and result is not None:
+            checkpointed[step.name] = result
+            checkpoint_dirty = True
+
+    def save_checkpoint() -> None:
+        nonlocal checkpoint_dirty
+        if checkpoints is None or not checkpoint_dirty:
+            return
+        try:
+            checkpoints.save(dict(checkpointed))
+            checkpoint_dirty = False
+        except Exception as e:
+            logger.warning(
+                "Failed to save pipeline checkpoint",
+                extra={"run_id": run_id, "error": str(e)},
+            )
+
+    with ThreadPoolExecutor(
+        max_workers=max(1, max_workers), thread_name_prefix=f"step-{run_id}"
+    ) as executor:
+        running: Dict[Any, PipelineStep] = {}
+        while pending or running:
+            for step in [s for s in pending if all(d in results for d in s.requires)]:
+                pending.remove(step)
+                running[executor.submit(run_step, step)] = step
+            if not running:
+                raise ValueError(
+                    f"Step graph has a dependency cycle: {[s.name for s in pending]}"
+                )
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                step = running.pop(future)
+                try:
+                    record(step, future.result())
+                except Exception:
+                    # Only critical steps raise; let in-flight steps finish and
+                    # keep their results so a resumed run does not repeat them
+                    wait(running)
+                    for other_future, other_step in running.items():
+                        if other_future.exception() is None:
+                            record(other_step, other_future.result())
+                    save_checkpoint()
+                    raise
+            if not any(s.checkpoint for s in running.values()):
+                save_checkpoint()
+
+    wall_ms = int((time.perf_counter() - started) * 1000)
+    summed_ms = sum(step_elapsed_ms.values())
+    logger.info(
+        "Pipeline step graph completed",
+        extra={
+            "run_id": run_id,
+            "max_workers": max_workers,
+            "elapsed_ms": wall_ms,
+            "summed_step_ms": summed_ms,
+            "overlap_ms": max(0, summed_ms - wall_ms),
+            "step_elapsed_ms": step_elapsed_ms,
+        },
+    )
+    return results
+
+
 def _validate_ai_provider_config(config: dict, ai_provider: str, run_id: str) -> None:
     """Ensure runtime provider selection is explicit and configuration is consistent."""
     if ai_provider not in SUPPORTED_AI_PROVIDERS:
@@ -210,7 +411,58 @@ def run_qc_pipeline_async(
         return {"error": str(e)}
 
 
-def main(zip_path: str, config_path: str, output_path: Optional[str] = None) -> str:
+@dataclass
+class PipelineResources:
+    """Process-wide resources that can be reused across manuscripts."""
+
+    config: dict
+    prompt_handler: PromptHandler
+    ai_provider: str
+    object_detector: Optional[ObjectDetection] = None
+
+
+def load_pipeline_resources(
+    config: dict, run_id: str = "startup", warm_object_detector: bool = False
+) -> PipelineResources:
+    """
+    Build the resources shared by every manuscript processed with one config.
+
+    Args:
+        config: Merged pipeline configuration
+        run_id: Identifier used for structured logs
+        warm_object_detector: Load the panel detection model up front so that
+            it is shared across manuscripts instead of reloaded per figure matcher
+
+    Returns:
+        PipelineResources ready to be passed to run_pipeline
+    """
+    ai_provider = config.get("ai_provider", "openai").lower()
+    logger.info(
+        f"Using AI provider: {ai_provider}",
+        extra={"run_id": run_id, "ai_provider": ai_provider},
+    )
+    _validate_ai_provider_config(config, ai_provider, run_id)
+    prompt_handler = PromptHandler(config["pipeline"])
+    configure_rate_limits(config)
+
+    object_detector = None
+    if warm_object_detector:
+        object_detector = create_object_detection(config)
+
+    return PipelineResources(
+        config=config,
+        prompt_handler=prompt_handler,
+        ai_provider=ai_provider,
+        object_detector=object_detector,
+    )
+
+
+def main(
+    zip_path: str,
+    config_path: str,
+    output_path: Optional[str] = None,
+    resume: bool = False,
+) -> str:
     """
     Main entry point for SODA curation pipeline.
 
@@ -218,6 +470,8 @@ def main(zip_path: str, config_path: str, output_path: Optional[str] = None) ->
         zip_path: Path to input ZIP file
         config_path: Path to configuration file
         output_path: Optional path to output JSON file
+        resume: Reuse valid step checkpoints from a previous run of the same
+            ZIP and configuration
 
     Returns:
         JSON string containing processing results
@@ -234,157 +488,204 @@ def main(zip_path: str, config_path: str, output_path: Optional[str] = None) ->
     # Setup logging based on environment
     setup_logging(config_loader.config)
     run_id = uuid4().hex[:10]
-    logger.info("Starting SODA curation pipeline", extra={"run_id": run_id})
 
-    # Setup extraction directory
-    extract_dir = setup_extract_dir()
-    config_loader.config["extraction_dir"] = str(extract_dir)
-    recoverable_failures: list[StepFailure] = []
+    resources = load_pipeline_resources(config_loader.config, run_id=run_id)
+    return run_pipeline(zip_path, resources, output_path, run_id=run_id, resume=resume)
 
-    try:
-        # Extract manuscript structure (first pipeline step)
-        extractor = XMLStructureExtractor(zip_path, str(extract_dir))
-        zip_structure = _execute_pipeline_step(
-            step_name="extract_structure",
-            runner=extractor.extract_structure,
-            run_id=run_id,
-            critical=True,
-            recoverable_failures=recoverable_failures,
-        )
 
-        # Extract manuscript content for downstream AI steps
-        manuscript_content = _execute_pipeline_step(
-            step_name="extract_docx_content",
-            runner=lambda: extractor.extract_docx_content(zip_structure.docx),
-            run_id=run_id,
-            critical=True,
-            recoverable_failures=recoverable_failures,
-        )
-        zip_structure.manuscript_text = manuscript_content
-        prompt_handler = PromptHandler(config_loader.config["pipeline"])
+def run_pipeline(
+    zip_path: str,
+    resources: PipelineResources,
+    output_path: Optional[str] = None,
+    run_id: Optional[str] = None,
+    recoverable_failures: Optional[list[StepFailure]] = None,
+    resume: bool = False,
+) -> str:
+    """
+    Process a single manuscript ZIP with already-loaded resources.
 
-        # Select AI provider (default: openai)
-        ai_provider = config_loader.config.get("ai_provider", "openai").lower()
-        logger.info(
-            f"Using AI provider: {ai_provider}",
-            extra={"run_id": run_id, "ai_provider": ai_provider},
-        )
-        _validate_ai_provider_config(config_loader.config, ai_provider, run_id)
+    Args:
+        zip_path: Path to input ZIP file
+        resources: Shared resources from load_pipeline_resources
+        output_path: Optional path to output JSON file
+        run_id: Optional identifier used for structured logs
+        recoverable_failures: Optional list collecting this run's StepFailure records
+        resume: Reuse valid step checkpoints from a previous run
 
-        # Extract relevant sections for the pipeline
-        if ai_provider == "anthropic":
-            section_extractor = SectionExtractorAnthropic(
-                config_loader.config, prompt_handler
-            )
-        else:
-            section_extractor = SectionExtractorOpenAI(
-                config_loader.config, prompt_handler
-            )
-        (
-            figure_legends,
-            data_availability_text,
-            zip_structure,
-        ) = _execute_pipeline_step(
-            step_name="extract_sections",
-            runner=lambda: section_extractor.extract_sections(
-                doc_content=manuscript_content, zip_structure=zip_structure
-            ),
-            run_id=run_id,
-            critical=True,
-            recoverable_failures=recoverable_failures,
-        )
+    Returns:
+        JSON string containing processing results
+    """
+    run_id = run_id or uuid4().hex[:10]
+    logger.info("Starting SODA curation pipeline", extra={"run_id": run_id})
 
-        # Extract individual captions from figure legends
-        if ai_provider == "anthropic":
-            caption_extractor = FigureCaptionExtractorAnthropic(
-                config_loader.config, prompt_handler
-            )
-        else:
-            caption_extractor = FigureCaptionExtractorOpenAI(
-                config_loader.config, prompt_handler
-            )
-        zip_structure = _execute_pipeline_step(
-            step_name="extract_individual_captions",
-            runner=lambda: caption_extractor.extract_individual_captions(
-                doc_content=figure_legends, zip_structure=zip_structure
-            ),
-            run_id=run_id,
-            critical=True,
-            recoverable_failures=recoverable_failures,
-        )
+    # Per-run copy so concurrent runs never share mutable top-level keys
+    config = dict(resources.config)
+    prompt_handler = resources.prompt_handler
+    ai_provider = resources.ai_provider
 
-        # Extract data sources from data availability section
+    # Setup extraction directory
+    extract_dir = setup_extract_dir()
+    config["extraction_dir"] = str(extract_dir)
+    if recoverable_failures is None:
+        recoverable_failures = []
+
+    extractor = None
+    try:
+        extractor = XMLStructureExtractor(zip_path, str(extract_dir))
         if ai_provider == "anthropic":
+            section_extractor = SectionExtractorAnthropic(config, prompt_handler)
+            caption_extractor = FigureCaptionExtractorAnthropic(config, prompt_handler)
             data_availability_extractor = DataAvailabilityExtractorAnthropic(
-                config_loader.config, prompt_handler
+                config, prompt_handler
             )
-        else:
-            data_availability_extractor = DataAvailabilityExtractorOpenAI(
-                config_loader.config, prompt_handler
-            )
-        zip_structure = _execute_pipeline_step(
-            step_name="extract_data_sources",
-            runner=lambda: data_availability_extractor.extract_data_sources(
-                section_text=data_availability_text, zip_structure=zip_structure
-            ),
-            run_id=run_id,
-            critical=True,
-            recoverable_failures=recoverable_failures,
-        )
-
-        # Match panels with captions using object detection
-        if ai_provider == "anthropic":
             panel_matcher = MatchPanelCaptionAnthropic(
-                config=config_loader.config,
+                config=config,
                 prompt_handler=prompt_handler,
                 extract_dir=extractor.manuscript_extract_dir,
+                object_detector=resources.object_detector,
+            )
+            panel_source_assigner = PanelSourceAssignerAnthropic(
+                config, prompt_handler, extractor.manuscript_extract_dir
             )
         else:
+            section_extractor = SectionExtractorOpenAI(config, prompt_handler)
+            caption_extractor = FigureCaptionExtractorOpenAI(config, prompt_handler)
+            data_availability_extractor = DataAvailabilityExtractorOpenAI(
+                config, prompt_handler
+            )
             panel_matcher = MatchPanelCaptionOpenAI(
-                config=config_loader.config,
+                config=config,
                 prompt_handler=prompt_handler,
                 extract_dir=extractor.manuscript_extract_dir,
+                object_detector=resources.object_detector,
+            )
+            panel_source_assigner = PanelSourceAssignerOpenAI(
+                config, prompt_handler, extractor.manuscript_extract_dir
             )
-        panel_processing_result = _execute_pipeline_step(
-            step_name="match_caption_panel",
-            runner=lambda: panel_matcher.process_figures(zip_structure),
-            run_id=run_id,
-            critical=False,
-            recoverable_failures=recoverable_failures,
-        )
-        if panel_processing_result is not None:
-            zip_structure = panel_processing_result
 
-        # Get figure images and captions for QC pipeline
-        figure_data = _execute_pipeline_step(
-            step_name="collect_qc_figure_payloads",
-            runner=panel_matcher.get_figure_images_and_captions,
+        # Steps mutate the shared ZipStructure in place, so independent steps
+        # only need to wait for the results they read. Data source extraction
+        # runs alongside caption extraction, and figure conversion and panel
+        # detection start as soon as the figure files are extracted.
+        def _extract_docx_content(results):
+            zip_structure = results["extract_structure"]
+            manuscript_content = extractor.extract_docx_content(zip_structure.docx)
+            zip_structure.manuscript_text = manuscript_content
+            return manuscript_content
+
+        def _collect_figure_payloads(results):
+            if not panel_matcher.figure_images:
+                # Matching was restored from a checkpoint; load the images
+                panel_matcher.cache_figure_images(_matched_structure(results))
+            return panel_matcher.get_figure_images_and_captions()
+
+        def _matched_structure(results):
+            matched = results["match_caption_panel"]
+            if matched is not None:
+                return matched
+            return results["extract_individual_captions"]
+
+        steps = [
+            PipelineStep(
+                name="extract_structure",
+                runner=lambda r: extractor.extract_structure(),
+                critical=True,
+            ),
+            PipelineStep(
+                name="extract_docx_content",
+                runner=_extract_docx_content,
+                critical=True,
+                requires=("extract_structure",),
+            ),
+            PipelineStep(
+                name="extract_sections",
+                runner=lambda r: section_extractor.extract_sections(
+                    doc_content=r["extract_docx_content"],
+                    zip_structure=r["extract_structure"],
+                ),
+                critical=True,
+                requires=("extract_structure", "extract_docx_content"),
+            ),
+            PipelineStep(
+                name="extract_individual_captions",
+                runner=lambda r: caption_extractor.extract_individual_captions(
+                    doc_content=r["extract_sections"][0],
+                    zip_structure=r["extract_sections"][2],
+                ),
+                critical=True,
+                requires=("extract_sections",),
+            ),
+            PipelineStep(
+                name="extract_data_sources",
+                runner=lambda r: data_availability_extractor.extract_data_sources(
+                    section_text=r["extract_sections"][1],
+                    zip_structure=r["extract_sections"][2],
+                ),
+                critical=True,
+                requires=("extract_sections",),
+            ),
+            PipelineStep(
+                name="convert_figures",
+                runner=lambda r: panel_matcher.convert_figure_images(
+                    r["extract_structure"]
+                ),
+                critical=False,
+                requires=("extract_structure",),
+                checkpoint=False,
+            ),
+            PipelineStep(
+                name="detect_panels",
+                runner=lambda r: panel_matcher.detect_figure_panels(
+                    r["extract_structure"]
+                ),
+                critical=False,
+                requires=("extract_structure", "convert_figures"),
+                checkpoint=False,
+            ),
+            PipelineStep(
+                name="match_caption_panel",
+                runner=lambda r: panel_matcher.process_figures(
+                    r["extract_individual_captions"]
+                ),
+                critical=False,
+                requires=("extract_individual_captions", "detect_panels"),
+            ),
+            PipelineStep(
+                name="collect_qc_figure_payloads",
+                runner=_collect_figure_payloads,
+                critical=False,
+                requires=("match_caption_panel",),
+                checkpoint=False,
+            ),
+            PipelineStep(
+                name="assign_panel_source",
+                runner=lambda r: panel_source_assigner.assign_panel_source(
+                    _matched_structure(r),
+                ),
+                critical=False,
+                requires=("match_caption_panel",),
+            ),
+        ]
+        results = _run_step_graph(
+            steps,
             run_id=run_id,
-            critical=False,
             recoverable_failures=recoverable_failures,
+            max_workers=config.get("scheduler", {}).get(
+                "max_workers", DEFAULT_STEP_WORKERS
+            ),
+            checkpoints=create_checkpoint_store(resources.config, zip_path, resume),
+            resume=resume,
         )
+
+        manuscript_content = results["extract_docx_content"]
+        zip_structure = _matched_structure(results)
+
+        figure_data = results["collect_qc_figure_payloads"]
         if figure_data is None:
             figure_data = []
 
-        # Assign panel source
-        if ai_provider == "anthropic":
-            panel_source_assigner = PanelSourceAssignerAnthropic(
-                config_loader.config, prompt_handler, extractor.manuscript_extract_dir
-            )
-        else:
-            panel_source_assigner = PanelSourceAssignerOpenAI(
-                config_loader.config, prompt_handler, extractor.manuscript_extract_dir
-            )
-        processed_figures = _execute_pipeline_step(
-            step_name="assign_panel_source",
-            runner=lambda: panel_source_assigner.assign_panel_source(
-                zip_structure,
-            ),
-            run_id=run_id,
-            critical=False,
-            recoverable_failures=recoverable_failures,
-        )
         # Preserve all ZipStructure data while updating figures
+        processed_figures = results["assign_panel_source"]
         if processed_figures is not None:
             zip_structure.figures = processed_figures
         else:
@@ -396,22 +697,23 @@ def main(zip_path: str, config_path: str, output_path: Optional[str] = None) ->
         # Update total costs before returning results
         zip_structure.update_total_cost()
 
-        # Check for possible hallucinations
+        # Check for possible hallucinations against a manuscript normalized once
+        normalized_manuscript = NormalizedSource(manuscript_content or "")
         zip_structure.locate_captions_hallucination_score = (
             calculate_hallucination_score(
-                zip_structure.ai_response_locate_captions, manuscript_content
+                zip_structure.ai_response_locate_captions, normalized_manuscript
             )
         )
         zip_structure.locate_data_section_hallucination_score = (
             calculate_hallucination_score(
-                zip_structure.data_availability["section_text"], manuscript_content
+                zip_structure.data_availability["section_text"], normalized_manuscript
             )
         )
         for fig in zip_structure.figures:
             if fig.figure_caption:
                 if fig.hallucination_score == 1:
                     fig.hallucination_score = calculate_hallucination_score(
-                        fig.figure_caption, manuscript_content
+                        fig.figure_caption, normalized_manuscript
                     )
 
         # Save data for QC pipeline
@@ -479,21 +781,53 @@ def main(zip_path: str, config_path: str, output_path: Optional[str] = None) ->
         return output_json
 
     finally:
+        if extractor is not None:
+            extractor.close()
         cleanup_extract_dir(extract_dir)
+        # Counts are cumulative over the process, so batches show reuse across runs
+        log_http_client_stats(run_id=run_id)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description="Process a ZIP file using SODA curation"
     )
-    parser.add_argument("--zip", required=True, help="Path to the input ZIP file")
+    input_group = parser.add_mutually_exclusive_group(required=True)
+    input_group.add_argument("--zip", help="Path to the input ZIP file")
+    input_group.add_argument(
+        "--batch",
+        help="Directory of ZIP files or manifest file listing one ZIP path per line",
+    )
     parser.add_argument(
         "--config", required=True, help="Path to the configuration file"
     )
-    parser.add_argument("--output", help="Path to the output JSON file")
+    parser.add_argument(
+        "--output",
+        help="Path to the output JSON file (output directory with --batch)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip steps with a valid checkpoint from a previous run",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of manuscripts processed concurrently with --batch",
+    )
 
     args = parser.parse_args()
 
-    output_json = main(args.zip, args.config, args.output)
-    if not args.output:
-        print(output_json)
+    if args.batch:
+        from .batch import run_batch
+
+        if not args.output:
+            parser.error("--output is required with --batch")
+        summary = run_batch(
+            args.batch, args.config, args.output, args.workers, resume=args.resume
+        )
+        print(json.dumps({k: v for k, v in summary.items() if k != "manuscripts"}))
+    else:
+        output_json = main(args.zip, args.config, args.output, resume=args.resume)
+        if not args.output:
+            print(output_json)
@@ -1,13 +1,22 @@
 """Anthropic Claude API utility functions."""
 
+import asyncio
 import json
 import logging
-import time
-from typing import Any, Dict, List, Optional, Type, TypeVar
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
 
 import anthropic
 
 from .ai_observability import summarize_messages
+from .openai_utils import count_messages_tokens
+from .rate_limits import (
+    rate_limit_steps,
+    retry_after_seconds,
+    settle_rate_limit,
+    with_model_header,
+)
+from .request_steps import ApiRequest, Backoff, Steps, arun_steps, run_steps
+from .response_cache import ResponseCache, make_cache_key
 
 logger = logging.getLogger(__name__)
 
@@ -21,19 +30,52 @@ VALID_ANTHROPIC_MODELS = {
     "claude-haiku-4-5-20251001",
 }
 ANTHROPIC_MAX_RETRIES = 3
+# Marks the end of a prompt prefix Anthropic may cache. A request can carry at
+# most four breakpoints; prefixes shorter than the model's minimum (1024 tokens
+# for Sonnet) are processed without caching.
+PROMPT_CACHE_CONTROL = {"type": "ephemeral"}
+MAX_CACHE_BREAKPOINTS = 4
 _SUPPORTED_ANTHROPIC_TOOL_TYPE_PREFIXES = ("web_search", "web_fetch")
 
 
 class AnthropicUsage:
     """Usage statistics wrapper with both Anthropic and OpenAI-compatible attribute names."""
 
-    def __init__(self, input_tokens: int, output_tokens: int):
+    def __init__(
+        self,
+        input_tokens: int,
+        output_tokens: int,
+        cache_read_input_tokens: int = 0,
+        cache_creation_input_tokens: int = 0,
+    ):
         self.input_tokens = input_tokens
         self.output_tokens = output_tokens
-        # OpenAI-compatible aliases used by update_token_usage
-        self.prompt_tokens = input_tokens
+        self.cache_read_input_tokens = cache_read_input_tokens
+        self.cache_creation_input_tokens = cache_creation_input_tokens
+        # OpenAI-compatible aliases used by update_token_usage. input_tokens
+        # excludes the prompt-cache reads and writes; prompt_tokens includes them
+        self.prompt_tokens = (
+            input_tokens + cache_read_input_tokens + cache_creation_input_tokens
+        )
         self.completion_tokens = output_tokens
-        self.total_tokens = input_tokens + output_tokens
+        self.total_tokens = self.prompt_tokens + output_tokens
+        self.cache_read_tokens = cache_read_input_tokens
+        self.cache_write_tokens = cache_creation_input_tokens
+
+    @classmethod
+    def from_response(cls, usage: Any) -> "AnthropicUsage":
+        """Build from the usage of an Anthropic Messages API response."""
+
+        def count(name: str) -> int:
+            value = getattr(usage, name, 0)
+            return value if isinstance(value, int) else 0
+
+        return cls(
+            input_tokens=usage.input_tokens,
+            output_tokens=usage.output_tokens,
+            cache_read_input_tokens=count("cache_read_input_tokens"),
+            cache_creation_input_tokens=count("cache_creation_input_tokens"),
+        )
 
 
 class AnthropicMessage:
@@ -116,14 +158,16 @@ def _classify_anthropic_error(error: Exception) -> Dict[str, str]:
     return {"severity": "critical", "reason": "unexpected_error"}
 
 
-def _create_with_retry(
-    client: anthropic.Anthropic,
-    params: Dict[str, Any],
-    model: str,
-    operation: str,
-) -> Any:
+def _create_steps(params: Dict[str, Any], model: str, operation: str) -> Steps:
     """Retry Anthropic calls when failures look transient."""
     for attempt in range(1, ANTHROPIC_MAX_RETRIES + 1):
+        reserved = yield from rate_limit_steps(
+            "anthropic",
+            model,
+            lambda: _estimate_request_tokens(params, model),
+            operation,
+        )
+        settled = False
         try:
             if attempt > 1:
                 logger.warning(
@@ -135,14 +179,16 @@ def _create_with_retry(
                         "max_attempts": ANTHROPIC_MAX_RETRIES,
                     },
                 )
-            return client.messages.create(**params)
+            response = yield ApiRequest(with_model_header(params, model))
         except Exception as error:
+            settle_rate_limit("anthropic", model, reserved)
+            settled = True
             classification = _classify_anthropic_error(error)
             retryable = (
                 _is_retryable_anthropic_error(error) and attempt < ANTHROPIC_MAX_RETRIES
             )
             if retryable:
-                wait_seconds = min(2 ** (attempt - 1), 8)
+                wait_seconds = retry_after_seconds(error) or min(2 ** (attempt - 1), 8)
                 logger.warning(
                     "Recoverable Anthropic error; retrying",
                     extra={
@@ -153,7 +199,7 @@ def _create_with_retry(
                         "retry_in_s": wait_seconds,
                     },
                 )
-                time.sleep(wait_seconds)
+                yield Backoff(wait_seconds)
                 continue
             log_method = (
                 logger.error
@@ -171,24 +217,63 @@ def _create_with_retry(
                 },
             )
             raise
+        else:
+            settle_rate_limit("anthropic", model, reserved, response)
+            settled = True
+        finally:
+            if not settled:
+                # Refund the reservation on any failure, including cancellation
+                settle_rate_limit("anthropic", model, reserved)
+        return response
+
+
+def _estimate_request_tokens(params: Dict[str, Any], model: str) -> int:
+    """Tokens a request counts against the rate limit: prompt plus max_tokens."""
+    texts = [_content_text(params.get("system"))] + [
+        _content_text(message.get("content")) for message in params["messages"]
+    ]
+    prompt = [{"role": "user", "content": text} for text in texts if text]
+    return count_messages_tokens(prompt, model) + (params.get("max_tokens") or 0)
 
 
-def _convert_messages(messages: List[Dict[str, Any]]) -> tuple:
+def _content_text(content: Any) -> str:
+    """Join the text of a string or a list of content blocks."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "\n".join(
+            block.get("text", "") for block in content if isinstance(block, dict)
+        )
+    return ""
+
+
+def _convert_messages(
+    messages: List[Dict[str, Any]], prompt_caching: bool = False
+) -> tuple:
     """
     Convert OpenAI-format messages to Anthropic format.
 
+    Every system message becomes one system block; the first one holds the
+    stable instructions of a step and later ones request-specific additions.
+    With ``prompt_caching`` the first system block, and every content part
+    that carries a ``cache_control`` key, end a cacheable prefix. Without it
+    the system blocks are joined into a plain string and ``cache_control``
+    keys are dropped, so the request is unchanged.
+
     Returns:
-        Tuple of (system_prompt: str, anthropic_messages: list)
+        Tuple of (system: str or list of blocks, anthropic_messages: list)
     """
-    system_prompt = ""
+    system_texts: List[str] = []
     anthropic_messages = []
+    # The first system block takes one of the breakpoints
+    breakpoints_left = MAX_CACHE_BREAKPOINTS - 1
 
     for msg in messages:
         role = msg["role"]
         content = msg["content"]
 
         if role == "system":
-            system_prompt = content if isinstance(content, str) else str(content)
+            system_texts.append(content if isinstance(content, str) else str(content))
 
         elif role in ("user", "assistant"):
             if isinstance(content, list):
@@ -196,28 +281,39 @@ def _convert_messages(messages: List[Dict[str, Any]]) -> tuple:
                 anthropic_content = []
                 for item in content:
                     if item["type"] == "text":
-                        anthropic_content.append({"type": "text", "text": item["text"]})
+                        block = {"type": "text", "text": item["text"]}
                     elif item["type"] == "image_url":
                         url = item["image_url"]["url"]
-                        if url.startswith("data:"):
-                            # data:image/png;base64,<data>
-                            header, base64_data = url.split(",", 1)
-                            media_type = header.split(":")[1].split(";")[0]
-                            anthropic_content.append(
-                                {
-                                    "type": "image",
-                                    "source": {
-                                        "type": "base64",
-                                        "media_type": media_type,
-                                        "data": base64_data,
-                                    },
-                                }
-                            )
+                        if not url.startswith("data:"):
+                            continue
+                        # data:image/png;base64,<data>
+                        header, base64_data = url.split(",", 1)
+                        media_type = header.split(":")[1].split(";")[0]
+                        block = {
+                            "type": "image",
+                            "source": {
+                                "type": "base64",
+                                "media_type": media_type,
+                                "data": base64_data,
+                            },
+                        }
+                    else:
+                        continue
+                    if prompt_caching and item.get("cache_control"):
+                        if breakpoints_left > 0:
+                            block["cache_control"] = PROMPT_CACHE_CONTROL
+                            breakpoints_left -= 1
+                    anthropic_content.append(block)
                 anthropic_messages.append({"role": role, "content": anthropic_content})
             else:
                 anthropic_messages.append({"role": role, "content": content})
 
-    return system_prompt, anthropic_messages
+    if not prompt_caching or not system_texts:
+        return "\n\n".join(system_texts), anthropic_messages
+
+    system_blocks = [{"type": "text", "text": text} for text in system_texts]
+    system_blocks[0]["cache_control"] = PROMPT_CACHE_CONTROL
+    return system_blocks, anthropic_messages
 
 
 def _extract_supported_anthropic_tools(
@@ -305,6 +401,8 @@ def call_anthropic(
     operation: str = "unspecified_operation",
     request_metadata: Optional[Dict[str, Any]] = None,
     model_config: Optional[Dict[str, Any]] = None,
+    cache: Optional[ResponseCache] = None,
+    prompt_caching: bool = False,
 ) -> AnthropicResponseWrapper:
     """
     Call Anthropic Claude API, optionally enforcing structured output via tool use.
@@ -320,11 +418,150 @@ def call_anthropic(
         operation: Operation name for structured logs.
         request_metadata: Additional metadata for structured logs.
         model_config: Optional provider-specific runtime config (e.g. tools/tool_choice).
+        cache: Optional response cache; identical requests are replayed from it.
+        prompt_caching: Mark the system prompt, and content parts carrying a
+            ``cache_control`` key, as cacheable prompt prefixes.
 
     Returns:
         AnthropicResponseWrapper compatible with OpenAI response format.
     """
-    system_prompt, anthropic_messages = _convert_messages(messages)
+    cache_key, cached = _prepare_anthropic_call(
+        cache,
+        model,
+        messages,
+        response_format,
+        temperature,
+        max_tokens,
+        operation,
+        model_config,
+    )
+    if cached is not None:
+        return cached
+
+    response = run_steps(
+        _anthropic_call_steps(
+            model=model,
+            messages=messages,
+            response_format=response_format,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            operation=operation,
+            request_metadata=request_metadata,
+            model_config=model_config,
+            prompt_caching=prompt_caching,
+        ),
+        lambda params: client.messages.create(**params),
+    )
+    if cache is not None:
+        return cache.store(cache_key, response)
+    return response
+
+
+async def acall_anthropic(
+    client: anthropic.AsyncAnthropic,
+    model: str,
+    messages: List[Dict[str, Any]],
+    response_format: Optional[Type[T]] = None,
+    temperature: float = 0.1,
+    max_tokens: int = 2048,
+    operation: str = "unspecified_operation",
+    request_metadata: Optional[Dict[str, Any]] = None,
+    model_config: Optional[Dict[str, Any]] = None,
+    cache: Optional[ResponseCache] = None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    prompt_caching: bool = False,
+) -> AnthropicResponseWrapper:
+    """
+    Async version of call_anthropic for an AsyncAnthropic client.
+
+    Retries and structured-output handling behave exactly as in the blocking
+    helper. Pass one semaphore to every call that should share a concurrency
+    limit; it is held only while a request is in flight.
+    """
+    cache_key, cached = _prepare_anthropic_call(
+        cache,
+        model,
+        messages,
+        response_format,
+        temperature,
+        max_tokens,
+        operation,
+        model_config,
+    )
+    if cached is not None:
+        return cached
+
+    response = await arun_steps(
+        _anthropic_call_steps(
+            model=model,
+            messages=messages,
+            response_format=response_format,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            operation=operation,
+            request_metadata=request_metadata,
+            model_config=model_config,
+            prompt_caching=prompt_caching,
+        ),
+        lambda params: client.messages.create(**params),
+        semaphore=semaphore,
+    )
+    if cache is not None:
+        return cache.store(cache_key, response)
+    return response
+
+
+def _prepare_anthropic_call(
+    cache: Optional[ResponseCache],
+    model: str,
+    messages: List[Dict[str, Any]],
+    response_format: Optional[Type[T]],
+    temperature: float,
+    max_tokens: int,
+    operation: str,
+    model_config: Optional[Dict[str, Any]],
+) -> Tuple[Optional[str], Any]:
+    """Return the request's cache key and any cached response."""
+    if cache is None:
+        return None, None
+    cache_key = make_cache_key(
+        "anthropic",
+        model,
+        messages,
+        {
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "tools": _extract_supported_anthropic_tools(model_config),
+            "tool_choice": (model_config or {}).get("tool_choice"),
+        },
+        response_format,
+    )
+    cached = cache.lookup(cache_key, response_format)
+    if cached is not None:
+        logger.info(
+            "Anthropic response served from cache",
+            extra={
+                "operation": operation,
+                "model": model,
+                "cache_key": cache_key[:16],
+            },
+        )
+    return cache_key, cached
+
+
+def _anthropic_call_steps(
+    model: str,
+    messages: List[Dict[str, Any]],
+    response_format: Optional[Type[T]],
+    temperature: float,
+    max_tokens: int,
+    operation: str,
+    request_metadata: Optional[Dict[str, Any]],
+    model_config: Optional[Dict[str, Any]],
+    prompt_caching: bool = False,
+) -> Steps:
+    """Send one request to the Anthropic API and wrap the response."""
+    system_prompt, anthropic_messages = _convert_messages(messages, prompt_caching)
 
     params: Dict[str, Any] = {
         "model": model,
@@ -341,6 +578,7 @@ def call_anthropic(
             "operation": operation,
             "model": model,
             "message_summary": summarize_messages(messages),
+            "prompt_caching": prompt_caching,
             "request_metadata": request_metadata or {},
         },
     )
@@ -366,12 +604,10 @@ def call_anthropic(
             f"Calling Anthropic API with structured output ({response_format.__name__}) "
             f"using model: {model} (external_tool_count={len(external_tools)})"
         )
-        response = _create_with_retry(client, params, model, operation)
+        response = yield from _create_steps(params, model, operation)
 
-        usage = AnthropicUsage(
-            input_tokens=response.usage.input_tokens,
-            output_tokens=response.usage.output_tokens,
-        )
+        usage = AnthropicUsage.from_response(response.usage)
+        _log_prompt_cache_usage(usage, model, operation)
 
         parsed = None
         raw_text_parts: List[str] = []
@@ -408,12 +644,10 @@ def call_anthropic(
     else:
         # Plain text response (JSON expected in prompt instructions)
         logger.info(f"Calling Anthropic API with model: {model}")
-        response = _create_with_retry(client, params, model, operation)
+        response = yield from _create_steps(params, model, operation)
 
-        usage = AnthropicUsage(
-            input_tokens=response.usage.input_tokens,
-            output_tokens=response.usage.output_tokens,
-        )
+        usage = AnthropicUsage.from_response(response.usage)
+        _log_prompt_cache_usage(usage, model, operation)
 
         content = ""
         for block in response.content:
@@ -428,6 +662,22 @@ def call_anthropic(
         )
 
 
+def _log_prompt_cache_usage(usage: AnthropicUsage, model: str, operation: str) -> None:
+    """Log prompt-cache reads and writes of a response, if any."""
+    if not (usage.cache_read_tokens or usage.cache_write_tokens):
+        return
+    logger.info(
+        "Anthropic prompt cache usage",
+        extra={
+            "operation": operation,
+            "model": model,
+            "cache_read_tokens": usage.cache_read_tokens,
+            "cache_write_tokens": usage.cache_write_tokens,
+            "uncached_input_tokens": usage.input_tokens,
+        },
+    )
+
+
 def validate_anthropic_model(model: str) -> None:
     """Raise ValueError if the model is not a recognised Claude model."""
     if model not in VALID_ANTHROPIC_MODELS:
@@ -10,7 +10,9 @@ import anthropic
 from ..ai_observability import summarize_text
 from ..anthropic_utils import call_anthropic, validate_anthropic_model
 from ..cost_tracking import update_token_usage
+from ..http_clients import get_http_client
 from ..prompt_handler import PromptHandler
+from ..response_cache import get_response_cache
 from .assign_panel_source_base import (
     AsignedFiles,
     AsignedFilesList,
@@ -27,7 +29,9 @@ class PanelSourceAssignerAnthropic(PanelSourceAssigner):
         self, config: Dict[str, Any], prompt_handler: PromptHandler, extract_dir: Path
     ):
         super().__init__(config, prompt_handler, extract_dir)
-        self.client = anthropic.Anthropic()
+        self.client = anthropic.Anthropic(
+            http_client=get_http_client("anthropic", config)
+        )
 
     def _validate_config(self) -> None:
         """Validate Anthropic configuration parameters."""
@@ -63,6 +67,8 @@ class PanelSourceAssignerAnthropic(PanelSourceAssigner):
             temperature=config_.get("temperature", 0.3),
             max_tokens=config_.get("max_tokens", 2048),
             operation="main.assign_panel_source",
+            cache=get_response_cache(self.config, "assign_panel_source", "anthropic"),
+            prompt_caching=config_.get("prompt_caching", True),
             request_metadata={
                 "provider": "anthropic",
                 "allowed_file_count": len(allowed_files),
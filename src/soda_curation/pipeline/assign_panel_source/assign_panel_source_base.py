@@ -1,7 +1,6 @@
 import logging
 import os
 import re
-import zipfile
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
@@ -9,6 +8,7 @@ from typing import Any, Dict, List, Tuple
 from pydantic import BaseModel
 
 from ..manuscript_structure.manuscript_structure import Figure, Panel, ZipStructure
+from ..manuscript_structure.zip_filesystem import list_zip_members, path_exists
 from ..prompt_handler import PromptHandler
 
 
@@ -206,32 +206,28 @@ class PanelSourceAssigner(ABC):
 
         for file_path in sd_files:
             full_path = self.extraction_dir / file_path
-            if not full_path.exists():
+            if not path_exists(full_path):
                 logger.warning(f"Source data file not found: {full_path}")
                 continue
 
             if str(full_path).endswith(".zip"):
-                with zipfile.ZipFile(full_path, "r") as zip_ref:
-                    for file_info in zip_ref.infolist():
-                        filename = file_info.filename
-
-                        # Skip if any of these conditions are met
-                        if (
-                            filename.endswith("/")
-                            or "__MACOSX" in filename  # Directory
-                            or any(  # macOS metadata
-                                sf in filename for sf in system_files
-                            )
-                            or filename.startswith(".")  # System files
-                        ):  # Hidden files
-                            continue
-
-                        # Normalize the filename
-                        normalized_filename = self._normalize_filename(filename)
-                        relative_path = (
-                            Path(full_path).relative_to(self.extraction_dir).as_posix()
-                        )
-                        extracted_files.append(f"{relative_path}:{normalized_filename}")
+                # Read from the inner central directory, never extracted to disk
+                for filename in list_zip_members(full_path):
+                    # Skip if any of these conditions are met
+                    if (
+                        filename.endswith("/")
+                        or "__MACOSX" in filename  # Directory
+                        or any(sf in filename for sf in system_files)  # macOS metadata
+                        or filename.startswith(".")  # System files
+                    ):  # Hidden files
+                        continue
+
+                    # Normalize the filename
+                    normalized_filename = self._normalize_filename(filename)
+                    relative_path = (
+                        Path(full_path).relative_to(self.extraction_dir).as_posix()
+                    )
+                    extracted_files.append(f"{relative_path}:{normalized_filename}")
             else:
                 extracted_files.append(file_path)
 
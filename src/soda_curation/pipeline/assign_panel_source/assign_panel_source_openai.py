@@ -8,8 +8,10 @@ from pydantic import ValidationError
 
 from ..ai_observability import summarize_text
 from ..cost_tracking import update_token_usage
+from ..http_clients import get_http_client
 from ..openai_utils import call_openai_with_fallback, validate_model_config
 from ..prompt_handler import PromptHandler
+from ..response_cache import get_response_cache
 from .assign_panel_source_base import (
     AsignedFiles,
     AsignedFilesList,
@@ -25,7 +27,7 @@ class PanelSourceAssignerOpenAI(PanelSourceAssigner):
     ):
         """Initialize with OpenAI configuration."""
         super().__init__(config, prompt_handler, extract_dir)
-        self.client = openai.OpenAI()
+        self.client = openai.OpenAI(http_client=get_http_client("openai", config))
 
     def _validate_config(self) -> None:
         """Validate OpenAI configuration parameters."""
@@ -77,6 +79,7 @@ class PanelSourceAssignerOpenAI(PanelSourceAssigner):
             frequency_penalty=config_.get("frequency_penalty", 0),
             presence_penalty=config_.get("presence_penalty", 0),
             operation="main.assign_panel_source",
+            cache=get_response_cache(self.config, "assign_panel_source", "openai"),
             request_metadata={
                 "provider": "openai",
                 "allowed_file_count": len(allowed_files),
@@ -1,25 +1,66 @@
 """Token usage and cost tracking utilities."""
 
-from typing import Any
+from typing import Any, Tuple
 
 from ..pipeline.manuscript_structure.manuscript_structure import TokenUsage
 
 pricing = {
-    # OpenAI models (USD per 1M tokens)
-    "gpt-4o": {"input_tokens": 5.00, "output_tokens": 10.00},
-    "gpt-4o-mini": {"input_tokens": 0.15, "output_tokens": 0.60},
-    "gpt-5": {"input_tokens": 5.00, "output_tokens": 15.00},
-    # Anthropic Claude models (USD per 1M tokens)
-    "claude-opus-4-6": {"input_tokens": 15.00, "output_tokens": 75.00},
-    "claude-sonnet-4-6": {"input_tokens": 3.00, "output_tokens": 15.00},
-    "claude-haiku-4-5": {"input_tokens": 0.25, "output_tokens": 1.25},
+    # OpenAI models (USD per 1M tokens). Cached prompt tokens are discounted
+    # automatically and writing the cache costs nothing extra
+    "gpt-4o": {
+        "input_tokens": 5.00,
+        "output_tokens": 10.00,
+        "cache_read_tokens": 2.50,
+    },
+    "gpt-4o-mini": {
+        "input_tokens": 0.15,
+        "output_tokens": 0.60,
+        "cache_read_tokens": 0.075,
+    },
+    "gpt-5": {
+        "input_tokens": 5.00,
+        "output_tokens": 15.00,
+        "cache_read_tokens": 0.50,
+    },
+    # Anthropic Claude models (USD per 1M tokens). Prompt-cache reads cost 0.1x
+    # and 5-minute cache writes 1.25x the input price
+    "claude-opus-4-6": {
+        "input_tokens": 15.00,
+        "output_tokens": 75.00,
+        "cache_read_tokens": 1.50,
+        "cache_write_tokens": 18.75,
+    },
+    "claude-sonnet-4-6": {
+        "input_tokens": 3.00,
+        "output_tokens": 15.00,
+        "cache_read_tokens": 0.30,
+        "cache_write_tokens": 3.75,
+    },
+    "claude-haiku-4-5": {
+        "input_tokens": 0.25,
+        "output_tokens": 1.25,
+        "cache_read_tokens": 0.025,
+        "cache_write_tokens": 0.3125,
+    },
 }
 
 
-def calculate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
-    """Calculate cost based on token usage and model pricing."""
+def calculate_cost(
+    model: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    cache_read_tokens: int = 0,
+    cache_write_tokens: int = 0,
+) -> float:
+    """
+    Calculate cost based on token usage and model pricing.
+
+    ``prompt_tokens`` includes the prompt-cache read and write tokens, which
+    are billed at the model's cache prices (the input price if it has none).
+    """
+    uncached_tokens = max(prompt_tokens - cache_read_tokens - cache_write_tokens, 0)
     # Convert tokens to millions
-    input_tokens_million = prompt_tokens / 1_000_000
+    input_tokens_million = uncached_tokens / 1_000_000
     output_tokens_million = completion_tokens / 1_000_000
 
     # Retrieve pricing — exact match first, then prefix match for versioned IDs
@@ -36,9 +77,15 @@ def calculate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> fl
     input_cost = model_pricing["input_tokens"]
     output_cost = model_pricing["output_tokens"]
 
+    cache_read_cost = model_pricing.get("cache_read_tokens", input_cost)
+    cache_write_cost = model_pricing.get("cache_write_tokens", input_cost)
+
     # Calculate total cost
-    total_cost = (input_tokens_million * input_cost) + (
-        output_tokens_million * output_cost
+    total_cost = (
+        (input_tokens_million * input_cost)
+        + (output_tokens_million * output_cost)
+        + (cache_read_tokens / 1_000_000 * cache_read_cost)
+        + (cache_write_tokens / 1_000_000 * cache_write_cost)
     )
     return total_cost
 
@@ -47,52 +94,84 @@ def update_token_usage(
     token_usage: TokenUsage, response: Any, model: str
 ) -> TokenUsage:
     """Update TokenUsage object with data from API response."""
+    # Steps may record usage from several worker threads at once
+    with TokenUsage.lock:
+        return _update_token_usage(token_usage, response, model)
+
+
+def _usage_count(usage: Any, name: str) -> int:
+    """Return a token count from a usage object or dict, 0 if absent."""
+    value = usage.get(name, 0) if isinstance(usage, dict) else getattr(usage, name, 0)
+    return value if isinstance(value, int) else 0
+
+
+def prompt_cache_tokens(usage: Any) -> Tuple[int, int]:
+    """
+    Return the prompt-cache read and write token counts of a response usage.
+
+    Anthropic usage (and usage replayed from the response cache) reports
+    ``cache_read_tokens`` and ``cache_write_tokens``. OpenAI reports the
+    prompt tokens it served from its cache as
+    ``prompt_tokens_details.cached_tokens`` and has no cache writes.
+    """
+    cache_read_tokens = _usage_count(usage, "cache_read_tokens")
+    if not cache_read_tokens:
+        details = (
+            usage.get("prompt_tokens_details")
+            if isinstance(usage, dict)
+            else getattr(usage, "prompt_tokens_details", None)
+        )
+        if details is not None:
+            cache_read_tokens = _usage_count(details, "cached_tokens")
+    return cache_read_tokens, _usage_count(usage, "cache_write_tokens")
+
+
+def _add_usage(token_usage: TokenUsage, usage: Any, model: str) -> None:
+    """Accumulate one response's usage and cost."""
+    prompt_tokens = _usage_count(usage, "prompt_tokens")
+    completion_tokens = _usage_count(usage, "completion_tokens")
+    cache_read_tokens, cache_write_tokens = prompt_cache_tokens(usage)
+
+    token_usage.prompt_tokens += prompt_tokens
+    token_usage.completion_tokens += completion_tokens
+    token_usage.total_tokens += _usage_count(usage, "total_tokens")
+    token_usage.prompt_cache_read_tokens += cache_read_tokens
+    token_usage.prompt_cache_write_tokens += cache_write_tokens
+
+    # Calculate and accumulate cost for this call
+    token_usage.cost += calculate_cost(
+        model,
+        prompt_tokens,
+        completion_tokens,
+        cache_read_tokens,
+        cache_write_tokens,
+    )
+
+
+def _update_token_usage(
+    token_usage: TokenUsage, response: Any, model: str
+) -> TokenUsage:
+    # Responses replayed from the response cache cost nothing
+    cache_status = getattr(response, "cache_status", None)
+    if cache_status == "hit":
+        token_usage.cache_hits += 1
+        return token_usage
+    if cache_status == "miss":
+        token_usage.cache_misses += 1
+
     # Handle response object with usage attribute
     if hasattr(response, "usage"):
-        # Accumulate token counts
-        token_usage.prompt_tokens += response.usage.prompt_tokens
-        token_usage.completion_tokens += response.usage.completion_tokens
-        token_usage.total_tokens += response.usage.total_tokens
-
-        # Calculate and accumulate cost for this call
-        call_cost = calculate_cost(
-            model,
-            response.usage.prompt_tokens,
-            response.usage.completion_tokens,
-        )
-        token_usage.cost += call_cost
+        _add_usage(token_usage, response.usage, model)
     elif isinstance(response, dict) and "usage" in response:
         # Handle dictionary response format
-        token_usage.prompt_tokens += response["usage"]["prompt_tokens"]
-        token_usage.completion_tokens += response["usage"]["completion_tokens"]
-        token_usage.total_tokens += response["usage"]["total_tokens"]
-
-        # Calculate and accumulate cost for this call
-        call_cost = calculate_cost(
-            model,
-            response["usage"]["prompt_tokens"],
-            response["usage"]["completion_tokens"],
-        )
-        token_usage.cost += call_cost
+        _add_usage(token_usage, response["usage"], model)
     else:
         # Try to convert to dict if it's a Pydantic model
         try:
             if hasattr(response, "model_dump"):
                 response_dict = response.model_dump()
                 if "usage" in response_dict:
-                    token_usage.prompt_tokens += response_dict["usage"]["prompt_tokens"]
-                    token_usage.completion_tokens += response_dict["usage"][
-                        "completion_tokens"
-                    ]
-                    token_usage.total_tokens += response_dict["usage"]["total_tokens"]
-
-                    # Calculate and accumulate cost for this call
-                    call_cost = calculate_cost(
-                        model,
-                        response_dict["usage"]["prompt_tokens"],
-                        response_dict["usage"]["completion_tokens"],
-                    )
-                    token_usage.cost += call_cost
+                    _add_usage(token_usage, response_dict["usage"], model)
         except Exception:
             # If all else fails, skip token tracking
             pass
@@ -10,7 +10,9 @@ import anthropic
 from ..ai_observability import summarize_text
 from ..anthropic_utils import call_anthropic, validate_anthropic_model
 from ..cost_tracking import update_token_usage
+from ..http_clients import get_http_client
 from ..manuscript_structure.manuscript_structure import ZipStructure
+from ..response_cache import get_response_cache
 from .data_availability_base import DataAvailabilityExtractor, ExtractDataSources
 
 logger = logging.getLogger(__name__)
@@ -21,7 +23,9 @@ class DataAvailabilityExtractorAnthropic(DataAvailabilityExtractor):
 
     def __init__(self, config: Dict, prompt_handler):
         super().__init__(config, prompt_handler)
-        self.client = anthropic.Anthropic()
+        self.client = anthropic.Anthropic(
+            http_client=get_http_client("anthropic", config)
+        )
         self.database_registry = self._load_database_registry()
 
     def _load_database_registry(self) -> Dict[Any, Any]:
@@ -82,6 +86,9 @@ class DataAvailabilityExtractorAnthropic(DataAvailabilityExtractor):
             temperature=config_.get("temperature", 0.1),
             max_tokens=config_.get("max_tokens", 2048),
             operation="main.extract_data_sources",
+            cache=get_response_cache(self.config, "extract_data_sources", "anthropic"),
+            # The prompt and registry are the same for every manuscript
+            prompt_caching=config_.get("prompt_caching", True),
             request_metadata={
                 "registry_database_count": len(
                     self.database_registry.get("databases", [])
@@ -10,8 +10,10 @@ import openai
 
 from ..ai_observability import summarize_text
 from ..cost_tracking import update_token_usage
+from ..http_clients import get_http_client
 from ..manuscript_structure.manuscript_structure import ZipStructure
 from ..openai_utils import call_openai_with_fallback, validate_model_config
+from ..response_cache import get_response_cache
 from .data_availability_base import DataAvailabilityExtractor, ExtractDataSources
 
 logger = logging.getLogger(__name__)
@@ -29,7 +31,9 @@ class DataAvailabilityExtractorOpenAI(DataAvailabilityExtractor):
         if not api_key:
             raise ValueError("OPENAI_API_KEY environment variable is not set")
 
-        self.client = openai.OpenAI(api_key=api_key)
+        self.client = openai.OpenAI(
+            api_key=api_key, http_client=get_http_client("openai", config)
+        )
 
         # Load database registry from identifiers.txt
         self.database_registry = self._load_database_registry()
@@ -111,6 +115,7 @@ class DataAvailabilityExtractorOpenAI(DataAvailabilityExtractor):
             frequency_penalty=config_.get("frequency_penalty", 0),
             presence_penalty=config_.get("presence_penalty", 0),
             operation="main.extract_data_sources",
+            cache=get_response_cache(self.config, "extract_data_sources", "openai"),
             request_metadata={
                 "registry_database_count": len(
                     self.database_registry.get("databases", [])
@@ -8,14 +8,20 @@ import anthropic
 from pydantic import BaseModel
 
 from ..ai_observability import summarize_text
-from ..anthropic_utils import call_anthropic, validate_anthropic_model
+from ..anthropic_utils import (
+    PROMPT_CACHE_CONTROL,
+    call_anthropic,
+    validate_anthropic_model,
+)
 from ..cost_tracking import update_token_usage
+from ..http_clients import get_http_client
 from ..manuscript_structure.manuscript_structure import (
     Figure,
     Panel,
     TokenUsage,
     ZipStructure,
 )
+from ..response_cache import get_response_cache
 from .extract_captions_base import FigureCaptionExtractor
 
 logger = logging.getLogger(__name__)
@@ -49,7 +55,9 @@ class FigureCaptionExtractorAnthropic(FigureCaptionExtractor):
 
     def __init__(self, config: Dict[str, Any], prompt_handler):
         super().__init__(config, prompt_handler)
-        self.client = anthropic.Anthropic()
+        self.client = anthropic.Anthropic(
+            http_client=get_http_client("anthropic", config)
+        )
         self.caption_config = config["pipeline"]["extract_caption_title"]["anthropic"]
         self.panel_config = config["pipeline"]["extract_panel_sequence"]["anthropic"]
 
@@ -79,25 +87,17 @@ class FigureCaptionExtractorAnthropic(FigureCaptionExtractor):
                 "captions_summary": summarize_text(all_captions),
             },
         )
-        prompts = self.prompt_handler.get_prompt(
-            step="extract_caption_title",
-            variables={
-                "figure_label": figure_label,
-                "figure_captions": all_captions,
-            },
-        )
-
-        system_prompt = prompts["system"]
-        if "json" not in system_prompt.lower():
-            system_prompt += "\n\nProvide your response in JSON format."
-
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": prompts["user"]},
-        ]
-
         config_ = self.caption_config
         model_ = config_.get("model", "claude-sonnet-4-6")
+        prompt_caching = config_.get("prompt_caching", True)
+
+        # Only the whole legends section is marked as a cache breakpoint; a
+        # figure's own slice would be written to the cache and never read
+        layout = self._caption_title_layout(figure_label, all_captions, prompt_caching)
+
+        if "json" not in layout.system.lower():
+            layout.system += "\n\nProvide your response in JSON format."
+        messages = layout.messages(PROMPT_CACHE_CONTROL if prompt_caching else None)
 
         response = call_anthropic(
             client=self.client,
@@ -107,6 +107,8 @@ class FigureCaptionExtractorAnthropic(FigureCaptionExtractor):
             temperature=config_.get("temperature", 0.1),
             max_tokens=config_.get("max_tokens", 4096),
             operation="main.extract_caption_title",
+            cache=get_response_cache(self.config, "extract_caption_title", "anthropic"),
+            prompt_caching=prompt_caching,
             request_metadata={"figure_label": figure_label},
         )
 
@@ -162,6 +164,10 @@ class FigureCaptionExtractorAnthropic(FigureCaptionExtractor):
             temperature=config_.get("temperature", 0.1),
             max_tokens=config_.get("max_tokens", 4096),
             operation="main.extract_panel_sequence",
+            cache=get_response_cache(
+                self.config, "extract_panel_sequence", "anthropic"
+            ),
+            prompt_caching=config_.get("prompt_caching", True),
             request_metadata={"figure_label": figure_label},
         )
 
@@ -195,10 +201,7 @@ class FigureCaptionExtractorAnthropic(FigureCaptionExtractor):
             figure.figure_label, sanitized_all_captions, zip_structure
         )
 
-        total_token_usage.prompt_tokens += caption_token_usage.prompt_tokens
-        total_token_usage.completion_tokens += caption_token_usage.completion_tokens
-        total_token_usage.total_tokens += caption_token_usage.total_tokens
-        total_token_usage.cost += caption_token_usage.cost
+        total_token_usage.add(caption_token_usage)
 
         if not caption_result.figure_caption:
             logger.warning(
@@ -222,10 +225,7 @@ class FigureCaptionExtractorAnthropic(FigureCaptionExtractor):
             figure.figure_label, caption_result.figure_caption
         )
 
-        total_token_usage.prompt_tokens += panel_token_usage.prompt_tokens
-        total_token_usage.completion_tokens += panel_token_usage.completion_tokens
-        total_token_usage.total_tokens += panel_token_usage.total_tokens
-        total_token_usage.cost += panel_token_usage.cost
+        total_token_usage.add(panel_token_usage)
 
         figure.caption_title = caption_result.caption_title
         figure.figure_caption = caption_result.figure_caption
@@ -248,22 +248,7 @@ class FigureCaptionExtractorAnthropic(FigureCaptionExtractor):
         """Extract individual captions for each figure in the structure."""
         logger.info("Starting extraction of individual captions")
 
-        total_token_usage = TokenUsage()
-
-        for figure in zip_structure.figures:
-            if self.is_ev_figure(figure.figure_label):
-                logger.info(f"Skipping EV figure: {figure.figure_label}")
-                continue
-
-            logger.info(f"Processing {figure.figure_label}")
-            updated_figure, figure_token_usage = self.process_figure(
-                figure, doc_content, zip_structure
-            )
-
-            total_token_usage.prompt_tokens += figure_token_usage.prompt_tokens
-            total_token_usage.completion_tokens += figure_token_usage.completion_tokens
-            total_token_usage.total_tokens += figure_token_usage.total_tokens
-            total_token_usage.cost += figure_token_usage.cost
+        total_token_usage = self._process_figures(doc_content, zip_structure)
 
         zip_structure.cost.extract_individual_captions = total_token_usage
         zip_structure.update_total_cost()
@@ -3,15 +3,30 @@
 import logging
 import re
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel
 
-from ..manuscript_structure.manuscript_structure import Panel, ZipStructure
-from ..prompt_handler import PromptHandler
+from ..manuscript_structure.manuscript_structure import (
+    Figure,
+    Panel,
+    TokenUsage,
+    ZipStructure,
+)
+from ..prompt_handler import PromptHandler, PromptLayout
+from .legend_segmenter import (
+    DEFAULT_MARGIN_CHARS,
+    LegendSegmentation,
+    LegendSlice,
+    segment_figure_legends,
+)
 
 logger = logging.getLogger(__name__)
 
+# Figures whose caption and panel requests run concurrently
+DEFAULT_FIGURE_WORKERS = 4
+
 
 class PanelList(BaseModel):
     """Model for a list of panels."""
@@ -56,6 +71,8 @@ class FigureCaptionExtractor(ABC):
         """
         self.config = config
         self.prompt_handler = prompt_handler
+        # The sanitized legends section of the manuscript being processed
+        self._legends_section: Optional[str] = None
         self._validate_config()
 
     @abstractmethod
@@ -86,6 +103,131 @@ class FigureCaptionExtractor(ABC):
         """
         pass
 
+    def _figure_workers(self) -> int:
+        """Number of figures processed concurrently (``max_workers``)."""
+        caption_config = getattr(self, "caption_config", {}) or {}
+        return max(1, int(caption_config.get("max_workers", DEFAULT_FIGURE_WORKERS)))
+
+    def _segment_legends(
+        self, doc_content: str, figure_labels: List[str]
+    ) -> LegendSegmentation:
+        """
+        Cut the legends section into per-figure slices for the caption requests.
+
+        Controlled by ``legend_segmentation`` in the caption step's provider
+        config (``enabled``, default true; ``margin_chars``, default 200). Figures
+        whose legend cannot be located unambiguously get the full section.
+        """
+        caption_config = getattr(self, "caption_config", {}) or {}
+        options = caption_config.get("legend_segmentation", {}) or {}
+        if not options.get("enabled", True):
+            segmentation = LegendSegmentation(full_text=doc_content)
+            for label in figure_labels:
+                segmentation.slices[label] = LegendSlice(
+                    label, doc_content, "disabled", False
+                )
+            return segmentation
+
+        segmentation = segment_figure_legends(
+            doc_content,
+            figure_labels,
+            margin_chars=options.get("margin_chars", DEFAULT_MARGIN_CHARS),
+        )
+        logger.info(
+            "Figure legends segmented",
+            extra={
+                "operation": "main.extract_individual_captions",
+                **segmentation.stats(),
+            },
+        )
+        return segmentation
+
+    def _is_legends_section(self, captions: str) -> bool:
+        """
+        Whether a figure is sent the whole legends section rather than its slice.
+
+        Only the whole section is the same for every figure of a manuscript and
+        worth a prompt-cache entry; each slice would be written and never read.
+        """
+        return self._legends_section is not None and captions == self._legends_section
+
+    def _caption_title_layout(
+        self, figure_label: str, captions: str, prompt_caching: bool
+    ) -> PromptLayout:
+        """
+        Lay out the caption-title prompts of one figure for prompt caching.
+
+        Only the whole legends section, the same for every figure, is moved
+        ahead of the figure label as a shared prefix. A figure's own slice
+        differs per request and gains nothing from being moved, so it keeps
+        the template's order, as does ``prompt_caching: false``.
+        """
+        variables = {"figure_label": figure_label, "figure_captions": captions}
+        if prompt_caching and self._is_legends_section(captions):
+            return self.prompt_handler.get_prompt_layout(
+                "extract_caption_title",
+                variables,
+                shared={"figure_captions": "Figure legends"},
+            )
+        prompts = self.prompt_handler.get_prompt(
+            step="extract_caption_title", variables=variables
+        )
+        return PromptLayout(system=prompts["system"], user=prompts["user"])
+
+    def _process_figures(
+        self, doc_content: str, zip_structure: ZipStructure
+    ) -> TokenUsage:
+        """
+        Run process_figure for every non-EV figure and return the summed usage.
+
+        Each figure is sent only its own slice of the legends section when the
+        slice can be located (see _segment_legends).
+
+        Figures are processed on a thread pool of ``max_workers`` threads (set in
+        the caption step's provider config; 1 processes them one by one). Each
+        figure only updates itself, and usage is summed in figure order, so the
+        result does not depend on which request finishes first.
+        """
+        figures = []
+        for figure in zip_structure.figures:
+            if self.is_ev_figure(figure.figure_label):
+                logger.info(f"Skipping EV figure: {figure.figure_label}")
+                continue
+            figures.append(figure)
+
+        legends = self._segment_legends(
+            doc_content, [figure.figure_label for figure in figures]
+        )
+        self._legends_section = self._sanitize_caption_html(legends.full_text)
+
+        def run(figure: Figure) -> TokenUsage:
+            logger.info(f"Processing {figure.figure_label}")
+            _, figure_token_usage = self.process_figure(
+                figure, legends.text_for(figure.figure_label), zip_structure
+            )
+            return figure_token_usage
+
+        workers = min(self._figure_workers(), len(figures)) or 1
+        logger.info(
+            "Processing figure captions",
+            extra={
+                "operation": "main.extract_individual_captions",
+                "figure_count": len(figures),
+                "workers": workers,
+            },
+        )
+        total_token_usage = TokenUsage()
+        if workers == 1:
+            usages = [run(figure) for figure in figures]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="captions"
+            ) as executor:
+                usages = list(executor.map(run, figures))
+        for figure_token_usage in usages:
+            total_token_usage.add(figure_token_usage)
+        return total_token_usage
+
     def _parse_response(self, response: str) -> Dict:
         """Parse AI response containing caption data."""
         try:
@@ -10,6 +10,7 @@ from pydantic import BaseModel
 
 from ..ai_observability import summarize_text
 from ..cost_tracking import update_token_usage
+from ..http_clients import get_http_client
 from ..manuscript_structure.manuscript_structure import (
     Figure,
     Panel,
@@ -17,6 +18,7 @@ from ..manuscript_structure.manuscript_structure import (
     ZipStructure,
 )
 from ..openai_utils import call_openai_with_fallback, validate_model_config
+from ..response_cache import get_response_cache
 from .extract_captions_base import FigureCaptionExtractor
 
 logger = logging.getLogger(__name__)
@@ -57,7 +59,9 @@ class FigureCaptionExtractorOpenAI(FigureCaptionExtractor):
         if not api_key:
             raise ValueError("OPENAI_API_KEY environment variable is not set")
 
-        self.client = openai.OpenAI(api_key=api_key)
+        self.client = openai.OpenAI(
+            api_key=api_key, http_client=get_http_client("openai", config)
+        )
 
         self.config = config
         self.prompt_handler = prompt_handler
@@ -107,29 +111,18 @@ class FigureCaptionExtractorOpenAI(FigureCaptionExtractor):
             },
         )
 
-        # Get prompts with variables substituted
-        prompts = self.prompt_handler.get_prompt(
-            step="extract_caption_title",
-            variables={
-                "figure_label": figure_label,
-                "figure_captions": all_captions,
-            },
+        config_ = self.caption_config
+        # OpenAI caches repeated prompt prefixes automatically
+        layout = self._caption_title_layout(
+            figure_label, all_captions, config_.get("prompt_caching", True)
         )
 
         # Add JSON instruction to system prompt to satisfy the API requirement
-        system_prompt = prompts["system"]
-        if "json" not in system_prompt.lower():
-            system_prompt += "\n\nProvide your response in JSON format."
-
-        # Prepare messages
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": prompts["user"]},
-        ]
+        if "json" not in layout.system.lower():
+            layout.system += "\n\nProvide your response in JSON format."
+        messages = layout.messages()
 
-        config_ = self.caption_config
         model_ = config_.get("model", "gpt-4o")
-
         response = call_openai_with_fallback(
             client=self.client,
             model=model_,
@@ -140,26 +133,11 @@ class FigureCaptionExtractorOpenAI(FigureCaptionExtractor):
             frequency_penalty=config_.get("frequency_penalty", 0),
             presence_penalty=config_.get("presence_penalty", 0),
             operation="main.extract_caption_title",
+            cache=get_response_cache(self.config, "extract_caption_title", "openai"),
             request_metadata={"figure_label": figure_label},
         )
-        # Create token usage object
-        token_usage = TokenUsage()
-        token_usage.prompt_tokens = response.usage.prompt_tokens
-        token_usage.completion_tokens = response.usage.completion_tokens
-        token_usage.total_tokens = response.usage.total_tokens
-
-        # Update cost based on model and tokens
-        token_usage = update_token_usage(
-            token_usage,
-            {
-                "usage": {
-                    "prompt_tokens": response.usage.prompt_tokens,
-                    "completion_tokens": response.usage.completion_tokens,
-                    "total_tokens": response.usage.total_tokens,
-                }
-            },
-            model_,
-        )
+        # Create token usage object and update cost based on model and tokens
+        token_usage = update_token_usage(TokenUsage(), response, model_)
 
         # When using structured responses, the parsed content is in .parsed
         if hasattr(response.choices[0].message, "parsed"):
@@ -220,6 +198,7 @@ class FigureCaptionExtractorOpenAI(FigureCaptionExtractor):
             frequency_penalty=config_.get("frequency_penalty", 0),
             presence_penalty=config_.get("presence_penalty", 0),
             operation="main.extract_panel_sequence",
+            cache=get_response_cache(self.config, "extract_panel_sequence", "openai"),
             request_metadata={"figure_label": figure_label},
         )
 
@@ -265,10 +244,7 @@ class FigureCaptionExtractorOpenAI(FigureCaptionExtractor):
         )
 
         # Accumulate token usage
-        total_token_usage.prompt_tokens += caption_token_usage.prompt_tokens
-        total_token_usage.completion_tokens += caption_token_usage.completion_tokens
-        total_token_usage.total_tokens += caption_token_usage.total_tokens
-        total_token_usage.cost += caption_token_usage.cost
+        total_token_usage.add(caption_token_usage)
 
         # Skip panel extraction if no caption was found
         if not caption_result.figure_caption:
@@ -294,10 +270,7 @@ class FigureCaptionExtractorOpenAI(FigureCaptionExtractor):
         )
 
         # Accumulate token usage
-        total_token_usage.prompt_tokens += panel_token_usage.prompt_tokens
-        total_token_usage.completion_tokens += panel_token_usage.completion_tokens
-        total_token_usage.total_tokens += panel_token_usage.total_tokens
-        total_token_usage.cost += panel_token_usage.cost
+        total_token_usage.add(panel_token_usage)
 
         # Update figure with extracted information
         figure.caption_title = caption_result.caption_title
@@ -337,27 +310,7 @@ class FigureCaptionExtractorOpenAI(FigureCaptionExtractor):
         )
 
         # Track token usage across all figures
-        total_token_usage = TokenUsage()
-
-        # Process each figure one by one
-        for figure in zip_structure.figures:
-            # Skip EV figures
-            if self.is_ev_figure(figure.figure_label):
-                logger.info(f"Skipping EV figure: {figure.figure_label}")
-                continue
-
-            logger.info(f"Processing {figure.figure_label}")
-
-            # Process the figure directly (no need for async)
-            updated_figure, figure_token_usage = self.process_figure(
-                figure, doc_content, zip_structure
-            )
-
-            # Update total token usage
-            total_token_usage.prompt_tokens += figure_token_usage.prompt_tokens
-            total_token_usage.completion_tokens += figure_token_usage.completion_tokens
-            total_token_usage.total_tokens += figure_token_usage.total_tokens
-            total_token_usage.cost += figure_token_usage.cost
+        total_token_usage = self._process_figures(doc_content, zip_structure)
 
         # Store token usage in zip structure
         zip_structure.cost.extract_individual_captions = total_token_usage
@@ -0,0 +1,174 @@
+"""Deterministic splitting of the figure legends section into per-figure slices.
+
+Caption extraction asks the model for one figure at a time. Sending the whole
+legends section with every request makes prompt size grow with the number of
+figures times the legend length, so the section is first cut at legend
+boundaries: a figure label such as "Figure 3", "Figure EV2" or "Fig. 4" at the
+start of a heading, a bold run, a paragraph or a line of the pandoc HTML.
+
+A slice runs to the next boundary of another requested figure, so a line
+inside a legend that opens with a reference to some other figure ("Figure S3
+shows...") does not cut it short. A figure gets its own slice (plus a small
+margin on each side) only when its label is found at exactly one boundary and
+the next requested figure follows it in numbering order; otherwise it falls
+back to the full section.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_MARGIN_CHARS = 200
+# Slices with less visible text than this are treated as misdetections
+DEFAULT_MIN_SLICE_CHARS = 40
+# Rough characters-per-token ratio for reporting savings
+CHARS_PER_TOKEN = 4
+
+_BOUNDARY_RE = re.compile(
+    r"(?:^|(?P<open><(?P<tag>h[1-6]|p|li|div|strong|b)\b[^>]*>)|<br\s*/?>|\n)"
+    r"\s*(?:<(?P<inner>strong|b|em|i|span)\b[^>]*>\s*)*"
+    r"(?:Figure|Fig\.?)\s*(?P<prefix>EV|E|S)?\s*(?P<number>\d+)(?![\w])",
+    re.IGNORECASE,
+)
+_LABEL_RE = re.compile(
+    r"(?P<prefix>\bEV|\bE|\bS|Expanded\s+View|Extended\s+View|Extended\s+Data)?"
+    r"\s*(?:Figure|Fig\.?)?\s*(?P<prefix2>EV|E|S)?\s*(?P<number>\d+)\b",
+    re.IGNORECASE,
+)
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def _normalize_prefix(prefix: Optional[str]) -> str:
+    if not prefix:
+        return ""
+    prefix = prefix.upper()
+    return "S" if prefix == "S" else "EV"
+
+
+def figure_key(figure_label: str) -> Optional[Tuple[str, int]]:
+    """Return the (prefix, number) key of a figure label, e.g. ("EV", 2)."""
+    match = _LABEL_RE.search(figure_label)
+    if match is None:
+        return None
+    prefix = match.group("prefix") or match.group("prefix2")
+    return _normalize_prefix(prefix), int(match.group("number"))
+
+
+def _boundary_pattern(match: "re.Match[str]") -> str:
+    tag = (match.group("tag") or "").lower()
+    inner = (match.group("inner") or "").lower()
+    if tag.startswith("h"):
+        return "heading"
+    if tag in ("strong", "b") or inner in ("strong", "b"):
+        return "bold"
+    if tag:
+        return "paragraph"
+    return "line"
+
+
+def _follows(key: Tuple[str, int], next_key: Tuple[str, int]) -> bool:
+    """Whether a legend can come after another: a new series or a higher number."""
+    return next_key[0] != key[0] or next_key[1] > key[1]
+
+
+@dataclass
+class LegendSlice:
+    """The legend text sent for one figure."""
+
+    figure_label: str
+    text: str
+    pattern: str
+    segmented: bool
+
+
+@dataclass
+class LegendSegmentation:
+    """Per-figure legend slices and the size of the full legends section."""
+
+    full_text: str
+    slices: Dict[str, LegendSlice] = field(default_factory=dict)
+
+    def text_for(self, figure_label: str) -> str:
+        """Return the slice for a figure, or the full section if it has none."""
+        legend_slice = self.slices.get(figure_label)
+        return legend_slice.text if legend_slice else self.full_text
+
+    def stats(self) -> Dict[str, int]:
+        """Summarize how much legend text the slices save across all figures."""
+        full_chars = len(self.full_text) * len(self.slices)
+        sent_chars = sum(len(s.text) for s in self.slices.values())
+        return {
+            "figure_count": len(self.slices),
+            "segmented_figures": sum(s.segmented for s in self.slices.values()),
+            "fallback_figures": sum(not s.segmented for s in self.slices.values()),
+            "legend_chars_full": full_chars,
+            "legend_chars_sent": sent_chars,
+            "estimated_prompt_tokens_saved": (full_chars - sent_chars)
+            // CHARS_PER_TOKEN,
+        }
+
+
+def segment_figure_legends(
+    legends: str,
+    figure_labels: List[str],
+    margin_chars: int = DEFAULT_MARGIN_CHARS,
+    min_slice_chars: int = DEFAULT_MIN_SLICE_CHARS,
+) -> LegendSegmentation:
+    """
+    Split a figure legends section into one slice per requested figure.
+
+    Args:
+        legends: Figure legends section (pandoc HTML or plain text)
+        figure_labels: Labels of the figures to slice for
+        margin_chars: Characters of context kept before and after each slice
+        min_slice_chars: Minimum visible characters for a slice to be trusted
+
+    Returns:
+        LegendSegmentation with a slice for every label; labels that cannot be
+        located unambiguously get the full section.
+    """
+    segmentation = LegendSegmentation(full_text=legends)
+
+    boundaries: List[Tuple[int, Tuple[str, int], str]] = []
+    for match in _BOUNDARY_RE.finditer(legends):
+        key = (_normalize_prefix(match.group("prefix")), int(match.group("number")))
+        start = match.start("open") if match.group("open") else match.start()
+        boundaries.append((start, key, _boundary_pattern(match)))
+    # Only boundaries of requested figures end a slice
+    requested_keys = {figure_key(label) for label in figure_labels}
+    boundaries = [boundary for boundary in boundaries if boundary[1] in requested_keys]
+    key_counts: Dict[Tuple[str, int], int] = {}
+    for _, key, _ in boundaries:
+        key_counts[key] = key_counts.get(key, 0) + 1
+
+    for label in figure_labels:
+        key = figure_key(label)
+        if key is None or key_counts.get(key) != 1:
+            segmentation.slices[label] = LegendSlice(label, legends, "fallback", False)
+            continue
+
+        index = next(
+            i for i, (_, hit_key, _) in enumerate(boundaries) if hit_key == key
+        )
+        start = boundaries[index][0]
+        end = len(legends)
+        if index + 1 < len(boundaries):
+            end, next_key, _ = boundaries[index + 1]
+            if not _follows(key, next_key) or key_counts[next_key] != 1:
+                segmentation.slices[label] = LegendSlice(
+                    label, legends, "fallback", False
+                )
+                continue
+        visible_text = _TAG_RE.sub("", legends[start:end]).strip()
+        if len(visible_text) < min_slice_chars:
+            segmentation.slices[label] = LegendSlice(label, legends, "fallback", False)
+            continue
+
+        text = legends[
+            max(0, start - margin_chars) : min(len(legends), end + margin_chars)
+        ]
+        segmentation.slices[label] = LegendSlice(
+            label, text, boundaries[index][2], True
+        )
+
+    return segmentation
@@ -9,7 +9,9 @@ import anthropic
 from ..ai_observability import summarize_text
 from ..anthropic_utils import call_anthropic, validate_anthropic_model
 from ..cost_tracking import update_token_usage
+from ..http_clients import get_http_client
 from ..manuscript_structure.manuscript_structure import ZipStructure
+from ..response_cache import get_response_cache
 from .extract_sections_base import ExtractedSections, SectionExtractor
 
 logger = logging.getLogger(__name__)
@@ -20,7 +22,9 @@ class SectionExtractorAnthropic(SectionExtractor):
 
     def __init__(self, config: Dict, prompt_handler):
         super().__init__(config, prompt_handler)
-        self.client = anthropic.Anthropic()
+        self.client = anthropic.Anthropic(
+            http_client=get_http_client("anthropic", config)
+        )
 
     def _validate_config(self) -> None:
         """Validate Anthropic configuration parameters."""
@@ -69,6 +73,8 @@ class SectionExtractorAnthropic(SectionExtractor):
             temperature=config_.get("temperature", 0.1),
             max_tokens=config_.get("max_tokens", 2048),
             operation="main.extract_sections",
+            cache=get_response_cache(self.config, "extract_sections", "anthropic"),
+            prompt_caching=config_.get("prompt_caching", True),
             request_metadata={"figure_count": len(zip_structure.figures)},
         )
 
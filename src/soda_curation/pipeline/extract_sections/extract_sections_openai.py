@@ -9,8 +9,10 @@ import openai
 
 from ..ai_observability import summarize_text
 from ..cost_tracking import update_token_usage
+from ..http_clients import get_http_client
 from ..manuscript_structure.manuscript_structure import ZipStructure
 from ..openai_utils import call_openai_with_fallback, validate_model_config
+from ..response_cache import get_response_cache
 from .extract_sections_base import ExtractedSections, SectionExtractor
 
 logger = logging.getLogger(__name__)
@@ -28,7 +30,9 @@ class SectionExtractorOpenAI(SectionExtractor):
         if not api_key:
             raise ValueError("OPENAI_API_KEY environment variable is not set")
 
-        self.client = openai.OpenAI(api_key=api_key)
+        self.client = openai.OpenAI(
+            api_key=api_key, http_client=get_http_client("openai", config)
+        )
 
     def _validate_config(self) -> None:
         """Validate OpenAI configuration parameters."""
@@ -88,6 +92,7 @@ class SectionExtractorOpenAI(SectionExtractor):
             frequency_penalty=config_.get("frequency_penalty", 0),
             presence_penalty=config_.get("presence_penalty", 0),
             operation="main.extract_sections",
+            cache=get_response_cache(self.config, "extract_sections", "openai"),
             request_metadata={
                 "figure_count": len(zip_structure.figures),
                 "expected_labels_count": len(
@@ -0,0 +1,209 @@
+"""Process-wide HTTP connection pools for the provider SDK clients.
+
+Every extractor, matcher and QC provider builds its own SDK client. Left to
+themselves, each of those clients opens its own connection pool, so TCP and
+TLS connections are never reused across steps. The SDK clients are instead
+handed one shared ``httpx`` client per provider, which keeps connections alive
+for the whole process.
+
+Pool limits live in the top-level ``http_clients`` section, with optional
+per-provider overrides::
+
+    default:
+      http_clients:
+        max_connections: 20            # default
+        max_keepalive_connections: 10  # default
+        keepalive_expiry: 30           # seconds, default
+        anthropic:
+          max_connections: 40
+
+Set ``enabled: false`` to let each SDK client manage its own pool. The first
+caller for a provider fixes its pool's limits. Request and connection counts
+are kept per pool and logged by ``log_http_client_stats``. Rate-limit response
+headers are passed on to the rate limiter.
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import anthropic
+import httpx
+import openai
+
+from .rate_limits import MODEL_HEADER, get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 10
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+# httpcore trace event emitted once per newly opened TCP connection
+_CONNECTION_OPENED = "connection.connect_tcp.complete"
+# Request extension carrying the model named in MODEL_HEADER
+_MODEL_EXTENSION = "soda_curation.model"
+
+
+@dataclass
+class PoolStats:
+    """Request and connection counts of one shared connection pool."""
+
+    requests: int = 0
+    connections_opened: int = 0
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    @property
+    def reused_requests(self) -> int:
+        """Requests sent over a connection that was already open."""
+        return max(self.requests - self.connections_opened, 0)
+
+    def on_request(self, request: httpx.Request) -> None:
+        """httpx request hook; counts the request and traces its connection."""
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self._trace
+
+    def _trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        if event_name == _CONNECTION_OPENED:
+            with self._lock:
+                self.connections_opened += 1
+
+
+_pools: Dict[Tuple[int, str], httpx.Client] = {}
+_stats: Dict[Tuple[int, str], PoolStats] = {}
+_pools_lock = threading.Lock()
+
+
+def pool_limits(
+    config: Optional[Dict[str, Any]], provider: str
+) -> Optional[httpx.Limits]:
+    """Return the pool limits for a provider, or None if pooling is disabled."""
+    settings = dict((config or {}).get("http_clients") or {})
+    overrides = settings.pop(provider, None) or {}
+    settings.update(overrides)
+    if not settings.get("enabled", True):
+        return None
+    return httpx.Limits(
+        max_connections=int(settings.get("max_connections", DEFAULT_MAX_CONNECTIONS)),
+        max_keepalive_connections=int(
+            settings.get("max_keepalive_connections", DEFAULT_MAX_KEEPALIVE_CONNECTIONS)
+        ),
+        keepalive_expiry=float(
+            settings.get("keepalive_expiry", DEFAULT_KEEPALIVE_EXPIRY)
+        ),
+    )
+
+
+def get_http_client(
+    provider: str, config: Optional[Dict[str, Any]] = None
+) -> Optional[httpx.Client]:
+    """
+    Return the shared httpx client for a provider's SDK clients.
+
+    Args:
+        provider: Provider name, e.g. "openai", "anthropic" or "gemini".
+        config: Pipeline configuration holding the ``http_clients`` section.
+            Callers without one get the pool already created for the
+            provider, or a pool with default limits.
+
+    Returns:
+        The shared client, or None when pooling is disabled and the SDK should
+        create its own.
+    """
+    limits = pool_limits(config, provider)
+    if limits is None:
+        return None
+
+    # Pools are not shared with forked worker processes
+    key = (os.getpid(), provider)
+    with _pools_lock:
+        if key not in _pools:
+            stats = PoolStats()
+            _pools[key] = _build_http_client(provider, limits, stats)
+            _stats[key] = stats
+            logger.info(
+                "Created shared HTTP connection pool",
+                extra={
+                    "operation": "http_clients.create",
+                    "provider": provider,
+                    "max_connections": limits.max_connections,
+                    "max_keepalive_connections": limits.max_keepalive_connections,
+                    "keepalive_expiry": limits.keepalive_expiry,
+                },
+            )
+        return _pools[key]
+
+
+def _build_http_client(
+    provider: str, limits: httpx.Limits, stats: PoolStats
+) -> httpx.Client:
+    """Build a provider's pooled client with the SDK's default settings."""
+    event_hooks = {
+        "request": [stats.on_request, _take_model_header],
+        "response": [_rate_limit_hook(provider)],
+    }
+    if provider == "openai":
+        return openai.DefaultHttpxClient(limits=limits, event_hooks=event_hooks)
+    if provider == "anthropic":
+        return anthropic.DefaultHttpxClient(limits=limits, event_hooks=event_hooks)
+    return httpx.Client(limits=limits, event_hooks=event_hooks)
+
+
+def _take_model_header(request: httpx.Request) -> None:
+    """httpx request hook; keeps the model header out of the sent request."""
+    model = request.headers.pop(MODEL_HEADER, None)
+    if model:
+        request.extensions[_MODEL_EXTENSION] = model
+
+
+def _rate_limit_hook(provider: str) -> Callable[[httpx.Response], None]:
+    """Return a response hook passing rate-limit headers to the rate limiter."""
+
+    def observe(response: httpx.Response) -> None:
+        limiter = get_rate_limiter()
+        model = response.request.extensions.get(_MODEL_EXTENSION)
+        if limiter is not None and model:
+            limiter.observe_headers(provider, model, response.headers)
+
+    return observe
+
+
+def http_client_stats() -> Dict[str, PoolStats]:
+    """Return the connection stats of this process's pools, by provider."""
+    pid = os.getpid()
+    with _pools_lock:
+        return {
+            provider: stats
+            for (owner, provider), stats in _stats.items()
+            if owner == pid
+        }
+
+
+def log_http_client_stats(**extra: Any) -> None:
+    """Log how many requests of each shared pool reused an open connection."""
+    for provider, stats in http_client_stats().items():
+        logger.info(
+            "HTTP connection pool usage",
+            extra={
+                "operation": "http_clients.stats",
+                "provider": provider,
+                "requests": stats.requests,
+                "connections_opened": stats.connections_opened,
+                "reused_requests": stats.reused_requests,
+                **extra,
+            },
+        )
+
+
+def close_http_clients() -> None:
+    """Close and forget this process's shared pools."""
+    pid = os.getpid()
+    with _pools_lock:
+        for key in [key for key in _pools if key[0] == pid]:
+            _pools.pop(key).close()
+            _stats.pop(key, None)
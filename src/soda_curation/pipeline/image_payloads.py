@@ -0,0 +1,128 @@
+"""Encoding of panel crops and full figures for the vision APIs.
+
+Panel crops sent to the panel-caption matcher and the full figures sent to the
+QC checks used to be lossless PNGs at full size, with the provider's default
+image detail. Lossy formats, a cap on the longest edge and a lower OpenAI
+``detail`` level cut request bytes, upload time and image tokens.
+
+Settings live in the top-level ``image_payloads`` section, one entry per
+payload kind (``panel``, ``figure`` and ``annotated_figure``, the figure with
+numbered detection boxes used by the annotated-figure matching strategy)::
+
+    default:
+      image_payloads:
+        panel:
+          format: JPEG    # PNG (default), JPEG or WEBP
+          quality: 85     # JPEG/WebP quality, 1-100
+          max_edge: 1024  # longest side in pixels; unset keeps the size
+          detail: low     # OpenAI image detail: auto (default), low or high
+        figure:
+          format: PNG
+          max_edge: 2048
+
+Anthropic and Gemini have no detail setting and ignore it. The media type of
+a payload is read from its first bytes, so JPEG and WebP payloads saved with
+the QC figure data are labelled correctly when they are loaded again.
+"""
+
+import base64
+import io
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from PIL import Image
+
+PAYLOAD_KINDS = ("panel", "figure", "annotated_figure")
+IMAGE_FORMATS = {"PNG": "image/png", "JPEG": "image/jpeg", "WEBP": "image/webp"}
+DETAIL_LEVELS = ("auto", "low", "high")
+
+# Base64 prefixes of the PNG, JPEG and WebP ("RIFF") file signatures
+_BASE64_SIGNATURES = (
+    ("iVBORw0KGgo", "image/png"),
+    ("/9j/", "image/jpeg"),
+    ("UklGR", "image/webp"),
+)
+
+
+@dataclass(frozen=True)
+class ImageEncoding:
+    """How an image payload is encoded before it is sent to a vision model."""
+
+    format: str = "PNG"
+    quality: int = 85
+    max_edge: Optional[int] = None
+    detail: str = "auto"
+
+    def __post_init__(self):
+        if self.format not in IMAGE_FORMATS:
+            raise ValueError(
+                f"Invalid image format: {self.format}. "
+                f"Must be one of {list(IMAGE_FORMATS)}"
+            )
+        if not 1 <= self.quality <= 100:
+            raise ValueError(f"Image quality must be in 1-100, got {self.quality}")
+        if self.max_edge is not None and self.max_edge < 1:
+            raise ValueError(f"max_edge must be positive, got {self.max_edge}")
+        if self.detail not in DETAIL_LEVELS:
+            raise ValueError(
+                f"Invalid image detail: {self.detail}. Must be one of {DETAIL_LEVELS}"
+            )
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], kind: str) -> "ImageEncoding":
+        """Build the encoding of a payload kind from ``image_payloads``."""
+        if kind not in PAYLOAD_KINDS:
+            raise ValueError(f"Unknown image payload kind: {kind}")
+        settings = (config.get("image_payloads") or {}).get(kind) or {}
+        max_edge = settings.get("max_edge")
+        return cls(
+            format=str(settings.get("format", "PNG")).upper(),
+            quality=int(settings.get("quality", 85)),
+            max_edge=int(max_edge) if max_edge else None,
+            detail=str(settings.get("detail", "auto")).lower(),
+        )
+
+    @property
+    def memo_key(self) -> str:
+        """Key identifying the encoded bytes, for memoizing payloads."""
+        if self.format == "PNG":
+            return f"PNG:{self.max_edge}"
+        return f"{self.format}:{self.quality}:{self.max_edge}"
+
+
+def encode_image(image: Image.Image, encoding: ImageEncoding = ImageEncoding()) -> str:
+    """Return ``image`` encoded with ``encoding`` as a base64 string."""
+    if encoding.max_edge and max(image.size) > encoding.max_edge:
+        image = image.copy()
+        image.thumbnail(
+            (encoding.max_edge, encoding.max_edge), Image.Resampling.LANCZOS
+        )
+
+    save_kwargs: Dict[str, Any] = {}
+    if encoding.format != "PNG":
+        save_kwargs["quality"] = encoding.quality
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+    buffered = io.BytesIO()
+    image.save(buffered, format=encoding.format, **save_kwargs)
+    return base64.b64encode(buffered.getvalue()).decode("utf-8")
+
+
+def image_media_type(encoded_image: str) -> str:
+    """Return the media type of a base64 image payload, PNG if unknown."""
+    for prefix, media_type in _BASE64_SIGNATURES:
+        if encoded_image.startswith(prefix):
+            return media_type
+    return "image/png"
+
+
+def image_url_content(encoded_image: str, detail: str = "auto") -> Dict[str, Any]:
+    """Return an OpenAI-style ``image_url`` content part for a payload."""
+    image_url: Dict[str, Any] = {
+        "url": f"data:{image_media_type(encoded_image)};base64,{encoded_image}"
+    }
+    # "auto" is the provider default; leaving it out keeps requests unchanged
+    if detail != "auto":
+        image_url["detail"] = detail
+    return {"type": "image_url", "image_url": image_url}
@@ -6,9 +6,10 @@ the structure of ZIP files containing manuscript data.
 import json
 import logging
 import os
+import threading
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, ClassVar, Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -84,6 +85,28 @@ class TokenUsage:
     completion_tokens: int = 0
     total_tokens: int = 0
     cost: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    # Prompt tokens read from / written to the provider's prompt cache, both
+    # included in prompt_tokens. OpenAI's cached_tokens count as reads
+    prompt_cache_read_tokens: int = 0
+    prompt_cache_write_tokens: int = 0
+
+    # Shared by all instances so usage can be accumulated from worker threads
+    lock: ClassVar[threading.RLock] = threading.RLock()
+
+    def add(self, other: "TokenUsage") -> "TokenUsage":
+        """Accumulate another usage record into this one."""
+        with self.lock:
+            self.prompt_tokens += other.prompt_tokens
+            self.completion_tokens += other.completion_tokens
+            self.total_tokens += other.total_tokens
+            self.cost += other.cost
+            self.cache_hits += other.cache_hits
+            self.cache_misses += other.cache_misses
+            self.prompt_cache_read_tokens += other.prompt_cache_read_tokens
+            self.prompt_cache_write_tokens += other.prompt_cache_write_tokens
+        return self
 
 
 @dataclass
@@ -156,6 +179,10 @@ class ZipStructure:
         total.completion_tokens = 0
         total.total_tokens = 0
         total.cost = 0.0
+        total.cache_hits = 0
+        total.cache_misses = 0
+        total.prompt_cache_read_tokens = 0
+        total.prompt_cache_write_tokens = 0
 
         # Add up each component
         for component in [
@@ -169,6 +196,10 @@ class ZipStructure:
             total.completion_tokens += component.completion_tokens
             total.total_tokens += component.total_tokens
             total.cost += component.cost
+            total.cache_hits += component.cache_hits
+            total.cache_misses += component.cache_misses
+            total.prompt_cache_read_tokens += component.prompt_cache_read_tokens
+            total.prompt_cache_write_tokens += component.prompt_cache_write_tokens
 
         # Verify total_tokens equals sum of prompt and completion
         total.total_tokens = total.prompt_tokens + total.completion_tokens
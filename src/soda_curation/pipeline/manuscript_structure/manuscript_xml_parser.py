@@ -8,7 +8,6 @@ used to create a structured representation of the manuscript.
 
 import logging
 import os
-import shutil
 import zipfile
 from pathlib import Path
 from typing import List
@@ -18,6 +17,7 @@ from lxml import etree
 
 from .exceptions import NoManuscriptFileError, NoXMLFileFoundError
 from .manuscript_structure import Figure, ZipStructure
+from .zip_filesystem import ZipFileSystem
 
 logger = logging.getLogger(__name__)
 
@@ -48,7 +48,8 @@ class XMLStructureExtractor:
         self.extract_dir = Path(extract_dir)
         self.extract_dir.mkdir(parents=True, exist_ok=True)
 
-        # First extract just the XML to get manuscript ID
+        # Only the XML is extracted up front; everything else stays in the
+        # archive until a consumer needs a real path (see zip_filesystem)
         with zipfile.ZipFile(self.zip_path, "r") as zip_ref:
             xml_files = [f for f in zip_ref.namelist() if f.endswith(".xml")]
             if not xml_files:
@@ -70,30 +71,17 @@ class XMLStructureExtractor:
             # Parse XML content
             self.xml_content = etree.parse(xml_path).getroot()
 
-            # Now extract everything to manuscript_id subdirectory
-            for item in zip_ref.namelist():
-                if item == xml_file:  # Skip XML as already extracted
-                    continue
-
-                if not item.endswith("/"):  # Skip directories
-                    # Remove manuscript ID prefix if it exists
-                    item_path = Path(item)
-                    if item_path.parts[0] == self.manuscript_id:
-                        relative_path = Path(*item_path.parts[1:])
-                    else:
-                        relative_path = item_path
-
-                    # Extract to manuscript_id subdirectory
-                    target_path = self.manuscript_extract_dir / relative_path
-                    target_path.parent.mkdir(parents=True, exist_ok=True)
-
-                    # Extract file
-                    with zip_ref.open(item) as source, open(
-                        target_path, "wb"
-                    ) as target:
-                        shutil.copyfileobj(source, target)
+        self.files = ZipFileSystem(
+            self.zip_path, self.manuscript_extract_dir, strip_prefix=self.manuscript_id
+        ).register()
+        logger.info(
+            f"Indexed {len(self.files.members)} archive members for on-demand "
+            f"extraction to {self.manuscript_extract_dir}"
+        )
 
-            logger.info(f"Extracted contents to {self.manuscript_extract_dir}")
+    def close(self) -> None:
+        """Release the submission archive once the pipeline is done with it."""
+        self.files.close()
 
     def _extract_xml_content(self) -> etree._Element:
         """Extract and parse XML content."""
@@ -146,10 +134,11 @@ class XMLStructureExtractor:
             if object_id:
                 raw_path = object_id[0].text
                 cleaned_path = self._clean_path(raw_path)
-                full_path = self.manuscript_extract_dir / cleaned_path
 
                 # Check if DOCX exists
-                if raw_path.lower().endswith(".docx") and full_path.exists():
+                if raw_path.lower().endswith(".docx") and self.files.exists(
+                    cleaned_path
+                ):
                     docx_path = cleaned_path
                     logger.info(f"Found DOCX file: {docx_path}")
                     return docx_path
@@ -157,37 +146,17 @@ class XMLStructureExtractor:
         # If DOCX not found, try fallback formats
         logger.warning("DOCX file not found, searching for fallback formats...")
         # Try PDF in pdf/ folder
-        pdf_folder = self.manuscript_extract_dir / "pdf"
-        if pdf_folder.exists():
-            pdf_files = list(pdf_folder.glob("*.pdf"))
-            if pdf_files:
-                pdf_path = pdf_files[0].relative_to(self.manuscript_extract_dir)
-                logger.info(f"Found PDF file as fallback: {pdf_path}")
-                return str(pdf_path)
-
-        # Try other formats in doc/ folder
-        doc_folder = self.manuscript_extract_dir / "doc"
-        if doc_folder.exists():
-            # Try LaTeX (.tex)
-            tex_files = list(doc_folder.glob("*.tex"))
-            if tex_files:
-                tex_path = tex_files[0].relative_to(self.manuscript_extract_dir)
-                logger.info(f"Found LaTeX file as fallback: {tex_path}")
-                return str(tex_path)
-
-            # Try RTF
-            rtf_files = list(doc_folder.glob("*.rtf"))
-            if rtf_files:
-                rtf_path = rtf_files[0].relative_to(self.manuscript_extract_dir)
-                logger.info(f"Found RTF file as fallback: {rtf_path}")
-                return str(rtf_path)
-
-            # Try ODT
-            odt_files = list(doc_folder.glob("*.odt"))
-            if odt_files:
-                odt_path = odt_files[0].relative_to(self.manuscript_extract_dir)
-                logger.info(f"Found ODT file as fallback: {odt_path}")
-                return str(odt_path)
+        pdf_files = self.files.glob("pdf", "*.pdf")
+        if pdf_files:
+            logger.info(f"Found PDF file as fallback: {pdf_files[0]}")
+            return pdf_files[0]
+
+        # Try other formats in doc/ folder: LaTeX (.tex), RTF, ODT
+        for pattern, name in (("*.tex", "LaTeX"), ("*.rtf", "RTF"), ("*.odt", "ODT")):
+            doc_files = self.files.glob("doc", pattern)
+            if doc_files:
+                logger.info(f"Found {name} file as fallback: {doc_files[0]}")
+                return doc_files[0]
 
         # If nothing found, raise error
         if docx_path:
@@ -262,8 +231,11 @@ class XMLStructureExtractor:
         return cleaned_path
 
     def get_full_path(self, relative_path: str) -> Path:
-        """Get full path in extraction directory."""
-        return self.manuscript_extract_dir / relative_path
+        """Get full path in extraction directory, extracting the file if needed."""
+        full_path = self.manuscript_extract_dir / relative_path
+        if self.files.exists(relative_path):
+            return self.files.materialize(relative_path)
+        return full_path
 
     def extract_structure(self) -> ZipStructure:
         """
@@ -377,7 +349,7 @@ class XMLStructureExtractor:
             NoManuscriptFileError: If file is not found or extraction fails
         """
         try:
-            full_path = self.manuscript_extract_dir / docx_path
+            full_path = self.get_full_path(docx_path)
             if not full_path.exists():
                 raise NoManuscriptFileError(f"Manuscript file not found at {full_path}")
 
@@ -0,0 +1,317 @@
+"""
+Read-only view of a submission ZIP that extracts members on demand.
+
+Submissions can contain multi-GB source data archives that the pipeline only
+lists, so members are served straight from the open archive and written to the
+extraction directory only when a consumer needs a real path (pandoc, the image
+converters). Consumers that only receive the extraction directory resolve
+paths through the module-level helpers, which fall back to the local
+filesystem for paths that do not belong to a registered archive.
+"""
+
+import io
+import logging
+import os
+import shutil
+import struct
+import threading
+import zipfile
+from collections import OrderedDict
+from fnmatch import fnmatch
+from pathlib import Path, PurePosixPath
+from typing import IO, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_registry_lock = threading.Lock()
+_registry: Dict[Path, "ZipFileSystem"] = {}
+
+# Local file header layout, see zipfile.structFileHeader
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+# Decompressed bytes kept from the end of a compressed nested ZIP; enough to
+# hold the central directory of archives with tens of thousands of files
+NESTED_TAIL_BYTES = 8 * 1024 * 1024
+# Nested ZIP listings kept in memory, keyed by member CRC and size
+NESTED_LISTING_CACHE_SIZE = 256
+
+_listing_cache_lock = threading.Lock()
+_listing_cache: "OrderedDict[Tuple[int, int], Tuple[str, ...]]" = OrderedDict()
+
+
+class _RangeReader(io.RawIOBase):
+    """Seekable read-only view of a byte range of a file."""
+
+    def __init__(self, path: str, start: int, length: int):
+        self._file = open(path, "rb")
+        self._start = start
+        self._length = length
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: self._length}
+        self._position = max(0, base[whence] + offset)
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        size = max(0, min(len(buffer), self._length - self._position))
+        self._file.seek(self._start + self._position)
+        data = self._file.read(size)
+        buffer[: len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+def _cached_listing(info: zipfile.ZipInfo) -> Optional[Tuple[str, ...]]:
+    with _listing_cache_lock:
+        key = (info.CRC, info.file_size)
+        if key in _listing_cache:
+            _listing_cache.move_to_end(key)
+            return _listing_cache[key]
+    return None
+
+
+def _cache_listing(info: zipfile.ZipInfo, names: Tuple[str, ...]) -> None:
+    with _listing_cache_lock:
+        _listing_cache[(info.CRC, info.file_size)] = names
+        while len(_listing_cache) > NESTED_LISTING_CACHE_SIZE:
+            _listing_cache.popitem(last=False)
+
+
+class ZipFileSystem:
+    """
+    Members of a ZIP archive mapped onto a local directory.
+
+    Member paths are relative to ``root`` after removing ``strip_prefix`` (the
+    manuscript ID folder most submissions use) from their first component.
+    """
+
+    def __init__(self, zip_path: str, root: Path, strip_prefix: str = ""):
+        self.zip_path = zip_path
+        self.root = Path(root)
+        self._resolved_root = self.root.resolve()
+        self._zip = zipfile.ZipFile(zip_path, "r")
+        self._lock = threading.Lock()
+        self._member_locks: Dict[str, threading.Lock] = {}
+        self.members: Dict[str, zipfile.ZipInfo] = {}
+        self.materialized_bytes = 0
+
+        for info in self._zip.infolist():
+            if info.is_dir():
+                continue
+            parts = PurePosixPath(info.filename).parts
+            if strip_prefix and len(parts) > 1 and parts[0] == strip_prefix:
+                parts = parts[1:]
+            if ".." in parts or PurePosixPath(info.filename).is_absolute():
+                logger.warning(f"Skipping unsafe archive member: {info.filename}")
+                continue
+            self.members[PurePosixPath(*parts).as_posix()] = info
+
+    def _relative(self, path) -> str:
+        path = Path(path)
+        if path.is_absolute():
+            path = path.resolve().relative_to(self._resolved_root)
+        return path.as_posix()
+
+    def exists(self, path) -> bool:
+        """Check whether a file exists in the archive or on disk."""
+        relative = self._relative(path)
+        return relative in self.members or (self.root / relative).is_file()
+
+    def size(self, path) -> int:
+        """Uncompressed size of a member in bytes."""
+        return self.members[self._relative(path)].file_size
+
+    def glob(self, directory: str, pattern: str) -> List[str]:
+        """Member paths directly inside ``directory`` matching ``pattern``."""
+        prefix = directory.strip("/") + "/"
+        return [
+            name
+            for name in self.members
+            if name.startswith(prefix)
+            and "/" not in name[len(prefix) :]
+            and fnmatch(name[len(prefix) :], pattern)
+        ]
+
+    def open(self, path) -> IO[bytes]:
+        """Open a file for reading without writing it to disk."""
+        relative = self._relative(path)
+        if (self.root / relative).is_file():
+            return open(self.root / relative, "rb")
+        info = self.members.get(relative)
+        if info is None:
+            raise FileNotFoundError(f"File not found in archive: {relative}")
+        return self._zip.open(info)
+
+    def _data_offset(self, info: zipfile.ZipInfo) -> int:
+        """Offset of a member's (possibly compressed) data in the outer file."""
+        with open(self.zip_path, "rb") as handle:
+            handle.seek(info.header_offset)
+            header = _LOCAL_HEADER.unpack(handle.read(_LOCAL_HEADER.size))
+        return info.header_offset + _LOCAL_HEADER.size + header[10] + header[11]
+
+    def _read_nested_names(self, info: zipfile.ZipInfo) -> Tuple[str, ...]:
+        if info.compress_type == zipfile.ZIP_STORED and not info.flag_bits & 0x1:
+            # Stored members are a contiguous range of the outer file, so the
+            # inner central directory is read with a few seeks
+            reader = _RangeReader(
+                self.zip_path, self._data_offset(info), info.file_size
+            )
+            with zipfile.ZipFile(reader) as inner:
+                return tuple(inner.namelist())
+
+        # Compressed members are decompressed once as a stream, keeping only
+        # the tail where the inner central directory lives
+        tail = bytearray()
+        with self._zip.open(info) as source:
+            for chunk in iter(lambda: source.read(1024 * 1024), b""):
+                tail += chunk
+                del tail[: max(0, len(tail) - NESTED_TAIL_BYTES)]
+        try:
+            with zipfile.ZipFile(io.BytesIO(bytes(tail))) as inner:
+                return tuple(inner.namelist())
+        except zipfile.BadZipFile:
+            if info.file_size <= NESTED_TAIL_BYTES:
+                raise
+        # Central directory larger than the tail; seek within the stream
+        with self._zip.open(info) as source, zipfile.ZipFile(source) as inner:
+            return tuple(inner.namelist())
+
+    def list_nested_zip(self, path) -> List[str]:
+        """
+        List the files of a ZIP stored inside the archive without extracting it.
+
+        Listings are cached by member CRC and size, so repeated lookups of the
+        same source data archive return immediately.
+        """
+        relative = self._relative(path)
+        if (self.root / relative).is_file():
+            with zipfile.ZipFile(self.root / relative) as local:
+                return local.namelist()
+        info = self.members.get(relative)
+        if info is None:
+            raise FileNotFoundError(f"File not found in archive: {relative}")
+
+        names = _cached_listing(info)
+        if names is None:
+            names = self._read_nested_names(info)
+            _cache_listing(info, names)
+        return list(names)
+
+    def materialize(self, path) -> Path:
+        """
+        Return a real path for a member, extracting it on first use.
+
+        Raises:
+            FileNotFoundError: If the member is not in the archive
+        """
+        relative = self._relative(path)
+        target = self.root / relative
+        if target.is_file():
+            return target
+        info = self.members.get(relative)
+        if info is None:
+            raise FileNotFoundError(f"File not found in archive: {relative}")
+
+        with self._lock:
+            member_lock = self._member_locks.setdefault(relative, threading.Lock())
+        with member_lock:
+            if target.is_file():
+                return target
+            target.parent.mkdir(parents=True, exist_ok=True)
+            partial = target.with_name(f".{target.name}.partial")
+            with self._zip.open(info) as source, open(partial, "wb") as sink:
+                shutil.copyfileobj(source, sink)
+            os.replace(partial, target)
+            self.materialized_bytes += info.file_size
+            logger.debug(
+                "Materialized archive member",
+                extra={
+                    "operation": "zip_filesystem.materialize",
+                    "member": relative,
+                    "size_bytes": info.file_size,
+                },
+            )
+        return target
+
+    def register(self) -> "ZipFileSystem":
+        """Make the module-level path helpers resolve paths under ``root``."""
+        with _registry_lock:
+            _registry[self._resolved_root] = self
+        return self
+
+    def close(self) -> None:
+        """Unregister the archive and close the underlying ZIP file."""
+        with _registry_lock:
+            if _registry.get(self._resolved_root) is self:
+                del _registry[self._resolved_root]
+        self._zip.close()
+
+
+def _lookup(path) -> Optional[ZipFileSystem]:
+    path = Path(path).resolve()
+    with _registry_lock:
+        for root, filesystem in _registry.items():
+            if path == root or root in path.parents:
+                return filesystem
+    return None
+
+
+def path_exists(path) -> bool:
+    """Check a path on disk or in the archive registered for its directory."""
+    if Path(path).is_file():
+        return True
+    filesystem = _lookup(path)
+    return filesystem is not None and filesystem.exists(Path(path).absolute())
+
+
+def open_path(path) -> IO[bytes]:
+    """Open a path for reading, streaming it from its archive if not on disk."""
+    if Path(path).is_file():
+        return open(path, "rb")
+    filesystem = _lookup(path)
+    if filesystem is None:
+        raise FileNotFoundError(f"File not found: {path}")
+    return filesystem.open(Path(path).absolute())
+
+
+def list_zip_members(path) -> List[str]:
+    """List a ZIP file on disk or inside the archive registered for its directory."""
+    if Path(path).is_file():
+        with zipfile.ZipFile(path, "r") as zip_ref:
+            return [info.filename for info in zip_ref.infolist()]
+    filesystem = _lookup(path)
+    if filesystem is None:
+        raise FileNotFoundError(f"File not found: {path}")
+    return filesystem.list_nested_zip(Path(path).absolute())
+
+
+def materialize_path(path) -> Path:
+    """
+    Return a path that exists on disk, extracting it from its archive if needed.
+
+    Paths outside any registered archive, and members missing from it, are
+    returned unchanged so that callers keep their own not-found handling.
+    """
+    path = Path(path)
+    if path.is_file():
+        return path
+    filesystem = _lookup(path)
+    if filesystem is None:
+        return path
+    try:
+        return filesystem.materialize(path.absolute())
+    except FileNotFoundError:
+        return path
@@ -0,0 +1,230 @@
+"""
+Process-pool rasterization of a manuscript's figures.
+
+The Wand, Ghostscript, pdf2image, tifffile and cv2 conversions behind
+convert_to_pil_image are CPU-bound, so running them on the step threads
+serializes them on the GIL and on each other. This stage converts all figures
+of a manuscript on a shared process pool as soon as the ZIP structure is
+known, and hands the decoded images to the figure image store used by panel
+detection, matching and the QC payloads.
+
+Settings live in the top-level ``figure_conversion`` section::
+
+    default:
+      figure_conversion:
+        max_workers: 4                 # default: min(4, CPU count); 1 = serial
+        max_memory_mb_per_worker: 4096 # address-space cap per worker; 0 = none
+
+Conversion runs in the calling thread when only one worker is configured,
+when there is a single figure, or when a process pool cannot be started (for
+example in sandboxes without process semaphores). Figures whose worker died,
+for instance at the memory cap, are retried once in a new pool and then
+reported as failures; they are never converted in the uncapped parent.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from .object_detection import convert_to_pil_image
+from .raster_cache import get_raster_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_MEMORY_MB_PER_WORKER = 4096
+
+
+def _limit_worker_memory(max_memory_bytes: int) -> None:
+    """Cap the address space of a pool worker and the converters it launches."""
+    if max_memory_bytes <= 0:
+        return
+    try:
+        import resource
+
+        resource.setrlimit(resource.RLIMIT_AS, (max_memory_bytes, max_memory_bytes))
+    except (ImportError, ValueError, OSError) as e:
+        logger.warning(f"Could not limit figure conversion worker memory: {str(e)}")
+
+
+def _convert_figure(
+    path: str, raster_cache_config: Optional[Dict[str, Any]] = None
+) -> Image.Image:
+    """Rasterize one figure; runs in a pool worker or the calling thread."""
+    raster_cache = get_raster_cache({"raster_cache": raster_cache_config or {}})
+    image, _ = convert_to_pil_image(path, raster_cache=raster_cache)
+    # Pixels must be loaded before the image is pickled back to the parent
+    image.load()
+    return image
+
+
+def conversion_settings(config: Dict[str, Any]) -> Tuple[int, int]:
+    """Return ``(max_workers, max_memory_bytes_per_worker)`` from the config."""
+    conversion_config = config.get("figure_conversion") or {}
+    max_workers = conversion_config.get("max_workers")
+    if max_workers is None:
+        max_workers = min(DEFAULT_MAX_WORKERS, os.cpu_count() or 1)
+    max_memory_mb = conversion_config.get(
+        "max_memory_mb_per_worker", DEFAULT_MAX_MEMORY_MB_PER_WORKER
+    )
+    return max(1, int(max_workers)), int(max_memory_mb * 1024 * 1024)
+
+
+_pools: Dict[Tuple[int, int], ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(max_workers: int, max_memory_bytes: int) -> ProcessPoolExecutor:
+    """Return the process pool shared by every manuscript with these settings."""
+    key = (max_workers, max_memory_bytes)
+    with _pools_lock:
+        if key not in _pools:
+            # Steps run on threads, so forking this process is unsafe
+            _pools[key] = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_limit_worker_memory,
+                initargs=(max_memory_bytes,),
+            )
+        return _pools[key]
+
+
+def _discard_pool(
+    max_workers: int, max_memory_bytes: int, pool: ProcessPoolExecutor
+) -> None:
+    """Forget a broken pool, unless another caller has already replaced it."""
+    key = (max_workers, max_memory_bytes)
+    with _pools_lock:
+        if _pools.get(key) is not pool:
+            return
+        del _pools[key]
+    # Work of other manuscripts on a broken pool has failed already; their
+    # callers retry it on the replacement pool
+    logger.warning(
+        "Discarded broken figure conversion pool",
+        extra={
+            "operation": "figure_conversion.discard_pool",
+            "max_workers": max_workers,
+        },
+    )
+    pool.shutdown(wait=False)
+
+
+def _convert_on_pool(
+    pool: ProcessPoolExecutor,
+    paths: List[str],
+    raster_cache_config: Dict[str, Any],
+    on_converted: Callable[[str, Image.Image], None],
+    failures: Dict[str, str],
+) -> List[str]:
+    """Convert figures on a pool; return those whose worker process died."""
+    crashed = []
+    futures = {}
+    for path in paths:
+        try:
+            futures[path] = pool.submit(_convert_figure, path, raster_cache_config)
+        except BrokenProcessPool:
+            crashed.append(path)
+    for path, future in futures.items():
+        try:
+            on_converted(path, future.result())
+        except BrokenProcessPool:
+            crashed.append(path)
+        except Exception as e:
+            failures[path] = str(e)
+    return crashed
+
+
+def convert_figures(
+    paths: List[str],
+    config: Dict[str, Any],
+    on_converted: Callable[[str, Image.Image], None],
+) -> Dict[str, str]:
+    """
+    Rasterize figures on a process pool and hand each image to ``on_converted``.
+
+    Args:
+        paths: Figure files on disk
+        config: Pipeline configuration with the ``figure_conversion`` and
+            ``raster_cache`` sections
+        on_converted: Called in the calling thread with each path and image
+
+    Returns:
+        Mapping of path to error message for figures that failed to convert
+    """
+    max_workers, max_memory_bytes = conversion_settings(config)
+    raster_cache_config = config.get("raster_cache") or {}
+    failures: Dict[str, str] = {}
+    pending = list(paths)
+    started = time.perf_counter()
+    mode = "serial"
+
+    if max_workers > 1 and len(pending) > 1:
+        try:
+            pool = _get_pool(max_workers, max_memory_bytes)
+            crashed = _convert_on_pool(
+                pool, pending, raster_cache_config, on_converted, failures
+            )
+            mode = "process_pool"
+            pending = []
+        except (OSError, NotImplementedError) as e:
+            # No process semaphores available here
+            logger.warning(
+                "Figure conversion pool unavailable; converting serially",
+                extra={
+                    "operation": "figure_conversion.convert_figures",
+                    "remaining": len(pending),
+                    "error": str(e),
+                },
+            )
+            mode = "serial_fallback"
+            crashed = []
+
+        if crashed:
+            logger.warning(
+                "Figure conversion worker died; retrying in a new pool",
+                extra={
+                    "operation": "figure_conversion.convert_figures",
+                    "crashed_count": len(crashed),
+                },
+            )
+            _discard_pool(max_workers, max_memory_bytes, pool)
+            try:
+                pool = _get_pool(max_workers, max_memory_bytes)
+                crashed = _convert_on_pool(
+                    pool, crashed, raster_cache_config, on_converted, failures
+                )
+            except (OSError, NotImplementedError) as e:
+                logger.warning(
+                    f"Could not restart the figure conversion pool: {str(e)}"
+                )
+            if crashed:
+                _discard_pool(max_workers, max_memory_bytes, pool)
+            for path in crashed:
+                failures[path] = "Figure conversion worker died"
+
+    for path in pending:
+        try:
+            on_converted(path, _convert_figure(path, raster_cache_config))
+        except Exception as e:
+            failures[path] = str(e)
+
+    logger.info(
+        "Converted figure images",
+        extra={
+            "operation": "figure_conversion.convert_figures",
+            "mode": mode,
+            "max_workers": max_workers,
+            "figure_count": len(paths),
+            "failed_count": len(failures),
+            "elapsed_ms": int((time.perf_counter() - started) * 1000),
+        },
+    )
+    return failures
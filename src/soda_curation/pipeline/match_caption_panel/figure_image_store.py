@@ -0,0 +1,192 @@
+"""
+Decode-once store for full figure images.
+
+Panel detection, panel matching and the QC payloads all need the same figure
+images. EPS, TIFF and PDF figures are expensive to rasterize, so each file is
+decoded once and kept in memory under a byte budget with least-recently-used
+eviction. Encoded payloads (base64 images for the vision APIs) are produced on
+first request and memoized with the image.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Tuple, Union
+
+from PIL import Image
+
+from ..image_payloads import ImageEncoding, encode_image
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_MEMORY_MB = 1024
+
+
+def _content_digest(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _image_nbytes(image: Image.Image) -> int:
+    try:
+        width, height = image.size
+        return int(width * height * len(image.getbands()))
+    except (TypeError, AttributeError, ValueError):
+        return 0
+
+
+@dataclass
+class _StoredImage:
+    image: Image.Image
+    nbytes: int
+    encodings: Dict[str, str] = field(default_factory=dict)
+
+
+class FigureImageStore:
+    """
+    Figure images keyed by file path and content hash.
+
+    Args:
+        loader: Callable decoding a file path into a PIL image
+        max_memory_bytes: Budget for decoded pixels and memoized encodings;
+            the least recently used figures are evicted beyond it
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Image.Image],
+        max_memory_bytes: int = DEFAULT_MAX_MEMORY_MB * 1024 * 1024,
+    ):
+        self.loader = loader
+        self.max_memory_bytes = max_memory_bytes
+        self._entries: "OrderedDict[Tuple[str, str], _StoredImage]" = OrderedDict()
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.RLock()
+        self.memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(
+        cls, config: Dict[str, Any], loader: Callable[[str], Image.Image]
+    ) -> "FigureImageStore":
+        """Build a store using the top-level ``figure_image_store`` settings."""
+        store_config = config.get("figure_image_store") or {}
+        max_memory_mb = store_config.get("max_memory_mb", DEFAULT_MAX_MEMORY_MB)
+        return cls(loader, max_memory_bytes=int(max_memory_mb * 1024 * 1024))
+
+    def key_for(self, path) -> Tuple[str, str]:
+        """Return the (absolute path, content digest) key of a figure file."""
+        path = os.path.abspath(str(path))
+        stat = os.stat(path)
+        stat_key = (path, stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            digest = self._digests.get(stat_key)
+        if digest is None:
+            digest = _content_digest(path)
+            with self._lock:
+                self._digests[stat_key] = digest
+        return path, digest
+
+    def _entry(self, path) -> Tuple[Tuple[str, str], _StoredImage]:
+        key = self.key_for(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return key, entry
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Decode outside the store lock so other figures are not blocked
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return key, entry
+            image = self.loader(key[0])
+            entry = _StoredImage(image=image, nbytes=_image_nbytes(image))
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = entry
+                self.memory_bytes += entry.nbytes
+                self._evict(keep=key)
+        return key, entry
+
+    def _evict(self, keep: Tuple[str, str]) -> None:
+        while self.memory_bytes > self.max_memory_bytes and len(self._entries) > 1:
+            key, entry = next(iter(self._entries.items()))
+            if key == keep:
+                self._entries.move_to_end(key)
+                key, entry = next(iter(self._entries.items()))
+            del self._entries[key]
+            self._key_locks.pop(key, None)
+            self.memory_bytes -= entry.nbytes + sum(
+                len(encoded) for encoded in entry.encodings.values()
+            )
+            self.evictions += 1
+            logger.debug(
+                "Evicted figure image",
+                extra={
+                    "operation": "figure_image_store.evict",
+                    "path": key[0],
+                    "memory_bytes": self.memory_bytes,
+                },
+            )
+
+    def put(self, path, image: Image.Image) -> None:
+        """Add a figure decoded elsewhere, e.g. by the conversion stage."""
+        key = self.key_for(path)
+        with self._lock:
+            if key in self._entries:
+                return
+            entry = _StoredImage(image=image, nbytes=_image_nbytes(image))
+            self._entries[key] = entry
+            self.memory_bytes += entry.nbytes
+            self._evict(keep=key)
+
+    def get(self, path) -> Image.Image:
+        """Return the decoded image for a figure file, decoding it at most once."""
+        return self._entry(path)[1].image
+
+    def encoded(self, path, encoding: Union[str, ImageEncoding] = "PNG") -> str:
+        """
+        Return the base64-encoded figure, memoized per encoding.
+
+        ``encoding`` is an ImageEncoding or just an image format name.
+        """
+        if isinstance(encoding, str):
+            encoding = ImageEncoding(format=encoding)
+        key, entry = self._entry(path)
+        with self._lock:
+            encoded = entry.encodings.get(encoding.memo_key)
+        if encoded is None:
+            encoded = encode_image(entry.image, encoding)
+            with self._lock:
+                if encoding.memo_key not in entry.encodings:
+                    entry.encodings[encoding.memo_key] = encoded
+                    if self._entries.get(key) is entry:
+                        self.memory_bytes += len(encoded)
+                        self._evict(keep=key)
+        return encoded
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit, miss and eviction counts and current memory use."""
+        with self._lock:
+            return {
+                "figures": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "memory_bytes": self.memory_bytes,
+            }
@@ -2,14 +2,27 @@
 
 import logging
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import anthropic
 
 from ..ai_observability import summarize_text
-from ..anthropic_utils import call_anthropic, validate_anthropic_model
+from ..anthropic_utils import (
+    PROMPT_CACHE_CONTROL,
+    call_anthropic,
+    validate_anthropic_model,
+)
 from ..cost_tracking import update_token_usage
-from .match_caption_panel_base import MatchPanelCaption, PanelObject
+from ..http_clients import get_http_client
+from ..image_payloads import image_url_content
+from ..response_cache import get_response_cache
+from .match_caption_panel_base import (
+    ANNOTATED_PROMPT_STEP,
+    AnnotatedFigureObject,
+    MatchPanelCaption,
+    PanelObject,
+)
+from .object_detection import ObjectDetection
 
 logger = logging.getLogger(__name__)
 
@@ -17,69 +30,26 @@ logger = logging.getLogger(__name__)
 class MatchPanelCaptionAnthropic(MatchPanelCaption):
     """Match panel captions with panel images using Anthropic Claude vision models."""
 
-    def __init__(self, config: Dict[str, Any], prompt_handler: Any, extract_dir: Path):
-        super().__init__(config, prompt_handler, extract_dir)
-        self.client = anthropic.Anthropic()
+    provider = "anthropic"
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        prompt_handler: Any,
+        extract_dir: Path,
+        object_detector: Optional[ObjectDetection] = None,
+    ):
+        super().__init__(config, prompt_handler, extract_dir, object_detector)
+        self.client = anthropic.Anthropic(
+            http_client=get_http_client("anthropic", config)
+        )
         self.anthropic_config = config["pipeline"]["match_caption_panel"]["anthropic"]
-        self.figure_images: Dict = {}
 
     def _validate_config(self) -> None:
         """Validate Anthropic configuration parameters."""
         config_ = self.config["pipeline"]["match_caption_panel"]["anthropic"]
         validate_anthropic_model(config_.get("model", "claude-sonnet-4-6"))
 
-    def process_figures(self, zip_structure):
-        """Override parent to cache figure images."""
-        from .object_detection import convert_to_pil_image
-
-        self.figure_images = {}
-        result = super().process_figures(zip_structure)
-
-        for figure in zip_structure.figures:
-            if figure.figure_label not in self.figure_images and figure.img_files:
-                try:
-                    full_path = self.extract_dir / figure.img_files[0]
-                    if full_path.exists():
-                        image, _ = convert_to_pil_image(str(full_path))
-                        self.figure_images[figure.figure_label] = image
-                except Exception as e:
-                    logger.error(
-                        f"Error caching figure image {figure.figure_label}: {str(e)}"
-                    )
-
-        return result
-
-    def get_figure_images_and_captions(self):
-        """Return base64-encoded figure images and their captions."""
-        import base64
-        import io
-
-        result = []
-        if not hasattr(self, "zip_structure") or not self.zip_structure:
-            logger.warning("No zip structure available. Run process_figures first.")
-            return result
-
-        for figure in self.zip_structure.figures:
-            try:
-                if figure.figure_label in self.figure_images:
-                    image = self.figure_images[figure.figure_label]
-                    buffered = io.BytesIO()
-                    image.save(buffered, format="PNG")
-                    encoded_image = base64.b64encode(buffered.getvalue()).decode(
-                        "utf-8"
-                    )
-                    result.append(
-                        (figure.figure_label, encoded_image, figure.figure_caption)
-                    )
-                else:
-                    logger.warning(
-                        f"Figure image not found in cache: {figure.figure_label}"
-                    )
-            except Exception as e:
-                logger.error(f"Error encoding figure {figure.figure_label}: {str(e)}")
-
-        return result
-
     def _match_panel_caption(
         self, encoded_image: str, figure_caption: str
     ) -> PanelObject:
@@ -112,13 +82,13 @@ class MatchPanelCaptionAnthropic(MatchPanelCaption):
                 {
                     "role": "user",
                     "content": [
-                        {"type": "text", "text": prompts["user"]},
+                        # The caption is the same for every crop of a figure
                         {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/png;base64,{encoded_image}"
-                            },
+                            "type": "text",
+                            "text": prompts["user"],
+                            "cache_control": PROMPT_CACHE_CONTROL,
                         },
+                        image_url_content(encoded_image, self.panel_encoding.detail),
                     ],
                 },
             ],
@@ -126,6 +96,8 @@ class MatchPanelCaptionAnthropic(MatchPanelCaption):
             temperature=self.anthropic_config.get("temperature", 0.1),
             max_tokens=self.anthropic_config.get("max_tokens", 512),
             operation="main.match_caption_panel",
+            cache=get_response_cache(self.config, "match_caption_panel", "anthropic"),
+            prompt_caching=self.anthropic_config.get("prompt_caching", True),
             request_metadata={
                 "provider": "anthropic",
                 "encoded_image_chars": len(encoded_image),
@@ -142,3 +114,65 @@ class MatchPanelCaptionAnthropic(MatchPanelCaption):
         if response.choices[0].message.parsed is not None:
             return response.choices[0].message.parsed
         return PanelObject(panel_label="", panel_caption="")
+
+    def _match_annotated_figure(
+        self, encoded_image: str, figure_caption: str, box_count: int
+    ) -> AnnotatedFigureObject:
+        """Label every numbered box of an annotated figure in one request."""
+        prompts = self.prompt_handler.get_prompt(
+            ANNOTATED_PROMPT_STEP,
+            {"figure_caption": figure_caption, "box_count": box_count},
+        )
+        settings = self._annotated_settings("anthropic")
+        model = settings.get("model", "claude-sonnet-4-6")
+        logger.info(
+            "Preparing annotated-figure vision request",
+            extra={
+                "operation": "main.match_caption_panel",
+                "provider": "anthropic",
+                "model": model,
+                "box_count": box_count,
+                "figure_caption_summary": summarize_text(figure_caption),
+                "encoded_image_chars": len(encoded_image),
+            },
+        )
+
+        response = call_anthropic(
+            client=self.client,
+            model=model,
+            messages=[
+                {"role": "system", "content": prompts["system"]},
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": prompts["user"]},
+                        image_url_content(
+                            encoded_image, self.annotated_figure_encoding.detail
+                        ),
+                    ],
+                },
+            ],
+            response_format=AnnotatedFigureObject,
+            temperature=settings.get("temperature", 0.1),
+            max_tokens=settings.get("max_tokens", 4096),
+            operation="main.match_caption_panel",
+            cache=get_response_cache(self.config, "match_caption_panel", "anthropic"),
+            prompt_caching=settings.get("prompt_caching", True),
+            request_metadata={
+                "provider": "anthropic",
+                "strategy": "annotated_figure",
+                "box_count": box_count,
+                "encoded_image_chars": len(encoded_image),
+            },
+        )
+
+        if hasattr(self, "zip_structure"):
+            update_token_usage(
+                self.zip_structure.cost.match_caption_panel,
+                response,
+                model,
+            )
+
+        if response.choices[0].message.parsed is not None:
+            return response.choices[0].message.parsed
+        return AnnotatedFigureObject(panels=[])
@@ -1,22 +1,48 @@
-import base64
-import io
 import json
 import logging
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from PIL import Image
 from pydantic import BaseModel
 
 from ...pipeline.prompt_handler import PromptHandler
 from ..ai_observability import summarize_text
-from ..manuscript_structure.manuscript_structure import Panel, ZipStructure
-from .object_detection import convert_to_pil_image, create_object_detection
+from ..image_payloads import ImageEncoding, encode_image
+from ..manuscript_structure.manuscript_structure import Figure, Panel, ZipStructure
+from ..manuscript_structure.zip_filesystem import materialize_path
+from .figure_conversion import convert_figures
+from .figure_image_store import FigureImageStore
+from .object_detection import (
+    ObjectDetection,
+    convert_to_pil_image,
+    create_object_detection,
+    draw_numbered_boxes,
+)
+from .raster_cache import RasterCache, get_raster_cache
 
 logger = logging.getLogger(__name__)
 
 
+def _decode_figure(
+    path: str, raster_cache: Optional[RasterCache] = None
+) -> Image.Image:
+    image, _ = convert_to_pil_image(path, raster_cache=raster_cache)
+    return image
+
+
+MATCHING_STRATEGIES = ("per_panel", "annotated_figure")
+# Prompts of the annotated-figure strategy live under their own step key
+ANNOTATED_PROMPT_STEP = "match_caption_panel_annotated"
+# Detections below this confidence are not sent for matching
+MIN_MATCH_CONFIDENCE = 0.25
+# Panel crops of one figure whose matching requests run concurrently
+DEFAULT_PANEL_WORKERS = 4
+
+
 class PanelObject(BaseModel):
     """Model for a list of panels."""
 
@@ -24,11 +50,39 @@ class PanelObject(BaseModel):
     panel_caption: str
 
 
+class NumberedPanelObject(BaseModel):
+    """Model for the panel in one numbered box of an annotated figure."""
+
+    box_number: int
+    panel_label: str
+    panel_caption: str
+
+
+class AnnotatedFigureObject(BaseModel):
+    """Model for the panels of an annotated figure."""
+
+    panels: List[NumberedPanelObject]
+
+
 class MatchPanelCaption(ABC):
+    # Key of the provider block under pipeline.match_caption_panel
+    provider = "openai"
+
     def __init__(
-        self, config: Dict[str, Any], prompt_handler: PromptHandler, extract_dir: Path
+        self,
+        config: Dict[str, Any],
+        prompt_handler: PromptHandler,
+        extract_dir: Path,
+        object_detector: Optional[ObjectDetection] = None,
+        image_store: Optional[FigureImageStore] = None,
     ):
-        """Initialize with configuration."""
+        """Initialize with configuration.
+
+        A pre-loaded ``object_detector`` can be passed in so that batch and
+        worker runs share one model instead of reloading it per manuscript.
+        Figure images are decoded once into ``image_store`` and shared by
+        detection, matching and the QC payloads.
+        """
         self.config = config
         self.prompt_handler = prompt_handler
         self.extract_dir = Path(
@@ -36,15 +90,225 @@ class MatchPanelCaption(ABC):
         )  # This is now the manuscript-specific directory
         self._validate_config()
         # Initialize object detector using the create_object_detection helper
-        self.object_detector = create_object_detection(config)
+        if object_detector is None:
+            object_detector = create_object_detection(config)
+        self.object_detector = object_detector
+        # Images and detections computed ahead of matching, keyed by image path
+        self._prepared_figures: Dict[str, tuple] = {}
+        # Rasterized EPS/AI/PDF/TIFF figures persist across runs when enabled
+        self.raster_cache = get_raster_cache(config)
+        if image_store is None:
+            image_store = FigureImageStore.from_config(
+                config, loader=partial(_decode_figure, raster_cache=self.raster_cache)
+            )
+        self.image_store = image_store
+        # Encodings of the panel crops and of the full-figure QC payloads
+        self.panel_encoding = ImageEncoding.from_config(config, "panel")
+        self.figure_encoding = ImageEncoding.from_config(config, "figure")
+        self.annotated_figure_encoding = ImageEncoding.from_config(
+            config, "annotated_figure"
+        )
+        # One vision call per detected crop, or one per annotated figure
+        step_config = config.get("pipeline", {}).get("match_caption_panel", {})
+        self.strategy = step_config.get("strategy", "per_panel")
+        if self.strategy not in MATCHING_STRATEGIES:
+            raise ValueError(
+                f"Invalid match_caption_panel strategy: {self.strategy}. "
+                f"Must be one of {MATCHING_STRATEGIES}"
+            )
+        if (
+            self.strategy == "annotated_figure"
+            and ANNOTATED_PROMPT_STEP not in config["pipeline"]
+        ):
+            raise ValueError(
+                f"The annotated_figure strategy needs prompts under "
+                f"pipeline.{ANNOTATED_PROMPT_STEP}"
+            )
+        # Figure image paths keyed by figure label, used for QC payloads
+        self.figure_images: Dict[str, Path] = {}
 
     @abstractmethod
     def _validate_config(self) -> None:
         pass
 
+    def convert_figure_images(self, zip_structure: ZipStructure) -> int:
+        """
+        Rasterize every figure on the conversion process pool into the image store.
+
+        Runs right after the ZIP structure is extracted, so detection, matching
+        and the QC payloads find the figures already decoded. A figure that
+        fails here is decoded again on first use.
+
+        Returns:
+            Number of figures converted
+        """
+        paths = []
+        for figure in zip_structure.figures:
+            if not figure.img_files:
+                continue
+            full_path = materialize_path(self.extract_dir / figure.img_files[0])
+            if full_path.exists():
+                paths.append(str(full_path))
+
+        failures = convert_figures(paths, self.config, self.image_store.put)
+        for path, error in failures.items():
+            logger.warning(
+                "Figure conversion failed; will retry on first use",
+                extra={
+                    "operation": "main.convert_figures",
+                    "path": path,
+                    "error": error,
+                },
+            )
+        return len(paths) - len(failures)
+
+    def detect_figure_panels(self, zip_structure: ZipStructure) -> int:
+        """
+        Convert figure images and detect panels ahead of caption matching.
+
+        Detection only needs the figure files, so the pipeline runs it while the
+        caption steps are still in flight. Results are picked up by
+        process_figures; a figure that fails here is retried there.
+
+        Returns:
+            Number of figures with prepared detections
+        """
+        self._prepared_figures = {}
+        self._prepare_figures(zip_structure.figures)
+        return len(self._prepared_figures)
+
+    def _prepare_figures(self, figures: List[Figure]) -> None:
+        """
+        Detect panels on every figure without prepared detections, in batches.
+
+        All figures are decoded first and passed to the detector together, so
+        the model runs on batches instead of once per figure. Detectors
+        without a working batch API are called once per figure instead.
+        """
+        pending: List[Tuple[str, Image.Image, str]] = []
+        for figure in figures:
+            if not figure.img_files:
+                continue
+            full_path = materialize_path(self.extract_dir / figure.img_files[0])
+            if str(full_path) in self._prepared_figures or not full_path.exists():
+                continue
+            try:
+                image = self.image_store.get(full_path)
+            except Exception as e:
+                logger.warning(
+                    "Panel detection pre-pass failed; will retry during matching",
+                    extra={
+                        "operation": "main.detect_panels",
+                        "figure_label": figure.figure_label,
+                        "error": str(e),
+                    },
+                )
+                continue
+            pending.append((str(full_path), image, figure.figure_label))
+
+        if not pending:
+            return
+
+        try:
+            detections: List[Optional[List[Dict]]] = list(
+                self.object_detector.detect_panels_batch(
+                    [image for _, image, _ in pending]
+                )
+            )
+            if len(detections) != len(pending):
+                raise ValueError(
+                    f"Expected {len(pending)} detection results, got {len(detections)}"
+                )
+        except Exception as e:
+            logger.warning(
+                "Batched panel detection unavailable; detecting per figure",
+                extra={"operation": "main.detect_panels", "error": str(e)},
+            )
+            detections = []
+            for _, image, figure_label in pending:
+                try:
+                    detections.append(self.object_detector.detect_panels(image))
+                except Exception as e:
+                    logger.warning(
+                        "Panel detection pre-pass failed; will retry during matching",
+                        extra={
+                            "operation": "main.detect_panels",
+                            "figure_label": figure_label,
+                            "error": str(e),
+                        },
+                    )
+                    detections.append(None)
+
+        for (path, image, _), detected_regions in zip(pending, detections):
+            if detected_regions is not None:
+                self._prepared_figures[path] = (image, detected_regions)
+
+    def cache_figure_images(self, zip_structure: ZipStructure) -> None:
+        """
+        Load the full figure images used by get_figure_images_and_captions.
+
+        Runs after matching, and on its own when matching results were
+        restored from a checkpoint and process_figures did not run. Images
+        already decoded for matching are served from the image store.
+        """
+        self.zip_structure = zip_structure
+        for figure in zip_structure.figures:
+            if figure.figure_label not in self.figure_images and figure.img_files:
+                try:
+                    full_path = materialize_path(self.extract_dir / figure.img_files[0])
+                    if full_path.exists():
+                        self.image_store.get(full_path)
+                        self.figure_images[figure.figure_label] = full_path
+                except Exception as e:
+                    logger.error(
+                        f"Error caching figure image {figure.figure_label}: {str(e)}"
+                    )
+
+    def get_figure_images_and_captions(self) -> List[Tuple[str, str, str]]:
+        """
+        Get base64-encoded figure images and their captions.
+
+        Returns:
+            List of tuples containing (figure_label, base64_encoded_image, figure_caption)
+        """
+        result: List[Tuple[str, str, str]] = []
+
+        if not hasattr(self, "zip_structure") or not self.zip_structure:
+            logger.warning("No zip structure available. Run process_figures first.")
+            return result
+
+        for figure in self.zip_structure.figures:
+            try:
+                if figure.figure_label in self.figure_images:
+                    encoded_image = self.image_store.encoded(
+                        self.figure_images[figure.figure_label], self.figure_encoding
+                    )
+                    result.append(
+                        (figure.figure_label, encoded_image, figure.figure_caption)
+                    )
+                else:
+                    logger.warning(
+                        f"Figure image not found in cache: {figure.figure_label}"
+                    )
+            except Exception as e:
+                logger.error(f"Error encoding figure {figure.figure_label}: {str(e)}")
+
+        logger.info(
+            "Figure image store usage",
+            extra={
+                "operation": "main.match_caption_panel",
+                **self.image_store.stats(),
+                **(self.raster_cache.stats() if self.raster_cache else {}),
+            },
+        )
+        return result
+
     def process_figures(self, zip_structure: ZipStructure) -> ZipStructure:
-        """Process all figures in the manuscript."""
+        """Process all figures in the manuscript and cache their images."""
         self.zip_structure = zip_structure
+        self.figure_images = {}
+        # Detect panels on all figures up front, before any per-panel AI calls
+        self._prepare_figures(zip_structure.figures)
         for figure in zip_structure.figures:
             try:
                 logger.info(
@@ -59,29 +323,35 @@ class MatchPanelCaption(ABC):
                 original_panels = {panel.panel_label: panel for panel in figure.panels}
 
                 # Convert figure file to PIL Image
-                full_path = self.extract_dir / figure.img_files[0]
+                full_path = materialize_path(self.extract_dir / figure.img_files[0])
                 if not full_path.exists():
                     raise FileNotFoundError(f"File not found: {full_path}")
-                image, _ = convert_to_pil_image(str(full_path))
-
-                # Debug: Check what we got from convert_to_pil_image
-                logger.debug(
-                    f"convert_to_pil_image returned: image type={type(image)}, image={image}"
-                )
+                prepared = self._prepared_figures.pop(str(full_path), None)
+                if prepared is not None:
+                    # Detection already ran in detect_figure_panels
+                    image, detected_regions = prepared
+                else:
+                    image = self.image_store.get(full_path)
 
-                # Additional validation before passing to detect_panels
-                if not hasattr(image, "mode") or not hasattr(image, "size"):
-                    logger.error(
-                        f"Invalid image object for {figure.figure_label}: "
-                        f"type={type(image)}, has_mode={hasattr(image, 'mode')}, "
-                        f"has_size={hasattr(image, 'size')}, value={image}"
-                    )
-                    raise TypeError(
-                        f"convert_to_pil_image returned invalid object: {type(image)}"
+                    # Debug: Check what we got from the image store
+                    logger.debug(
+                        f"Figure image store returned: image type={type(image)}, image={image}"
                     )
 
-                # Get only bounding boxes from detection
-                detected_regions = self.object_detector.detect_panels(image)
+                    # Additional validation before passing to detect_panels
+                    if not hasattr(image, "mode") or not hasattr(image, "size"):
+                        logger.error(
+                            f"Invalid image object for {figure.figure_label}: "
+                            f"type={type(image)}, has_mode={hasattr(image, 'mode')}, "
+                            f"has_size={hasattr(image, 'size')}, value={image}"
+                        )
+                        raise TypeError(
+                            f"convert_to_pil_image returned invalid object: {type(image)}"
+                        )
+
+                    # Get only bounding boxes from detection
+                    detected_regions = self.object_detector.detect_panels(image)
+
                 logger.info(
                     "Detected panel candidate regions",
                     extra={
@@ -97,48 +367,14 @@ class MatchPanelCaption(ABC):
                     )
                     continue
 
-                # Process each detected region and collect AI results
-                panel_matches = []
-                for idx, detection in enumerate(detected_regions):
-                    if detection["confidence"] < 0.25:
-                        logger.warning(
-                            f"Low confidence detection ({detection['confidence']:.2f}) in figure {figure.figure_label}"
-                        )
-                        continue
-
-                    encoded_image = self._extract_panel_image(image, detection["bbox"])
-
-                    if encoded_image:
-                        logger.info(
-                            "Sending panel crop to AI matcher",
-                            extra={
-                                "operation": "main.match_caption_panel",
-                                "figure_label": figure.figure_label,
-                                "detection_index": idx,
-                                "bbox_confidence": detection["confidence"],
-                                "caption_summary": summarize_text(
-                                    figure.figure_caption
-                                ),
-                                "encoded_image_chars": len(encoded_image),
-                            },
-                        )
-                        panel_object = self._match_panel_caption(
-                            encoded_image, figure.figure_caption
-                        )
-                        panel_object = (
-                            PanelObject(**json.loads(panel_object))
-                            if isinstance(panel_object, str)
-                            else panel_object
-                        )
-
-                        # Store the detection index with the panel match
-                        panel_matches.append(
-                            {
-                                "panel_object": panel_object,
-                                "detection": detection,
-                                "detection_idx": idx,
-                            }
-                        )
+                if self.strategy == "annotated_figure":
+                    panel_matches = self._match_panels_annotated(
+                        figure, image, detected_regions
+                    )
+                else:
+                    panel_matches = self._match_panels_per_crop(
+                        figure, image, detected_regions
+                    )
 
                 # Resolve any duplicate panel label assignments and add unmatched detections
                 processed_panels = self._resolve_panel_conflicts(
@@ -173,8 +409,155 @@ class MatchPanelCaption(ABC):
                 )
                 continue
 
+        self.cache_figure_images(zip_structure)
         return zip_structure
 
+    def _panel_workers(self) -> int:
+        """Number of panel crops matched concurrently (``max_workers``)."""
+        step_config = self.config["pipeline"]["match_caption_panel"]
+        provider_config = step_config.get(self.provider, {}) or {}
+        return max(1, int(provider_config.get("max_workers", DEFAULT_PANEL_WORKERS)))
+
+    def _match_panels_per_crop(
+        self, figure: Figure, image: Image.Image, detected_regions: List[Dict]
+    ) -> List[Dict]:
+        """
+        Match each detected region with one vision call on its crop.
+
+        Crops are cut in detection order, then their requests run on a thread
+        pool of ``max_workers`` threads (set in the provider block of
+        ``match_caption_panel``; 1 sends them one by one). Matches are returned
+        in detection order, so conflict resolution does not depend on which
+        request finishes first.
+        """
+        crops = []
+        for idx, detection in enumerate(detected_regions):
+            if detection["confidence"] < MIN_MATCH_CONFIDENCE:
+                logger.warning(
+                    f"Low confidence detection ({detection['confidence']:.2f}) in figure {figure.figure_label}"
+                )
+                continue
+
+            encoded_image = self._extract_panel_image(image, detection["bbox"])
+
+            if encoded_image:
+                logger.info(
+                    "Sending panel crop to AI matcher",
+                    extra={
+                        "operation": "main.match_caption_panel",
+                        "figure_label": figure.figure_label,
+                        "detection_index": idx,
+                        "bbox_confidence": detection["confidence"],
+                        "caption_summary": summarize_text(figure.figure_caption),
+                        "encoded_image_chars": len(encoded_image),
+                        "image_format": self.panel_encoding.format,
+                    },
+                )
+                crops.append((idx, detection, encoded_image))
+
+        def match(encoded_image: str) -> PanelObject:
+            panel_object = self._match_panel_caption(
+                encoded_image, figure.figure_caption
+            )
+            return (
+                PanelObject(**json.loads(panel_object))
+                if isinstance(panel_object, str)
+                else panel_object
+            )
+
+        workers = min(self._panel_workers(), len(crops)) or 1
+        encoded_images = [encoded_image for _, _, encoded_image in crops]
+        if workers == 1:
+            panel_objects = [match(encoded_image) for encoded_image in encoded_images]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="panel-match"
+            ) as executor:
+                panel_objects = list(executor.map(match, encoded_images))
+
+        # Store the detection index with the panel match
+        return [
+            {
+                "panel_object": panel_object,
+                "detection": detection,
+                "detection_idx": idx,
+            }
+            for (idx, detection, _), panel_object in zip(crops, panel_objects)
+        ]
+
+    def _match_panels_annotated(
+        self, figure: Figure, image: Image.Image, detected_regions: List[Dict]
+    ) -> List[Dict]:
+        """
+        Match all detected regions with one vision call on an annotated figure.
+
+        The detections are drawn as numbered boxes on the figure and the model
+        returns a label and caption per box number. Boxes the model skips get
+        an empty label, like crops without a recognizable label in per-crop
+        mode. If the call fails, the figure is matched per crop instead.
+        """
+        indices = [
+            idx
+            for idx, detection in enumerate(detected_regions)
+            if detection["confidence"] >= MIN_MATCH_CONFIDENCE
+        ]
+        if not indices:
+            return []
+
+        annotated = draw_numbered_boxes(
+            image, [detected_regions[idx]["bbox"] for idx in indices]
+        )
+        encoded_image = encode_image(annotated, self.annotated_figure_encoding)
+        logger.info(
+            "Sending annotated figure to AI matcher",
+            extra={
+                "operation": "main.match_caption_panel",
+                "figure_label": figure.figure_label,
+                "box_count": len(indices),
+                "caption_summary": summarize_text(figure.figure_caption),
+                "encoded_image_chars": len(encoded_image),
+                "image_format": self.annotated_figure_encoding.format,
+            },
+        )
+        try:
+            response = self._match_annotated_figure(
+                encoded_image, figure.figure_caption, len(indices)
+            )
+            if isinstance(response, str):
+                response = AnnotatedFigureObject(**json.loads(response))
+        except Exception as e:
+            logger.warning(
+                "Annotated-figure matching failed; matching panel crops instead",
+                extra={
+                    "operation": "main.match_caption_panel",
+                    "figure_label": figure.figure_label,
+                    "severity": "recoverable",
+                    "error": str(e),
+                },
+            )
+            return self._match_panels_per_crop(figure, image, detected_regions)
+
+        by_box: Dict[int, PanelObject] = {}
+        for panel in response.panels:
+            if 1 <= panel.box_number <= len(indices):
+                by_box.setdefault(
+                    panel.box_number,
+                    PanelObject(
+                        panel_label=panel.panel_label,
+                        panel_caption=panel.panel_caption,
+                    ),
+                )
+        return [
+            {
+                "panel_object": by_box.get(
+                    number, PanelObject(panel_label="", panel_caption="")
+                ),
+                "detection": detected_regions[idx],
+                "detection_idx": idx,
+            }
+            for number, idx in enumerate(indices, start=1)
+        ]
+
     def _extract_panel_image(
         self, pil_image: Image.Image, bbox: List[float]
     ) -> Optional[str]:
@@ -182,7 +565,8 @@ class MatchPanelCaption(ABC):
         Extract a panel image from a figure based on bounding box coordinates.
 
         This method crops the PIL Image according to the bounding box,
-        and returns the panel image as a base64 encoded string.
+        and returns the panel image as a base64 encoded string in the
+        ``image_payloads.panel`` format.
 
         Args:
             pil_image (Image.Image): The PIL Image object of the entire figure.
@@ -198,10 +582,7 @@ class MatchPanelCaption(ABC):
                 for i, coord in enumerate(bbox)
             ]
             panel = pil_image.crop((left, top, right, bottom))
-
-            buffered = io.BytesIO()
-            panel.save(buffered, format="PNG")
-            return base64.b64encode(buffered.getvalue()).decode("utf-8")
+            return encode_image(panel, self.panel_encoding)
         except Exception as e:
             logger.error(f"Error extracting panel image: {str(e)}")
             return None
@@ -254,6 +635,34 @@ class MatchPanelCaption(ABC):
         """Match a panel image with its caption using AI."""
         pass
 
+    def _annotated_settings(self, provider: str) -> Dict[str, Any]:
+        """
+        Provider settings for the annotated-figure strategy.
+
+        Model and sampling settings come from ``match_caption_panel``; any set
+        under ``match_caption_panel_annotated`` (e.g. a larger ``max_tokens``)
+        take precedence.
+        """
+        pipeline_config = self.config["pipeline"]
+        settings = dict(pipeline_config["match_caption_panel"].get(provider, {}))
+        settings.update(
+            pipeline_config.get(ANNOTATED_PROMPT_STEP, {}).get(provider, {})
+        )
+        settings.pop("prompts", None)
+        return settings
+
+    def _match_annotated_figure(
+        self, encoded_image: str, figure_caption: str, box_count: int
+    ) -> AnnotatedFigureObject:
+        """
+        Label the numbered boxes of an annotated figure using AI.
+
+        Providers without an implementation fall back to per-crop matching.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support annotated-figure matching"
+        )
+
     def _resolve_panel_conflicts(
         self, figure: Any, panel_matches: List[Dict], original_panels: Dict[str, Panel]
     ) -> List[Panel]:
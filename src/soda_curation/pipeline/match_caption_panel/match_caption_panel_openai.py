@@ -6,20 +6,25 @@ It includes a class that interacts with the OpenAI API to process figure panels
 matching them based on the visual content and the full figure caption.
 """
 
-import base64
-import io
 import logging
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Optional
 
 import openai
 
 from ..ai_observability import summarize_text
 from ..cost_tracking import update_token_usage
-from ..manuscript_structure.manuscript_structure import ZipStructure
+from ..http_clients import get_http_client
+from ..image_payloads import image_url_content
 from ..openai_utils import call_openai_with_fallback, validate_model_config
-from .match_caption_panel_base import MatchPanelCaption, PanelObject
-from .object_detection import convert_to_pil_image  # Import the function directly
+from ..response_cache import get_response_cache
+from .match_caption_panel_base import (
+    ANNOTATED_PROMPT_STEP,
+    AnnotatedFigureObject,
+    MatchPanelCaption,
+    PanelObject,
+)
+from .object_detection import ObjectDetection
 
 logger = logging.getLogger(__name__)
 
@@ -38,21 +43,26 @@ class MatchPanelCaptionOpenAI(MatchPanelCaption):
         debug_enabled (bool): Flag indicating whether debug mode is enabled.
         debug_dir (str): Directory for saving debug information.
         extract_dir (str): Directory containing extracted files from the ZIP archive.
-        figure_images (Dict): Cache of loaded figure images
+        figure_images (Dict): Figure image paths served from the shared image store
     """
 
-    def __init__(self, config: Dict[str, Any], prompt_handler: Any, extract_dir: Path):
-        super().__init__(config, prompt_handler, extract_dir)
+    provider = "openai"
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        prompt_handler: Any,
+        extract_dir: Path,
+        object_detector: Optional[ObjectDetection] = None,
+    ):
+        super().__init__(config, prompt_handler, extract_dir, object_detector)
 
         # Initialize OpenAI client
-        self.client = openai.OpenAI()
+        self.client = openai.OpenAI(http_client=get_http_client("openai", config))
 
         # Get OpenAI specific config
         self.openai_config = config["pipeline"]["match_caption_panel"]["openai"]
 
-        # Cache for figure images
-        self.figure_images = {}
-
     def _validate_config(self) -> None:
         """Validate OpenAI configuration parameters."""
         valid_models = [
@@ -70,66 +80,6 @@ class MatchPanelCaptionOpenAI(MatchPanelCaption):
         # Use the utility function for validation
         validate_model_config(model, config_)
 
-    def process_figures(self, zip_structure: ZipStructure) -> ZipStructure:
-        """Override parent method to cache figure images"""
-        self.figure_images = {}  # Clear previous cache
-        result = super().process_figures(zip_structure)
-
-        # For each figure, store the image in the cache if not already there
-        for figure in zip_structure.figures:
-            if figure.figure_label not in self.figure_images and figure.img_files:
-                try:
-                    full_path = self.extract_dir / figure.img_files[0]
-                    if full_path.exists():
-                        # Use the imported function, not a method
-                        image, _ = convert_to_pil_image(str(full_path))
-                        self.figure_images[figure.figure_label] = image
-                except Exception as e:
-                    logger.error(
-                        f"Error caching figure image {figure.figure_label}: {str(e)}"
-                    )
-
-        return result
-
-    def get_figure_images_and_captions(self) -> List[Tuple[str, str, str]]:
-        """
-        Get base64-encoded figure images and their captions.
-
-        Returns:
-            List of tuples containing (figure_label, base64_encoded_image, figure_caption)
-        """
-        result = []
-
-        if not hasattr(self, "zip_structure") or not self.zip_structure:
-            logger.warning("No zip structure available. Run process_figures first.")
-            return result
-
-        for figure in self.zip_structure.figures:
-            try:
-                if figure.figure_label in self.figure_images:
-                    # Get the PIL image from cache
-                    image = self.figure_images[figure.figure_label]
-
-                    # Convert to base64
-                    buffered = io.BytesIO()
-                    image.save(buffered, format="PNG")
-                    encoded_image = base64.b64encode(buffered.getvalue()).decode(
-                        "utf-8"
-                    )
-
-                    # Add to result list
-                    result.append(
-                        (figure.figure_label, encoded_image, figure.figure_caption)
-                    )
-                else:
-                    logger.warning(
-                        f"Figure image not found in cache: {figure.figure_label}"
-                    )
-            except Exception as e:
-                logger.error(f"Error encoding figure {figure.figure_label}: {str(e)}")
-
-        return result
-
     def _match_panel_caption(
         self, encoded_image: str, figure_caption: str
     ) -> PanelObject:
@@ -162,12 +112,7 @@ class MatchPanelCaptionOpenAI(MatchPanelCaption):
                     "role": "user",
                     "content": [
                         {"type": "text", "text": prompts["user"]},
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/png;base64,{encoded_image}"
-                            },
-                        },
+                        image_url_content(encoded_image, self.panel_encoding.detail),
                     ],
                 },
             ],
@@ -178,6 +123,7 @@ class MatchPanelCaptionOpenAI(MatchPanelCaption):
             presence_penalty=self.openai_config.get("presence_penalty", 0),
             max_tokens=self.openai_config.get("max_tokens", 512),
             operation="main.match_caption_panel",
+            cache=get_response_cache(self.config, "match_caption_panel", "openai"),
             request_metadata={
                 "provider": "openai",
                 "encoded_image_chars": len(encoded_image),
@@ -197,3 +143,66 @@ class MatchPanelCaptionOpenAI(MatchPanelCaption):
         else:
             # Fallback for non-structured responses
             return response.choices[0].message.content
+
+    def _match_annotated_figure(
+        self, encoded_image: str, figure_caption: str, box_count: int
+    ) -> AnnotatedFigureObject:
+        """Label every numbered box of an annotated figure in one request."""
+        prompts = self.prompt_handler.get_prompt(
+            ANNOTATED_PROMPT_STEP,
+            {"figure_caption": figure_caption, "box_count": box_count},
+        )
+        settings = self._annotated_settings("openai")
+        model = settings.get("model", "gpt-4o")
+        logger.info(
+            "Preparing annotated-figure vision request",
+            extra={
+                "operation": "main.match_caption_panel",
+                "provider": "openai",
+                "model": model,
+                "box_count": box_count,
+                "figure_caption_summary": summarize_text(figure_caption),
+                "encoded_image_chars": len(encoded_image),
+            },
+        )
+
+        response = call_openai_with_fallback(
+            client=self.client,
+            model=model,
+            messages=[
+                {"role": "system", "content": prompts["system"]},
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": prompts["user"]},
+                        image_url_content(
+                            encoded_image, self.annotated_figure_encoding.detail
+                        ),
+                    ],
+                },
+            ],
+            response_format=AnnotatedFigureObject,
+            temperature=settings.get("temperature", 0.1),
+            top_p=settings.get("top_p", 1.0),
+            frequency_penalty=settings.get("frequency_penalty", 0),
+            presence_penalty=settings.get("presence_penalty", 0),
+            max_tokens=settings.get("max_tokens", 4096),
+            operation="main.match_caption_panel",
+            cache=get_response_cache(self.config, "match_caption_panel", "openai"),
+            request_metadata={
+                "provider": "openai",
+                "strategy": "annotated_figure",
+                "box_count": box_count,
+                "encoded_image_chars": len(encoded_image),
+            },
+        )
+        if hasattr(self, "zip_structure"):
+            update_token_usage(
+                self.zip_structure.cost.match_caption_panel,
+                response,
+                model,
+            )
+
+        if hasattr(response.choices[0].message, "parsed"):
+            return response.choices[0].message.parsed
+        return response.choices[0].message.content
@@ -2,32 +2,54 @@
 This module provides functionality for object detection in scientific figures,
 particularly for identifying panels within figure images.
 
-It includes utilities for image conversion and resizing, as well as a class for
-performing object detection using the YOLOv10 model.
+It includes utilities for image conversion and resizing, as well as classes for
+performing object detection using the YOLOv10 model, either through ultralytics
+(torch) or through an exported ONNX model on onnxruntime.
 """
 import logging
+import math
 import os
+import re
 import subprocess
+import threading
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import cv2
 import numpy as np
 import pdf2image
-from PIL import Image, ImageDraw
+from PIL import Image, ImageDraw, ImageFont
 from PIL.Image import DecompressionBombError
 
-try:
-    # ultralytics renamed/flattened model entrypoints across versions.
-    # Prefer YOLOv10 when available, otherwise fall back to YOLO.
-    # Keep the name ``YOLOv10`` at module scope so tests can patch it.
-    from ultralytics import YOLOv10
-except ImportError:
-    from ultralytics import YOLO as YOLOv10
+from .raster_cache import RasterCache
 
 logger = logging.getLogger(__name__)
 
 
+def YOLOv10(model_path: str) -> Any:
+    """
+    Load an ultralytics detection model.
+
+    ultralytics (and with it torch) is imported on first use, so the ONNX
+    backend never pays for it. The name ``YOLOv10`` stays at module scope so
+    tests can patch it.
+    """
+    try:
+        # ultralytics renamed/flattened model entrypoints across versions.
+        # Prefer YOLOv10 when available, otherwise fall back to YOLO.
+        from ultralytics import YOLOv10 as model_class
+    except ImportError:
+        from ultralytics import YOLO as model_class
+    return model_class(model_path)
+
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    # Only needed for the "onnx" detection backend
+    ort = None
+
+
 try:
     from wand.image import Image as WandImage
 except ImportError:
@@ -37,6 +59,109 @@ except ImportError:
     WandImage = None
 
 
+# Formats that are rasterized into a PNG before use
+RASTERIZED_EXTENSIONS = (".eps", ".ai", ".pdf", ".tif", ".tiff")
+
+POINTS_PER_INCH = 72
+# Bytes searched for the DSC bounding box at each end of a PostScript file
+_POSTSCRIPT_SCAN_BYTES = 256 * 1024
+_BOUNDING_BOX_RE = re.compile(
+    rb"%%(HiRes)?BoundingBox:[ \t]*([-+\d.eE]+)[ \t]+([-+\d.eE]+)"
+    rb"[ \t]+([-+\d.eE]+)[ \t]+([-+\d.eE]+)"
+)
+# Magic number of DOS EPS files with a binary preview header
+_DOS_EPS_MAGIC = b"\xc5\xd0\xd3\xc6"
+
+
+def _postscript_page_size(path: str) -> Optional[Tuple[float, float]]:
+    """Return the (width, height) in points from an EPS/AI bounding box comment."""
+    with open(path, "rb") as f:
+        header = f.read(30)
+        start = 0
+        if header[:4] == _DOS_EPS_MAGIC:
+            # The PostScript section offset follows the magic number
+            start = int.from_bytes(header[4:8], "little")
+        f.seek(start)
+        head = f.read(_POSTSCRIPT_SCAN_BYTES)
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        f.seek(max(start, end - _POSTSCRIPT_SCAN_BYTES))
+        tail = f.read()
+
+    # The first box in the header wins over boxes of embedded documents; an
+    # "(atend)" header box does not match and is found in the trailer instead
+    boxes: Dict[bool, List[float]] = {}
+    for chunk in (head, tail):
+        for match in _BOUNDING_BOX_RE.finditer(chunk):
+            boxes.setdefault(
+                bool(match.group(1)), [float(v) for v in match.groups()[1:]]
+            )
+    box = boxes.get(True) or boxes.get(False)
+    if box is None:
+        return None
+    llx, lly, urx, ury = box
+    return abs(urx - llx), abs(ury - lly)
+
+
+def _pdf_page_size(path: str) -> Optional[Tuple[float, float]]:
+    """Return the (width, height) in points of a PDF's first page."""
+    from PyPDF2 import PdfReader
+
+    # pdftoppm renders the crop box, which defaults to the media box
+    box = PdfReader(path).pages[0].cropbox
+    return float(box.width), float(box.height)
+
+
+def intrinsic_page_size(path: str) -> Optional[Tuple[float, float]]:
+    """
+    Return the intrinsic (width, height) in points of a vector figure.
+
+    PDF files (including PDF-based Illustrator files) are measured from the
+    first page's crop box; EPS and PostScript-based AI files from their DSC
+    bounding box.
+
+    Returns:
+        The page size, or None if it cannot be determined
+    """
+    try:
+        with open(path, "rb") as f:
+            magic = f.read(4)
+        if magic == b"%PDF":
+            size = _pdf_page_size(path)
+        else:
+            size = _postscript_page_size(path)
+    except Exception as e:
+        logger.debug(f"Could not read page size of {path}: {str(e)}")
+        return None
+    if size is None or min(size) <= 0:
+        return None
+    return size
+
+
+def target_raster_dpi(path: str, max_size: int = 2048, dpi: int = 300) -> int:
+    """
+    Return the DPI that rasterizes a vector figure straight to ``max_size``.
+
+    Rendering at ``dpi`` and then shrinking to ``max_size`` builds bitmaps far
+    larger than needed for big pages. The DPI is lowered so the longest side
+    comes out just at or above ``max_size``; it is never raised above ``dpi``,
+    and ``dpi`` is used when the page size is unknown.
+
+    Args:
+        path (str): Path to the PDF, EPS or AI file
+        max_size (int): Longest side of the final image in pixels
+        dpi (int): Upper bound on the DPI
+
+    Returns:
+        int: The DPI to render at
+    """
+    size = intrinsic_page_size(path)
+    if size is None:
+        return dpi
+    fitted = math.ceil(max_size * POINTS_PER_INCH / max(size))
+    return max(1, min(dpi, fitted))
+
+
 def fallback_ghostscript_conversion(
     eps_path: str, output_path: str, dpi: int = 300
 ) -> str:
@@ -147,53 +272,76 @@ def convert_tiff_with_cv2(tiff_path: str, output_path: str) -> str:
         raise ValueError(f"Failed to convert TIFF with OpenCV: {str(e)}")
 
 
-def _tiff_array_to_rgb_uint8(arr: np.ndarray) -> np.ndarray:
-    """Normalize a decoded TIFF array to HxWx3 uint8 RGB for saving as PNG."""
+def _scale_to_uint8(
+    values: np.ndarray, dtype: np.dtype, max_value: Optional[float] = None
+) -> np.ndarray:
+    """
+    Map pixel values of a TIFF sample ``dtype`` to uint8.
+
+    ``values`` may already be converted to float (e.g. area-averaged); the
+    scaling is chosen from the original ``dtype``. ``max_value`` is the maximum
+    over the whole image, computed from ``values`` when not given.
+    """
+    dtype = np.dtype(dtype)
+    if dtype == np.uint8:
+        return np.rint(values).clip(0, 255).astype(np.uint8)
+    if dtype == np.uint16:
+        return (
+            (values.astype(np.float32) / 65535.0 * 255.0).clip(0, 255).astype(np.uint8)
+        )
+    if max_value is None:
+        if np.issubdtype(dtype, np.floating):
+            max_value = float(np.nanmax(values)) if values.size else 0.0
+        else:
+            max_value = float(values.max()) if values.size else 0.0
+    if np.issubdtype(dtype, np.floating) and max_value <= 1.0:
+        return (values * 255.0).clip(0, 255).astype(np.uint8)
+    if max_value > 0:
+        return (
+            (values.astype(np.float32) / max_value * 255.0)
+            .clip(0, 255)
+            .astype(np.uint8)
+        )
+    return np.zeros(values.shape, dtype=np.uint8)
+
+
+def _tiff_array_to_rgb(arr: np.ndarray) -> np.ndarray:
+    """Expand or trim a decoded TIFF array to HxWx3, keeping its dtype."""
     if arr.ndim == 2:
-        rgb = np.stack([arr, arr, arr], axis=-1)
-    elif arr.ndim == 3:
+        return np.stack([arr, arr, arr], axis=-1)
+    if arr.ndim == 3:
         c = arr.shape[2]
         if c == 1:
-            rgb = np.repeat(arr, 3, axis=2)
-        elif c == 3:
-            rgb = arr
-        elif c == 4:
+            return np.repeat(arr, 3, axis=2)
+        if c == 3:
+            return arr
+        if c == 4:
             # Drop alpha (same intent as OpenCV RGBA→RGB path)
-            rgb = arr[:, :, :3]
-        else:
-            raise ValueError(f"Unsupported channel count: {c}")
-    else:
-        raise ValueError(f"Unsupported TIFF array shape: {arr.shape}")
+            return arr[:, :, :3]
+        raise ValueError(f"Unsupported channel count: {c}")
+    raise ValueError(f"Unsupported TIFF array shape: {arr.shape}")
 
-    if rgb.dtype == np.uint8:
-        pass
-    elif rgb.dtype == np.uint16:
-        rgb = (rgb.astype(np.float32) / 65535.0 * 255.0).clip(0, 255).astype(np.uint8)
-    elif np.issubdtype(rgb.dtype, np.floating):
-        mx = float(np.nanmax(rgb)) if rgb.size else 0.0
-        if mx <= 1.0:
-            rgb = (rgb * 255.0).clip(0, 255).astype(np.uint8)
-        elif mx > 0:
-            rgb = (rgb / mx * 255.0).clip(0, 255).astype(np.uint8)
-        else:
-            rgb = np.zeros_like(rgb, dtype=np.uint8)
-    else:
-        mx = float(rgb.max()) if rgb.size else 0.0
-        if mx > 0:
-            rgb = (rgb.astype(np.float32) / mx * 255.0).clip(0, 255).astype(np.uint8)
-        else:
-            rgb = np.zeros(rgb.shape, dtype=np.uint8)
 
-    return rgb
+def _tiff_array_to_rgb_uint8(arr: np.ndarray) -> np.ndarray:
+    """Normalize a decoded TIFF array to HxWx3 uint8 RGB for saving as PNG."""
+    rgb = _tiff_array_to_rgb(arr)
+    if rgb.dtype == np.uint8:
+        return rgb
+    return _scale_to_uint8(rgb, rgb.dtype)
 
 
-def convert_tiff_with_tifffile(tiff_path: str, output_path: str) -> str:
+def convert_tiff_with_tifffile(
+    tiff_path: str, output_path: str, max_size: int = 2048
+) -> str:
     """
     Decode TIFFs that OpenCV/Pillow/ImageMagick reject.
 
     Some exports (e.g. LZW with an invalid ``SampleFormat`` tag) fail in libtiff
     with ``TIFFReadDirectory: Incorrect count for "SampleFormat"`` while
     ``tifffile`` (with ``imagecodecs`` for LZW) can still read the pixel data.
+
+    TIFFs above ``LARGE_TIFF_PIXELS`` are read at reduced resolution, at most
+    ``max_size`` pixels on the longest side.
     """
     try:
         import tifffile
@@ -202,6 +350,9 @@ def convert_tiff_with_tifffile(tiff_path: str, output_path: str) -> str:
             "tifffile is required for problematic TIFF decoding; install tifffile (+ imagecodecs for LZW)"
         ) from exc
 
+    if _is_large_tiff(tiff_path):
+        return convert_large_tiff(tiff_path, output_path, max_size=max_size)
+
     try:
         arr = tifffile.imread(tiff_path)
     except Exception as e:
@@ -224,6 +375,199 @@ def convert_tiff_with_tifffile(tiff_path: str, output_path: str) -> str:
     return output_path
 
 
+# TIFFs above this many pixels are downsampled while they are read instead of
+# being decoded to a full-resolution array first
+LARGE_TIFF_PIXELS = 8192 * 8192
+
+# Elements converted to float at a time when averaging a block
+_AREA_CHUNK_ELEMENTS = 16 * 1024 * 1024
+# Compressed bytes of strips/tiles read and decoded per pass
+_TIFF_SEGMENT_BUFFER_BYTES = 16 * 1024 * 1024
+
+
+class _AreaDownsampler:
+    """
+    Area-average an image into a small output, one block at a time.
+
+    Every source pixel is added to the output pixel it falls into, so only the
+    output-sized float accumulator and the block being added are in memory.
+    """
+
+    def __init__(
+        self, height: int, width: int, out_height: int, out_width: int, channels: int
+    ):
+        self.row_map = np.arange(height, dtype=np.int64) * out_height // height
+        self.col_map = np.arange(width, dtype=np.int64) * out_width // width
+        self.sums = np.zeros((out_height, out_width, channels), dtype=np.float32)
+        self.max_value = None
+
+    def add(self, block: np.ndarray, y: int, x: int, channel: int = 0) -> None:
+        """Add an ``(h, w, c)`` block whose top-left pixel is at ``(y, x)``."""
+        height = min(block.shape[0], len(self.row_map) - y)
+        width = min(block.shape[1], len(self.col_map) - x)
+        if height <= 0 or width <= 0:
+            return
+        # Edge tiles are padded beyond the image
+        block = block[:height, :width]
+
+        block_max = (
+            np.nanmax(block) if np.issubdtype(block.dtype, np.floating) else block.max()
+        )
+        if not np.isnan(block_max):
+            block_max = float(block_max)
+            if self.max_value is None or block_max > self.max_value:
+                self.max_value = block_max
+
+        cols = self.col_map[x : x + width]
+        col_starts = np.flatnonzero(np.r_[True, cols[1:] != cols[:-1]])
+        rows_per_chunk = max(1, _AREA_CHUNK_ELEMENTS // max(1, block[0].size))
+        for start in range(0, height, rows_per_chunk):
+            chunk = block[start : start + rows_per_chunk].astype(np.float32)
+            if np.issubdtype(block.dtype, np.floating):
+                chunk = np.nan_to_num(chunk, copy=False)
+            rows = self.row_map[y + start : y + start + len(chunk)]
+            row_starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+            summed = np.add.reduceat(
+                np.add.reduceat(chunk, row_starts, axis=0), col_starts, axis=1
+            )
+            self.sums[
+                rows[row_starts][:, None],
+                cols[col_starts][None, :],
+                channel : channel + summed.shape[2],
+            ] += summed
+
+    def result(self) -> np.ndarray:
+        """Return the averaged float image."""
+        row_counts = np.bincount(self.row_map, minlength=self.sums.shape[0])
+        col_counts = np.bincount(self.col_map, minlength=self.sums.shape[1])
+        counts = np.outer(row_counts, col_counts).astype(np.float32)
+        return self.sums / counts[:, :, None]
+
+
+def _select_tiff_level(series: Any, max_size: int) -> Any:
+    """Return the smallest pyramid level that still covers ``max_size``."""
+    selected = series.levels[0]
+    for level in series.levels[1:]:
+        page = level.pages[0]
+        if max(page.imagelength, page.imagewidth) < max_size:
+            break
+        selected = level
+    return selected
+
+
+def _add_memmapped_page(
+    tiff_path: str, page: Any, byteorder: str, out: _AreaDownsampler
+) -> None:
+    """Feed an uncompressed page to ``out`` through short-lived memory maps."""
+    planes, depth, height, width, samples = page.shaped
+    dtype = np.dtype(page.dtype).newbyteorder(byteorder)
+    row_bytes = width * samples * dtype.itemsize
+    rows_per_block = max(1, _AREA_CHUNK_ELEMENTS // (width * samples))
+    for plane in range(planes):
+        plane_offset = page.dataoffsets[0] + plane * depth * height * row_bytes
+        for y in range(0, height, rows_per_block):
+            rows = min(rows_per_block, height - y)
+            # Mapping a block at a time keeps resident pages bounded
+            block = np.memmap(
+                tiff_path,
+                dtype=dtype,
+                mode="r",
+                offset=plane_offset + y * row_bytes,
+                shape=(rows, width, samples),
+            )
+            out.add(block, y, 0, channel=plane)
+            del block
+
+
+def read_tiff_downsampled(tiff_path: str, max_size: int = 2048) -> np.ndarray:
+    """
+    Read a TIFF at most ``max_size`` pixels on its longest side, as uint8 RGB.
+
+    Memory stays bounded by the output size plus one strip or tile instead of
+    the full-resolution array:
+
+    * if the file holds a pyramid (SubIFDs or reduced-resolution pages), the
+      smallest level of at least ``max_size`` is read;
+    * uncompressed pages are memory-mapped a block of rows at a time;
+    * compressed pages are decoded one strip or tile at a time.
+
+    Blocks are area-averaged into the output and normalized to uint8 with the
+    same rules as ``convert_tiff_with_tifffile``. Only the first image of
+    multi-page stacks is read.
+    """
+    import tifffile
+
+    with tifffile.TiffFile(tiff_path) as tif:
+        level = _select_tiff_level(tif.series[0], max_size)
+        page = level.pages[0]
+        if not isinstance(page, tifffile.TiffPage):
+            page = page.aspage()
+        planes, depth, height, width, samples = page.shaped
+        if depth != 1:
+            raise ValueError(f"Unsupported TIFF image depth: {depth}")
+
+        scale = min(1.0, max_size / max(height, width))
+        out = _AreaDownsampler(
+            height,
+            width,
+            max(1, int(height * scale)),
+            max(1, int(width * scale)),
+            planes * samples,
+        )
+        if page.is_memmappable:
+            _add_memmapped_page(tiff_path, page, tif.byteorder, out)
+        else:
+            segments = page.segments(buffersize=_TIFF_SEGMENT_BUFFER_BYTES)
+            for segment, (plane, _, y, x, _), _ in segments:
+                if segment is not None:
+                    out.add(segment[0], y, x, channel=plane)
+
+        logger.info(
+            "Read large TIFF at reduced resolution",
+            extra={
+                "operation": "object_detection.read_tiff_downsampled",
+                "path": tiff_path,
+                "levels": len(tif.series[0].levels),
+                "level_shape": (height, width),
+                "memmapped": page.is_memmappable,
+                "output_shape": out.sums.shape[:2],
+            },
+        )
+        averaged = _tiff_array_to_rgb(out.result())
+        return _scale_to_uint8(averaged, page.dtype, out.max_value or 0.0)
+
+
+def _tiff_shape(tiff_path: str) -> Optional[Tuple[int, int]]:
+    """Return ``(height, width)`` of a TIFF's first image from its header."""
+    try:
+        import tifffile
+
+        with tifffile.TiffFile(tiff_path) as tif:
+            page = tif.pages[0]
+            return int(page.imagelength), int(page.imagewidth)
+    except Exception:
+        return None
+
+
+def _is_large_tiff(tiff_path: str) -> bool:
+    shape = _tiff_shape(tiff_path)
+    return shape is not None and shape[0] * shape[1] > LARGE_TIFF_PIXELS
+
+
+def convert_large_tiff(tiff_path: str, output_path: str, max_size: int = 2048) -> str:
+    """
+    Convert a TIFF to a PNG of at most ``max_size`` pixels without decoding
+    it at full resolution; see ``read_tiff_downsampled``.
+    """
+    try:
+        rgb = read_tiff_downsampled(tiff_path, max_size=max_size)
+        Image.fromarray(rgb).save(output_path, "PNG")
+    except Exception as e:
+        logger.error(f"Reduced-resolution TIFF read failed for {tiff_path}: {e}")
+        raise ValueError(f"Failed to convert large TIFF: {e}") from e
+    return output_path
+
+
 def scale_down_large_image(file_path: str, max_pixels: int = 178956970) -> str:
     """
     Scale down an image file if it exceeds the maximum pixel limit.
@@ -238,6 +582,24 @@ def scale_down_large_image(file_path: str, max_pixels: int = 178956970) -> str:
     """
     try:
         file_ext = os.path.splitext(file_path)[1].lower()
+        # Create scaled image path
+        scaled_path = (
+            os.path.splitext(file_path)[0] + "_scaled" + os.path.splitext(file_path)[1]
+        )
+
+        tiff_shape = _tiff_shape(file_path) if file_ext in (".tif", ".tiff") else None
+        if tiff_shape is not None and tiff_shape[0] * tiff_shape[1] > LARGE_TIFF_PIXELS:
+            # Read the header only; never decode the full-resolution TIFF
+            total_pixels = tiff_shape[0] * tiff_shape[1]
+            if total_pixels <= max_pixels:
+                return file_path
+            scale_factor = (max_pixels / total_pixels) ** 0.5
+            rgb = read_tiff_downsampled(
+                file_path, max_size=int(max(tiff_shape) * scale_factor)
+            )
+            cv2.imwrite(scaled_path, cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR))
+            return scaled_path
+
         # Read image dimensions first
         img = cv2.imread(file_path, cv2.IMREAD_UNCHANGED)
         if img is None and file_ext in (".tif", ".tiff"):
@@ -265,11 +627,6 @@ def scale_down_large_image(file_path: str, max_pixels: int = 178956970) -> str:
         new_width = int(width * scale_factor)
         new_height = int(height * scale_factor)
 
-        # Create scaled image path
-        scaled_path = (
-            os.path.splitext(file_path)[0] + "_scaled" + os.path.splitext(file_path)[1]
-        )
-
         # Resize using OpenCV
         img_scaled = cv2.resize(
             img, (new_width, new_height), interpolation=cv2.INTER_LANCZOS4
@@ -392,16 +749,33 @@ def create_standard_thumbnail(
     """
     Create standardized thumbnail for any image format with robust fallback mechanisms.
 
+    Vector formats (AI, EPS, PDF) are rendered at the DPI that brings their
+    page to about ``max_size`` pixels, capped at ``dpi``.
+
     Args:
         image_path (str): Path to the source image
         output_path (str): Path to save the output thumbnail
         max_size (int): Maximum dimension for the thumbnail
-        dpi (int): DPI for high-resolution conversion
+        dpi (int): Maximum DPI for high-resolution conversion
 
     Returns:
         str: Path to the created thumbnail
     """
     file_ext = os.path.splitext(image_path)[1].lower()
+    if file_ext in (".ai", ".eps", ".pdf"):
+        render_dpi = target_raster_dpi(image_path, max_size=max_size, dpi=dpi)
+        if render_dpi != dpi:
+            logger.info(
+                "Rasterizing vector figure at target resolution",
+                extra={
+                    "operation": "object_detection.create_standard_thumbnail",
+                    "path": image_path,
+                    "dpi": render_dpi,
+                    "max_dpi": dpi,
+                    "max_size": max_size,
+                },
+            )
+        dpi = render_dpi
 
     # Route to specialized converters based on format
     try:
@@ -412,12 +786,17 @@ def create_standard_thumbnail(
             return _create_jpg_preview_from_eps(image_path, output_path, dpi=dpi)
 
         elif file_ext in [".tif", ".tiff"]:
+            # OpenCV decodes the full-resolution image; large TIFFs go
+            # straight to the reduced-resolution tifffile path
+            if not _is_large_tiff(image_path):
+                try:
+                    return convert_tiff_with_cv2(image_path, output_path)
+                except Exception as e:
+                    logger.warning(f"TIFF conversion with CV2 failed: {str(e)}")
             try:
-                return convert_tiff_with_cv2(image_path, output_path)
-            except Exception as e:
-                logger.warning(f"TIFF conversion with CV2 failed: {str(e)}")
-            try:
-                return convert_tiff_with_tifffile(image_path, output_path)
+                return convert_tiff_with_tifffile(
+                    image_path, output_path, max_size=max_size
+                )
             except Exception as e:
                 logger.warning(f"TIFF conversion with tifffile failed: {str(e)}")
                 # Will fall through to generic cv2 / PIL
@@ -474,17 +853,28 @@ def create_standard_thumbnail(
             )
 
 
-def convert_to_pil_image(file_path: str, dpi: int = 300) -> Tuple[Image.Image, str]:
+def convert_to_pil_image(
+    file_path: str,
+    dpi: int = 300,
+    max_size: int = 2048,
+    raster_cache: Optional[RasterCache] = None,
+) -> Tuple[Image.Image, str]:
     """
     Convert various image formats (PDF, EPS, TIFF, JPG, PNG) to a PIL image.
     Large images are automatically scaled down if they exceed the pixel limit.
 
+    EPS, AI, PDF and TIFF figures are looked up in ``raster_cache`` first, and
+    stored there after conversion, so an unchanged file is rasterized once.
+
     Args:
         file_path (str): The path to the image file.
         dpi (int): Dots per inch for high-resolution conversion. Default is 300.
+        max_size (int): Maximum width or height of the returned image.
+        raster_cache (RasterCache, optional): Persistent cache of rasterized figures.
 
     Returns:
-        Tuple[PIL.Image, str]: The converted PIL image and the path to the new image file.
+        Tuple[PIL.Image, str]: The converted PIL image and the path to the new image
+        file (the cached PNG on a cache hit).
 
     Raises:
         FileNotFoundError: If the specified file does not exist.
@@ -496,16 +886,28 @@ def convert_to_pil_image(file_path: str, dpi: int = 300) -> Tuple[Image.Image, s
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
 
+    cache_key = None
     # Create a temporary file for the converted image if needed
-    if file_ext in [".eps", ".ai", ".pdf", ".tif", ".tiff"]:
+    if file_ext in RASTERIZED_EXTENSIONS:
         new_file_path = os.path.splitext(file_path)[0] + ".png"
+        if raster_cache is not None:
+            try:
+                cache_key = raster_cache.make_key(file_path, dpi, max_size)
+            except OSError as e:
+                logger.warning(f"Raster cache key failed for {file_path}: {str(e)}")
+            if cache_key is not None:
+                cached = raster_cache.get(cache_key)
+                if cached is not None:
+                    return cached, str(raster_cache.path_for(cache_key))
     else:
         new_file_path = file_path
 
     try:
         # Use our robust thumbnail generator
-        if file_ext in [".eps", ".ai", ".tif", ".tiff", ".pdf"]:
-            new_file_path = create_standard_thumbnail(file_path, new_file_path, dpi=dpi)
+        if file_ext in RASTERIZED_EXTENSIONS:
+            new_file_path = create_standard_thumbnail(
+                file_path, new_file_path, max_size=max_size, dpi=dpi
+            )
             try:
                 image = Image.open(new_file_path)
             except DecompressionBombError:
@@ -526,7 +928,7 @@ def convert_to_pil_image(file_path: str, dpi: int = 300) -> Tuple[Image.Image, s
                 raise ValueError(f"Failed to open image: {str(e)}")
 
         # Ensure image is in correct format and size
-        image = convert_and_resize_image(image)
+        image = convert_and_resize_image(image, max_size=max_size)
 
         # Validate that we have a PIL Image
         # Use hasattr to check for PIL Image attributes instead of isinstance
@@ -539,6 +941,9 @@ def convert_to_pil_image(file_path: str, dpi: int = 300) -> Tuple[Image.Image, s
             logger.error(f"convert_to_pil_image returned non-PIL object: {type(image)}")
             raise ValueError(f"Expected PIL Image, got {type(image)}")
 
+        if cache_key is not None:
+            raster_cache.set(cache_key, image)
+
         return image, new_file_path
 
     except Exception as e:
@@ -568,6 +973,65 @@ def convert_and_resize_image(image: Image.Image, max_size: int = 2048) -> Image.
     return image
 
 
+# Detection settings used when the configuration does not override them
+# Box outlines cycle through these so neighbouring panels are told apart
+BOX_COLORS = ((230, 25, 75), (0, 130, 200), (60, 180, 75), (245, 130, 48))
+
+
+def draw_numbered_boxes(
+    image: Image.Image, bboxes: Sequence[Sequence[float]]
+) -> Image.Image:
+    """
+    Return a copy of ``image`` with each relative bbox outlined and numbered.
+
+    Boxes are numbered from 1 in the order given. The number sits on a filled
+    tag at the box's top-right corner, away from the usual position of the
+    printed panel label, and stays legible over any content.
+    """
+    annotated = image.convert("RGB")
+    width, height = annotated.size
+    line_width = max(2, round(max(width, height) / 400))
+    font_size = max(12, round(max(width, height) / 40))
+    try:
+        font = ImageFont.load_default(size=font_size)
+    except TypeError:
+        # Pillow < 10.1 only has the fixed-size bitmap font
+        font = ImageFont.load_default()
+
+    draw = ImageDraw.Draw(annotated)
+    for number, bbox in enumerate(bboxes, start=1):
+        color = BOX_COLORS[(number - 1) % len(BOX_COLORS)]
+        left, top, right, bottom = (
+            bbox[0] * width,
+            bbox[1] * height,
+            bbox[2] * width,
+            bbox[3] * height,
+        )
+        draw.rectangle([left, top, right, bottom], outline=color, width=line_width)
+        tag = str(number)
+        text_left, text_top, text_right, text_bottom = draw.textbbox(
+            (0, 0), tag, font=font
+        )
+        padding = line_width
+        tag_width = text_right + 2 * padding
+        tag_left = max(left, right - tag_width)
+        draw.rectangle(
+            [tag_left, top, tag_left + tag_width, top + text_bottom + 2 * padding],
+            fill=color,
+        )
+        draw.text((tag_left + padding, top + padding), tag, fill="white", font=font)
+    return annotated
+
+
+DEFAULT_DETECTION_SETTINGS = {
+    "confidence_threshold": 0.25,
+    "iou_threshold": 0.1,
+    "image_size": 512,
+    "max_detections": 30,
+    "batch_size": 1,
+}
+
+
 class ObjectDetection:
     """
     A class for performing object detection on images using the YOLOv10 model.
@@ -578,46 +1042,44 @@ class ObjectDetection:
     Attributes:
         model_path (str): Path to the YOLOv10 model file.
         model (YOLOv10): The loaded YOLOv10 model.
+        settings (Dict[str, Any]): Default thresholds, inference size and batch size.
     """
 
-    def __init__(self, model_path: str):
+    # The ultralytics predictor is stateful; serialize inference so a single
+    # loaded model can be shared between batch worker threads.
+    _lock = threading.Lock()
+    settings: Dict[str, Any] = DEFAULT_DETECTION_SETTINGS
+
+    def __init__(self, model_path: str, settings: Optional[Dict[str, Any]] = None):
         """
         Initialize the ObjectDetection class.
 
         Args:
             model_path (str): Path to the YOLOv10 model file.
+            settings (Dict[str, Any], optional): Overrides for
+                DEFAULT_DETECTION_SETTINGS.
         """
         self.model_path = model_path
+        self.settings = {**DEFAULT_DETECTION_SETTINGS, **(settings or {})}
         self.model = YOLOv10(self.model_path)
         logger.info(f"Initialized ObjectDetection with model: {self.model_path}")
 
-    def detect_panels(
+    def _inference_kwargs(
         self,
-        image: Image.Image,
-        conf: float = 0.25,
-        iou: float = 0.1,
-        imgsz: int = 512,
-        max_det: int = 30,
-    ) -> List[Dict[str, float]]:
-        """
-        Detect panels in the given image using YOLOv10.
-
-        This method processes an image, detects panels within it using the YOLOv10 model,
-        and returns a list of detected panels with their properties.
-
-        Args:
-            image (Image.Image): The input PIL Image object.
-            conf (float): Confidence threshold for detection. Default is 0.25.
-            iou (float): IoU threshold for non-max suppression. Default is 0.1.
-            imgsz (int): Inference size for the model. Default is 512.
-            max_det (int): Maximum number of detections. Default is 30.
-
-        Returns:
-            List[Dict[str, float]]: List of detected panels with bbox and confidence
-
-        Raises:
-            Exception: If there's an error during the detection process.
-        """
+        conf: Optional[float],
+        iou: Optional[float],
+        imgsz: Optional[int],
+        max_det: Optional[int],
+    ) -> Dict[str, Any]:
+        return {
+            "conf": self.settings["confidence_threshold"] if conf is None else conf,
+            "iou": self.settings["iou_threshold"] if iou is None else iou,
+            "imgsz": self.settings["image_size"] if imgsz is None else imgsz,
+            "max_det": self.settings["max_detections"] if max_det is None else max_det,
+        }
+
+    @staticmethod
+    def _validate_image(image: Image.Image) -> None:
         if image is None:
             raise ValueError("Input image cannot be None")
 
@@ -646,27 +1108,68 @@ class ObjectDetection:
                 f"Type: {type(image)}, Module: {type(image).__module__}"
             )
 
+    @staticmethod
+    def _parse_result(result: Any) -> List[Dict[str, float]]:
+        detections = []
+        for i, box in enumerate(result.boxes.xyxyn.tolist()):
+            x1, y1, x2, y2 = box
+            confidence = float(result.boxes.conf[i])
+
+            detection_info = {
+                "bbox": [x1, y1, x2, y2],
+                "confidence": confidence,
+            }
+            detections.append(detection_info)
+        return detections
+
+    def _run_model(
+        self, inputs: Any, kwargs: Dict[str, Any]
+    ) -> List[List[Dict[str, float]]]:
+        """Run the model on one array or a list of arrays; detections per image."""
+        with self._lock:
+            results = self.model(inputs, **kwargs)
+        return [self._parse_result(result) for result in results]
+
+    def detect_panels(
+        self,
+        image: Image.Image,
+        conf: Optional[float] = None,
+        iou: Optional[float] = None,
+        imgsz: Optional[int] = None,
+        max_det: Optional[int] = None,
+    ) -> List[Dict[str, float]]:
+        """
+        Detect panels in the given image using YOLOv10.
+
+        This method processes an image, detects panels within it using the YOLOv10 model,
+        and returns a list of detected panels with their properties.
+
+        Args:
+            image (Image.Image): The input PIL Image object.
+            conf (float): Confidence threshold for detection. Default is 0.25.
+            iou (float): IoU threshold for non-max suppression. Default is 0.1.
+            imgsz (int): Inference size for the model. Default is 512.
+            max_det (int): Maximum number of detections. Default is 30.
+
+        Unset arguments fall back to the detector's configured settings.
+
+        Returns:
+            List[Dict[str, float]]: List of detected panels with bbox and confidence
+
+        Raises:
+            Exception: If there's an error during the detection process.
+        """
+        self._validate_image(image)
+
         logger.info(
             f"Detecting panels in image - type: {type(image).__name__}, mode: {image.mode}, size: {image.size}"
         )
 
         try:
             np_image = np.array(image)
-            results = self.model(
-                np_image, conf=conf, iou=iou, imgsz=imgsz, max_det=max_det
-            )
-
-            detections = []
-            for i, box in enumerate(results[0].boxes.xyxyn.tolist()):
-                x1, y1, x2, y2 = box
-                confidence = float(results[0].boxes.conf[i])
-
-                detection_info = {
-                    "bbox": [x1, y1, x2, y2],
-                    "confidence": confidence,
-                }
-                detections.append(detection_info)
-
+            detections = self._run_model(
+                np_image, self._inference_kwargs(conf, iou, imgsz, max_det)
+            )[0]
             logger.info(f"Detected {len(detections)} panels")
             return detections
 
@@ -674,13 +1177,302 @@ class ObjectDetection:
             logger.error(f"Error detecting panels: {str(e)}")
             return []
 
+    def detect_panels_batch(
+        self,
+        images: Sequence[Image.Image],
+        conf: Optional[float] = None,
+        iou: Optional[float] = None,
+        imgsz: Optional[int] = None,
+        max_det: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> List[List[Dict[str, float]]]:
+        """
+        Detect panels in several images, running the model on batches of them.
+
+        Batching amortizes model dispatch across the figures of a manuscript.
+        A batch that fails is retried one image at a time, so a single bad
+        figure only loses its own detections.
+
+        Args:
+            images: The input PIL Image objects.
+            conf, iou, imgsz, max_det: As for detect_panels.
+            batch_size: Images per model call. Defaults to the configured
+                ``batch_size``.
+
+        Returns:
+            List[List[Dict[str, float]]]: Detections for each image, in input order
+        """
+        for image in images:
+            self._validate_image(image)
+
+        batch_size = max(1, batch_size or self.settings["batch_size"])
+        kwargs = self._inference_kwargs(conf, iou, imgsz, max_det)
+        detections: List[List[Dict[str, float]]] = []
+        for start in range(0, len(images), batch_size):
+            batch = list(images[start : start + batch_size])
+            try:
+                np_images = [np.array(image) for image in batch]
+                found = self._run_model(np_images, kwargs)
+                if len(found) != len(batch):
+                    raise ValueError(
+                        f"Model returned {len(found)} results for {len(batch)} images"
+                    )
+                detections.extend(found)
+            except Exception as e:
+                logger.warning(
+                    "Batched panel detection failed; detecting one image at a time",
+                    extra={
+                        "operation": "object_detection.detect_panels_batch",
+                        "batch_size": len(batch),
+                        "error": str(e),
+                    },
+                )
+                detections.extend(
+                    self.detect_panels(image, **kwargs) for image in batch
+                )
+
+        logger.info(
+            "Detected panels in batch",
+            extra={
+                "operation": "object_detection.detect_panels_batch",
+                "image_count": len(images),
+                "batch_size": batch_size,
+                "imgsz": kwargs["imgsz"],
+                "panel_count": sum(len(found) for found in detections),
+            },
+        )
+        return detections
+
+
+# Padding value and stride used by ultralytics' LetterBox preprocessing
+LETTERBOX_COLOR = (114, 114, 114)
+LETTERBOX_STRIDE = 32
+# Offset separating classes in class-aware NMS, as in ultralytics
+NMS_CLASS_OFFSET = 7680
+
+
+def letterbox_image(
+    image: np.ndarray, size: int
+) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """
+    Resize an image into a square ``size`` canvas, preserving aspect ratio.
+
+    Mirrors ultralytics' LetterBox for a fixed-shape model: the image is
+    scaled to fit and centred on gray padding.
+
+    Args:
+        image (np.ndarray): HxWx3 uint8 array.
+        size (int): Side of the square model input.
+
+    Returns:
+        Tuple[np.ndarray, float, Tuple[int, int]]: The padded image, the scale
+        ratio and the (left, top) padding in pixels.
+    """
+    height, width = image.shape[:2]
+    ratio = min(size / height, size / width)
+    new_width, new_height = int(round(width * ratio)), int(round(height * ratio))
+    if (new_width, new_height) != (width, height):
+        image = cv2.resize(
+            image, (new_width, new_height), interpolation=cv2.INTER_LINEAR
+        )
+    pad_w, pad_h = (size - new_width) / 2, (size - new_height) / 2
+    top, bottom = int(round(pad_h - 0.1)), int(round(pad_h + 0.1))
+    left, right = int(round(pad_w - 0.1)), int(round(pad_w + 0.1))
+    image = cv2.copyMakeBorder(
+        image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=LETTERBOX_COLOR
+    )
+    return image, ratio, (left, top)
+
+
+def decode_yolo_output(
+    prediction: np.ndarray, conf: float, iou: float, max_det: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Turn the raw output of an exported YOLO model for one image into boxes.
+
+    Two layouts are supported: the NMS-free YOLOv10 head, which emits
+    ``(max_det, 6)`` rows of ``x1, y1, x2, y2, score, class``, and the classic
+    ``(4 + classes, anchors)`` head, which is decoded and passed through NMS.
+
+    Args:
+        prediction (np.ndarray): Model output for a single image.
+        conf (float): Confidence threshold.
+        iou (float): IoU threshold for NMS (classic head only).
+        max_det (int): Maximum number of detections.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: ``(n, 4)`` xyxy boxes in model input
+        pixels and their ``(n,)`` scores, highest score first.
+    """
+    if prediction.shape[-1] == 6 and prediction.shape[0] > 6:
+        keep = prediction[:, 4] >= conf
+        rows = prediction[keep]
+        rows = rows[np.argsort(-rows[:, 4], kind="stable")][:max_det]
+        return rows[:, :4], rows[:, 4]
+
+    rows = prediction.T
+    class_scores = rows[:, 4:]
+    classes = class_scores.argmax(axis=1)
+    scores = class_scores[np.arange(len(rows)), classes]
+    keep = scores >= conf
+    centers, sizes = rows[keep, :2], rows[keep, 2:4]
+    boxes = np.concatenate([centers - sizes / 2, centers + sizes / 2], axis=1)
+    scores, classes = scores[keep], classes[keep]
+    if not len(boxes):
+        return boxes, scores
+
+    offset_boxes = boxes + (classes * NMS_CLASS_OFFSET)[:, None]
+    xywh = np.concatenate([offset_boxes[:, :2], sizes], axis=1)
+    indices = cv2.dnn.NMSBoxes(xywh.tolist(), scores.tolist(), conf, iou, top_k=max_det)
+    indices = np.array(indices, dtype=int).reshape(-1)[:max_det]
+    return boxes[indices], scores[indices]
+
+
+class OnnxObjectDetection(ObjectDetection):
+    """
+    Panel detection with an exported ONNX model on onnxruntime (CPU).
+
+    A drop-in replacement for ObjectDetection that does not import torch. The
+    model is exported from the YOLOv10 weights with
+    ``scripts/export_panel_detection_onnx.py``, optionally with an INT8
+    dynamically quantized variant. Detections have the same ``bbox`` /
+    ``confidence`` format.
+
+    Attributes:
+        model_path (str): Path to the ONNX model file.
+        model (onnxruntime.InferenceSession): The loaded session.
+        settings (Dict[str, Any]): Default thresholds, inference size and batch size.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        settings: Optional[Dict[str, Any]] = None,
+        num_threads: int = 0,
+    ):
+        """
+        Initialize the OnnxObjectDetection class.
+
+        Args:
+            model_path (str): Path to the ONNX model file.
+            settings (Dict[str, Any], optional): Overrides for
+                DEFAULT_DETECTION_SETTINGS.
+            num_threads (int): Intra-op threads for onnxruntime; 0 lets
+                onnxruntime use all physical cores.
+
+        Raises:
+            ImportError: If onnxruntime is not installed.
+        """
+        if ort is None:
+            raise ImportError(
+                "The onnx object detection backend requires onnxruntime "
+                "(pip install onnxruntime)"
+            )
+        self.model_path = model_path
+        self.settings = {**DEFAULT_DETECTION_SETTINGS, **(settings or {})}
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = num_threads
+        self.model = ort.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+
+        model_input = self.model.get_inputs()[0]
+        self._input_name = model_input.name
+        batch, _, height, _ = model_input.shape
+        # Static exports fix the batch and input size; dynamic ones use strings
+        self._fixed_batch = batch if isinstance(batch, int) else None
+        self._fixed_size = height if isinstance(height, int) else None
+        logger.info(
+            f"Initialized OnnxObjectDetection with model: {self.model_path}",
+            extra={
+                "operation": "object_detection.onnx_init",
+                "input_shape": list(model_input.shape),
+                "num_threads": num_threads,
+            },
+        )
+
+    def _input_size(self, imgsz: int) -> int:
+        if self._fixed_size is not None:
+            return self._fixed_size
+        return int(np.ceil(imgsz / LETTERBOX_STRIDE) * LETTERBOX_STRIDE)
+
+    def _run_model(
+        self, inputs: Any, kwargs: Dict[str, Any]
+    ) -> List[List[Dict[str, float]]]:
+        """Letterbox, run the session and map boxes back to each image."""
+        # InferenceSession.run is thread-safe, so unlike the ultralytics
+        # predictor no lock is taken here.
+        images = inputs if isinstance(inputs, list) else [inputs]
+        size = self._input_size(kwargs["imgsz"])
+
+        tensors, geometry = [], []
+        for image in images:
+            if image.ndim == 2:
+                image = np.stack([image] * 3, axis=-1)
+            image = image[..., :3]
+            # detect_panels hands ultralytics RGB arrays, which it reads as
+            # BGR and flips; flip too so both backends see the same input.
+            padded, ratio, pad = letterbox_image(np.ascontiguousarray(image), size)
+            tensors.append(padded[..., ::-1].transpose(2, 0, 1))
+            geometry.append((image.shape[1], image.shape[0], ratio, pad))
+
+        step = self._fixed_batch or len(tensors)
+        predictions: List[np.ndarray] = []
+        for start in range(0, len(tensors), step):
+            batch = np.ascontiguousarray(
+                np.stack(tensors[start : start + step]), dtype=np.float32
+            )
+            batch /= 255.0
+            output = self.model.run(None, {self._input_name: batch})[0]
+            predictions.extend(output)
+
+        detections = []
+        for prediction, (width, height, ratio, (left, top)) in zip(
+            predictions, geometry
+        ):
+            boxes, scores = decode_yolo_output(
+                prediction, kwargs["conf"], kwargs["iou"], kwargs["max_det"]
+            )
+            boxes = (boxes - [left, top, left, top]) / ratio
+            boxes = boxes.clip(0, [width, height, width, height])
+            boxes = boxes / [width, height, width, height]
+            detections.append(
+                [
+                    {"bbox": box.tolist(), "confidence": float(score)}
+                    for box, score in zip(boxes, scores)
+                ]
+            )
+        return detections
+
+
+def onnx_model_path_for(model_path: str, int8: bool = False) -> str:
+    """
+    Return the ONNX export path for a model, e.g. ``model.onnx``/``model.int8.onnx``.
+
+    Args:
+        model_path (str): Path to the ``.pt`` weights or the ``.onnx`` model.
+        int8 (bool): Whether to point at the INT8 quantized variant.
+    """
+    path = Path(model_path)
+    if path.suffix == ".onnx" and not int8:
+        return model_path
+    stem = path.stem.removesuffix(".int8")
+    suffix = ".int8.onnx" if int8 else ".onnx"
+    return str(path.with_name(stem + suffix))
+
 
 def create_object_detection(config: Dict[str, Any]) -> ObjectDetection:
     """
     Create an instance of ObjectDetection based on the configuration.
 
     This function reads the configuration to determine the path of the YOLOv10 model
-    and creates an ObjectDetection instance with that model.
+    and its detection settings (thresholds, ``image_size``, ``batch_size``) and
+    creates an ObjectDetection instance with that model. With ``backend: onnx``
+    an OnnxObjectDetection is created instead, loading ``onnx_model_path`` (by
+    default the ``.onnx`` export next to ``model_path``, or its ``.int8.onnx``
+    variant when ``onnx_int8`` is set).
 
     Args:
         config (Dict[str, Any]): Configuration dictionary containing model path information.
@@ -690,10 +1482,25 @@ def create_object_detection(config: Dict[str, Any]) -> ObjectDetection:
 
     Raises:
         FileNotFoundError: If the specified model file is not found.
+        ValueError: If the backend is not recognized.
     """
-    relative_model_path = config.get("object_detection", {}).get(
+    # Settings live under pipeline.object_detection in the config files; a
+    # top-level object_detection section takes precedence
+    detection_config = {
+        **(config.get("pipeline", {}).get("object_detection") or {}),
+        **(config.get("object_detection") or {}),
+    }
+    relative_model_path = detection_config.get(
         "model_path", "data/models/panel_detection_model_no_labels.pt"
     )
+    backend = detection_config.get("backend") or "ultralytics"
+    if backend == "onnx":
+        relative_model_path = onnx_model_path_for(
+            detection_config.get("onnx_model_path") or relative_model_path,
+            int8=bool(detection_config.get("onnx_int8", False)),
+        )
+    elif backend != "ultralytics":
+        raise ValueError(f"Unknown object detection backend: {backend}")
 
     # Construct the absolute path to the model
     absolute_model_path = Path("/app") / relative_model_path
@@ -703,4 +1510,15 @@ def create_object_detection(config: Dict[str, Any]) -> ObjectDetection:
     if not absolute_model_path.exists():
         raise FileNotFoundError(f"Model file not found at {absolute_model_path}")
 
-    return ObjectDetection(str(absolute_model_path))
+    settings = {
+        key: detection_config[key]
+        for key in DEFAULT_DETECTION_SETTINGS
+        if detection_config.get(key) is not None
+    }
+    if backend == "onnx":
+        return OnnxObjectDetection(
+            str(absolute_model_path),
+            settings=settings,
+            num_threads=int(detection_config.get("onnx_threads") or 0),
+        )
+    return ObjectDetection(str(absolute_model_path), settings=settings)
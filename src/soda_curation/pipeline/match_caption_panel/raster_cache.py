@@ -0,0 +1,227 @@
+"""
+Persistent on-disk cache of rasterized figures.
+
+EPS, AI, PDF and TIFF figures are rasterized through ImageMagick, Ghostscript,
+pdf2image or tifffile, which takes seconds per figure and is repeated on every
+run and for every resubmission of a manuscript. The cache stores the final
+converted image as a PNG keyed by the source file's content hash, the DPI and
+the maximum size, so an unchanged figure is only rasterized once per machine.
+
+The cache is opt-in::
+
+    default:
+      raster_cache:
+        enabled: true
+        path: data/cache/rasters  # default
+        max_size_mb: 2048         # default
+
+Entries beyond the size cap are evicted least recently used first; a hit
+refreshes the entry's modification time. Files are written atomically, so
+several processes can share one cache directory.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "data/cache/rasters"
+DEFAULT_MAX_SIZE_MB = 2048
+
+# Bump when the conversion output changes so stale rasters are not reused
+RASTER_CACHE_VERSION = 3
+
+CACHE_HIT = "hit"
+CACHE_MISS = "miss"
+
+
+def _file_digest(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RasterCache:
+    """
+    Directory of rasterized figure PNGs with size-bounded LRU eviction.
+
+    Args:
+        path: Cache directory
+        max_size_bytes: Total size of cached PNGs before eviction starts
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_DIR,
+        max_size_bytes: int = DEFAULT_MAX_SIZE_MB * 1024 * 1024,
+    ):
+        self.path = Path(path)
+        self.max_size_bytes = max_size_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def make_key(self, source_path: str, dpi: int, max_size: int) -> str:
+        """Return the key of a source file rasterized at ``dpi`` and ``max_size``."""
+        payload = (
+            f"{RASTER_CACHE_VERSION}:{_file_digest(source_path)}:"
+            f"{os.path.splitext(source_path)[1].lower()}:{dpi}:{max_size}"
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        """Return the PNG path of a key."""
+        return self.path / key[:2] / f"{key}.png"
+
+    def _count(self, status: str) -> None:
+        with self._lock:
+            if status == CACHE_HIT:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str) -> Optional[Image.Image]:
+        """Return the cached image for a key, or None, counting the hit or miss."""
+        cached_path = self.path_for(key)
+        image = None
+        try:
+            if cached_path.exists():
+                with Image.open(cached_path) as cached:
+                    image = cached.convert("RGB")
+                # Refresh the LRU position
+                os.utime(cached_path)
+        except Exception as e:
+            logger.warning(f"Raster cache read failed for {cached_path}: {str(e)}")
+            image = None
+
+        status = CACHE_HIT if image is not None else CACHE_MISS
+        self._count(status)
+        logger.debug(
+            "Raster cache lookup",
+            extra={
+                "operation": "raster_cache.get",
+                "key": key,
+                "status": status,
+            },
+        )
+        return image
+
+    def set(self, key: str, image: Image.Image) -> Optional[Path]:
+        """Store an image under a key and evict down to the size cap."""
+        cached_path = self.path_for(key)
+        try:
+            cached_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(
+                dir=cached_path.parent, prefix=".", suffix=".png.tmp"
+            )
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    image.save(f, format="PNG")
+                os.replace(tmp_path, cached_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+        except Exception as e:
+            logger.warning(f"Raster cache write failed for {cached_path}: {str(e)}")
+            return None
+
+        self._evict(keep=cached_path)
+        return cached_path
+
+    def _entries(self):
+        for entry_dir in self.path.iterdir():
+            if not entry_dir.is_dir():
+                continue
+            for entry in os.scandir(entry_dir):
+                if entry.name.endswith(".png") and entry.is_file():
+                    yield entry
+
+    def _evict(self, keep: Path) -> None:
+        entries = []
+        total = 0
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+        excess = total - self.max_size_bytes
+        if excess <= 0:
+            return
+
+        evicted = 0
+        for _, size, entry_path in sorted(entries):
+            if excess <= 0:
+                break
+            if Path(entry_path) == keep:
+                continue
+            try:
+                os.unlink(entry_path)
+            except FileNotFoundError:
+                pass
+            excess -= size
+            evicted += 1
+        with self._lock:
+            self.evictions += evicted
+        logger.info(
+            "Evicted least recently used rasters",
+            extra={"operation": "raster_cache.evict", "evicted": evicted},
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters and the current cache size."""
+        entries = 0
+        size = 0
+        for entry in self._entries():
+            try:
+                size += entry.stat().st_size
+                entries += 1
+            except FileNotFoundError:
+                continue
+        with self._lock:
+            return {
+                "raster_cache_hits": self.hits,
+                "raster_cache_misses": self.misses,
+                "raster_cache_evictions": self.evictions,
+                "raster_cache_entries": entries,
+                "raster_cache_size_bytes": size,
+            }
+
+
+_caches: Dict[str, RasterCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_raster_cache(config: Dict[str, Any]) -> Optional[RasterCache]:
+    """
+    Return the shared raster cache if ``raster_cache.enabled`` is set.
+
+    One instance is shared per cache directory.
+    """
+    cache_config = config.get("raster_cache") or {}
+    if not cache_config.get("enabled", False):
+        return None
+
+    path = str(cache_config.get("path", DEFAULT_CACHE_DIR))
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = RasterCache(
+                path=path,
+                max_size_bytes=int(
+                    cache_config.get("max_size_mb", DEFAULT_MAX_SIZE_MB) * 1024 * 1024
+                ),
+            )
+        return _caches[path]
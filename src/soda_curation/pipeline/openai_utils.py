@@ -2,16 +2,25 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import re
-import time
-from typing import Any, Dict, List, Optional, Type, TypeVar, Union
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar, Union
 
 import openai
 from openai import OpenAIError
 
 from .ai_observability import summarize_messages
+from .cost_tracking import prompt_cache_tokens
+from .rate_limits import (
+    rate_limit_steps,
+    retry_after_seconds,
+    settle_rate_limit,
+    with_model_header,
+)
+from .request_steps import ApiRequest, Backoff, Steps, arun_steps, run_steps
+from .response_cache import ResponseCache, make_cache_key
 
 try:
     import tiktoken
@@ -279,6 +288,11 @@ def count_messages_tokens(messages: List[Dict[str, Any]], model: str = "gpt-4o")
         for key, value in message.items():
             if isinstance(value, str):
                 num_tokens += count_tokens(value, model)
+            elif isinstance(value, list):
+                # Multimodal content: count the text parts, not the images
+                for part in value:
+                    if isinstance(part, dict) and part.get("type") == "text":
+                        num_tokens += count_tokens(part.get("text", ""), model)
             if key == "name":
                 num_tokens += tokens_per_name
 
@@ -667,14 +681,23 @@ def prepare_model_params(
     return params
 
 
-def _parse_with_retry(
-    client: openai.OpenAI,
-    params: Dict[str, Any],
-    model: str,
-    operation: str,
-) -> Any:
+def _usage_log_fields(response: Any) -> Dict[str, int]:
+    """Prompt and cached token counts of a response, for the success logs."""
+    usage = getattr(response, "usage", None)
+    prompt_tokens = getattr(usage, "prompt_tokens", 0)
+    return {
+        "prompt_tokens": prompt_tokens if isinstance(prompt_tokens, int) else 0,
+        "cached_tokens": prompt_cache_tokens(usage)[0],
+    }
+
+
+def _parse_steps(params: Dict[str, Any], model: str, operation: str) -> Steps:
     """Parse chat completion with retries for transient errors."""
     for attempt in range(1, OPENAI_MAX_RETRIES + 1):
+        reserved = yield from rate_limit_steps(
+            "openai", model, lambda: _estimate_request_tokens(params, model), operation
+        )
+        settled = False
         try:
             if attempt > 1:
                 logger.warning(
@@ -686,14 +709,16 @@ def _parse_with_retry(
                         "max_attempts": OPENAI_MAX_RETRIES,
                     },
                 )
-            return client.beta.chat.completions.parse(**params)
+            response = yield ApiRequest(with_model_header(params, model))
         except OpenAIError as error:
+            settle_rate_limit("openai", model, reserved)
+            settled = True
             classification = classify_openai_error(error)
             retryable = (
                 is_retryable_openai_error(error) and attempt < OPENAI_MAX_RETRIES
             )
             if retryable:
-                wait_seconds = min(2 ** (attempt - 1), 8)
+                wait_seconds = retry_after_seconds(error) or min(2 ** (attempt - 1), 8)
                 logger.warning(
                     "Recoverable OpenAI error; retrying",
                     extra={
@@ -704,9 +729,133 @@ def _parse_with_retry(
                         "retry_in_s": wait_seconds,
                     },
                 )
-                time.sleep(wait_seconds)
+                yield Backoff(wait_seconds)
                 continue
             raise
+        else:
+            settle_rate_limit("openai", model, reserved, response)
+            settled = True
+        finally:
+            if not settled:
+                # Refund the reservation on any failure, including cancellation
+                settle_rate_limit("openai", model, reserved)
+        return response
+
+
+def _estimate_request_tokens(params: Dict[str, Any], model: str) -> int:
+    """Tokens a request counts against the rate limit: prompt plus max_tokens."""
+    return count_messages_tokens(params["messages"], model) + (
+        params.get("max_tokens") or 0
+    )
+
+
+def _openai_call_kwargs(
+    model: str,
+    messages: List[Dict[str, Any]],
+    response_format: Optional[Union[Type[T], Dict[str, Any]]],
+    temperature: float,
+    top_p: float,
+    frequency_penalty: float,
+    presence_penalty: float,
+    max_tokens: int,
+    json_mode: bool,
+    fallback_model: str,
+    operation: str,
+    request_metadata: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Collect the arguments shared by the sync and async call helpers."""
+    return {
+        "model": model,
+        "messages": messages,
+        "response_format": response_format,
+        "temperature": temperature,
+        "top_p": top_p,
+        "frequency_penalty": frequency_penalty,
+        "presence_penalty": presence_penalty,
+        "max_tokens": max_tokens,
+        "json_mode": json_mode,
+        "fallback_model": fallback_model,
+        "operation": operation,
+        "request_metadata": request_metadata,
+    }
+
+
+def _prepare_openai_call(
+    cache: Optional[ResponseCache], call_kwargs: Dict[str, Any], enable_chunking: bool
+) -> Tuple[Optional[str], Any]:
+    """Log the request and return its cache key and any cached response."""
+    model = call_kwargs["model"]
+    operation = call_kwargs["operation"]
+    logger.info(
+        "OpenAI request prepared",
+        extra={
+            "operation": operation,
+            "model": model,
+            "fallback_model": call_kwargs["fallback_model"],
+            "message_summary": summarize_messages(call_kwargs["messages"]),
+            "request_metadata": call_kwargs["request_metadata"] or {},
+        },
+    )
+    if cache is None:
+        return None, None
+
+    params = {
+        key: call_kwargs[key]
+        for key in (
+            "temperature",
+            "top_p",
+            "frequency_penalty",
+            "presence_penalty",
+            "max_tokens",
+            "json_mode",
+            "fallback_model",
+        )
+    }
+    params["enable_chunking"] = enable_chunking
+    response_format = call_kwargs["response_format"]
+    cache_key = make_cache_key(
+        "openai", model, call_kwargs["messages"], params, response_format
+    )
+    cached = cache.lookup(cache_key, response_format)
+    if cached is not None:
+        logger.info(
+            "OpenAI response served from cache",
+            extra={
+                "operation": operation,
+                "model": model,
+                "cache_key": cache_key[:16],
+            },
+        )
+    return cache_key, cached
+
+
+def _fallback_call_steps(
+    call_kwargs: Dict[str, Any], enable_chunking: bool = True
+) -> Steps:
+    """Chunk oversized requests up front, otherwise make a single call."""
+    model = call_kwargs["model"]
+    operation = call_kwargs["operation"]
+
+    # Check if messages exceed token limit and need chunking
+    token_limit = get_token_limit(model)
+    current_tokens = count_messages_tokens(call_kwargs["messages"], model)
+
+    if enable_chunking and current_tokens > token_limit:
+        logger.warning(
+            "Fallback strategy activated: chunking",
+            extra={
+                "operation": operation,
+                "model": model,
+                "reason": "context_length_precheck",
+                "context_length_source": "local_estimate",
+                "current_tokens": current_tokens,
+                "token_limit": token_limit,
+            },
+        )
+        return (yield from _chunked_call_steps(**call_kwargs))
+
+    # Standard call without chunking
+    return (yield from _single_call_steps(**call_kwargs))
 
 
 def call_openai_with_fallback(
@@ -724,6 +873,7 @@ def call_openai_with_fallback(
     enable_chunking: bool = True,
     operation: str = "unspecified_operation",
     request_metadata: Optional[Dict[str, Any]] = None,
+    cache: Optional[ResponseCache] = None,
 ) -> Any:
     """
     Call OpenAI API with automatic fallback to GPT-5 on context length errors
@@ -744,6 +894,7 @@ def call_openai_with_fallback(
         enable_chunking: Whether to enable automatic chunking for large requests
         operation: Operation name for structured logs
         request_metadata: Additional metadata for structured logs
+        cache: Optional response cache; identical requests are replayed from it
 
     Returns:
         Response from OpenAI API (or merged responses if chunked)
@@ -751,69 +902,89 @@ def call_openai_with_fallback(
     Raises:
         OpenAIError: If both primary and fallback models fail
     """
-    logger.info(
-        "OpenAI request prepared",
-        extra={
-            "operation": operation,
-            "model": model,
-            "fallback_model": fallback_model,
-            "message_summary": summarize_messages(messages),
-            "request_metadata": request_metadata or {},
-        },
+    call_kwargs = _openai_call_kwargs(
+        model,
+        messages,
+        response_format,
+        temperature,
+        top_p,
+        frequency_penalty,
+        presence_penalty,
+        max_tokens,
+        json_mode,
+        fallback_model,
+        operation,
+        request_metadata,
     )
+    cache_key, cached = _prepare_openai_call(cache, call_kwargs, enable_chunking)
+    if cached is not None:
+        return cached
 
-    # Check if messages exceed token limit and need chunking
-    token_limit = get_token_limit(model)
-    current_tokens = count_messages_tokens(messages, model)
+    response = run_steps(
+        _fallback_call_steps(call_kwargs, enable_chunking),
+        lambda params: client.beta.chat.completions.parse(**params),
+    )
 
-    if enable_chunking and current_tokens > token_limit:
-        logger.warning(
-            "Fallback strategy activated: chunking",
-            extra={
-                "operation": operation,
-                "model": model,
-                "reason": "context_length_precheck",
-                "context_length_source": "local_estimate",
-                "current_tokens": current_tokens,
-                "token_limit": token_limit,
-            },
-        )
-        return _call_openai_with_chunking(
-            client=client,
-            model=model,
-            messages=messages,
-            response_format=response_format,
-            temperature=temperature,
-            top_p=top_p,
-            frequency_penalty=frequency_penalty,
-            presence_penalty=presence_penalty,
-            max_tokens=max_tokens,
-            json_mode=json_mode,
-            fallback_model=fallback_model,
-            operation=operation,
-            request_metadata=request_metadata,
-        )
+    if cache is not None:
+        return cache.store(cache_key, response)
+    return response
 
-    # Standard call without chunking
-    return _call_openai_single(
-        client=client,
-        model=model,
-        messages=messages,
-        response_format=response_format,
-        temperature=temperature,
-        top_p=top_p,
-        frequency_penalty=frequency_penalty,
-        presence_penalty=presence_penalty,
-        max_tokens=max_tokens,
-        json_mode=json_mode,
-        fallback_model=fallback_model,
-        operation=operation,
-        request_metadata=request_metadata,
+
+async def acall_openai_with_fallback(
+    client: openai.AsyncOpenAI,
+    model: str,
+    messages: List[Dict[str, Any]],
+    response_format: Optional[Union[Type[T], Dict[str, Any]]] = None,
+    temperature: float = 0.1,
+    top_p: float = 1.0,
+    frequency_penalty: float = 0.0,
+    presence_penalty: float = 0.0,
+    max_tokens: int = 2048,
+    json_mode: bool = True,
+    fallback_model: str = GPT5_MODEL,
+    enable_chunking: bool = True,
+    operation: str = "unspecified_operation",
+    request_metadata: Optional[Dict[str, Any]] = None,
+    cache: Optional[ResponseCache] = None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+) -> Any:
+    """
+    Async version of call_openai_with_fallback for an AsyncOpenAI client.
+
+    Retries, model fallback, output-length retries and chunking behave exactly
+    as in the blocking helper. Pass one semaphore to every call that should
+    share a concurrency limit; it is held only while a request is in flight.
+    """
+    call_kwargs = _openai_call_kwargs(
+        model,
+        messages,
+        response_format,
+        temperature,
+        top_p,
+        frequency_penalty,
+        presence_penalty,
+        max_tokens,
+        json_mode,
+        fallback_model,
+        operation,
+        request_metadata,
+    )
+    cache_key, cached = _prepare_openai_call(cache, call_kwargs, enable_chunking)
+    if cached is not None:
+        return cached
+
+    response = await arun_steps(
+        _fallback_call_steps(call_kwargs, enable_chunking),
+        lambda params: client.beta.chat.completions.parse(**params),
+        semaphore=semaphore,
     )
 
+    if cache is not None:
+        return cache.store(cache_key, response)
+    return response
 
-def _call_openai_single(
-    client: openai.OpenAI,
+
+def _single_call_steps(
     model: str,
     messages: List[Dict[str, Any]],
     response_format: Optional[Union[Type[T], Dict[str, Any]]] = None,
@@ -826,7 +997,7 @@ def _call_openai_single(
     fallback_model: str = GPT5_MODEL,
     operation: str = "unspecified_operation",
     request_metadata: Optional[Dict[str, Any]] = None,
-) -> Any:
+) -> Steps:
     """
     Make a single API call with fallback support.
 
@@ -854,12 +1025,13 @@ def _call_openai_single(
                 "request_metadata": request_metadata or {},
             },
         )
-        response = _parse_with_retry(client, params, model, operation)
+        response = yield from _parse_steps(params, model, operation)
         logger.info(
             "OpenAI API call succeeded",
             extra={
                 "operation": operation,
                 "model": model,
+                **_usage_log_fields(response),
             },
         )
         return response
@@ -914,20 +1086,21 @@ def _call_openai_single(
                             "token_limit": fallback_token_limit,
                         },
                     )
-                    return _call_openai_with_chunking(
-                        client=client,
-                        model=fallback_model,
-                        messages=messages,
-                        response_format=response_format,
-                        temperature=temperature,
-                        top_p=top_p,
-                        frequency_penalty=frequency_penalty,
-                        presence_penalty=presence_penalty,
-                        max_tokens=max_tokens,
-                        json_mode=json_mode,
-                        fallback_model=fallback_model,  # No further fallback
-                        operation=operation,
-                        request_metadata=request_metadata,
+                    return (
+                        yield from _chunked_call_steps(
+                            model=fallback_model,
+                            messages=messages,
+                            response_format=response_format,
+                            temperature=temperature,
+                            top_p=top_p,
+                            frequency_penalty=frequency_penalty,
+                            presence_penalty=presence_penalty,
+                            max_tokens=max_tokens,
+                            json_mode=json_mode,
+                            fallback_model=fallback_model,  # No further fallback
+                            operation=operation,
+                            request_metadata=request_metadata,
+                        )
                     )
 
                 # Prepare parameters for the fallback model
@@ -944,14 +1117,15 @@ def _call_openai_single(
                 )
 
                 try:
-                    response = _parse_with_retry(
-                        client, fallback_params, fallback_model, operation
+                    response = yield from _parse_steps(
+                        fallback_params, fallback_model, operation
                     )
                     logger.info(
                         "Fallback model call succeeded",
                         extra={
                             "operation": operation,
                             "model": fallback_model,
+                            **_usage_log_fields(response),
                             "reason": "context_length",
                         },
                     )
@@ -980,20 +1154,21 @@ def _call_openai_single(
                                 **fallback_api_context_details,
                             },
                         )
-                        return _call_openai_with_chunking(
-                            client=client,
-                            model=fallback_model,
-                            messages=messages,
-                            response_format=response_format,
-                            temperature=temperature,
-                            top_p=top_p,
-                            frequency_penalty=frequency_penalty,
-                            presence_penalty=presence_penalty,
-                            max_tokens=max_tokens,
-                            json_mode=json_mode,
-                            fallback_model=fallback_model,
-                            operation=operation,
-                            request_metadata=request_metadata,
+                        return (
+                            yield from _chunked_call_steps(
+                                model=fallback_model,
+                                messages=messages,
+                                response_format=response_format,
+                                temperature=temperature,
+                                top_p=top_p,
+                                frequency_penalty=frequency_penalty,
+                                presence_penalty=presence_penalty,
+                                max_tokens=max_tokens,
+                                json_mode=json_mode,
+                                fallback_model=fallback_model,
+                                operation=operation,
+                                request_metadata=request_metadata,
+                            )
                         )
                     logger.error(
                         "Fallback model failed",
@@ -1021,20 +1196,21 @@ def _call_openai_single(
                         "local_model_token_limit": get_token_limit(fallback_model),
                     },
                 )
-                return _call_openai_with_chunking(
-                    client=client,
-                    model=fallback_model,
-                    messages=messages,
-                    response_format=response_format,
-                    temperature=temperature,
-                    top_p=top_p,
-                    frequency_penalty=frequency_penalty,
-                    presence_penalty=presence_penalty,
-                    max_tokens=max_tokens,
-                    json_mode=json_mode,
-                    fallback_model=fallback_model,
-                    operation=operation,
-                    request_metadata=request_metadata,
+                return (
+                    yield from _chunked_call_steps(
+                        model=fallback_model,
+                        messages=messages,
+                        response_format=response_format,
+                        temperature=temperature,
+                        top_p=top_p,
+                        frequency_penalty=frequency_penalty,
+                        presence_penalty=presence_penalty,
+                        max_tokens=max_tokens,
+                        json_mode=json_mode,
+                        fallback_model=fallback_model,
+                        operation=operation,
+                        request_metadata=request_metadata,
+                    )
                 )
         elif is_safety_block_error(e) and model != fallback_model:
             # Safety/content-policy block — retry with fallback model (e.g. gpt-4o)
@@ -1058,14 +1234,15 @@ def _call_openai_single(
                 max_tokens=max_tokens,
                 json_mode=json_mode,
             )
-            response = _parse_with_retry(
-                client, fallback_params, fallback_model, operation
+            response = yield from _parse_steps(
+                fallback_params, fallback_model, operation
             )
             logger.info(
                 "Fallback model call succeeded",
                 extra={
                     "operation": operation,
                     "model": fallback_model,
+                    **_usage_log_fields(response),
                     "reason": "safety_block",
                 },
             )
@@ -1099,14 +1276,15 @@ def _call_openai_single(
                         json_mode=json_mode,
                     )
                     try:
-                        response = _parse_with_retry(
-                            client, retry_params, model, operation
+                        response = yield from _parse_steps(
+                            retry_params, model, operation
                         )
                         logger.info(
                             "OpenAI call succeeded after max_tokens increase",
                             extra={
                                 "operation": operation,
                                 "model": model,
+                                **_usage_log_fields(response),
                                 "reason": "output_length_limit",
                                 "max_tokens_after": retry_max_tokens,
                             },
@@ -1162,8 +1340,7 @@ def _call_openai_single(
         raise e
 
 
-def _call_openai_with_chunking(
-    client: openai.OpenAI,
+def _chunked_call_steps(
     model: str,
     messages: List[Dict[str, Any]],
     response_format: Optional[Union[Type[T], Dict[str, Any]]] = None,
@@ -1176,7 +1353,7 @@ def _call_openai_with_chunking(
     fallback_model: str = GPT5_MODEL,
     operation: str = "unspecified_operation",
     request_metadata: Optional[Dict[str, Any]] = None,
-) -> Any:
+) -> Steps:
     """
     Make multiple API calls by chunking large messages and merge the responses.
 
@@ -1205,20 +1382,21 @@ def _call_openai_with_chunking(
         logger.warning(
             "Chunking did not split messages. Attempting single call anyway."
         )
-        return _call_openai_single(
-            client=client,
-            model=model,
-            messages=messages,
-            response_format=response_format,
-            temperature=temperature,
-            top_p=top_p,
-            frequency_penalty=frequency_penalty,
-            presence_penalty=presence_penalty,
-            max_tokens=max_tokens,
-            json_mode=json_mode,
-            fallback_model=fallback_model,
-            operation=operation,
-            request_metadata=request_metadata,
+        return (
+            yield from _single_call_steps(
+                model=model,
+                messages=messages,
+                response_format=response_format,
+                temperature=temperature,
+                top_p=top_p,
+                frequency_penalty=frequency_penalty,
+                presence_penalty=presence_penalty,
+                max_tokens=max_tokens,
+                json_mode=json_mode,
+                fallback_model=fallback_model,
+                operation=operation,
+                request_metadata=request_metadata,
+            )
         )
 
     logger.info(f"Processing {len(chunked_message_lists)} chunks...")
@@ -1233,8 +1411,7 @@ def _call_openai_with_chunking(
         logger.info(f"Chunk {i+1} token count: {chunk_tokens}/{token_limit}")
 
         try:
-            response = _call_openai_single(
-                client=client,
+            response = yield from _single_call_steps(
                 model=model,
                 messages=chunk_messages,
                 response_format=response_format,
@@ -1,14 +1,64 @@
 """Prompt handling utilities for pipeline components."""
 
 import logging
+from dataclasses import dataclass, field
 from string import Template
-from typing import Dict
+from typing import Any, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 SUPPORTED_PROVIDERS = ["openai", "anthropic"]
 
 
+@dataclass
+class PromptLayout:
+    """
+    A step's prompts with its shared context moved ahead of the varying text.
+
+    ``shared`` holds ``(title, text)`` blocks that many requests of a step
+    repeat verbatim, such as the figure legends. They open the user message,
+    right after the system prompt, so those requests share the longest
+    possible prefix for the providers' prompt caches. ``user`` is the rest of
+    the user prompt, with each shared block replaced by a reference to it.
+    """
+
+    system: str
+    user: str
+    shared: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def shared_text(self) -> str:
+        """The shared blocks, titled, in order."""
+        return "\n\n".join(f"{title}:\n\n{text}" for title, text in self.shared)
+
+    def messages(
+        self, cache_control: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Return OpenAI-format system and user messages.
+
+        The user message is one string unless ``cache_control`` is given; then
+        the shared blocks are a separate text part carrying it, which marks the
+        end of a cacheable prefix for Anthropic.
+        """
+        user_content: Any = "\n\n".join(
+            part for part in (self.shared_text, self.user) if part
+        )
+        if cache_control is not None and self.shared:
+            user_content = [
+                {
+                    "type": "text",
+                    "text": self.shared_text,
+                    "cache_control": cache_control,
+                },
+                {"type": "text", "text": self.user},
+            ]
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": user_content},
+        ]
+
+
 class PromptHandler:
     """
     Handle prompt loading and template substitution for pipeline components.
@@ -77,6 +127,38 @@ class PromptHandler:
             "user": Template(user_str).safe_substitute(variables),
         }
 
+    def get_prompt_layout(
+        self, step: str, variables: Dict, shared: Dict[str, str]
+    ) -> PromptLayout:
+        """
+        Retrieve a step's prompts with shared variables laid out first.
+
+        Args:
+            step (str): Pipeline step name (e.g., "extract_caption_title").
+            variables (Dict): Template variables to substitute.
+            shared (Dict[str, str]): Names of the variables repeated across the
+                step's requests, mapped to the title of their block (e.g.
+                ``{"figure_captions": "Figure legends"}``).
+
+        Returns:
+            PromptLayout: The system prompt, the shared blocks and the user
+            prompt, which refers to the blocks instead of repeating them.
+        """
+        references = {
+            name: f'(see "{title}" at the start of this message)'
+            for name, title in shared.items()
+        }
+        prompts = self.get_prompt(step, {**variables, **references})
+        return PromptLayout(
+            system=prompts["system"],
+            user=prompts["user"],
+            shared=[
+                (title, str(variables[name]))
+                for name, title in shared.items()
+                if name in variables
+            ],
+        )
+
     def validate_prompts(self) -> None:
         """
         Validate that all required prompts are present and well-formed.
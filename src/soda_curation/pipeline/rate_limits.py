@@ -0,0 +1,387 @@
+"""Client-side request and token rate limits for the provider APIs.
+
+Retries only react to 429 responses after the fact. Once figures and
+manuscripts are processed in parallel, every worker would hit the limit at
+once and back off together. Instead, each provider/model pair gets a token
+bucket for requests per minute and one for tokens per minute. A request
+reserves one request and its estimated tokens (prompt plus ``max_tokens``)
+before it is sent and waits out any deficit; the estimate is corrected with
+the reported usage once the response arrives.
+
+Limits come from the optional top-level ``rate_limits`` section::
+
+    default:
+      rate_limits:
+        path: data/cache/rate_limits.sqlite  # share the buckets across processes
+        utilization: 0.9                     # share of reported limits to use
+        openai:
+          gpt-4o:
+            requests_per_minute: 500
+            tokens_per_minute: 30000
+        anthropic:
+          claude-sonnet-4-6:
+            tokens_per_minute: 40000
+
+Models without configured limits learn them from the ``x-ratelimit-*`` and
+``anthropic-ratelimit-*`` response headers, seen by the shared HTTP clients.
+Requests name their model in ``MODEL_HEADER`` for that purpose. The buckets
+never hold more than the reported remaining capacity. Without a ``path`` the
+buckets live in memory and are shared by the threads of one process.
+``enabled: false`` turns the limiter off.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from .request_steps import Backoff, Steps
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_UTILIZATION = 0.9
+
+# Header names of the limit and remaining counts, by bucket, per provider
+_LIMIT_HEADERS = {
+    "openai": {
+        "requests": ("x-ratelimit-limit-requests", "x-ratelimit-remaining-requests"),
+        "tokens": ("x-ratelimit-limit-tokens", "x-ratelimit-remaining-tokens"),
+    },
+    "anthropic": {
+        "requests": (
+            "anthropic-ratelimit-requests-limit",
+            "anthropic-ratelimit-requests-remaining",
+        ),
+        "tokens": (
+            "anthropic-ratelimit-tokens-limit",
+            "anthropic-ratelimit-tokens-remaining",
+        ),
+    },
+}
+BUCKETS = ("requests", "tokens")
+
+# Names the model of a request for the shared HTTP clients, which move it into
+# the request's extensions before it is sent
+MODEL_HEADER = "x-soda-rate-limit-model"
+
+
+@dataclass(frozen=True)
+class ModelLimits:
+    """Configured per-minute limits of one provider model; None is unlimited."""
+
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+
+    def get(self, bucket: str) -> Optional[float]:
+        if bucket == "requests":
+            return self.requests_per_minute
+        return self.tokens_per_minute
+
+
+def _new_state(now: float) -> Dict[str, Any]:
+    return {
+        "requests": None,
+        "tokens": None,
+        "learned_requests": None,
+        "learned_tokens": None,
+        "updated": now,
+    }
+
+
+class RateLimiter:
+    """
+    Token buckets per provider and model, refilled continuously.
+
+    Reservations may take a bucket below zero: the caller then waits until
+    the refill has paid the deficit back, so concurrent callers queue up in
+    reservation order instead of retrying in a burst. The bucket state is kept
+    in memory, or in SQLite when a path is given so that several processes
+    draw from the same buckets.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[Tuple[str, str], ModelLimits]] = None,
+        path: Optional[str] = None,
+        utilization: float = DEFAULT_UTILIZATION,
+    ):
+        if not 0 < utilization <= 1:
+            raise ValueError(f"utilization must be in (0, 1], got {utilization}")
+        self.limits = limits or {}
+        self.path = str(path) if path else None
+        self.utilization = utilization
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if self.path:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            with closing(self._connect()) as conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS buckets (
+                        key TEXT PRIMARY KEY,
+                        requests REAL,
+                        tokens REAL,
+                        learned_requests REAL,
+                        learned_tokens REAL,
+                        updated REAL NOT NULL
+                    )
+                    """
+                )
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["RateLimiter"]:
+        """Build the limiter from ``rate_limits``; None if it is disabled."""
+        settings = config.get("rate_limits") or {}
+        if not settings.get("enabled", True):
+            return None
+        limits = {}
+        for provider in _LIMIT_HEADERS:
+            for model, model_limits in (settings.get(provider) or {}).items():
+                limits[(provider, model)] = ModelLimits(
+                    requests_per_minute=model_limits.get("requests_per_minute"),
+                    tokens_per_minute=model_limits.get("tokens_per_minute"),
+                )
+        return cls(
+            limits=limits,
+            path=settings.get("path"),
+            utilization=float(settings.get("utilization", DEFAULT_UTILIZATION)),
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def _configured(self, provider: str, model: str) -> ModelLimits:
+        # Exact match first, then prefix match for versioned model IDs
+        configured = self.limits.get((provider, model))
+        if configured is None:
+            for (owner, name), model_limits in self.limits.items():
+                if owner == provider and model.startswith(name):
+                    return model_limits
+        return configured or ModelLimits()
+
+    def _capacity(
+        self, configured: ModelLimits, state: Dict[str, Any], bucket: str
+    ) -> Optional[float]:
+        """Per-minute capacity of a bucket: configured, else learned, limit."""
+        capacity = configured.get(bucket)
+        if capacity is None and state[f"learned_{bucket}"]:
+            capacity = state[f"learned_{bucket}"] * self.utilization
+        return capacity
+
+    def _update(self, provider: str, model: str, change: Callable) -> Any:
+        """Apply ``change(state, now)`` to a bucket state atomically."""
+        key = f"{provider}:{model}"
+        now = time.time()
+        if not self.path:
+            with self._lock:
+                state = self._states.setdefault(key, _new_state(now))
+                return change(state, now)
+
+        with closing(self._connect()) as conn:
+            # Hold the write lock from the read to the write-back
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT requests, tokens, learned_requests, learned_tokens, updated "
+                "FROM buckets WHERE key = ?",
+                (key,),
+            ).fetchone()
+            state = _new_state(now)
+            if row is not None:
+                state.update(zip(list(state), row))
+            result = change(state, now)
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (key, requests, tokens, "
+                "learned_requests, learned_tokens, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    state["requests"],
+                    state["tokens"],
+                    state["learned_requests"],
+                    state["learned_tokens"],
+                    state["updated"],
+                ),
+            )
+            conn.execute("COMMIT")
+            return result
+
+    def _refill(
+        self, configured: ModelLimits, state: Dict[str, Any], now: float
+    ) -> None:
+        elapsed = max(now - state["updated"], 0.0)
+        for bucket in BUCKETS:
+            capacity = self._capacity(configured, state, bucket)
+            if capacity is None:
+                state[bucket] = None
+            elif state[bucket] is None:
+                state[bucket] = capacity
+            else:
+                state[bucket] = min(capacity, state[bucket] + elapsed * capacity / 60)
+        state["updated"] = now
+
+    def limits_tokens(self, provider: str, model: str) -> bool:
+        """Whether requests to a model are limited by tokens per minute."""
+        configured = self._configured(provider, model)
+        if configured.tokens_per_minute is not None:
+            return True
+        return self._update(
+            provider, model, lambda state, now: bool(state["learned_tokens"])
+        )
+
+    def reserve(self, provider: str, model: str, tokens: int = 0) -> float:
+        """Reserve one request and ``tokens``; return the seconds to wait."""
+        configured = self._configured(provider, model)
+
+        def change(state: Dict[str, Any], now: float) -> float:
+            self._refill(configured, state, now)
+            wait = 0.0
+            for bucket, cost in (("requests", 1), ("tokens", tokens)):
+                if state[bucket] is None:
+                    continue
+                state[bucket] -= cost
+                if state[bucket] < 0:
+                    capacity = self._capacity(configured, state, bucket)
+                    wait = max(wait, -state[bucket] * 60 / capacity)
+            return wait
+
+        return self._update(provider, model, change)
+
+    def settle(self, provider: str, model: str, reserved: int, used: int) -> None:
+        """Return the reserved tokens a request did not use (or charge extra)."""
+        if reserved == used:
+            return
+        configured = self._configured(provider, model)
+
+        def change(state: Dict[str, Any], now: float) -> None:
+            self._refill(configured, state, now)
+            if state["tokens"] is not None:
+                capacity = self._capacity(configured, state, "tokens")
+                state["tokens"] = min(capacity, state["tokens"] + reserved - used)
+
+        self._update(provider, model, change)
+
+    def observe_headers(
+        self, provider: str, model: str, headers: Mapping[str, str]
+    ) -> None:
+        """Learn limits and remaining capacity from rate-limit response headers."""
+        reported = {}
+        for bucket, names in _LIMIT_HEADERS.get(provider, {}).items():
+            values = [_header_number(headers, name) for name in names]
+            if values[0] is not None:
+                reported[bucket] = values
+        if not reported:
+            return
+        configured = self._configured(provider, model)
+
+        def change(state: Dict[str, Any], now: float) -> None:
+            for bucket, (limit, _) in reported.items():
+                state[f"learned_{bucket}"] = limit
+            self._refill(configured, state, now)
+            for bucket, (_, remaining) in reported.items():
+                if remaining is not None and state[bucket] is not None:
+                    # The provider's count includes other clients of the account
+                    state[bucket] = min(state[bucket], remaining)
+
+        self._update(provider, model, change)
+
+
+def _header_number(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    try:
+        return float(value) if isinstance(value, str) else None
+    except ValueError:
+        return None
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Return the wait a provider asked for on a rate-limit error, if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not isinstance(headers, Mapping):
+        return None
+    retry_after_ms = _header_number(headers, "retry-after-ms")
+    if retry_after_ms is not None:
+        return retry_after_ms / 1000
+    return _header_number(headers, "retry-after")
+
+
+def response_tokens(response: Any) -> Optional[int]:
+    """Prompt plus completion tokens reported by a raw provider response."""
+    usage = getattr(response, "usage", None)
+    counts = [
+        getattr(usage, name, None)
+        for name in ("prompt_tokens", "completion_tokens")
+        if isinstance(getattr(usage, name, None), int)
+    ] or [
+        getattr(usage, name, None)
+        for name in ("input_tokens", "output_tokens")
+        if isinstance(getattr(usage, name, None), int)
+    ]
+    return sum(counts) if counts else None
+
+
+_limiter: Optional[RateLimiter] = RateLimiter()
+
+
+def configure_rate_limits(config: Dict[str, Any]) -> Optional[RateLimiter]:
+    """Replace the process-wide limiter with one built from ``config``."""
+    global _limiter
+    _limiter = RateLimiter.from_config(config)
+    return _limiter
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Return the process-wide limiter, None if rate limiting is disabled."""
+    return _limiter
+
+
+def rate_limit_steps(
+    provider: str,
+    model: str,
+    estimate_tokens: Callable[[], int],
+    operation: str,
+) -> Steps:
+    """
+    Reserve capacity for one request, waiting out any deficit.
+
+    ``estimate_tokens`` is only called for models limited by tokens. Returns
+    the tokens reserved, to be settled once the request has completed.
+    """
+    limiter = get_rate_limiter()
+    if limiter is None:
+        return 0
+    tokens = estimate_tokens() if limiter.limits_tokens(provider, model) else 0
+    wait_seconds = limiter.reserve(provider, model, tokens)
+    if wait_seconds > 0:
+        logger.info(
+            "Waiting for rate limit capacity",
+            extra={
+                "operation": operation,
+                "provider": provider,
+                "model": model,
+                "estimated_tokens": tokens,
+                "wait_s": round(wait_seconds, 3),
+            },
+        )
+        yield Backoff(wait_seconds)
+    return tokens
+
+
+def with_model_header(params: Dict[str, Any], model: str) -> Dict[str, Any]:
+    """Return SDK call parameters that name the model to the response hook."""
+    headers = {**(params.get("extra_headers") or {}), MODEL_HEADER: model}
+    return {**params, "extra_headers": headers}
+
+
+def settle_rate_limit(
+    provider: str, model: str, reserved: int, response: Any = None
+) -> None:
+    """Correct a reservation with a response's usage; refund it on failure."""
+    limiter = get_rate_limiter()
+    if limiter is None or not reserved:
+        return
+    used = response_tokens(response) if response is not None else 0
+    limiter.settle(provider, model, reserved, reserved if used is None else used)
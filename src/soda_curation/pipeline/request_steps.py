@@ -0,0 +1,84 @@
+"""Drive provider call logic from both blocking and asyncio code.
+
+The retry, fallback-model, output-length and chunking logic of the OpenAI and
+Anthropic helpers is written once, as generators that yield what they need
+next: an ``ApiRequest`` to send, or a ``Backoff`` to wait out. The result of a
+request (or the exception it raised) is sent back into the generator.
+``run_steps`` performs the requests with a blocking client and ``time.sleep``;
+``arun_steps`` performs them with an async client and ``asyncio.sleep``, holding
+an optional shared semaphore only while a request is in flight.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Generator, Optional, Union
+
+
+@dataclass
+class ApiRequest:
+    """A provider API call with its keyword arguments."""
+
+    params: Dict[str, Any]
+
+
+@dataclass
+class Backoff:
+    """A pause before retrying a transient failure."""
+
+    seconds: float
+
+
+Step = Union[ApiRequest, Backoff]
+Steps = Generator[Step, Any, Any]
+
+
+def run_steps(steps: Steps, send: Callable[[Dict[str, Any]], Any]) -> Any:
+    """Run call steps with a blocking ``send(params)`` and return their result."""
+    try:
+        step = next(steps)
+        while True:
+            if isinstance(step, Backoff):
+                time.sleep(step.seconds)
+                step = steps.send(None)
+                continue
+            try:
+                result = send(step.params)
+            except Exception as error:
+                step = steps.throw(error)
+            else:
+                step = steps.send(result)
+    except StopIteration as stop:
+        return stop.value
+
+
+async def arun_steps(
+    steps: Steps,
+    send: Callable[[Dict[str, Any]], Awaitable[Any]],
+    semaphore: Optional[asyncio.Semaphore] = None,
+) -> Any:
+    """
+    Run call steps with an awaitable ``send(params)`` and return their result.
+
+    When a semaphore is given it bounds the number of requests in flight across
+    every caller sharing it; backoff waits do not hold it.
+    """
+    try:
+        step = next(steps)
+        while True:
+            if isinstance(step, Backoff):
+                await asyncio.sleep(step.seconds)
+                step = steps.send(None)
+                continue
+            try:
+                if semaphore is None:
+                    result = await send(step.params)
+                else:
+                    async with semaphore:
+                        result = await send(step.params)
+            except Exception as error:
+                step = steps.throw(error)
+            else:
+                step = steps.send(result)
+    except StopIteration as stop:
+        return stop.value
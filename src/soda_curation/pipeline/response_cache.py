@@ -0,0 +1,334 @@
+"""Content-addressed on-disk cache for OpenAI and Anthropic responses.
+
+Re-running a manuscript after a configuration change, or running the same
+benchmark grid twice, sends byte-identical requests to the providers. With the
+cache enabled for a step, the response to a request is stored in a SQLite file
+under a key derived from the provider, model, messages, sampling parameters and
+response schema, and replayed on the next identical request.
+
+Caching is opt-in per step and provider::
+
+    default:
+      pipeline:
+        extract_sections:
+          openai:
+            model: gpt-4o
+            cache: true
+      response_cache:
+        path: data/cache/llm_responses.sqlite
+        max_size_mb: 512
+        ttl_hours: 720
+
+Replayed responses report zero tokens, so update_token_usage records them as
+cache hits at no cost.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .cost_tracking import prompt_cache_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = "data/cache/llm_responses.sqlite"
+DEFAULT_MAX_SIZE_MB = 512
+DEFAULT_TTL_HOURS = 24 * 30
+
+CACHE_HIT = "hit"
+CACHE_MISS = "miss"
+
+
+class CachedUsage:
+    """Usage with both OpenAI and Anthropic attribute names."""
+
+    def __init__(
+        self,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0,
+    ):
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.total_tokens = prompt_tokens + completion_tokens
+        self.input_tokens = prompt_tokens
+        self.output_tokens = completion_tokens
+        self.cache_read_tokens = cache_read_tokens
+        self.cache_write_tokens = cache_write_tokens
+
+
+class CachedMessage:
+    """Message compatible with response.choices[0].message."""
+
+    def __init__(self, content: Optional[str], parsed: Any = None):
+        self.content = content
+        self.parsed = parsed
+
+
+class CachedChoice:
+    """Choice compatible with response.choices[0]."""
+
+    def __init__(self, message: CachedMessage):
+        self.message = message
+
+
+class CachedResponse:
+    """Provider-neutral response replayed from a cache record (usage is zero)."""
+
+    def __init__(
+        self,
+        content: Optional[str],
+        parsed: Any,
+        model: str,
+    ):
+        self.choices = [CachedChoice(CachedMessage(content=content, parsed=parsed))]
+        self.usage = CachedUsage()
+        self.model = model
+        self.cache_status = CACHE_HIT
+
+
+def _response_format_signature(response_format: Any) -> Any:
+    """Return a JSON-serializable description of a response format."""
+    if response_format is None or isinstance(response_format, dict):
+        return response_format
+    if hasattr(response_format, "model_json_schema"):
+        return {
+            "name": response_format.__name__,
+            "schema": response_format.model_json_schema(),
+        }
+    return repr(response_format)
+
+
+def make_cache_key(
+    provider: str,
+    model: str,
+    messages: List[Dict[str, Any]],
+    params: Dict[str, Any],
+    response_format: Any = None,
+) -> str:
+    """Return the SHA-256 key identifying a request."""
+    payload = {
+        "provider": provider,
+        "model": model,
+        "messages": messages,
+        "params": params,
+        "response_format": _response_format_signature(response_format),
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def response_to_record(response: Any) -> Dict[str, Any]:
+    """Extract the parts of a provider response that callers consume."""
+    message = response.choices[0].message
+    parsed = getattr(message, "parsed", None)
+    if hasattr(parsed, "model_dump"):
+        parsed = parsed.model_dump(mode="json")
+    usage = getattr(response, "usage", None)
+    cache_read_tokens, cache_write_tokens = prompt_cache_tokens(usage)
+    return {
+        "model": getattr(response, "model", None),
+        "content": message.content,
+        "parsed": parsed,
+        "usage": {
+            "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+            "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+            "cache_read_tokens": cache_read_tokens,
+            "cache_write_tokens": cache_write_tokens,
+        },
+    }
+
+
+def record_to_response(record: Dict[str, Any], response_format: Any) -> CachedResponse:
+    """Rebuild a replayed response from a cache record."""
+    parsed = record.get("parsed")
+    if parsed is not None and hasattr(response_format, "model_validate"):
+        parsed = response_format.model_validate(parsed)
+    return CachedResponse(
+        content=record.get("content"),
+        parsed=parsed,
+        model=record.get("model") or "",
+    )
+
+
+class ResponseCache:
+    """
+    SQLite-backed response cache with a TTL and size-bounded LRU eviction.
+
+    Every operation opens its own connection, so one instance can be shared by
+    threads and several processes can share one cache file.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        max_size_bytes: int = DEFAULT_MAX_SIZE_MB * 1024 * 1024,
+        ttl_seconds: float = DEFAULT_TTL_HOURS * 3600,
+    ):
+        self.path = str(path)
+        self.max_size_bytes = max_size_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_lru ON responses (accessed_at)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def _count(self, status: str) -> None:
+        with self._lock:
+            if status == CACHE_HIT:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored record for a key, or None if missing or expired."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+        return json.loads(row[0])
+
+    def set(self, key: str, record: Dict[str, Any]) -> None:
+        """Store a record, then drop expired entries and evict down to size."""
+        value = json.dumps(record, ensure_ascii=False)
+        size = len(value.encode("utf-8"))
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            conn.execute(
+                "DELETE FROM responses WHERE created_at < ?",
+                (now - self.ttl_seconds,),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        excess = total[0] - self.max_size_bytes
+        if excess <= 0:
+            return
+        evicted = []
+        for key, size in conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ).fetchall():
+            if excess <= 0:
+                break
+            evicted.append((key,))
+            excess -= size
+        conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        logger.info(
+            "Evicted least recently used cached responses",
+            extra={"operation": "response_cache.evict", "evicted": len(evicted)},
+        )
+
+    def lookup(self, key: str, response_format: Any = None) -> Optional[CachedResponse]:
+        """Return a replayed response for a key, counting the hit or miss."""
+        try:
+            record = self.get(key)
+            response = (
+                record_to_response(record, response_format)
+                if record is not None
+                else None
+            )
+        except Exception as e:
+            logger.warning(f"Response cache lookup failed: {str(e)}")
+            response = None
+        self._count(CACHE_HIT if response is not None else CACHE_MISS)
+        return response
+
+    def store(self, key: str, response: Any) -> Any:
+        """
+        Store a live response and return it tagged with ``cache_status``.
+
+        The caller keeps the provider's own response object, with its full
+        usage. If the response cannot be cached it is returned untagged.
+        """
+        try:
+            self.set(key, response_to_record(response))
+            response.cache_status = CACHE_MISS
+        except Exception as e:
+            logger.warning(f"Response cache store failed: {str(e)}")
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current cache size."""
+        with closing(self._connect()) as conn:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+
+_caches: Dict[str, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(
+    config: Dict[str, Any], step: str, provider: str
+) -> Optional[ResponseCache]:
+    """
+    Return the shared cache for a step if caching is enabled for it.
+
+    Caching is enabled with ``cache: true`` in the step's provider block; the
+    cache location and limits come from the top-level ``response_cache``
+    section. One instance is shared per cache file.
+    """
+    step_config = config.get("pipeline", {}).get(step, {}).get(provider, {})
+    if not step_config.get("cache", False):
+        return None
+
+    cache_config = config.get("response_cache", {})
+    path = str(cache_config.get("path", DEFAULT_CACHE_PATH))
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = ResponseCache(
+                path=path,
+                max_size_bytes=int(
+                    cache_config.get("max_size_mb", DEFAULT_MAX_SIZE_MB) * 1024 * 1024
+                ),
+                ttl_seconds=cache_config.get("ttl_hours", DEFAULT_TTL_HOURS) * 3600,
+            )
+        return _caches[path]
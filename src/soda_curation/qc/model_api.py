@@ -12,6 +12,7 @@ from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponen
 from ..pipeline.ai_observability import summarize_messages, summarize_text
 from ..pipeline.anthropic_utils import is_retryable_anthropic_error
 from ..pipeline.cost_tracking import update_token_usage
+from ..pipeline.image_payloads import ImageEncoding, image_url_content
 from ..pipeline.manuscript_structure.manuscript_structure import TokenUsage
 from ..pipeline.openai_utils import is_retryable_openai_error
 from .providers import build_qc_provider
@@ -69,6 +70,8 @@ class ModelAPI:
             clients=provider_clients,
         )
         self.token_usage = TokenUsage()
+        # OpenAI detail level of the figure images (``image_payloads.figure``)
+        self.figure_image_detail = ImageEncoding.from_config(config, "figure").detail
 
     @retry(
         stop=stop_after_attempt(3),
@@ -92,6 +95,9 @@ class ModelAPI:
         system_prompt = prompt_config.get("prompts", {}).get("system", "")
         user_prompt = prompt_config.get("prompts", {}).get("user", "")
 
+        # Per-figure additions go in a system message after the test's own
+        # instructions, which stay a stable, cacheable prefix across figures
+        system_messages = [{"role": "system", "content": system_prompt}]
         if expected_panels:
             panels_constraint = (
                 f"**CRITICAL PANEL LABEL CONSTRAINT**:\n"
@@ -105,7 +111,7 @@ class ModelAPI:
                 f"- Do NOT add modifiers to labels (e.g., 'C (plot)', 'C (right)').\n"
                 f"- Each `panel_label` in your response MUST be exactly one of: {expected_panels}\n"
             )
-            system_prompt = panels_constraint + "\n" + system_prompt
+            system_messages.append({"role": "system", "content": panels_constraint})
             user_prompt += "\n\n" + panels_constraint
 
         request_context = context or {}
@@ -122,17 +128,12 @@ class ModelAPI:
                 )
             user_prompt = user_prompt.replace("$figure_caption", caption)
             messages = [
-                {"role": "system", "content": system_prompt},
+                *system_messages,
                 {
                     "role": "user",
                     "content": [
                         {"type": "text", "text": user_prompt},
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/png;base64,{encoded_image}"
-                            },
-                        },
+                        image_url_content(encoded_image, self.figure_image_detail),
                     ],
                 },
             ]
@@ -153,7 +154,7 @@ class ModelAPI:
                 )
             user_prompt = user_prompt.replace("$manuscript_text", text_content)
             messages = [
-                {"role": "system", "content": system_prompt},
+                *system_messages,
                 {"role": "user", "content": user_prompt},
             ]
         else:
@@ -9,6 +9,7 @@ from typing import Any, Dict, Optional
 import anthropic
 
 from ...pipeline.anthropic_utils import call_anthropic
+from ...pipeline.http_clients import get_http_client
 from .base import BaseQCProvider, QCProviderRequest, QCProviderResponse
 
 logger = logging.getLogger(__name__)
@@ -26,7 +27,7 @@ class AnthropicQCProvider(BaseQCProvider):
             self.client = client
             return
         try:
-            self.client = anthropic.Anthropic()
+            self.client = anthropic.Anthropic(http_client=get_http_client("anthropic"))
         except Exception as exc:  # pragma: no cover - depends on runtime env
             self.client = None
             self._init_error = exc
@@ -48,6 +49,7 @@ class AnthropicQCProvider(BaseQCProvider):
             operation=request.operation,
             request_metadata=request.context,
             model_config=request.model_config if agentic_requested else None,
+            prompt_caching=request.prompt_config.get("prompt_caching", True),
         )
         message = response.choices[0].message
         parsed = getattr(message, "parsed", None)
@@ -66,6 +68,8 @@ class AnthropicQCProvider(BaseQCProvider):
             "prompt_tokens": int(getattr(response.usage, "prompt_tokens", 0)),
             "completion_tokens": int(getattr(response.usage, "completion_tokens", 0)),
             "total_tokens": int(getattr(response.usage, "total_tokens", 0)),
+            "cache_read_tokens": int(getattr(response.usage, "cache_read_tokens", 0)),
+            "cache_write_tokens": int(getattr(response.usage, "cache_write_tokens", 0)),
         }
         return QCProviderResponse(
             content=content,
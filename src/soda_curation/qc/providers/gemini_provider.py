@@ -6,6 +6,7 @@ import json
 import logging
 from typing import Any, Dict, List, Optional
 
+from ...pipeline.http_clients import get_http_client
 from .base import BaseQCProvider, QCProviderRequest, QCProviderResponse
 
 logger = logging.getLogger(__name__)
@@ -32,7 +33,14 @@ class GeminiQCProvider(BaseQCProvider):
                 "google-genai is not installed. Install with `poetry add google-genai`."
             )
         try:
-            self.client = genai.Client()
+            http_client = get_http_client("gemini")
+            self.client = genai.Client(
+                http_options=(
+                    genai.types.HttpOptions(httpx_client=http_client)
+                    if http_client is not None
+                    else None
+                )
+            )
         except Exception as exc:  # pragma: no cover - depends on runtime env
             self.client = None
             self._init_error = exc
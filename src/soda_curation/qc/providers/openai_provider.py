@@ -8,6 +8,8 @@ from typing import Any, Dict, List, Optional
 
 import openai
 
+from ...pipeline.cost_tracking import prompt_cache_tokens
+from ...pipeline.http_clients import get_http_client
 from ...pipeline.openai_utils import call_openai_with_fallback, validate_model_config
 from .base import BaseQCProvider, QCProviderRequest, QCProviderResponse
 
@@ -49,7 +51,7 @@ class OpenAIQCProvider(BaseQCProvider):
             self.client = client
             return
         try:
-            self.client = openai.OpenAI()
+            self.client = openai.OpenAI(http_client=get_http_client("openai"))
         except Exception as exc:  # pragma: no cover - depends on runtime env
             self.client = None
             self._init_error = exc
@@ -147,7 +149,12 @@ class OpenAIQCProvider(BaseQCProvider):
 def _normalize_usage(raw_usage: Any) -> Dict[str, int]:
     """Normalize provider usage objects to prompt/completion/total token fields."""
     if raw_usage is None:
-        return {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        return {
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_tokens": 0,
+            "cache_read_tokens": 0,
+        }
 
     prompt_tokens = getattr(raw_usage, "prompt_tokens", None)
     if prompt_tokens is None:
@@ -161,10 +168,18 @@ def _normalize_usage(raw_usage: Any) -> Dict[str, int]:
     if total_tokens is None:
         total_tokens = int(prompt_tokens) + int(completion_tokens)
 
+    # The Responses API reports cached prompt tokens under input_tokens_details
+    cache_read_tokens = prompt_cache_tokens(raw_usage)[0]
+    if not cache_read_tokens:
+        details = getattr(raw_usage, "input_tokens_details", None)
+        cached = getattr(details, "cached_tokens", 0)
+        cache_read_tokens = cached if isinstance(cached, int) else 0
+
     return {
         "prompt_tokens": int(prompt_tokens),
         "completion_tokens": int(completion_tokens),
         "total_tokens": int(total_tokens),
+        "cache_read_tokens": cache_read_tokens,
     }
 
 
@@ -0,0 +1,616 @@
+"""Long-running worker that processes queued manuscripts with warm resources.
+
+Starting the pipeline pays a fixed cost on every invocation: importing torch,
+ultralytics and the provider SDKs, loading the YOLO weights and fetching QC
+prompts and schemas. The worker pays it once and then processes jobs from a
+queue until stopped.
+
+Two queue backends are supported:
+
+* ``DirectoryJobQueue``: jobs are JSON files dropped in ``<queue>/pending``.
+  A job is claimed by atomically renaming it into ``processing`` and finished
+  by moving it to ``done`` or ``failed`` with the outcome added to the file.
+* ``SQLiteJobQueue``: jobs are rows in a SQLite database, claimed inside an
+  immediate transaction so several workers can share one queue file.
+
+Each claim carries a token. While a job runs, the worker refreshes its claim
+every ``worker.heartbeat_interval_s`` (default 60 seconds). A worker that dies
+mid-job stops refreshing it; when claiming, claims not refreshed within the
+claim timeout (``worker.claim_timeout_s``, default 600 seconds; null keeps
+them forever) are put back to pending. A worker only finishes a job whose
+claim still carries its token, so a requeued job is recorded by its new owner.
+
+A job is ``{"zip_path": ..., "output_path": ...}``; ``output_path`` is
+optional and defaults to ``<zip stem>.json`` next to the ZIP.
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+from uuid import uuid4
+
+from .config import ConfigurationLoader
+from .logging_config import setup_logging
+from .main import PipelineResources, StepFailure, load_pipeline_resources, run_pipeline
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL_S = 2.0
+DEFAULT_CLAIM_TIMEOUT_S = 600.0
+DEFAULT_HEARTBEAT_INTERVAL_S = 60.0
+
+
+@dataclass
+class Job:
+    """A manuscript queued for processing."""
+
+    job_id: str
+    zip_path: str
+    output_path: Optional[str] = None
+    # Identifies the claim; None for jobs that were not claimed from a queue
+    claim_token: Optional[str] = None
+
+    def resolved_output_path(self) -> str:
+        if self.output_path:
+            return self.output_path
+        zip_path = Path(self.zip_path)
+        return str(zip_path.with_name(f"{zip_path.stem}.json"))
+
+
+class JobQueue(ABC):
+    """Queue of manuscript jobs shared by one or more workers."""
+
+    @abstractmethod
+    def submit(self, zip_path: str, output_path: Optional[str] = None) -> str:
+        """Add a job and return its id."""
+
+    @abstractmethod
+    def claim(self, stale_after: Optional[float] = None) -> Optional[Job]:
+        """
+        Claim the oldest pending job, or return None if the queue is empty.
+
+        Claims not refreshed for ``stale_after`` seconds are first put back to
+        pending.
+        """
+
+    @abstractmethod
+    def heartbeat(self, job: Job) -> bool:
+        """Refresh a claim; return False if the job was requeued meanwhile."""
+
+    @abstractmethod
+    def complete(self, job: Job, result: Dict[str, Any]) -> None:
+        """Mark a claimed job as processed, if the claim is still held."""
+
+    @abstractmethod
+    def fail(self, job: Job, error: str) -> None:
+        """Mark a claimed job as failed, if the claim is still held."""
+
+
+def _log_lost_claim(job: Job, action: str) -> None:
+    logger.warning(
+        "Job claim was lost to another worker",
+        extra={"operation": f"worker.{action}", "job_id": job.job_id},
+    )
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class DirectoryJobQueue(JobQueue):
+    """Queue backed by JSON files moved between state directories."""
+
+    STATES = ("pending", "processing", "done", "failed")
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        for state in self.STATES:
+            (self.root / state).mkdir(parents=True, exist_ok=True)
+
+    def submit(self, zip_path: str, output_path: Optional[str] = None) -> str:
+        job_id = f"{time.time_ns()}-{uuid4().hex[:8]}"
+        payload = {
+            "zip_path": str(zip_path),
+            "output_path": output_path,
+            "submitted_at": _utc_now(),
+        }
+        self._write(self.root / "pending" / f"{job_id}.json", payload)
+        return job_id
+
+    @staticmethod
+    def _write(path: Path, payload: Dict[str, Any]) -> None:
+        # Write under a temporary name so workers never read a partial file.
+        tmp_path = path.with_name(f".{path.stem}.tmp")
+        tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def _claimed_payload(self, job: Job) -> Optional[Dict[str, Any]]:
+        """Return a job's file while it still carries the job's claim token."""
+        path = self.root / "processing" / f"{job.job_id}.json"
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if payload.get("claim_token") != job.claim_token:
+            return None
+        return payload
+
+    def _requeue_stale(self, stale_after: float) -> None:
+        cutoff = time.time() - stale_after
+        for path in (self.root / "processing").glob("*.json"):
+            try:
+                if path.stat().st_mtime >= cutoff:
+                    continue
+                path.rename(self.root / "pending" / path.name)
+            except FileNotFoundError:
+                continue
+            logger.warning(
+                "Requeued stale job claim",
+                extra={"operation": "worker.requeue", "job_id": path.stem},
+            )
+
+    def claim(self, stale_after: Optional[float] = None) -> Optional[Job]:
+        if stale_after is not None:
+            self._requeue_stale(stale_after)
+        for path in sorted((self.root / "pending").glob("*.json")):
+            target = self.root / "processing" / path.name
+            try:
+                # rename is atomic; losing the race to another worker raises
+                path.rename(target)
+                # rename keeps the submission mtime; stamp the claim time
+                os.utime(target)
+            except FileNotFoundError:
+                continue
+            try:
+                payload = json.loads(target.read_text(encoding="utf-8"))
+                job = Job(
+                    job_id=path.stem,
+                    zip_path=payload["zip_path"],
+                    output_path=payload.get("output_path"),
+                    claim_token=uuid4().hex,
+                )
+            except (json.JSONDecodeError, KeyError) as e:
+                logger.error(f"Invalid job file {path.name}: {str(e)}")
+                target.rename(self.root / "failed" / path.name)
+                continue
+            payload["claim_token"] = job.claim_token
+            self._write(target, payload)
+            return job
+        return None
+
+    def heartbeat(self, job: Job) -> bool:
+        if self._claimed_payload(job) is None:
+            return False
+        os.utime(self.root / "processing" / f"{job.job_id}.json")
+        return True
+
+    def _finish(self, job: Job, state: str, outcome: Dict[str, Any]) -> None:
+        source = self.root / "processing" / f"{job.job_id}.json"
+        payload = self._claimed_payload(job)
+        if payload is None:
+            _log_lost_claim(job, state)
+            return
+        del payload["claim_token"]
+        payload.update(outcome)
+        payload["finished_at"] = _utc_now()
+        (self.root / state / f"{job.job_id}.json").write_text(
+            json.dumps(payload, indent=2), encoding="utf-8"
+        )
+        source.unlink(missing_ok=True)
+
+    def complete(self, job: Job, result: Dict[str, Any]) -> None:
+        self._finish(job, "done", result)
+
+    def fail(self, job: Job, error: str) -> None:
+        self._finish(job, "failed", {"error": error})
+
+
+class SQLiteJobQueue(JobQueue):
+    """Queue backed by a SQLite table; safe to share between processes."""
+
+    def __init__(self, db_path: str):
+        self.db_path = str(db_path)
+        with closing(self._connect()) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    zip_path TEXT NOT NULL,
+                    output_path TEXT,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    submitted_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT,
+                    result TEXT,
+                    error TEXT,
+                    claim_token TEXT,
+                    claimed_at TEXT
+                )
+                """
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            # Queue files created before claims carried a token
+            for column in ("claim_token", "claimed_at"):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} TEXT")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, submitted_at)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    def submit(self, zip_path: str, output_path: Optional[str] = None) -> str:
+        job_id = uuid4().hex
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO jobs (job_id, zip_path, output_path, submitted_at) "
+                "VALUES (?, ?, ?, ?)",
+                (job_id, str(zip_path), output_path, _utc_now()),
+            )
+        return job_id
+
+    def claim(self, stale_after: Optional[float] = None) -> Optional[Job]:
+        conn = self._connect()
+        try:
+            # BEGIN IMMEDIATE takes the write lock so two workers cannot
+            # select the same pending row.
+            conn.execute("BEGIN IMMEDIATE")
+            if stale_after is not None:
+                cutoff = datetime.now(timezone.utc) - timedelta(seconds=stale_after)
+                requeued = conn.execute(
+                    "UPDATE jobs SET status = 'pending', started_at = NULL, "
+                    "claim_token = NULL, claimed_at = NULL "
+                    "WHERE status = 'processing' "
+                    "AND COALESCE(claimed_at, started_at) < ?",
+                    (cutoff.isoformat(),),
+                ).rowcount
+                if requeued:
+                    logger.warning(
+                        "Requeued stale job claims",
+                        extra={"operation": "worker.requeue", "requeued": requeued},
+                    )
+            row = conn.execute(
+                "SELECT job_id, zip_path, output_path FROM jobs "
+                "WHERE status = 'pending' ORDER BY submitted_at, rowid LIMIT 1"
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            job = Job(
+                job_id=row[0],
+                zip_path=row[1],
+                output_path=row[2],
+                claim_token=uuid4().hex,
+            )
+            now = _utc_now()
+            conn.execute(
+                "UPDATE jobs SET status = 'processing', started_at = ?, "
+                "claim_token = ?, claimed_at = ? WHERE job_id = ?",
+                (now, job.claim_token, now, job.job_id),
+            )
+            conn.execute("COMMIT")
+            return job
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _update_claimed(self, job: Job, assignments: str, values: tuple) -> bool:
+        """Update a job while it is still claimed with the job's token."""
+        with closing(self._connect()) as conn:
+            return (
+                conn.execute(
+                    f"UPDATE jobs SET {assignments} WHERE job_id = ? "
+                    "AND status = 'processing' AND claim_token IS ?",
+                    (*values, job.job_id, job.claim_token),
+                ).rowcount
+                == 1
+            )
+
+    def heartbeat(self, job: Job) -> bool:
+        return self._update_claimed(job, "claimed_at = ?", (_utc_now(),))
+
+    def complete(self, job: Job, result: Dict[str, Any]) -> None:
+        if not self._update_claimed(
+            job,
+            "status = 'done', finished_at = ?, result = ?",
+            (_utc_now(), json.dumps(result)),
+        ):
+            _log_lost_claim(job, "done")
+
+    def fail(self, job: Job, error: str) -> None:
+        if not self._update_claimed(
+            job, "status = 'failed', finished_at = ?, error = ?", (_utc_now(), error)
+        ):
+            _log_lost_claim(job, "failed")
+
+
+def warm_qc_prompt_registry() -> int:
+    """
+    Pre-fetch QC prompts and build their response models.
+
+    Failures are logged and ignored; the registry falls back to fetching on
+    first use exactly as it would without warming.
+
+    Returns:
+        Number of QC tests whose response model was built
+    """
+    from .qc.prompt_registry import registry
+
+    warmed = 0
+    for test_name in registry.get_all_test_names():
+        try:
+            registry.get_pydantic_model(test_name)
+            warmed += 1
+        except Exception as e:
+            logger.warning(f"Could not warm QC prompt '{test_name}': {str(e)}")
+    return warmed
+
+
+class Worker:
+    """Process jobs from a queue with resources loaded once at start-up."""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        resources: PipelineResources,
+        poll_interval: float = DEFAULT_POLL_INTERVAL_S,
+        claim_timeout: Optional[float] = DEFAULT_CLAIM_TIMEOUT_S,
+        resume: bool = False,
+        heartbeat_interval: float = DEFAULT_HEARTBEAT_INTERVAL_S,
+    ):
+        self.queue = queue
+        self.resources = resources
+        self.poll_interval = poll_interval
+        self.claim_timeout = claim_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.resume = resume
+        self._stopping = False
+        self.processed = 0
+        self.failed = 0
+
+    def stop(self, *_args) -> None:
+        """Finish the current job, then exit the loop."""
+        logger.info("Worker stop requested", extra={"operation": "worker.stop"})
+        self._stopping = True
+
+    @contextmanager
+    def _keep_claim(self, job: Job) -> Iterator[None]:
+        """Refresh a job's claim from a background thread while it runs."""
+        stopped = threading.Event()
+
+        def refresh() -> None:
+            while not stopped.wait(self.heartbeat_interval):
+                try:
+                    if not self.queue.heartbeat(job):
+                        _log_lost_claim(job, "heartbeat")
+                        return
+                except Exception as e:
+                    logger.warning(f"Could not refresh job claim: {str(e)}")
+
+        thread = threading.Thread(
+            target=refresh, name=f"claim-{job.job_id}", daemon=True
+        )
+        thread.start()
+        try:
+            yield
+        finally:
+            stopped.set()
+            thread.join()
+
+    def process_job(self, job: Job) -> bool:
+        """Run the pipeline for one job and record the outcome in the queue."""
+        run_id = uuid4().hex[:10]
+        output_path = job.resolved_output_path()
+        recoverable_failures: list[StepFailure] = []
+        started = time.perf_counter()
+        logger.info(
+            "Worker claimed job",
+            extra={
+                "operation": "worker.process_job",
+                "run_id": run_id,
+                "job_id": job.job_id,
+                "zip_path": job.zip_path,
+            },
+        )
+        try:
+            with self._keep_claim(job):
+                run_pipeline(
+                    job.zip_path,
+                    self.resources,
+                    output_path=output_path,
+                    run_id=run_id,
+                    recoverable_failures=recoverable_failures,
+                    resume=self.resume,
+                )
+        except Exception as exc:
+            logger.error(
+                "Worker job failed",
+                extra={
+                    "operation": "worker.process_job",
+                    "run_id": run_id,
+                    "job_id": job.job_id,
+                    "error": str(exc),
+                },
+            )
+            self.queue.fail(job, str(exc))
+            self.failed += 1
+            return False
+
+        elapsed_s = round(time.perf_counter() - started, 3)
+        self.queue.complete(
+            job,
+            {
+                "run_id": run_id,
+                "output_path": output_path,
+                "elapsed_s": elapsed_s,
+                "recoverable_failures": [
+                    {"step": item.step, "reason": item.reason}
+                    for item in recoverable_failures
+                ],
+            },
+        )
+        self.processed += 1
+        logger.info(
+            "Worker job completed",
+            extra={
+                "operation": "worker.process_job",
+                "run_id": run_id,
+                "job_id": job.job_id,
+                "elapsed_s": elapsed_s,
+                "recoverable_failure_count": len(recoverable_failures),
+            },
+        )
+        return True
+
+    def run(self, max_jobs: Optional[int] = None, exit_when_idle: bool = False):
+        """
+        Poll the queue and process jobs until stopped.
+
+        Args:
+            max_jobs: Stop after this many jobs (processed or failed)
+            exit_when_idle: Stop as soon as the queue is empty
+        """
+        while not self._stopping:
+            if max_jobs is not None and self.processed + self.failed >= max_jobs:
+                break
+            job = self.queue.claim(stale_after=self.claim_timeout)
+            if job is None:
+                if exit_when_idle:
+                    break
+                time.sleep(self.poll_interval)
+                continue
+            self.process_job(job)
+
+        logger.info(
+            "Worker stopped",
+            extra={
+                "operation": "worker.run",
+                "processed": self.processed,
+                "failed": self.failed,
+            },
+        )
+
+
+def create_queue(queue_dir: Optional[str], queue_db: Optional[str]) -> JobQueue:
+    """Build the queue backend selected on the command line."""
+    if queue_db:
+        return SQLiteJobQueue(queue_db)
+    if queue_dir:
+        return DirectoryJobQueue(queue_dir)
+    raise ValueError("Either a queue directory or a queue database is required")
+
+
+def start_worker(
+    queue: JobQueue,
+    config_path: str,
+    poll_interval: Optional[float] = None,
+    max_jobs: Optional[int] = None,
+    exit_when_idle: bool = False,
+    claim_timeout: Optional[float] = None,
+    resume: bool = False,
+) -> Worker:
+    """Load configuration and warm resources once, then run the worker loop."""
+    if not os.path.exists(config_path):
+        raise FileNotFoundError(f"Config file not found: {config_path}")
+    config = ConfigurationLoader(config_path).config
+    setup_logging(config)
+    worker_config = config.get("worker", {})
+
+    started = time.perf_counter()
+    resources = load_pipeline_resources(
+        config, run_id="worker", warm_object_detector=True
+    )
+    warmed_prompts = 0
+    if worker_config.get("warm_qc_prompts", False):
+        warmed_prompts = warm_qc_prompt_registry()
+    logger.info(
+        "Worker resources loaded",
+        extra={
+            "operation": "worker.start",
+            "startup_ms": int((time.perf_counter() - started) * 1000),
+            "warmed_qc_prompts": warmed_prompts,
+        },
+    )
+
+    if poll_interval is None:
+        poll_interval = worker_config.get("poll_interval_s", DEFAULT_POLL_INTERVAL_S)
+    if claim_timeout is None:
+        claim_timeout = worker_config.get("claim_timeout_s", DEFAULT_CLAIM_TIMEOUT_S)
+    worker = Worker(
+        queue,
+        resources,
+        poll_interval=poll_interval,
+        claim_timeout=claim_timeout,
+        resume=resume,
+        heartbeat_interval=worker_config.get(
+            "heartbeat_interval_s", DEFAULT_HEARTBEAT_INTERVAL_S
+        ),
+    )
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run(max_jobs=max_jobs, exit_when_idle=exit_when_idle)
+    return worker
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Run a SODA curation worker or submit jobs to its queue"
+    )
+    queue_group = parser.add_mutually_exclusive_group(required=True)
+    queue_group.add_argument("--queue-dir", help="Directory-backed job queue")
+    queue_group.add_argument("--queue-db", help="SQLite-backed job queue file")
+    parser.add_argument("--config", help="Path to the configuration file")
+    parser.add_argument(
+        "--submit", metavar="ZIP", help="Enqueue a ZIP file instead of running"
+    )
+    parser.add_argument("--output", help="Output JSON path for --submit")
+    parser.add_argument("--poll-interval", type=float, help="Seconds between polls")
+    parser.add_argument("--max-jobs", type=int, help="Exit after this many jobs")
+    parser.add_argument(
+        "--claim-timeout",
+        type=float,
+        help="Seconds without a heartbeat after which a claim is requeued",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip steps with a valid checkpoint from a previous run",
+    )
+    parser.add_argument(
+        "--exit-when-idle",
+        action="store_true",
+        help="Exit once the queue is empty instead of polling",
+    )
+
+    args = parser.parse_args()
+    job_queue = create_queue(args.queue_dir, args.queue_db)
+
+    if args.submit:
+        print(job_queue.submit(args.submit, args.output))
+    else:
+        if not args.config:
+            parser.error("--config is required to run the worker")
+        start_worker(
+            job_queue,
+            args.config,
+            poll_interval=args.poll_interval,
+            max_jobs=args.max_jobs,
+            exit_when_idle=args.exit_when_idle,
+            claim_timeout=args.claim_timeout,
+            resume=args.resume,
+        )
@@ -0,0 +1,205 @@
+"""Tests for Anthropic prompt caching and prompt-cache token accounting."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from pydantic import BaseModel
+
+from src.soda_curation.pipeline.anthropic_utils import (
+    PROMPT_CACHE_CONTROL,
+    call_anthropic,
+)
+from src.soda_curation.pipeline.cost_tracking import calculate_cost, update_token_usage
+from src.soda_curation.pipeline.extract_captions.extract_captions_anthropic import (
+    FigureCaptionExtractorAnthropic,
+    PanelExtraction,
+)
+from src.soda_curation.pipeline.manuscript_structure.manuscript_structure import (
+    Figure,
+    ProcessingCost,
+    TokenUsage,
+    ZipStructure,
+)
+from src.soda_curation.pipeline.prompt_handler import PromptHandler
+
+
+class Answer(BaseModel):
+    label: str
+
+
+MESSAGES = [
+    {"role": "system", "content": "Stable instructions"},
+    {"role": "system", "content": "Request-specific constraint"},
+    {
+        "role": "user",
+        "content": [
+            {
+                "type": "text",
+                "text": "Shared legends",
+                "cache_control": PROMPT_CACHE_CONTROL,
+            },
+            {"type": "text", "text": "Figure 2"},
+            {
+                "type": "image_url",
+                "image_url": {"url": "data:image/png;base64,iVBORw0KGgo"},
+            },
+        ],
+    },
+]
+
+
+def anthropic_client(cache_read=0, cache_write=0):
+    block = MagicMock(type="tool_use", input={"label": "A"})
+    block.name = "structured_output"
+    response = MagicMock(content=[block], model="claude-sonnet-4-6")
+    response.usage = MagicMock(
+        input_tokens=200,
+        output_tokens=20,
+        cache_read_input_tokens=cache_read,
+        cache_creation_input_tokens=cache_write,
+    )
+    client = MagicMock()
+    client.messages.create.return_value = response
+    return client
+
+
+def test_prompt_caching_marks_system_prompt_and_marked_parts():
+    client = anthropic_client()
+
+    call_anthropic(
+        client,
+        "claude-sonnet-4-6",
+        MESSAGES,
+        response_format=Answer,
+        prompt_caching=True,
+    )
+
+    params = client.messages.create.call_args.kwargs
+    assert params["system"] == [
+        {
+            "type": "text",
+            "text": "Stable instructions",
+            "cache_control": PROMPT_CACHE_CONTROL,
+        },
+        {"type": "text", "text": "Request-specific constraint"},
+    ]
+    content = params["messages"][0]["content"]
+    assert content[0]["cache_control"] == PROMPT_CACHE_CONTROL
+    assert "cache_control" not in content[1]
+    assert "cache_control" not in content[2]
+
+
+def test_requests_without_prompt_caching_are_unmarked():
+    client = anthropic_client()
+
+    call_anthropic(client, "claude-sonnet-4-6", MESSAGES, response_format=Answer)
+
+    params = client.messages.create.call_args.kwargs
+    assert params["system"] == "Stable instructions\n\nRequest-specific constraint"
+    assert all("cache_control" not in part for part in params["messages"][0]["content"])
+
+
+def test_prompt_cache_tokens_flow_into_usage_and_cost():
+    response = call_anthropic(
+        anthropic_client(cache_read=1000, cache_write=300),
+        "claude-sonnet-4-6",
+        MESSAGES,
+        response_format=Answer,
+        prompt_caching=True,
+    )
+    usage = TokenUsage()
+
+    update_token_usage(usage, response, "claude-sonnet-4-6")
+
+    assert usage.prompt_tokens == 1500
+    assert usage.total_tokens == 1520
+    assert usage.prompt_cache_read_tokens == 1000
+    assert usage.prompt_cache_write_tokens == 300
+    # 200 uncached at $3, 1000 read at $0.30, 300 written at $3.75, 20 out at $15
+    expected = (200 * 3.00 + 1000 * 0.30 + 300 * 3.75 + 20 * 15.00) / 1_000_000
+    assert usage.cost == pytest.approx(expected)
+    assert usage.cost < calculate_cost("claude-sonnet-4-6", 1500, 20)
+
+
+LEGENDS = (
+    "<p><strong>Figure 1.</strong> First legend describing the panels A and B.</p>"
+    "<p><strong>Figure 2.</strong> Second legend describing the panels A and B.</p>"
+)
+
+
+def caption_requests(legend_segmentation):
+    """Run caption extraction for two figures; return the caption requests."""
+    caption_step = {
+        "model": "claude-sonnet-4-6",
+        "legend_segmentation": legend_segmentation,
+        "prompts": {
+            "system": "Extract the caption of a figure as JSON.",
+            "user": "Find $figure_label in:\n$figure_captions",
+        },
+    }
+    panel_step = {
+        "model": "claude-sonnet-4-6",
+        "prompts": {"system": "Split panels.", "user": "$figure_caption"},
+    }
+    pipeline = {
+        "extract_caption_title": {"anthropic": caption_step},
+        "extract_panel_sequence": {"anthropic": panel_step},
+    }
+    client = MagicMock()
+    block = MagicMock(
+        type="tool_use",
+        input={
+            "figure_label": "Figure 1",
+            "caption_title": "Title",
+            "figure_caption": "A) Panel.",
+            "is_verbatim": True,
+        },
+    )
+    block.name = "structured_output"
+    client.messages.create.return_value = MagicMock(
+        content=[block],
+        model="claude-sonnet-4-6",
+        usage=MagicMock(input_tokens=100, output_tokens=10),
+    )
+    with patch("anthropic.Anthropic", return_value=client):
+        extractor = FigureCaptionExtractorAnthropic(
+            {"pipeline": pipeline}, PromptHandler(pipeline)
+        )
+    extractor.extract_figure_panels = MagicMock(
+        return_value=(PanelExtraction(figure_label="", panels=[]), TokenUsage())
+    )
+    structure = ZipStructure(
+        figures=[
+            Figure(figure_label=label, img_files=[], sd_files=[])
+            for label in ("Figure 1", "Figure 2")
+        ],
+        cost=ProcessingCost(),
+    )
+
+    extractor.extract_individual_captions(LEGENDS, structure)
+
+    return [call.kwargs for call in client.messages.create.call_args_list]
+
+
+def test_per_figure_legend_slices_are_not_cache_breakpoints():
+    requests = caption_requests({"margin_chars": 0})
+
+    assert len(requests) == 2
+    for params in requests:
+        assert params["system"][0]["cache_control"] == PROMPT_CACHE_CONTROL
+        content = params["messages"][0]["content"]
+        assert isinstance(content, str)
+        # A figure's slice keeps the template's order
+        assert content.startswith("Find Figure")
+        assert "in:\n<p><strong>Figure" in content
+        assert "Second legend" not in content or "First legend" not in content
+
+
+def test_whole_legends_section_is_a_cache_breakpoint():
+    requests = caption_requests({"enabled": False})
+
+    for params in requests:
+        legends_part = params["messages"][0]["content"][0]
+        assert legends_part["cache_control"] == PROMPT_CACHE_CONTROL
+        assert "First legend" in legends_part["text"]
+        assert "Second legend" in legends_part["text"]
@@ -0,0 +1,191 @@
+"""Tests for the asyncio variants of the OpenAI and Anthropic call helpers."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import openai
+from pydantic import BaseModel
+
+from src.soda_curation.pipeline.anthropic_utils import acall_anthropic, call_anthropic
+from src.soda_curation.pipeline.openai_utils import (
+    acall_openai_with_fallback,
+    call_openai_with_fallback,
+)
+
+
+class Answer(BaseModel):
+    label: str
+
+
+MESSAGES = [
+    {"role": "system", "content": "You are a curator."},
+    {"role": "user", "content": "Label this figure."},
+]
+
+
+def openai_response(label="A", model="gpt-4o"):
+    message = MagicMock(content=f'{{"label": "{label}"}}')
+    message.parsed = Answer(label=label)
+    response = MagicMock(model=model)
+    response.choices = [MagicMock(message=message)]
+    response.usage = MagicMock(prompt_tokens=10, completion_tokens=2, total_tokens=12)
+    return response
+
+
+def anthropic_response(label="B"):
+    block = MagicMock(type="tool_use", input={"label": label})
+    block.name = "structured_output"
+    response = MagicMock(content=[block], model="claude-sonnet-4-6")
+    response.usage = MagicMock(input_tokens=10, output_tokens=2)
+    return response
+
+
+def rate_limit_error():
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    return openai.RateLimitError(
+        "rate limited", response=httpx.Response(429, request=request), body=None
+    )
+
+
+def context_length_error():
+    return openai.BadRequestError(
+        "This model's maximum context length is 128000 tokens",
+        response=httpx.Response(
+            400, request=httpx.Request("POST", "https://api.openai.com")
+        ),
+        body={"code": "context_length_exceeded"},
+    )
+
+
+def async_openai_client(*results):
+    client = MagicMock()
+    client.beta.chat.completions.parse = AsyncMock(side_effect=list(results))
+    return client
+
+
+@patch("src.soda_curation.pipeline.openai_utils.count_messages_tokens", return_value=10)
+def test_acall_openai_matches_sync_result(_):
+    sync_client = MagicMock()
+    sync_client.beta.chat.completions.parse.return_value = openai_response()
+    async_client = async_openai_client(openai_response())
+
+    sync_result = call_openai_with_fallback(
+        sync_client, "gpt-4o", MESSAGES, response_format=Answer
+    )
+    async_result = asyncio.run(
+        acall_openai_with_fallback(
+            async_client, "gpt-4o", MESSAGES, response_format=Answer
+        )
+    )
+
+    assert (
+        async_result.choices[0].message.parsed == sync_result.choices[0].message.parsed
+    )
+    assert (
+        async_client.beta.chat.completions.parse.call_args.kwargs
+        == sync_client.beta.chat.completions.parse.call_args.kwargs
+    )
+
+
+@patch("src.soda_curation.pipeline.openai_utils.count_messages_tokens", return_value=10)
+def test_acall_openai_retries_with_async_backoff(_):
+    client = async_openai_client(rate_limit_error(), openai_response())
+
+    with patch(
+        "src.soda_curation.pipeline.request_steps.asyncio.sleep", new=AsyncMock()
+    ) as sleep, patch(
+        "src.soda_curation.pipeline.request_steps.time.sleep"
+    ) as blocking:
+        result = asyncio.run(
+            acall_openai_with_fallback(
+                client, "gpt-4o", MESSAGES, response_format=Answer
+            )
+        )
+
+    assert result.choices[0].message.parsed.label == "A"
+    assert client.beta.chat.completions.parse.await_count == 2
+    sleep.assert_awaited_once_with(1)
+    blocking.assert_not_called()
+
+
+@patch("src.soda_curation.pipeline.openai_utils.count_messages_tokens", return_value=10)
+def test_acall_openai_falls_back_on_context_length(_):
+    client = async_openai_client(context_length_error(), openai_response(model="gpt-5"))
+
+    result = asyncio.run(
+        acall_openai_with_fallback(
+            client, "gpt-4o", MESSAGES, response_format=Answer, fallback_model="gpt-5"
+        )
+    )
+
+    assert result.model == "gpt-5"
+    models = [
+        call.kwargs["model"]
+        for call in client.beta.chat.completions.parse.call_args_list
+    ]
+    assert models == ["gpt-4o", "gpt-5"]
+
+
+@patch("src.soda_curation.pipeline.openai_utils.count_messages_tokens", return_value=10)
+def test_shared_semaphore_bounds_requests_in_flight(_):
+    in_flight = 0
+    peak = 0
+
+    async def parse(**params):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return openai_response()
+
+    client = MagicMock()
+    client.beta.chat.completions.parse = parse
+
+    async def fan_out():
+        semaphore = asyncio.Semaphore(3)
+        return await asyncio.gather(
+            *[
+                acall_openai_with_fallback(
+                    client,
+                    "gpt-4o",
+                    MESSAGES,
+                    response_format=Answer,
+                    semaphore=semaphore,
+                )
+                for _ in range(12)
+            ]
+        )
+
+    results = asyncio.run(fan_out())
+
+    assert len(results) == 12
+    assert peak == 3
+
+
+def test_acall_anthropic_matches_sync_result():
+    sync_client = MagicMock()
+    sync_client.messages.create.return_value = anthropic_response()
+    async_client = MagicMock()
+    async_client.messages.create = AsyncMock(return_value=anthropic_response())
+
+    sync_result = call_anthropic(
+        sync_client, "claude-sonnet-4-6", MESSAGES, response_format=Answer
+    )
+    async_result = asyncio.run(
+        acall_anthropic(
+            async_client,
+            "claude-sonnet-4-6",
+            MESSAGES,
+            response_format=Answer,
+            semaphore=asyncio.Semaphore(1),
+        )
+    )
+
+    assert async_result.choices[0].message.parsed == Answer(label="B")
+    assert async_result.usage.total_tokens == sync_result.usage.total_tokens
+    assert (
+        async_client.messages.create.call_args.kwargs
+        == sync_client.messages.create.call_args.kwargs
+    )
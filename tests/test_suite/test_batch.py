@@ -0,0 +1,104 @@
+"""Tests for batch processing of manuscript ZIP files."""
+
+import json
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+import yaml
+
+from src.soda_curation.batch import collect_batch_inputs, run_batch
+from src.soda_curation.main import StepFailure
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(
+        yaml.safe_dump({"default": {"pipeline": {}, "batch": {"workers": 2}}})
+    )
+    return str(config_path)
+
+
+@pytest.fixture
+def zip_dir(tmp_path):
+    directory = tmp_path / "zips"
+    directory.mkdir()
+    for name in ["EMBOJ-2.zip", "EMBOJ-1.zip", "EMBOJ-3.zip"]:
+        (directory / name).write_bytes(b"PK")
+    (directory / "notes.txt").write_text("ignored")
+    return directory
+
+
+def test_collect_batch_inputs_from_directory(zip_dir):
+    paths = collect_batch_inputs(str(zip_dir))
+    assert [p.name for p in paths] == ["EMBOJ-1.zip", "EMBOJ-2.zip", "EMBOJ-3.zip"]
+
+
+def test_collect_batch_inputs_from_manifest(zip_dir, tmp_path):
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text(
+        f"# comment\nzips/EMBOJ-3.zip\n\n{zip_dir / 'EMBOJ-1.zip'}\n",
+        encoding="utf-8",
+    )
+    paths = collect_batch_inputs(str(manifest))
+    assert [p.name for p in paths] == ["EMBOJ-3.zip", "EMBOJ-1.zip"]
+
+
+def test_collect_batch_inputs_missing_manifest_entry(tmp_path):
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("missing.zip\n", encoding="utf-8")
+    with pytest.raises(FileNotFoundError):
+        collect_batch_inputs(str(manifest))
+
+
+def test_collect_batch_inputs_empty_directory(tmp_path):
+    with pytest.raises(ValueError):
+        collect_batch_inputs(str(tmp_path))
+
+
+def test_run_batch_isolates_manuscript_failures(zip_dir, config_file, tmp_path):
+    output_dir = tmp_path / "out"
+    resources = MagicMock()
+
+    def fake_run_pipeline(zip_path, resources_, output_path, run_id, **kwargs):
+        assert resources_ is resources
+        name = Path(zip_path).name
+        if name == "EMBOJ-2.zip":
+            raise RuntimeError("extract_structure failed")
+        if name == "EMBOJ-3.zip":
+            kwargs["recoverable_failures"].append(
+                StepFailure(step="match_caption_panel", reason="timeout")
+            )
+        Path(output_path).write_text("{}")
+        return "{}"
+
+    with patch(
+        "src.soda_curation.batch.load_pipeline_resources", return_value=resources
+    ) as mock_load, patch(
+        "src.soda_curation.batch.run_pipeline", side_effect=fake_run_pipeline
+    ), patch(
+        "src.soda_curation.batch.setup_logging"
+    ):
+        summary = run_batch(str(zip_dir), config_file, str(output_dir))
+
+    mock_load.assert_called_once()
+    assert mock_load.call_args.kwargs["warm_object_detector"] is True
+    assert summary["workers"] == 2
+    assert summary["manuscript_count"] == 3
+    assert summary["status_counts"] == {
+        "completed": 1,
+        "failed": 1,
+        "completed_with_failures": 1,
+    }
+    assert summary["manuscripts_per_hour"] > 0
+
+    by_name = {Path(m["zip_path"]).name: m for m in summary["manuscripts"]}
+    assert by_name["EMBOJ-2.zip"]["error"] == "extract_structure failed"
+    assert by_name["EMBOJ-3.zip"]["recoverable_failures"] == [
+        {"step": "match_caption_panel", "reason": "timeout"}
+    ]
+    assert (output_dir / "EMBOJ-1.json").exists()
+
+    written = json.loads((output_dir / "batch_summary.json").read_text())
+    assert written["status_counts"] == summary["status_counts"]
@@ -0,0 +1,227 @@
+"""Tests for step checkpoints and resuming pipeline runs."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.soda_curation.checkpoint import CheckpointStore, create_checkpoint_store
+from src.soda_curation.main import PipelineStep, _run_step_graph
+from src.soda_curation.pipeline.manuscript_structure.manuscript_structure import (
+    ZipStructure,
+)
+
+
+@pytest.fixture
+def zip_file(tmp_path):
+    path = tmp_path / "manuscript.zip"
+    path.write_bytes(b"zip content")
+    return str(path)
+
+
+def build_steps(calls, fail_assign=False, fail_captions=False):
+    """Small graph mirroring the pipeline: one shared structure, a fan-out, a join."""
+
+    def record(name, result):
+        def runner(results):
+            calls.append(name)
+            if name == "assign" and fail_assign:
+                raise RuntimeError("assign failed")
+            if name == "captions" and fail_captions:
+                raise ValueError("captions failed")
+            return result(results)
+
+        return runner
+
+    def structure(results):
+        return ZipStructure(manuscript_id="EMBOJ-1")
+
+    def captions(results):
+        results["structure"].ai_response_extract_individual_captions = "captions"
+        return results["structure"]
+
+    def data_sources(results):
+        results["structure"].data_availability = {"section_text": "data"}
+        return results["structure"]
+
+    return [
+        PipelineStep("structure", record("structure", structure), critical=True),
+        PipelineStep(
+            "detect",
+            record("detect", lambda r: 3),
+            critical=False,
+            requires=("structure",),
+            checkpoint=False,
+        ),
+        PipelineStep(
+            "captions",
+            record("captions", captions),
+            critical=True,
+            requires=("structure",),
+        ),
+        PipelineStep(
+            "data_sources",
+            record("data_sources", data_sources),
+            critical=True,
+            requires=("structure",),
+        ),
+        PipelineStep(
+            "match",
+            record("match", lambda r: r["captions"]),
+            critical=False,
+            requires=("captions", "detect"),
+        ),
+        PipelineStep(
+            "assign",
+            record("assign", lambda r: ["figures"]),
+            critical=False,
+            requires=("match",),
+        ),
+    ]
+
+
+def test_checkpoint_store_round_trip(tmp_path, zip_file):
+    store = CheckpointStore(str(tmp_path / "ckpt"), zip_file, {"model": "gpt-4o"})
+    structure = ZipStructure(manuscript_id="EMBOJ-1")
+    store.save({"a": structure, "b": (1, structure)})
+
+    loaded = CheckpointStore(str(tmp_path / "ckpt"), zip_file, {"model": "gpt-4o"})
+    results = loaded.load()
+
+    assert results["a"].manuscript_id == "EMBOJ-1"
+    # Objects shared between step results stay shared after restoring
+    assert results["b"][1] is results["a"]
+
+
+def test_checkpoint_store_is_keyed_by_zip_and_config(tmp_path, zip_file):
+    root = str(tmp_path / "ckpt")
+    CheckpointStore(root, zip_file, {"model": "gpt-4o"}).save({"a": 1})
+
+    assert CheckpointStore(root, zip_file, {"model": "gpt-5"}).load() == {}
+    with open(zip_file, "wb") as f:
+        f.write(b"other content")
+    assert CheckpointStore(root, zip_file, {"model": "gpt-4o"}).load() == {}
+
+
+def test_checkpoint_store_ignores_corrupt_file(tmp_path, zip_file):
+    store = CheckpointStore(str(tmp_path), zip_file, {})
+    store.run_dir.mkdir(parents=True)
+    store.path.write_bytes(b"not a pickle")
+    assert store.load() == {}
+
+
+def test_create_checkpoint_store_is_opt_in(tmp_path, zip_file):
+    assert create_checkpoint_store({}, zip_file) is None
+    enabled = {"checkpoint": {"enabled": True, "dir": str(tmp_path)}}
+    assert isinstance(create_checkpoint_store(enabled, zip_file), CheckpointStore)
+    # Execution settings do not change the checkpoint key
+    with_scheduler = dict(enabled, scheduler={"max_workers": 1})
+    assert (
+        create_checkpoint_store(with_scheduler, zip_file).run_dir
+        == create_checkpoint_store(enabled, zip_file).run_dir
+    )
+
+
+@pytest.mark.parametrize("section", ["http_clients", "rate_limits"])
+def test_client_settings_do_not_change_the_checkpoint_key(tmp_path, zip_file, section):
+    enabled = {"checkpoint": {"enabled": True, "dir": str(tmp_path)}}
+    tuned = dict(enabled, **{section: {"enabled": False}})
+
+    assert (
+        create_checkpoint_store(tuned, zip_file).run_dir
+        == create_checkpoint_store(enabled, zip_file).run_dir
+    )
+
+
+def test_resume_skips_completed_steps_and_reruns_failed(tmp_path, zip_file):
+    store = CheckpointStore(str(tmp_path), zip_file, {})
+
+    first_calls = []
+    failures = []
+    _run_step_graph(
+        build_steps(first_calls, fail_assign=True),
+        run_id="first",
+        recoverable_failures=failures,
+        checkpoints=store,
+    )
+    assert [f.step for f in failures] == ["assign"]
+
+    second_calls = []
+    results = _run_step_graph(
+        build_steps(second_calls),
+        run_id="second",
+        recoverable_failures=[],
+        checkpoints=store,
+        resume=True,
+    )
+
+    # Only the failed step runs again; detection is skipped because its
+    # only dependent was restored
+    assert second_calls == ["assign"]
+    assert results["assign"] == ["figures"]
+    assert results["match"] is results["data_sources"]
+    assert results["match"].data_availability == {"section_text": "data"}
+
+
+def test_critical_failure_keeps_finished_steps(tmp_path, zip_file):
+    store = CheckpointStore(str(tmp_path), zip_file, {})
+
+    with pytest.raises(ValueError, match="captions failed"):
+        _run_step_graph(
+            build_steps([], fail_captions=True),
+            run_id="first",
+            recoverable_failures=[],
+            checkpoints=store,
+        )
+
+    saved = store.load()
+    assert "structure" in saved
+    assert "captions" not in saved
+
+    calls = []
+    _run_step_graph(
+        build_steps(calls),
+        run_id="second",
+        recoverable_failures=[],
+        checkpoints=store,
+        resume=True,
+    )
+    assert "structure" not in calls
+    assert "captions" in calls
+
+
+def test_restored_result_is_dropped_when_dependency_reruns(tmp_path, zip_file):
+    store = CheckpointStore(str(tmp_path), zip_file, {})
+    _run_step_graph(
+        build_steps([]), run_id="first", recoverable_failures=[], checkpoints=store
+    )
+
+    # Simulate a checkpoint where matching failed but assignment succeeded
+    saved = store.load()
+    del saved["match"]
+    store.save(saved)
+
+    calls = []
+    _run_step_graph(
+        build_steps(calls),
+        run_id="second",
+        recoverable_failures=[],
+        checkpoints=store,
+        resume=True,
+    )
+    assert calls == ["detect", "match", "assign"]
+
+
+def test_without_resume_checkpoints_are_not_read(tmp_path, zip_file):
+    store = CheckpointStore(str(tmp_path), zip_file, {})
+    store.load = MagicMock(return_value={})
+    _run_step_graph(
+        build_steps([]), run_id="run", recoverable_failures=[], checkpoints=store
+    )
+    store.load.assert_not_called()
+    assert set(CheckpointStore(str(tmp_path), zip_file, {}).load()) == {
+        "structure",
+        "captions",
+        "data_sources",
+        "match",
+        "assign",
+    }
@@ -1,6 +1,8 @@
 """Tests for caption extraction functionality."""
 
 import json
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -321,6 +323,144 @@ class TestIndividualCaptionExtraction:
         assert isinstance(token_usage, TokenUsage)
 
 
+class TestConcurrentCaptionExtraction:
+    """Test per-figure caption extraction on a thread pool."""
+
+    @staticmethod
+    def build_extractor(mock_prompt_handler, max_workers):
+        config = json.loads(json.dumps(VALID_CONFIG))
+        config["pipeline"]["extract_caption_title"]["openai"][
+            "max_workers"
+        ] = max_workers
+        extractor = FigureCaptionExtractorOpenAI(config, mock_prompt_handler)
+
+        def extract_caption(figure_label, all_captions, zip_structure):
+            # Later figures answer first
+            time.sleep(0.05 if figure_label.endswith("1") else 0.0)
+            return (
+                CaptionExtraction(
+                    figure_label=figure_label,
+                    caption_title=f"Title of {figure_label}",
+                    figure_caption=f"A) {figure_label} panel.",
+                    is_verbatim=True,
+                ),
+                TokenUsage(prompt_tokens=10, total_tokens=10, cost=0.1),
+            )
+
+        def extract_panels(figure_label, caption_text):
+            return (
+                PanelExtraction(
+                    figure_label=figure_label,
+                    panels=[PanelInfo(panel_label="A", panel_caption=caption_text)],
+                ),
+                TokenUsage(completion_tokens=5, total_tokens=5, cost=0.2),
+            )
+
+        extractor.extract_figure_caption = MagicMock(side_effect=extract_caption)
+        extractor.extract_figure_panels = MagicMock(side_effect=extract_panels)
+        return extractor
+
+    @staticmethod
+    def build_structure():
+        labels = ["Figure 1", "Figure 2", "Figure EV1", "Figure 3"]
+        return ZipStructure(
+            manuscript_id="test_manuscript",
+            figures=[
+                Figure(figure_label=label, img_files=[], sd_files=[])
+                for label in labels
+            ],
+            cost=ProcessingCost(),
+        )
+
+    @pytest.mark.parametrize("max_workers", [1, 4])
+    def test_figures_keep_order_and_usage_is_summed(
+        self, mock_openai_client, mock_prompt_handler, max_workers
+    ):
+        extractor = self.build_extractor(mock_prompt_handler, max_workers)
+        result = extractor.extract_individual_captions(
+            "legends", self.build_structure()
+        )
+
+        assert [figure.figure_label for figure in result.figures] == [
+            "Figure 1",
+            "Figure 2",
+            "Figure EV1",
+            "Figure 3",
+        ]
+        assert [figure.caption_title for figure in result.figures] == [
+            "Title of Figure 1",
+            "Title of Figure 2",
+            "",
+            "Title of Figure 3",
+        ]
+        assert result.figures[2].panels == []
+        usage = result.cost.extract_individual_captions
+        assert usage.prompt_tokens == 30
+        assert usage.completion_tokens == 15
+        assert usage.total_tokens == 45
+        assert usage.cost == pytest.approx(0.9)
+        assert extractor.extract_figure_caption.call_count == 3
+
+    def test_figures_are_processed_concurrently(
+        self, mock_openai_client, mock_prompt_handler
+    ):
+        extractor = self.build_extractor(mock_prompt_handler, max_workers=4)
+        barrier = threading.Barrier(3, timeout=5)
+        extract_caption = extractor.extract_figure_caption.side_effect
+
+        def wait_for_all_figures(*args):
+            # Fails with BrokenBarrierError unless all three figures are in flight
+            barrier.wait()
+            return extract_caption(*args)
+
+        extractor.extract_figure_caption.side_effect = wait_for_all_figures
+        result = extractor.extract_individual_captions(
+            "legends", self.build_structure()
+        )
+
+        assert result.figures[3].caption_title == "Title of Figure 3"
+
+    def test_each_figure_is_sent_its_legend_slice(
+        self, mock_openai_client, mock_prompt_handler
+    ):
+        legends = (
+            "<p><strong>Figure 1.</strong> First legend describing panels A and B.</p>"
+            "<p><strong>Figure 2.</strong> Second legend describing panels A and B.</p>"
+        )
+        extractor = self.build_extractor(mock_prompt_handler, max_workers=1)
+        extractor.caption_config["legend_segmentation"] = {"margin_chars": 0}
+        structure = self.build_structure()
+        structure.figures = structure.figures[:2]
+
+        extractor.extract_individual_captions(legends, structure)
+
+        sent = {
+            call.args[0]: call.args[1]
+            for call in extractor.extract_figure_caption.call_args_list
+        }
+        assert "Second legend" not in sent["Figure 1"]
+        assert sent["Figure 2"].startswith("<p><strong>Figure 2.")
+
+        extractor.caption_config["legend_segmentation"] = {"enabled": False}
+        extractor.extract_figure_caption.reset_mock()
+        extractor.extract_individual_captions(legends, structure)
+        assert extractor.extract_figure_caption.call_args.args[1] == legends
+
+    def test_token_usage_add_is_thread_safe(self):
+        total = TokenUsage()
+        one = TokenUsage(prompt_tokens=1, completion_tokens=1, total_tokens=2)
+        threads = [
+            threading.Thread(target=lambda: [total.add(one) for _ in range(1000)])
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert total.total_tokens == 16000
+
+
 class TestResponseParsing:
     """Test parsing of AI responses."""
 
@@ -0,0 +1,119 @@
+"""Tests for the process-pool figure conversion stage."""
+
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import Mock, patch
+
+from PIL import Image
+
+from src.soda_curation.pipeline.match_caption_panel.figure_conversion import (
+    _convert_figure,
+    conversion_settings,
+    convert_figures,
+)
+from src.soda_curation.pipeline.match_caption_panel.figure_image_store import (
+    FigureImageStore,
+)
+
+MODULE = "src.soda_curation.pipeline.match_caption_panel.figure_conversion"
+
+
+class FakePool:
+    """Runs submissions inline; figures in ``crash`` break their worker."""
+
+    def __init__(self, crash=()):
+        self.crash = set(crash)
+
+    def submit(self, fn, path, *args):
+        future = Future()
+        if path in self.crash:
+            future.set_exception(BrokenProcessPool("worker died"))
+        else:
+            future.set_result(fn(path, *args))
+        return future
+
+    def shutdown(self, wait=True):
+        pass
+
+
+def write_figures(tmp_path, count=2):
+    paths = []
+    for index in range(count):
+        path = tmp_path / f"figure{index}.png"
+        Image.new("RGB", (20, 10), (index * 50, 0, 0)).save(path)
+        paths.append(str(path))
+    return paths
+
+
+def test_conversion_settings_defaults_and_overrides():
+    max_workers, max_memory = conversion_settings({})
+    assert 1 <= max_workers <= 4
+    assert max_memory == 4096 * 1024 * 1024
+
+    config = {"figure_conversion": {"max_workers": 0, "max_memory_mb_per_worker": 0}}
+    assert conversion_settings(config) == (1, 0)
+
+
+def test_figures_are_converted_on_a_process_pool(tmp_path):
+    paths = write_figures(tmp_path)
+    store = FigureImageStore(loader=Mock(side_effect=AssertionError("decoded")))
+
+    failures = convert_figures(
+        paths + [str(tmp_path / "missing.png")],
+        {"figure_conversion": {"max_workers": 2}},
+        store.put,
+    )
+
+    assert list(failures) == [str(tmp_path / "missing.png")]
+    assert store.get(paths[1]).getpixel((0, 0)) == (50, 0, 0)
+    assert store.stats()["figures"] == 2
+
+
+def test_single_worker_converts_in_the_calling_thread(tmp_path):
+    paths = write_figures(tmp_path)
+    converted = []
+
+    with patch(f"{MODULE}._get_pool") as mock_pool:
+        convert_figures(
+            paths,
+            {"figure_conversion": {"max_workers": 1}},
+            lambda path, image: converted.append(path),
+        )
+
+    mock_pool.assert_not_called()
+    assert converted == paths
+
+
+def test_unavailable_pool_falls_back_to_serial(tmp_path):
+    paths = write_figures(tmp_path)
+    converted = []
+
+    with patch(f"{MODULE}._get_pool", side_effect=OSError("no semaphores")):
+        failures = convert_figures(
+            paths,
+            {"figure_conversion": {"max_workers": 4}},
+            lambda path, image: converted.append(path),
+        )
+
+    assert failures == {}
+    assert converted == paths
+
+
+def test_crashed_figures_are_retried_once_in_a_new_pool(tmp_path):
+    paths = write_figures(tmp_path, count=3)
+    converted = []
+    pools = [FakePool(crash=paths[1:]), FakePool(crash=paths[2:])]
+
+    with patch(f"{MODULE}._get_pool", side_effect=pools), patch(
+        f"{MODULE}._convert_figure", wraps=_convert_figure
+    ) as convert:
+        failures = convert_figures(
+            paths,
+            {"figure_conversion": {"max_workers": 2}},
+            lambda path, image: converted.append(path),
+        )
+
+    assert converted == paths[:2]
+    assert failures == {paths[2]: "Figure conversion worker died"}
+    # The crashing figure is never converted in the uncapped parent
+    assert convert.call_count == 2
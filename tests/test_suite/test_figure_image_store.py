@@ -0,0 +1,78 @@
+"""Tests for the decode-once figure image store."""
+
+import base64
+import io
+from unittest.mock import Mock
+
+from PIL import Image
+
+from src.soda_curation.pipeline.match_caption_panel.figure_image_store import (
+    FigureImageStore,
+)
+
+
+def write_figure(path, color=(255, 0, 0), size=(10, 10)):
+    Image.new("RGB", size, color).save(path, format="PNG")
+    return path
+
+
+def counting_loader():
+    return Mock(side_effect=lambda path: Image.open(path).convert("RGB"))
+
+
+def test_figure_is_decoded_once(tmp_path):
+    path = write_figure(tmp_path / "figure1.png")
+    loader = counting_loader()
+    store = FigureImageStore(loader)
+
+    first = store.get(path)
+    second = store.get(str(path))
+
+    assert first is second
+    assert loader.call_count == 1
+    assert store.stats()["hits"] == 1
+    assert store.stats()["misses"] == 1
+
+
+def test_changed_content_is_decoded_again(tmp_path):
+    path = write_figure(tmp_path / "figure1.png", color=(255, 0, 0))
+    loader = counting_loader()
+    store = FigureImageStore(loader)
+    store.get(path)
+
+    write_figure(path, color=(0, 0, 255), size=(12, 12))
+
+    assert store.get(path).size == (12, 12)
+    assert loader.call_count == 2
+
+
+def test_least_recently_used_figures_are_evicted(tmp_path):
+    paths = [write_figure(tmp_path / f"figure{i}.png") for i in range(3)]
+    loader = counting_loader()
+    # Each 10x10 RGB figure takes 300 bytes; room for two
+    store = FigureImageStore(loader, max_memory_bytes=600)
+
+    store.get(paths[0])
+    store.get(paths[1])
+    store.get(paths[0])
+    store.get(paths[2])
+
+    assert store.stats()["evictions"] == 1
+    assert store.stats()["memory_bytes"] <= 600
+    store.get(paths[0])
+    assert loader.call_count == 3
+    store.get(paths[1])
+    assert loader.call_count == 4
+
+
+def test_encoded_payload_is_memoized(tmp_path):
+    path = write_figure(tmp_path / "figure1.png")
+    store = FigureImageStore(counting_loader())
+
+    encoded = store.encoded(path, "PNG")
+
+    assert store.encoded(path, "PNG") is encoded
+    decoded = Image.open(io.BytesIO(base64.b64decode(encoded)))
+    assert decoded.format == "PNG"
+    assert decoded.size == (10, 10)
+    assert store.stats()["memory_bytes"] == 300 + len(encoded)
@@ -0,0 +1,126 @@
+"""Tests for the shared provider HTTP connection pools."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from src.soda_curation.pipeline.http_clients import (
+    close_http_clients,
+    get_http_client,
+    http_client_stats,
+    pool_limits,
+)
+from src.soda_curation.pipeline.rate_limits import MODEL_HEADER, configure_rate_limits
+from src.soda_curation.qc.providers.anthropic_provider import AnthropicQCProvider
+from src.soda_curation.qc.providers.openai_provider import OpenAIQCProvider
+
+
+class OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    received_headers = {}
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def do_POST(self):
+        OkHandler.received_headers = {k.lower(): v for k, v in self.headers.items()}
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("x-ratelimit-limit-tokens", "1000")
+        self.send_header("x-ratelimit-remaining-tokens", "0")
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def fresh_pools():
+    close_http_clients()
+    yield
+    close_http_clients()
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), OkHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_pool_limits_apply_provider_overrides():
+    config = {
+        "http_clients": {
+            "max_connections": 8,
+            "keepalive_expiry": 5,
+            "anthropic": {"max_connections": 40},
+        }
+    }
+
+    openai_limits = pool_limits(config, "openai")
+    anthropic_limits = pool_limits(config, "anthropic")
+
+    assert openai_limits.max_connections == 8
+    assert anthropic_limits.max_connections == 40
+    assert anthropic_limits.keepalive_expiry == 5.0
+    assert pool_limits({"http_clients": {"enabled": False}}, "openai") is None
+
+
+def test_one_pool_per_provider_is_shared():
+    client = get_http_client("openai", {"http_clients": {"max_connections": 8}})
+
+    assert get_http_client("openai") is client
+    assert get_http_client("anthropic") is not client
+    assert get_http_client("openai", {"http_clients": {"enabled": False}}) is None
+
+
+def test_sdk_clients_are_built_on_the_shared_pools():
+    with patch("openai.OpenAI") as openai_client, patch(
+        "anthropic.Anthropic"
+    ) as anthropic_client:
+        OpenAIQCProvider()
+        AnthropicQCProvider()
+
+    openai_pool = openai_client.call_args.kwargs["http_client"]
+    assert openai_pool is get_http_client("openai")
+    assert anthropic_client.call_args.kwargs["http_client"] is get_http_client(
+        "anthropic"
+    )
+
+
+def test_stats_count_reused_connections(local_server):
+    client = get_http_client("openai")
+
+    for _ in range(3):
+        assert client.get(local_server).text == "ok"
+
+    stats = http_client_stats()["openai"]
+    assert stats.requests == 3
+    assert stats.connections_opened == 1
+    assert stats.reused_requests == 2
+
+
+def test_rate_limit_headers_reach_the_rate_limiter(local_server):
+    limiter = configure_rate_limits({})
+    try:
+        get_http_client("openai").post(
+            local_server, json={"messages": []}, headers={MODEL_HEADER: "gpt-4o"}
+        )
+
+        # The model header is read by the client, not sent to the provider
+        assert MODEL_HEADER not in OkHandler.received_headers
+        assert limiter.limits_tokens("openai", "gpt-4o")
+        assert limiter.reserve("openai", "gpt-4o", 9) > 0
+        assert not limiter.limits_tokens("openai", "gpt-4o-mini")
+    finally:
+        configure_rate_limits({})
@@ -0,0 +1,92 @@
+"""Tests for the panel and figure image payload encodings."""
+
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+from src.soda_curation.pipeline.image_payloads import (
+    ImageEncoding,
+    encode_image,
+    image_media_type,
+    image_url_content,
+)
+from src.soda_curation.pipeline.match_caption_panel.figure_image_store import (
+    FigureImageStore,
+)
+
+
+def decode(encoded):
+    return Image.open(io.BytesIO(base64.b64decode(encoded)))
+
+
+def test_default_encoding_is_full_size_png():
+    image = Image.new("RGB", (300, 200), (10, 20, 30))
+
+    encoded = encode_image(image)
+
+    assert image_media_type(encoded) == "image/png"
+    assert decode(encoded).size == (300, 200)
+    assert decode(encoded).getpixel((0, 0)) == (10, 20, 30)
+
+
+@pytest.mark.parametrize(
+    "image_format,media_type", [("JPEG", "image/jpeg"), ("WEBP", "image/webp")]
+)
+def test_lossy_encoding_caps_the_longest_edge(image_format, media_type):
+    image = Image.new("RGBA", (1000, 400), (200, 0, 0, 255))
+
+    encoded = encode_image(image, ImageEncoding(format=image_format, max_edge=250))
+
+    assert image_media_type(encoded) == media_type
+    assert decode(encoded).size == (250, 100)
+    assert len(encoded) < len(encode_image(image))
+
+
+def test_from_config_reads_and_validates_settings():
+    config = {
+        "image_payloads": {
+            "panel": {"format": "jpeg", "quality": 70, "max_edge": 768, "detail": "LOW"}
+        }
+    }
+
+    assert ImageEncoding.from_config(config, "panel") == ImageEncoding(
+        format="JPEG", quality=70, max_edge=768, detail="low"
+    )
+    assert ImageEncoding.from_config(config, "figure") == ImageEncoding()
+    with pytest.raises(ValueError):
+        ImageEncoding.from_config(
+            {"image_payloads": {"panel": {"format": "GIF"}}}, "panel"
+        )
+    with pytest.raises(ValueError):
+        ImageEncoding.from_config(
+            {"image_payloads": {"panel": {"detail": "max"}}}, "panel"
+        )
+
+
+def test_image_url_content_only_sets_explicit_detail():
+    encoded = encode_image(Image.new("RGB", (4, 4)), ImageEncoding(format="JPEG"))
+
+    default = image_url_content(encoded)
+    low = image_url_content(encoded, "low")
+
+    assert default["image_url"] == {"url": f"data:image/jpeg;base64,{encoded}"}
+    assert low["image_url"]["detail"] == "low"
+    # Unrecognized payloads keep the historical PNG media type
+    assert image_url_content("encoded_image")["image_url"]["url"].startswith(
+        "data:image/png;base64,"
+    )
+
+
+def test_store_memoizes_each_encoding(tmp_path):
+    path = tmp_path / "figure1.png"
+    Image.new("RGB", (400, 200)).save(path)
+    store = FigureImageStore(loader=Image.open)
+    small_jpeg = ImageEncoding(format="JPEG", max_edge=100)
+
+    jpeg = store.encoded(path, small_jpeg)
+
+    assert store.encoded(path, small_jpeg) is jpeg
+    assert store.encoded(path, "PNG") is not jpeg
+    assert decode(jpeg).size == (100, 50)
@@ -0,0 +1,120 @@
+"""Tests for splitting the figure legends section into per-figure slices."""
+
+import pytest
+
+from src.soda_curation.pipeline.extract_captions.legend_segmenter import (
+    figure_key,
+    segment_figure_legends,
+)
+
+LEGENDS_HTML = (
+    "<p><strong>Figure 1. Loss of X impairs growth.</strong> (A) Growth curves of "
+    "wild-type and mutant cells. (B) Quantification, compare with Figure 2B.</p>\n"
+    "<p>Data are mean ± SD of three replicates.</p>\n"
+    "<h2>Figure 2</h2><p>X localizes to the nucleus. (A) Immunofluorescence "
+    "staining of X in HeLa cells.</p>\n"
+    "<p><b>Figure EV1</b> Validation of the antibody used throughout the study.</p>\n"
+    "<p>Figure 3: Model of X function, summarizing the results of this work.</p>"
+)
+
+
+@pytest.mark.parametrize(
+    "label,key",
+    [
+        ("Figure 1", ("", 1)),
+        ("Fig. 12", ("", 12)),
+        ("Figure EV3", ("EV", 3)),
+        ("Expanded View Figure 2", ("EV", 2)),
+        ("Appendix Figure S4", ("S", 4)),
+    ],
+)
+def test_figure_key(label, key):
+    assert figure_key(label) == key
+
+
+def test_slices_stop_at_the_next_legend():
+    segmentation = segment_figure_legends(
+        LEGENDS_HTML,
+        ["Figure 1", "Figure 2", "Figure 3", "Figure EV1"],
+        margin_chars=0,
+    )
+
+    figure1 = segmentation.slices["Figure 1"]
+    assert figure1.segmented and figure1.pattern == "bold"
+    assert figure1.text.startswith("<p><strong>Figure 1.")
+    assert "Data are mean" in figure1.text
+    # An in-text reference to another figure is not a boundary
+    assert "Figure 2B" in figure1.text
+    assert "<h2>Figure 2" not in figure1.text
+
+    assert segmentation.slices["Figure 2"].pattern == "heading"
+    # EV legends end the slice of the preceding figure
+    assert "Validation of the antibody" not in segmentation.slices["Figure 2"].text
+    assert segmentation.slices["Figure 3"].pattern == "paragraph"
+    assert segmentation.slices["Figure 3"].text.endswith("this work.</p>")
+
+
+def test_other_figure_lines_inside_a_legend_do_not_end_the_slice():
+    legends = (
+        "<p><strong>Figure 1.</strong> Growth of mutant cells over five days.</p>\n"
+        "<p>Figure S3 shows the same experiment in a second cell line.</p>\n"
+        "<p><strong>Figure 2.</strong> Localization of X in HeLa cells.</p>"
+    )
+
+    segmentation = segment_figure_legends(
+        legends, ["Figure 1", "Figure 2"], margin_chars=0
+    )
+
+    figure1 = segmentation.slices["Figure 1"]
+    assert figure1.segmented
+    assert "second cell line" in figure1.text
+    assert "Localization of X" not in figure1.text
+
+
+def test_out_of_order_legends_fall_back_to_full_section():
+    legends = (
+        "<p><strong>Figure 2.</strong> Localization of X in HeLa cells.</p>"
+        "<p><strong>Figure 1.</strong> Growth of mutant cells over five days.</p>"
+    )
+
+    segmentation = segment_figure_legends(legends, ["Figure 1", "Figure 2"])
+
+    assert not segmentation.slices["Figure 2"].segmented
+    assert segmentation.text_for("Figure 2") == legends
+
+
+def test_margin_adds_context_around_the_slice():
+    segmentation = segment_figure_legends(LEGENDS_HTML, ["Figure 2"], margin_chars=20)
+    text = segmentation.text_for("Figure 2")
+    start = LEGENDS_HTML.index("<h2>Figure 2")
+    assert text.startswith(LEGENDS_HTML[start - 20 : start])
+
+
+@pytest.mark.parametrize(
+    "legends",
+    [
+        # Label not found
+        "<p>Figure 1. Only one legend, long enough to be trusted as a slice.</p>",
+        # Label found at two boundaries
+        "<p>Figure 4. First candidate legend with enough text.</p>"
+        "<p>Figure 4. Second candidate legend with enough text.</p>",
+        # Too little text to be a legend
+        "<p>Figure 4</p><p>Figure 5. A legend with enough text to be trusted.</p>",
+    ],
+)
+def test_low_confidence_falls_back_to_full_section(legends):
+    segmentation = segment_figure_legends(legends, ["Figure 4", "Figure 5"])
+    assert not segmentation.slices["Figure 4"].segmented
+    assert segmentation.text_for("Figure 4") == legends
+
+
+def test_stats_report_savings():
+    labels = ["Figure 1", "Figure 2", "Figure 3", "Figure 9"]
+    segmentation = segment_figure_legends(LEGENDS_HTML, labels, margin_chars=0)
+    stats = segmentation.stats()
+
+    assert stats["segmented_figures"] == 3
+    assert stats["fallback_figures"] == 1
+    assert stats["legend_chars_full"] == 4 * len(LEGENDS_HTML)
+    assert stats["legend_chars_sent"] < stats["legend_chars_full"]
+    assert stats["estimated_prompt_tokens_saved"] > 0
@@ -1,13 +1,14 @@
 """Tests for main module CLI arguments and basic functionality."""
 
 import json
+import threading
 import zipfile
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from src.soda_curation.main import main
+from src.soda_curation.main import PipelineStep, StepFailure, _run_step_graph, main
 from src.soda_curation.pipeline.manuscript_structure.manuscript_structure import (
     ProcessingCost,
     TokenUsage,
@@ -369,3 +370,81 @@ def test_main_no_output_path_returns_json(
         assert isinstance(result, str)
         result_dict = json.loads(result)
         assert result_dict["manuscript_id"] == "EMBOJ-DUMMY-ZIP"
+
+
+def test_step_graph_overlaps_independent_steps():
+    """Independent steps run concurrently once their dependencies finish."""
+    barrier = threading.Barrier(2, timeout=5)
+
+    def wait_for_sibling(results):
+        # Deadlocks (and times out) unless both siblings run at the same time
+        barrier.wait()
+        return results["root"] + 1
+
+    steps = [
+        PipelineStep(name="root", runner=lambda r: 1, critical=True),
+        PipelineStep(
+            name="left", runner=wait_for_sibling, critical=True, requires=("root",)
+        ),
+        PipelineStep(
+            name="right", runner=wait_for_sibling, critical=True, requires=("root",)
+        ),
+        PipelineStep(
+            name="join",
+            runner=lambda r: r["left"] + r["right"],
+            critical=True,
+            requires=("left", "right"),
+        ),
+    ]
+
+    results = _run_step_graph(steps, run_id="test", recoverable_failures=[])
+
+    assert results == {"root": 1, "left": 2, "right": 2, "join": 4}
+
+
+def test_step_graph_recoverable_failure_keeps_dependents_running():
+    """A recoverable failure yields None and downstream steps still run."""
+    failures: list[StepFailure] = []
+
+    def fail(results):
+        raise RuntimeError("detector unavailable")
+
+    steps = [
+        PipelineStep(name="detect", runner=fail, critical=False),
+        PipelineStep(
+            name="match",
+            runner=lambda r: r["detect"] is None,
+            critical=False,
+            requires=("detect",),
+        ),
+    ]
+
+    results = _run_step_graph(steps, run_id="test", recoverable_failures=failures)
+
+    assert results == {"detect": None, "match": True}
+    assert failures == [StepFailure(step="detect", reason="detector unavailable")]
+
+
+def test_step_graph_critical_failure_stops_scheduling():
+    """A critical failure is re-raised and its dependents never start."""
+    downstream = MagicMock()
+
+    def fail(results):
+        raise ValueError("no sections")
+
+    steps = [
+        PipelineStep(name="sections", runner=fail, critical=True),
+        PipelineStep(
+            name="captions", runner=downstream, critical=True, requires=("sections",)
+        ),
+    ]
+
+    with pytest.raises(ValueError, match="no sections"):
+        _run_step_graph(steps, run_id="test", recoverable_failures=[])
+    downstream.assert_not_called()
+
+
+def test_step_graph_rejects_unknown_dependencies():
+    steps = [PipelineStep(name="a", runner=lambda r: 1, critical=True, requires=("b",))]
+    with pytest.raises(ValueError, match="unknown steps"):
+        _run_step_graph(steps, run_id="test", recoverable_failures=[])
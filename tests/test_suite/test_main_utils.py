@@ -5,10 +5,13 @@ import shutil
 import unittest
 import zipfile
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
+from rapidfuzz import fuzz
 
 from src.soda_curation._main_utils import (
+    NormalizedSource,
     calculate_hallucination_score,
     clean_original_source_data_files,
     cleanup_extract_dir,
@@ -226,10 +229,15 @@ def test_extraction_preserves_manuscript_structure(tmp_path):
     manuscript_dir = extract_dir / manuscript_id
     assert manuscript_dir.exists()
 
-    # Check paths relative to manuscript directory
-    assert (manuscript_dir / "Doc/manuscript.docx").exists()
-    assert (manuscript_dir / "graphic/Figure 1.tif").exists()
-    assert (manuscript_dir / "suppl_data/source.zip").exists()
+    # Files are extracted on first access, relative to the manuscript directory
+    for relative_path in (
+        "Doc/manuscript.docx",
+        "graphic/Figure 1.tif",
+        "suppl_data/source.zip",
+    ):
+        assert not (manuscript_dir / relative_path).exists()
+        assert extractor.get_full_path(relative_path) == manuscript_dir / relative_path
+        assert (manuscript_dir / relative_path).exists()
 
     # Verify file contents are preserved
     with open(manuscript_dir / "Doc/manuscript.docx") as f:
@@ -411,6 +419,61 @@ class TestHallucinationDetection(unittest.TestCase):
         self.assertEqual(calculate_hallucination_score(self.exact_match, ""), 1.0)
         self.assertEqual(calculate_hallucination_score("", ""), 1.0)
 
+    def test_normalized_source_matches_raw_source(self):
+        """A NormalizedSource gives the same results as the raw source text"""
+        source = NormalizedSource(self.source_text)
+        for extract in (
+            self.exact_match,
+            self.plain_text_match,
+            self.close_match,
+            self.hallucination,
+        ):
+            self.assertEqual(
+                exact_match_check(extract, source),
+                exact_match_check(extract, self.source_text),
+            )
+            self.assertEqual(
+                fuzzy_match_score(extract, source),
+                fuzzy_match_score(extract, self.source_text),
+            )
+            self.assertEqual(
+                calculate_hallucination_score(extract, source),
+                calculate_hallucination_score(extract, self.source_text),
+            )
+        self.assertEqual(calculate_hallucination_score("", source), 1.0)
+        self.assertEqual(
+            calculate_hallucination_score(self.exact_match, NormalizedSource("")), 1.0
+        )
+
+    def test_normalized_source_scores_windows_of_large_sources(self):
+        """Fuzzy scores on a large source match a full partial-ratio scan"""
+        filler = " ".join(
+            f"<p>Paragraph {i} describes unrelated experiment number {i}.</p>"
+            for i in range(400)
+        )
+        large_source = filler + self.source_text + filler
+        source = NormalizedSource(large_source)
+        self.assertGreater(len(source.text), 3 * len(self.plain_text_match))
+
+        with patch(
+            "src.soda_curation._main_utils.fuzz.partial_ratio",
+            wraps=fuzz.partial_ratio,
+        ) as partial_ratio:
+            score = fuzzy_match_score(self.plain_text_match, source)
+
+        # Only short candidate windows are scored for a near-verbatim extract
+        self.assertTrue(
+            all(
+                len(call.args[1]) < len(source.text)
+                for call in partial_ratio.call_args_list
+            )
+        )
+        self.assertEqual(score, fuzzy_match_score(self.plain_text_match, large_source))
+        self.assertEqual(
+            calculate_hallucination_score(self.hallucination, source),
+            calculate_hallucination_score(self.hallucination, large_source),
+        )
+
 
 class TestNormalizeFunction(unittest.TestCase):
     """Test the core normalize function with various options."""
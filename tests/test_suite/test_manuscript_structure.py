@@ -359,9 +359,13 @@ def test_extraction_preserves_manuscript_structure(temp_extract_dir, create_test
     manuscript_dir = extract_dir / MANUSCRIPT_ID
     assert manuscript_dir.exists()
 
-    # Check paths relative to manuscript directory
-    assert (manuscript_dir / "Doc" / f"{MANUSCRIPT_ID}Manuscript_TextIG.docx").exists()
-    assert (manuscript_dir / "graphic/FIGURE 1.tif").exists()
+    # Only the XML is extracted up front
+    docx_path = f"Doc/{MANUSCRIPT_ID}Manuscript_TextIG.docx"
+    assert not (manuscript_dir / docx_path).exists()
+
+    # Other files are extracted on first access, relative to the manuscript directory
+    assert extractor.get_full_path(docx_path) == manuscript_dir / docx_path
+    assert extractor.get_full_path("graphic/FIGURE 1.tif").exists()
 
     # Verify file contents
     assert (
@@ -503,8 +507,8 @@ def test_path_handling(temp_extract_dir, create_test_zip):
     # Test extraction structure
     manuscript_dir = temp_extract_dir / MANUSCRIPT_ID
     assert manuscript_dir.exists()
-    assert (manuscript_dir / "Doc").exists()
-    assert (manuscript_dir / "graphic").exists()
+    assert extractor.files.exists(structure.docx)
+    assert extractor.files.exists(structure.figures[0].img_files[0])
 
     # Test output paths don't have manuscript ID
     assert not structure.docx.startswith(f"{MANUSCRIPT_ID}/")
@@ -547,7 +551,7 @@ def test_path_cleaning(temp_extract_dir, create_test_zip):
             assert not img_file.startswith(f"{MANUSCRIPT_ID}/")
             assert img_file.startswith("graphic/")
             # Verify file exists in manuscript directory
-            full_path = extractor.manuscript_extract_dir / img_file
+            full_path = extractor.get_full_path(img_file)
             assert full_path.exists()
 
         # Check source data files
@@ -555,7 +559,7 @@ def test_path_cleaning(temp_extract_dir, create_test_zip):
             assert not sd_file.startswith(f"{MANUSCRIPT_ID}/")
             assert sd_file.startswith("suppl_data/")
             # Verify file exists in manuscript directory
-            full_path = extractor.manuscript_extract_dir / sd_file
+            full_path = extractor.get_full_path(sd_file)
             assert full_path.exists()
 
     # Test DOCX path
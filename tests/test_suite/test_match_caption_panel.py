@@ -4,6 +4,8 @@ Tests for the match_caption_panel modules, focusing on data preservation and enr
 
 import base64
 import io
+import threading
+import time
 from typing import List
 from unittest.mock import Mock, patch
 
@@ -18,12 +20,17 @@ from src.soda_curation.pipeline.manuscript_structure.manuscript_structure import
     ZipStructure,
 )
 from src.soda_curation.pipeline.match_caption_panel.match_caption_panel_base import (
+    AnnotatedFigureObject,
     MatchPanelCaption,
+    NumberedPanelObject,
     PanelObject,
 )
 from src.soda_curation.pipeline.match_caption_panel.match_caption_panel_openai import (
     MatchPanelCaptionOpenAI,
 )
+from src.soda_curation.pipeline.match_caption_panel.object_detection import (
+    draw_numbered_boxes,
+)
 
 
 # Add these classes at module level
@@ -235,6 +242,196 @@ class TestMatchPanelCaptionBase:
             assert preserved_panel_b.sd_files == original_panel_b.sd_files
             assert preserved_panel_b.ai_response == original_panel_b.ai_response
 
+    def test_detection_prepass_is_reused_by_process_figures(
+        self,
+        mock_config,
+        mock_prompt_handler,
+        sample_zip_structure,
+        mock_image,
+        tmp_path,
+    ):
+        """Test that detect_figure_panels results are consumed by process_figures."""
+        manuscript_dir = tmp_path / "TEST-ID"
+        manuscript_dir.mkdir(parents=True)
+        (manuscript_dir / "figure1.png").touch()
+
+        class TestMatchPanelCaption(MatchPanelCaption):
+            def _validate_config(self):
+                pass
+
+            def _match_panel_caption(self, panel_image, figure_caption):
+                return PanelObject(panel_label="A", panel_caption="New caption A")
+
+        with patch(
+            "src.soda_curation.pipeline.match_caption_panel.match_caption_panel_base.convert_to_pil_image"
+        ) as mock_convert:
+            mock_convert.return_value = (mock_image, "test.png")
+            mock_detector = Mock()
+            mock_detector.detect_panels.return_value = [
+                {"bbox": [0.1, 0.1, 0.3, 0.3], "confidence": 0.9}
+            ]
+
+            matcher = TestMatchPanelCaption(
+                mock_config,
+                mock_prompt_handler,
+                extract_dir=manuscript_dir,
+                object_detector=mock_detector,
+            )
+            assert matcher.detect_figure_panels(sample_zip_structure) == 1
+            result = matcher.process_figures(sample_zip_structure)
+
+            # Conversion and detection ran once, in the pre-pass
+            assert mock_convert.call_count == 1
+            assert mock_detector.detect_panels.call_count == 1
+            assert result.figures[0].panels[0].panel_label == "A"
+
+    def test_process_figures_batches_detection_before_matching(
+        self, mock_config, mock_prompt_handler, mock_image, tmp_path
+    ):
+        """Test that all figures are detected in one batch before any matching call."""
+        manuscript_dir = tmp_path / "TEST-ID"
+        manuscript_dir.mkdir(parents=True)
+        figures = []
+        for index in (1, 2):
+            (manuscript_dir / f"figure{index}.png").touch()
+            figures.append(
+                Figure(
+                    figure_label=f"Figure {index}",
+                    figure_caption=f"Caption of figure {index}",
+                    img_files=[f"figure{index}.png"],
+                    sd_files=[],
+                )
+            )
+        events = []
+
+        class TestMatchPanelCaption(MatchPanelCaption):
+            def _validate_config(self):
+                pass
+
+            def _match_panel_caption(self, panel_image, figure_caption):
+                events.append("match")
+                return PanelObject(panel_label="A", panel_caption="New caption A")
+
+        def detect_panels_batch(images):
+            events.append(("detect", len(images)))
+            return [[{"bbox": [0.1, 0.1, 0.3, 0.3], "confidence": 0.9}]] * len(images)
+
+        with patch(
+            "src.soda_curation.pipeline.match_caption_panel.match_caption_panel_base.convert_to_pil_image"
+        ) as mock_convert:
+            mock_convert.return_value = (mock_image, "test.png")
+            mock_detector = Mock()
+            mock_detector.detect_panels_batch.side_effect = detect_panels_batch
+
+            matcher = TestMatchPanelCaption(
+                mock_config,
+                mock_prompt_handler,
+                extract_dir=manuscript_dir,
+                object_detector=mock_detector,
+            )
+            result = matcher.process_figures(ZipStructure(figures=figures))
+
+        assert events == [("detect", 2), "match", "match"]
+        mock_detector.detect_panels.assert_not_called()
+        assert [len(figure.panels) for figure in result.figures] == [1, 1]
+
+    def test_panel_crops_matched_concurrently_in_detection_order(
+        self, mock_config, mock_prompt_handler, mock_image, tmp_path
+    ):
+        """Test that crop requests overlap and matches keep detection order."""
+        manuscript_dir = tmp_path / "TEST-ID"
+        manuscript_dir.mkdir(parents=True)
+        mock_config["pipeline"]["match_caption_panel"]["openai"]["max_workers"] = 3
+        # Every request waits until all three are in flight
+        barrier = threading.Barrier(3, timeout=5)
+        finished = []
+
+        class TestMatchPanelCaption(MatchPanelCaption):
+            def _validate_config(self):
+                pass
+
+            def _match_panel_caption(self, panel_image, figure_caption):
+                barrier.wait()
+                time.sleep(0.05 * (3 - int(panel_image)))
+                finished.append(panel_image)
+                return PanelObject(
+                    panel_label="ABC"[int(panel_image)], panel_caption=""
+                )
+
+        figure = Figure(
+            figure_label="Figure 1",
+            figure_caption="Figure 1. (A) One. (B) Two. (C) Three.",
+            img_files=["figure1.png"],
+            sd_files=[],
+        )
+        detections = [
+            {"bbox": [0.0, 0.0, 0.3, 0.3], "confidence": 0.9},
+            {"bbox": [0.3, 0.0, 0.6, 0.3], "confidence": 0.9},
+            {"bbox": [0.6, 0.0, 0.9, 0.3], "confidence": 0.9},
+        ]
+        matcher = TestMatchPanelCaption(
+            mock_config,
+            mock_prompt_handler,
+            extract_dir=manuscript_dir,
+            object_detector=Mock(),
+        )
+        with patch.object(
+            MatchPanelCaption, "_extract_panel_image", side_effect=["0", "1", "2"]
+        ):
+            matches = matcher._match_panels_per_crop(figure, mock_image, detections)
+
+        assert finished == ["2", "1", "0"]
+        assert [match["detection_idx"] for match in matches] == [0, 1, 2]
+        assert [match["panel_object"].panel_label for match in matches] == [
+            "A",
+            "B",
+            "C",
+        ]
+
+    def test_figure_images_decoded_once_for_matching_and_qc(
+        self,
+        mock_config,
+        mock_prompt_handler,
+        sample_zip_structure,
+        mock_image,
+        tmp_path,
+    ):
+        """Test that QC payloads reuse the image decoded for matching."""
+        manuscript_dir = tmp_path / "TEST-ID"
+        manuscript_dir.mkdir(parents=True)
+        (manuscript_dir / "figure1.png").touch()
+
+        class TestMatchPanelCaption(MatchPanelCaption):
+            def _validate_config(self):
+                pass
+
+            def _match_panel_caption(self, panel_image, figure_caption):
+                return PanelObject(panel_label="A", panel_caption="New caption A")
+
+        with patch(
+            "src.soda_curation.pipeline.match_caption_panel.match_caption_panel_base.convert_to_pil_image"
+        ) as mock_convert:
+            mock_convert.return_value = (mock_image, "test.png")
+            mock_detector = Mock()
+            mock_detector.detect_panels.return_value = [
+                {"bbox": [0.1, 0.1, 0.3, 0.3], "confidence": 0.9}
+            ]
+
+            matcher = TestMatchPanelCaption(
+                mock_config,
+                mock_prompt_handler,
+                extract_dir=manuscript_dir,
+                object_detector=mock_detector,
+            )
+            matcher.process_figures(sample_zip_structure)
+            payloads = matcher.get_figure_images_and_captions()
+            assert matcher.get_figure_images_and_captions() == payloads
+
+            assert mock_convert.call_count == 1
+            assert [label for label, _, _ in payloads] == ["Figure 1"]
+            assert payloads[0][1]
+            assert matcher.image_store.stats()["misses"] == 1
+
     def test_process_figure(
         self, mock_config, mock_prompt_handler, mock_image, tmp_path
     ):
@@ -1086,3 +1283,167 @@ class TestPanelPreservation:
                 assert (
                     panel.ai_response == original_panel.ai_response
                 ), f"AI response for panel {label} should be preserved"
+
+
+@pytest.fixture
+def annotated_config(mock_config):
+    """Configuration selecting the annotated-figure matching strategy."""
+    mock_config["pipeline"]["match_caption_panel"]["strategy"] = "annotated_figure"
+    mock_config["pipeline"]["match_caption_panel_annotated"] = {
+        "openai": {"max_tokens": 4096}
+    }
+    return mock_config
+
+
+class TestAnnotatedFigureStrategy:
+    """Test the single-call annotated-figure matching strategy."""
+
+    DETECTIONS = [
+        {"bbox": [0.05, 0.05, 0.45, 0.45], "confidence": 0.9},
+        {"bbox": [0.55, 0.05, 0.95, 0.45], "confidence": 0.1},
+        {"bbox": [0.05, 0.55, 0.45, 0.95], "confidence": 0.8},
+        {"bbox": [0.55, 0.55, 0.95, 0.95], "confidence": 0.7},
+    ]
+
+    def _figure(self, manuscript_dir):
+        (manuscript_dir / "figure1.png").touch()
+        return Figure(
+            figure_label="Figure 1",
+            figure_caption="Figure 1. (A) Control. (B) Treated. (C) Quantification.",
+            img_files=["figure1.png"],
+            sd_files=[],
+        )
+
+    def _process(self, matcher_class, config, prompt_handler, image, manuscript_dir):
+        figure = self._figure(manuscript_dir)
+        mock_detector = Mock()
+        mock_detector.detect_panels_batch.return_value = [self.DETECTIONS]
+        with patch(
+            "src.soda_curation.pipeline.match_caption_panel.match_caption_panel_base.convert_to_pil_image"
+        ) as mock_convert:
+            mock_convert.return_value = (image, "figure1.png")
+            matcher = matcher_class(
+                config,
+                prompt_handler,
+                extract_dir=manuscript_dir,
+                object_detector=mock_detector,
+            )
+            return matcher.process_figures(ZipStructure(figures=[figure]))
+
+    def test_draw_numbered_boxes(self):
+        image = Image.new("RGB", (400, 200), "white")
+
+        annotated = draw_numbered_boxes(
+            image, [[0.1, 0.1, 0.4, 0.9], [0.6, 0.1, 0.9, 0.9]]
+        )
+
+        assert annotated.size == image.size
+        assert image.getpixel((40, 100)) == (255, 255, 255)
+        # Box outlines are drawn on the copy, the interior is left untouched
+        assert annotated.getpixel((40, 100)) != (255, 255, 255)
+        assert annotated.getpixel((100, 150)) == (255, 255, 255)
+        # Number tags sit at the top-right corner of each box
+        assert annotated.getpixel((155, 25)) != (255, 255, 255)
+        assert annotated.getpixel((355, 25)) != (255, 255, 255)
+
+    def test_box_numbers_map_to_detections(
+        self, annotated_config, mock_prompt_handler, mock_image, tmp_path
+    ):
+        calls = []
+
+        class TestMatchPanelCaption(MatchPanelCaption):
+            def _validate_config(self):
+                pass
+
+            def _match_panel_caption(self, panel_image, figure_caption):
+                raise AssertionError("per-crop matching should not be used")
+
+            def _match_annotated_figure(self, encoded_image, figure_caption, count):
+                calls.append(count)
+                # Box 2 is answered twice and box 3 not at all
+                return AnnotatedFigureObject(
+                    panels=[
+                        NumberedPanelObject(
+                            box_number=2, panel_label="B", panel_caption="Treated"
+                        ),
+                        NumberedPanelObject(
+                            box_number=1, panel_label="A", panel_caption="Control"
+                        ),
+                        NumberedPanelObject(
+                            box_number=2, panel_label="C", panel_caption="Other"
+                        ),
+                        NumberedPanelObject(
+                            box_number=7, panel_label="D", panel_caption="Unknown"
+                        ),
+                    ]
+                )
+
+        result = self._process(
+            TestMatchPanelCaption,
+            annotated_config,
+            mock_prompt_handler,
+            mock_image,
+            tmp_path,
+        )
+
+        # One call for the three confident detections
+        assert calls == [3]
+        bboxes = {
+            panel.panel_label: panel.panel_bbox for panel in result.figures[0].panels
+        }
+        assert bboxes["A"] == self.DETECTIONS[0]["bbox"]
+        assert bboxes["B"] == self.DETECTIONS[2]["bbox"]
+        # The unanswered box is kept as an unlabeled detection
+        assert self.DETECTIONS[3]["bbox"] in bboxes.values()
+        assert self.DETECTIONS[1]["bbox"] not in bboxes.values()
+
+    def test_falls_back_to_per_crop_matching(
+        self, annotated_config, mock_prompt_handler, mock_image, tmp_path
+    ):
+        crops = []
+
+        class TestMatchPanelCaption(MatchPanelCaption):
+            def _validate_config(self):
+                pass
+
+            def _match_panel_caption(self, panel_image, figure_caption):
+                crops.append(panel_image)
+                label = "ABC"[len(crops) - 1]
+                return PanelObject(panel_label=label, panel_caption=label)
+
+        result = self._process(
+            TestMatchPanelCaption,
+            annotated_config,
+            mock_prompt_handler,
+            mock_image,
+            tmp_path,
+        )
+
+        assert len(crops) == 3
+        assert sorted(panel.panel_label for panel in result.figures[0].panels) == [
+            "A",
+            "B",
+            "C",
+        ]
+
+    def test_invalid_strategy_configuration(
+        self, mock_config, mock_prompt_handler, tmp_path
+    ):
+        class TestMatchPanelCaption(MatchPanelCaption):
+            def _validate_config(self):
+                pass
+
+            def _match_panel_caption(self, panel_image, figure_caption):
+                pass
+
+        mock_config["pipeline"]["match_caption_panel"]["strategy"] = "annotated_figure"
+        with pytest.raises(ValueError, match="match_caption_panel_annotated"):
+            TestMatchPanelCaption(
+                mock_config, mock_prompt_handler, tmp_path, object_detector=Mock()
+            )
+
+        mock_config["pipeline"]["match_caption_panel"]["strategy"] = "one_shot"
+        with pytest.raises(ValueError, match="Invalid match_caption_panel strategy"):
+            TestMatchPanelCaption(
+                mock_config, mock_prompt_handler, tmp_path, object_detector=Mock()
+            )
@@ -77,3 +77,36 @@ class TestModelAPI:
             api.generate_response(
                 prompt_config={"prompts": {"system": "", "user": ""}},
             )
+
+    @patch("src.soda_curation.qc.model_api.build_qc_provider")
+    def test_panel_constraint_follows_stable_system_prompt(
+        self, mock_build_provider, model_config
+    ):
+        mock_provider = MagicMock()
+        mock_provider.generate.return_value = QCProviderResponse(
+            content="{}",
+            parsed=None,
+            model="claude-sonnet-4-6",
+            usage={
+                "prompt_tokens": 1200,
+                "completion_tokens": 10,
+                "total_tokens": 1210,
+                "cache_read_tokens": 1000,
+                "cache_write_tokens": 0,
+            },
+        )
+        mock_build_provider.return_value = mock_provider
+
+        api = ModelAPI(model_config)
+        api.generate_response(
+            encoded_image="base64encodedimage",
+            caption="Test caption",
+            prompt_config={"prompts": {"system": "Test instructions", "user": "u"}},
+            expected_panels=["A", "B"],
+        )
+
+        messages = mock_provider.generate.call_args.args[0].messages
+        assert messages[0] == {"role": "system", "content": "Test instructions"}
+        assert messages[1]["role"] == "system"
+        assert "['A', 'B']" in messages[1]["content"]
+        assert api.token_usage.prompt_cache_read_tokens == 1000
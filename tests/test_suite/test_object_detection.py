@@ -12,6 +12,7 @@ from PIL import Image, UnidentifiedImageError
 
 from src.soda_curation.pipeline.match_caption_panel.object_detection import (
     ObjectDetection,
+    OnnxObjectDetection,
     _tiff_array_to_rgb_uint8,
     convert_and_resize_image,
     convert_eps_to_png,
@@ -20,8 +21,14 @@ from src.soda_curation.pipeline.match_caption_panel.object_detection import (
     convert_to_pil_image,
     create_object_detection,
     create_standard_thumbnail,
+    decode_yolo_output,
     fallback_ghostscript_conversion,
+    intrinsic_page_size,
+    letterbox_image,
+    onnx_model_path_for,
+    read_tiff_downsampled,
     scale_down_large_image,
+    target_raster_dpi,
 )
 
 
@@ -109,7 +116,9 @@ def test_convert_to_pil_image_pdf(mock_pdf2image, mock_image, mock_os):
         _, new_file_path = convert_to_pil_image("test.pdf")
 
     # Verify that create_standard_thumbnail was called correctly
-    mock_thumbnail.assert_called_once_with("/app/test.pdf", "/app/test.png", dpi=300)
+    mock_thumbnail.assert_called_once_with(
+        "/app/test.pdf", "/app/test.png", max_size=2048, dpi=300
+    )
 
     # Verify the output paths
     assert new_file_path == "/app/test.png"
@@ -650,6 +659,97 @@ def test_convert_tiff_with_tifffile_roundtrip(tmp_path):
     assert pil.mode == "RGB"
 
 
+@pytest.mark.parametrize(
+    "write_kwargs",
+    [
+        {"tile": (64, 64), "compression": "zlib"},
+        {"rowsperstrip": 16, "compression": "zlib"},
+        {},  # uncompressed, memory-mapped
+    ],
+)
+def test_read_tiff_downsampled_matches_area_resize(tmp_path, write_kwargs):
+    """Tiles, strips and memory-mapped rows average to the same small image."""
+    tifffile = pytest.importorskip("tifffile")
+    arr = np.random.randint(0, 255, (210, 300, 3), dtype=np.uint8)
+    tiff_path = tmp_path / "large.tif"
+    tifffile.imwrite(tiff_path, arr, **write_kwargs)
+
+    rgb = read_tiff_downsampled(str(tiff_path), max_size=100)
+
+    expected = cv2.resize(arr, (100, 70), interpolation=cv2.INTER_AREA)
+    assert rgb.shape == (70, 100, 3)
+    assert rgb.dtype == np.uint8
+    assert np.abs(rgb.astype(int) - expected).max() <= 1
+
+
+def test_read_tiff_downsampled_uses_pyramid_level(tmp_path):
+    """The smallest SubIFD level covering max_size is read, not the base image."""
+    tifffile = pytest.importorskip("tifffile")
+    tiff_path = tmp_path / "pyramid.tif"
+    with tifffile.TiffWriter(tiff_path) as tif:
+        tif.write(np.full((400, 400), 10, np.uint8), subifds=2, tile=(64, 64))
+        tif.write(np.full((200, 200), 20, np.uint8), subfiletype=1, tile=(64, 64))
+        tif.write(np.full((100, 100), 30, np.uint8), subfiletype=1, tile=(64, 64))
+
+    assert read_tiff_downsampled(str(tiff_path), max_size=150)[0, 0, 0] == 20
+    assert read_tiff_downsampled(str(tiff_path), max_size=100)[0, 0, 0] == 30
+    assert read_tiff_downsampled(str(tiff_path), max_size=50).shape == (50, 50, 3)
+
+
+def test_read_tiff_downsampled_planar_uint16(tmp_path):
+    """Separate-plane 16-bit samples are scaled like convert_tiff_with_tifffile."""
+    tifffile = pytest.importorskip("tifffile")
+    planes = np.zeros((3, 40, 60), dtype=np.uint16)
+    planes[0] = 65535
+    tiff_path = tmp_path / "planar.tif"
+    tifffile.imwrite(tiff_path, planes, planarconfig="separate", photometric="rgb")
+
+    rgb = read_tiff_downsampled(str(tiff_path), max_size=30)
+
+    assert rgb.shape == (20, 30, 3)
+    assert tuple(rgb[0, 0]) == (255, 0, 0)
+
+
+def test_create_standard_thumbnail_large_tiff_skips_full_decode(tmp_path):
+    """Large TIFFs bypass OpenCV and come out at most max_size pixels."""
+    tifffile = pytest.importorskip("tifffile")
+    tiff_path = tmp_path / "large.tif"
+    tifffile.imwrite(
+        tiff_path, np.zeros((300, 120), np.uint8), tile=(64, 64), compression="zlib"
+    )
+    out_png = tmp_path / "out.png"
+
+    with patch(
+        "src.soda_curation.pipeline.match_caption_panel.object_detection.LARGE_TIFF_PIXELS",
+        1000,
+    ), patch(
+        "src.soda_curation.pipeline.match_caption_panel.object_detection.convert_tiff_with_cv2"
+    ) as mock_cv2:
+        create_standard_thumbnail(str(tiff_path), str(out_png), max_size=100)
+
+    mock_cv2.assert_not_called()
+    assert Image.open(out_png).size == (40, 100)
+
+
+def test_scale_down_large_tiff_reads_reduced_resolution(tmp_path):
+    tifffile = pytest.importorskip("tifffile")
+    tiff_path = tmp_path / "large.tif"
+    tifffile.imwrite(tiff_path, np.zeros((400, 200, 3), np.uint8), tile=(64, 64))
+
+    with patch(
+        "src.soda_curation.pipeline.match_caption_panel.object_detection.LARGE_TIFF_PIXELS",
+        1000,
+    ), patch(
+        "src.soda_curation.pipeline.match_caption_panel.object_detection.cv2.imread"
+    ) as mock_imread:
+        scaled_path = scale_down_large_image(str(tiff_path), max_pixels=20_000)
+
+    mock_imread.assert_not_called()
+    height, width = tifffile.imread(scaled_path).shape[:2]
+    assert width * height <= 20_000
+    assert (width, height) == (100, 200)
+
+
 def test_fallback_ghostscript_conversion(mock_subprocess):
     """Test the fallback ghostscript conversion function."""
     mock_subprocess.run.return_value = Mock(returncode=0)
@@ -921,3 +1021,240 @@ def test_convert_to_pil_image_with_new_functions():
         assert isinstance(result, Image.Image)
         assert path == "/app/test.png"
         mock_thumbnail.assert_called_once()
+
+
+def make_result(boxes, confidences):
+    result = Mock()
+    result.boxes.xyxyn.tolist.return_value = boxes
+    result.boxes.conf = confidences
+    return result
+
+
+def test_detect_panels_batch_chunks_images_in_order(mock_yolo):
+    """Images are sent to the model in batch_size chunks and results keep input order."""
+    od = ObjectDetection("test_model.pt", settings={"batch_size": 2})
+    images = [Image.new("RGB", (10, 10)) for _ in range(3)]
+    od.model.side_effect = lambda batch, **kwargs: [
+        make_result([[0.1 * i, 0.1, 0.2, 0.2]], [0.9]) for i in range(len(batch))
+    ]
+
+    detections = od.detect_panels_batch(images)
+
+    assert od.model.call_count == 2
+    assert [len(call.args[0]) for call in od.model.call_args_list] == [2, 1]
+    assert len(detections) == 3
+    assert detections[1][0]["bbox"] == [0.1, 0.1, 0.2, 0.2]
+    assert detections[2][0]["bbox"] == [0.0, 0.1, 0.2, 0.2]
+
+
+def test_detect_panels_batch_falls_back_per_image(mock_yolo):
+    """A failing batch call is retried one image at a time."""
+    od = ObjectDetection("test_model.pt", settings={"batch_size": 2})
+    images = [Image.new("RGB", (10, 10)) for _ in range(2)]
+
+    def model(inputs, **kwargs):
+        if isinstance(inputs, list):
+            raise RuntimeError("batch inference failed")
+        return [make_result([[0.1, 0.1, 0.5, 0.5]], [0.8])]
+
+    od.model.side_effect = model
+
+    detections = od.detect_panels_batch(images)
+
+    assert od.model.call_count == 3
+    assert detections == [
+        [{"bbox": [0.1, 0.1, 0.5, 0.5], "confidence": 0.8}],
+        [{"bbox": [0.1, 0.1, 0.5, 0.5], "confidence": 0.8}],
+    ]
+
+
+def test_create_object_detection_reads_pipeline_settings():
+    """Detection settings under pipeline.object_detection reach the detector."""
+    config = {
+        "pipeline": {
+            "object_detection": {
+                "model_path": "custom_model.pt",
+                "image_size": 640,
+                "batch_size": 4,
+            }
+        }
+    }
+    with patch(
+        "src.soda_curation.pipeline.match_caption_panel.object_detection.Path.exists",
+        return_value=True,
+    ), patch("src.soda_curation.pipeline.match_caption_panel.object_detection.YOLOv10"):
+        od = create_object_detection(config)
+
+    assert od.settings["image_size"] == 640
+    assert od.settings["batch_size"] == 4
+    assert od.settings["confidence_threshold"] == 0.25
+    assert od.model_path.endswith("custom_model.pt")
+
+
+def test_decode_yolo_output_end_to_end_head():
+    """NMS-free YOLOv10 output is filtered by confidence and sorted by score."""
+    prediction = np.zeros((300, 6), dtype=np.float32)
+    prediction[0] = [10, 10, 50, 50, 0.4, 0]
+    prediction[1] = [60, 60, 90, 90, 0.9, 0]
+    prediction[2] = [0, 0, 5, 5, 0.1, 0]
+
+    boxes, scores = decode_yolo_output(prediction, conf=0.25, iou=0.1, max_det=30)
+
+    assert scores.tolist() == pytest.approx([0.9, 0.4])
+    assert boxes[0].tolist() == [60, 60, 90, 90]
+
+
+def test_decode_yolo_output_classic_head_applies_nms():
+    """Anchor-based output is decoded from cxcywh and overlapping boxes suppressed."""
+    prediction = np.array(
+        [
+            [30.0, 31.0, 80.0],  # cx
+            [30.0, 31.0, 80.0],  # cy
+            [20.0, 20.0, 10.0],  # w
+            [20.0, 20.0, 10.0],  # h
+            [0.9, 0.8, 0.7],  # class score
+        ],
+        dtype=np.float32,
+    )
+
+    boxes, scores = decode_yolo_output(prediction, conf=0.25, iou=0.5, max_det=30)
+
+    assert scores.tolist() == pytest.approx([0.9, 0.7])
+    assert boxes[0].tolist() == [20, 20, 40, 40]
+
+
+def test_letterbox_image_pads_to_square():
+    image = np.zeros((100, 200, 3), dtype=np.uint8)
+
+    padded, ratio, (left, top) = letterbox_image(image, 64)
+
+    assert padded.shape == (64, 64, 3)
+    assert ratio == pytest.approx(0.32)
+    assert (left, top) == (0, 16)
+    assert padded[0, 0].tolist() == [114, 114, 114]
+
+
+def test_onnx_model_path_for():
+    assert onnx_model_path_for("data/models/panel.pt") == "data/models/panel.onnx"
+    assert (
+        onnx_model_path_for("data/models/panel.pt", int8=True)
+        == "data/models/panel.int8.onnx"
+    )
+    assert onnx_model_path_for("custom.int8.onnx") == "custom.int8.onnx"
+    assert onnx_model_path_for("custom.onnx", int8=True) == "custom.int8.onnx"
+
+
+@pytest.fixture
+def mock_onnx_session():
+    """Fixture to mock onnxruntime with a static 1x3x64x64 end-to-end model."""
+    with patch(
+        "src.soda_curation.pipeline.match_caption_panel.object_detection.ort"
+    ) as mock_ort:
+        session = mock_ort.InferenceSession.return_value
+        session.get_inputs.return_value = [Mock(shape=[1, 3, 64, 64])]
+        session.get_inputs.return_value[0].name = "images"
+        output = np.zeros((1, 300, 6), dtype=np.float32)
+        output[0, 0] = [0, 16, 32, 48, 0.9, 0]
+        session.run.return_value = [output]
+        yield session
+
+
+def test_onnx_detect_panels_maps_boxes_to_image(mock_onnx_session):
+    """Boxes in letterboxed model pixels come back normalized to the figure."""
+    od = OnnxObjectDetection("model.onnx")
+
+    detections = od.detect_panels(Image.new("RGB", (200, 100)))
+
+    tensor = mock_onnx_session.run.call_args.args[1]["images"]
+    assert tensor.shape == (1, 3, 64, 64)
+    assert tensor.dtype == np.float32
+    assert detections == [
+        {"bbox": pytest.approx([0.0, 0.0, 0.5, 1.0]), "confidence": pytest.approx(0.9)}
+    ]
+
+
+def test_onnx_detect_panels_batch_respects_static_batch(mock_onnx_session):
+    """A model exported with batch size 1 is run once per figure."""
+    od = OnnxObjectDetection("model.onnx", settings={"batch_size": 4})
+
+    detections = od.detect_panels_batch([Image.new("RGB", (200, 100))] * 3)
+
+    assert mock_onnx_session.run.call_count == 3
+    assert [len(found) for found in detections] == [1, 1, 1]
+
+
+def test_create_object_detection_onnx_backend():
+    """backend: onnx loads the INT8 export next to the weights when requested."""
+    config = {
+        "pipeline": {
+            "object_detection": {
+                "model_path": "data/models/panel.pt",
+                "backend": "onnx",
+                "onnx_int8": True,
+                "onnx_threads": 2,
+            }
+        }
+    }
+    with patch(
+        "src.soda_curation.pipeline.match_caption_panel.object_detection.Path.exists",
+        return_value=True,
+    ), patch(
+        "src.soda_curation.pipeline.match_caption_panel.object_detection.OnnxObjectDetection"
+    ) as mock_onnx, patch(
+        "src.soda_curation.pipeline.match_caption_panel.object_detection.YOLOv10"
+    ) as mock_yolo_loader:
+        create_object_detection(config)
+
+    mock_yolo_loader.assert_not_called()
+    assert mock_onnx.call_args.args[0] == "/app/data/models/panel.int8.onnx"
+    assert mock_onnx.call_args.kwargs["num_threads"] == 2
+
+
+def test_create_object_detection_unknown_backend():
+    config = {"object_detection": {"backend": "tensorrt"}}
+    with pytest.raises(ValueError, match="Unknown object detection backend"):
+        create_object_detection(config)
+
+
+def test_target_raster_dpi_from_eps_bounding_box(tmp_path):
+    """A 40 inch wide EPS page is rendered at the DPI giving 2048 px, not 300."""
+    eps = tmp_path / "figure.eps"
+    eps.write_bytes(
+        b"%!PS-Adobe-3.0 EPSF-3.0\n%%BoundingBox: 0 0 2880 2160\n"
+        b"%%HiResBoundingBox: 0 0 2880.0 2160.0\n%%EndComments\nshowpage\n"
+    )
+
+    assert intrinsic_page_size(str(eps)) == (2880.0, 2160.0)
+    assert target_raster_dpi(str(eps), max_size=2048, dpi=300) == 52
+
+
+def test_target_raster_dpi_reads_atend_bounding_box(tmp_path):
+    eps = tmp_path / "figure.eps"
+    eps.write_bytes(
+        b"%!PS-Adobe-3.0 EPSF-3.0\n%%BoundingBox: (atend)\n%%EndComments\n"
+        b"showpage\n%%Trailer\n%%BoundingBox: 0 0 14400 720\n"
+    )
+
+    assert target_raster_dpi(str(eps), max_size=2048, dpi=300) == 11
+
+
+def test_target_raster_dpi_never_exceeds_requested_dpi(tmp_path):
+    pdf = tmp_path / "figure.pdf"
+    Image.new("RGB", (360, 180)).save(pdf, resolution=72)
+
+    assert intrinsic_page_size(str(pdf)) == (360.0, 180.0)
+    assert target_raster_dpi(str(pdf), max_size=2048, dpi=300) == 300
+    assert target_raster_dpi(str(tmp_path / "missing.pdf"), dpi=300) == 300
+
+
+def test_create_standard_thumbnail_renders_pdf_at_target_dpi(tmp_path):
+    pdf = tmp_path / "figure.pdf"
+    Image.new("RGB", (2880, 1440)).save(pdf, resolution=72)
+
+    with patch("pdf2image.convert_from_path") as mock_convert_pdf, patch(
+        "PIL.Image.Image.save"
+    ):
+        mock_convert_pdf.return_value = [Mock(spec=Image.Image)]
+        create_standard_thumbnail(str(pdf), str(tmp_path / "figure.png"))
+
+    mock_convert_pdf.assert_called_once_with(str(pdf), dpi=52)
@@ -0,0 +1,179 @@
+"""Tests for prompt-prefix layout and OpenAI cached-token accounting."""
+
+from string import Template
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.soda_curation.pipeline.cost_tracking import (
+    calculate_cost,
+    prompt_cache_tokens,
+    update_token_usage,
+)
+from src.soda_curation.pipeline.extract_captions.extract_captions_openai import (
+    CaptionExtraction,
+    FigureCaptionExtractorOpenAI,
+    PanelExtraction,
+)
+from src.soda_curation.pipeline.manuscript_structure.manuscript_structure import (
+    Figure,
+    ProcessingCost,
+    TokenUsage,
+    ZipStructure,
+)
+from src.soda_curation.pipeline.prompt_handler import PromptHandler
+from src.soda_curation.pipeline.response_cache import response_to_record
+
+PIPELINE_CONFIG = {
+    "extract_caption_title": {
+        "openai": {
+            "prompts": {
+                "system": "Extract the caption of a figure.",
+                "user": "Find $figure_label in these legends:\n$figure_captions",
+            }
+        }
+    }
+}
+
+
+def openai_usage(prompt_tokens, completion_tokens, cached_tokens):
+    return SimpleNamespace(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        total_tokens=prompt_tokens + completion_tokens,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=cached_tokens),
+    )
+
+
+def test_shared_variables_lead_the_user_message():
+    layout = PromptHandler(PIPELINE_CONFIG).get_prompt_layout(
+        "extract_caption_title",
+        {"figure_label": "Figure 2", "figure_captions": "Figure 1. ... Figure 2. ..."},
+        shared={"figure_captions": "Figure legends"},
+    )
+
+    system, user = layout.messages()
+
+    assert system == {"role": "system", "content": "Extract the caption of a figure."}
+    assert user["content"].startswith("Figure legends:\n\nFigure 1. ... Figure 2. ...")
+    assert user["content"].endswith(
+        'Find Figure 2 in these legends:\n(see "Figure legends" at the start of '
+        "this message)"
+    )
+
+
+def test_default_caption_prompt_keeps_the_template_order_for_legend_slices(
+    monkeypatch,
+):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    pipeline = {
+        **PIPELINE_CONFIG,
+        "extract_panel_sequence": {
+            "openai": {
+                "prompts": {"system": "Split panels.", "user": "$figure_caption"}
+            }
+        },
+    }
+    legends = "".join(
+        f"<p><strong>Figure {n}.</strong> Legend {n}. {'Panel text. ' * 40}</p>"
+        for n in (1, 2)
+    )
+    with patch("openai.OpenAI"):
+        extractor = FigureCaptionExtractorOpenAI(
+            {"pipeline": pipeline}, PromptHandler(pipeline)
+        )
+    extractor.extract_figure_caption = MagicMock(wraps=extractor.extract_figure_caption)
+    extractor.extract_figure_panels = MagicMock(
+        return_value=(PanelExtraction(figure_label="", panels=[]), TokenUsage())
+    )
+    message = SimpleNamespace(
+        parsed=CaptionExtraction(
+            figure_label="Figure 1",
+            caption_title="Title",
+            figure_caption="A) Panel.",
+            is_verbatim=True,
+        )
+    )
+    response = SimpleNamespace(
+        choices=[SimpleNamespace(message=message)], usage=openai_usage(10, 5, 0)
+    )
+    structure = ZipStructure(
+        figures=[
+            Figure(figure_label=f"Figure {n}", img_files=[], sd_files=[])
+            for n in (1, 2)
+        ],
+        cost=ProcessingCost(),
+    )
+
+    with patch(
+        "src.soda_curation.pipeline.extract_captions.extract_captions_openai."
+        "call_openai_with_fallback",
+        return_value=response,
+    ) as call:
+        extractor.extract_individual_captions(legends, structure)
+
+    template = Template(
+        PIPELINE_CONFIG["extract_caption_title"]["openai"]["prompts"]["user"]
+    )
+    sent = {
+        c.args[0]: c.args[1] for c in extractor.extract_figure_caption.call_args_list
+    }
+    assert call.call_count == 2
+    for request in call.call_args_list:
+        label = request.kwargs["request_metadata"]["figure_label"]
+        assert sent[label] != legends
+        # Byte for byte the prompt the template renders
+        assert request.kwargs["messages"][1]["content"] == template.substitute(
+            figure_label=label, figure_captions=sent[label]
+        )
+
+
+def test_layout_marks_shared_blocks_for_anthropic_caching():
+    layout = PromptHandler(PIPELINE_CONFIG).get_prompt_layout(
+        "extract_caption_title",
+        {"figure_label": "Figure 2", "figure_captions": "Legends"},
+        shared={"figure_captions": "Figure legends"},
+    )
+
+    parts = layout.messages({"type": "ephemeral"})[1]["content"]
+
+    assert parts[0] == {
+        "type": "text",
+        "text": "Figure legends:\n\nLegends",
+        "cache_control": {"type": "ephemeral"},
+    }
+    assert "cache_control" not in parts[1]
+    assert parts[1]["text"].startswith("Find Figure 2")
+
+
+def test_openai_cached_tokens_flow_into_usage_and_cost():
+    response = SimpleNamespace(usage=openai_usage(2000, 100, 1536))
+    usage = TokenUsage()
+
+    update_token_usage(usage, response, "gpt-4o")
+
+    assert usage.prompt_tokens == 2000
+    assert usage.prompt_cache_read_tokens == 1536
+    assert usage.prompt_cache_write_tokens == 0
+    # 464 uncached at $5, 1536 cached at $2.50, 100 out at $10
+    expected = (464 * 5.00 + 1536 * 2.50 + 100 * 10.00) / 1_000_000
+    assert usage.cost == pytest.approx(expected)
+    assert usage.cost < calculate_cost("gpt-4o", 2000, 100)
+
+
+def test_openai_cached_tokens_are_kept_in_response_cache_records():
+    message = SimpleNamespace(content="{}", parsed=None)
+    response = SimpleNamespace(
+        model="gpt-4o",
+        choices=[SimpleNamespace(message=message)],
+        usage=openai_usage(2000, 100, 1024),
+    )
+
+    record = response_to_record(response)
+
+    assert record["usage"]["cache_read_tokens"] == 1024
+    assert prompt_cache_tokens({"prompt_tokens_details": {"cached_tokens": 8}}) == (
+        8,
+        0,
+    )
@@ -0,0 +1,84 @@
+"""Tests for the persistent raster cache used by convert_to_pil_image."""
+
+import os
+from unittest.mock import patch
+
+from PIL import Image
+
+from src.soda_curation.pipeline.match_caption_panel.object_detection import (
+    convert_to_pil_image,
+)
+from src.soda_curation.pipeline.match_caption_panel.raster_cache import (
+    RasterCache,
+    get_raster_cache,
+)
+
+
+def write_tiff(path, color=(255, 0, 0), size=(40, 20)):
+    Image.new("RGB", size, color).save(path, format="TIFF")
+    return str(path)
+
+
+def test_figure_is_rasterized_once(tmp_path):
+    tiff = write_tiff(tmp_path / "figure1.tif")
+    cache = RasterCache(path=str(tmp_path / "cache"))
+
+    first, _ = convert_to_pil_image(tiff, raster_cache=cache)
+    with patch(
+        "src.soda_curation.pipeline.match_caption_panel.object_detection.create_standard_thumbnail"
+    ) as mock_thumbnail:
+        second, cached_path = convert_to_pil_image(tiff, raster_cache=cache)
+
+    mock_thumbnail.assert_not_called()
+    assert second.size == first.size
+    assert second.getpixel((0, 0)) == (255, 0, 0)
+    assert cached_path.startswith(str(tmp_path / "cache"))
+    stats = cache.stats()
+    assert stats["raster_cache_hits"] == 1
+    assert stats["raster_cache_misses"] == 1
+    assert stats["raster_cache_entries"] == 1
+
+
+def test_key_covers_content_dpi_and_max_size(tmp_path):
+    tiff = write_tiff(tmp_path / "figure1.tif")
+    cache = RasterCache(path=str(tmp_path / "cache"))
+
+    key = cache.make_key(tiff, 300, 2048)
+    assert key != cache.make_key(tiff, 150, 2048)
+    assert key != cache.make_key(tiff, 300, 1024)
+
+    write_tiff(tmp_path / "figure1.tif", color=(0, 255, 0))
+    assert key != cache.make_key(tiff, 300, 2048)
+
+
+def test_standard_formats_bypass_the_cache(tmp_path):
+    png = tmp_path / "figure1.png"
+    Image.new("RGB", (10, 10)).save(png)
+    cache = RasterCache(path=str(tmp_path / "cache"))
+
+    convert_to_pil_image(str(png), raster_cache=cache)
+
+    assert cache.stats()["raster_cache_misses"] == 0
+    assert cache.stats()["raster_cache_entries"] == 0
+
+
+def test_least_recently_used_rasters_are_evicted(tmp_path):
+    cache = RasterCache(path=str(tmp_path / "cache"), max_size_bytes=1)
+    image = Image.new("RGB", (10, 10))
+
+    first = cache.set("a" * 64, image)
+    os.utime(first, (1, 1))
+    second = cache.set("b" * 64, image)
+
+    assert not first.exists()
+    assert second.exists()
+    assert cache.stats()["raster_cache_evictions"] == 1
+
+
+def test_get_raster_cache_is_opt_in(tmp_path):
+    assert get_raster_cache({}) is None
+
+    config = {"raster_cache": {"enabled": True, "path": str(tmp_path / "rasters")}}
+    cache = get_raster_cache(config)
+    assert cache is get_raster_cache(config)
+    assert cache.path == tmp_path / "rasters"
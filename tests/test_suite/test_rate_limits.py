@@ -0,0 +1,161 @@
+"""Tests for the client-side provider rate limiter."""
+
+from unittest.mock import patch
+
+import httpx
+import openai
+import pytest
+
+from src.soda_curation.pipeline import rate_limits
+from src.soda_curation.pipeline.openai_utils import _parse_steps, count_messages_tokens
+from src.soda_curation.pipeline.rate_limits import (
+    MODEL_HEADER,
+    ModelLimits,
+    RateLimiter,
+    configure_rate_limits,
+)
+from src.soda_curation.pipeline.request_steps import ApiRequest, Backoff
+
+GPT4O = ("openai", "gpt-4o")
+
+
+@pytest.fixture
+def clock():
+    """Freeze the limiter's clock at a time the test can move forward."""
+    now = [1000.0]
+    with patch.object(rate_limits.time, "time", lambda: now[0]):
+        yield now
+
+
+@pytest.fixture(autouse=True)
+def default_limiter():
+    yield
+    configure_rate_limits({})
+
+
+def test_reservations_wait_for_the_token_bucket_to_refill(clock):
+    # 600 tokens per minute refill at 10 tokens per second
+    limiter = RateLimiter({GPT4O: ModelLimits(tokens_per_minute=600)})
+
+    assert limiter.reserve("openai", "gpt-4o", 600) == 0
+    assert limiter.reserve("openai", "gpt-4o", 300) == pytest.approx(30)
+    clock[0] += 30
+    assert limiter.reserve("openai", "gpt-4o", 100) == pytest.approx(10)
+
+
+def test_settle_refunds_unused_tokens(clock):
+    limiter = RateLimiter({GPT4O: ModelLimits(tokens_per_minute=600)})
+
+    limiter.reserve("openai", "gpt-4o", 600)
+    limiter.settle("openai", "gpt-4o", reserved=600, used=200)
+
+    assert limiter.reserve("openai", "gpt-4o", 400) == 0
+
+
+def test_limits_are_learned_from_response_headers(clock):
+    limiter = RateLimiter(utilization=0.5)
+    assert not limiter.limits_tokens("openai", "gpt-4o")
+
+    limiter.observe_headers(
+        "openai",
+        "gpt-4o",
+        httpx.Headers(
+            {
+                "x-ratelimit-limit-requests": "120",
+                "x-ratelimit-remaining-requests": "1",
+                "x-ratelimit-limit-tokens": "1000",
+            }
+        ),
+    )
+
+    assert limiter.limits_tokens("openai", "gpt-4o")
+    # One request is left; the next waits for the refill of 60 * 0.5 per minute
+    assert limiter.reserve("openai", "gpt-4o") == 0
+    assert limiter.reserve("openai", "gpt-4o") == pytest.approx(1)
+
+
+def test_sqlite_buckets_are_shared_between_limiters(tmp_path, clock):
+    path = tmp_path / "rate_limits.sqlite"
+    limits = {GPT4O: ModelLimits(requests_per_minute=2)}
+    first = RateLimiter(limits, path=str(path))
+    second = RateLimiter(limits, path=str(path))
+
+    assert first.reserve("openai", "gpt-4o") == 0
+    assert second.reserve("openai", "gpt-4o") == 0
+    assert first.reserve("openai", "gpt-4o") == pytest.approx(30)
+
+
+def test_openai_calls_wait_for_rate_limit_capacity(clock):
+    configure_rate_limits(
+        {"rate_limits": {"openai": {"gpt-4o": {"requests_per_minute": 1}}}}
+    )
+    params = {"model": "gpt-4o", "messages": []}
+
+    first = _parse_steps(params, "gpt-4o", "test")
+    request = next(first)
+    assert isinstance(request, ApiRequest)
+    assert request.params["extra_headers"] == {MODEL_HEADER: "gpt-4o"}
+    second = _parse_steps(params, "gpt-4o", "test")
+    step = next(second)
+
+    assert isinstance(step, Backoff)
+    assert step.seconds == pytest.approx(60)
+    assert isinstance(second.send(None), ApiRequest)
+
+
+def start_limited_call():
+    """Reserve tokens for an OpenAI call and stop at its API request."""
+    limiter = configure_rate_limits(
+        {"rate_limits": {"openai": {"gpt-4o": {"tokens_per_minute": 1000}}}}
+    )
+    params = {"model": "gpt-4o", "messages": [], "max_tokens": 900}
+    steps = _parse_steps(params, "gpt-4o", "test")
+    next(steps)
+    return limiter, steps
+
+
+def test_non_provider_errors_refund_the_reservation(clock):
+    limiter, steps = start_limited_call()
+
+    with pytest.raises(ValueError):
+        steps.throw(ValueError("unparseable response"))
+
+    assert limiter.reserve("openai", "gpt-4o", 1000) == 0
+
+
+def test_cancelled_calls_refund_the_reservation(clock):
+    limiter, steps = start_limited_call()
+
+    steps.close()
+
+    assert limiter.reserve("openai", "gpt-4o", 1000) == 0
+
+
+def test_vision_requests_count_their_text_parts():
+    text = "Describe the panels of this figure in detail. " * 20
+    image = {"type": "image_url", "image_url": {"url": "data:image/png;base64,AAAA"}}
+    vision = [{"role": "user", "content": [{"type": "text", "text": text}, image]}]
+
+    with patch(
+        "src.soda_curation.pipeline.openai_utils.count_tokens",
+        side_effect=lambda text, model: len(text) // 4,
+    ):
+        assert count_messages_tokens(vision) == count_messages_tokens(
+            [{"role": "user", "content": text}]
+        )
+
+
+def test_retry_waits_as_long_as_the_provider_asks():
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    error = openai.RateLimitError(
+        "Rate limit reached",
+        response=httpx.Response(429, headers={"retry-after": "7"}, request=request),
+        body=None,
+    )
+    steps = _parse_steps({"model": "gpt-4o", "messages": []}, "gpt-4o", "test")
+    next(steps)
+
+    step = steps.throw(error)
+
+    assert isinstance(step, Backoff)
+    assert step.seconds == 7.0
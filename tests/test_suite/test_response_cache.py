@@ -0,0 +1,171 @@
+"""Tests for the on-disk LLM response cache."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from pydantic import BaseModel
+
+from src.soda_curation.pipeline.anthropic_utils import call_anthropic
+from src.soda_curation.pipeline.cost_tracking import update_token_usage
+from src.soda_curation.pipeline.manuscript_structure.manuscript_structure import (
+    TokenUsage,
+)
+from src.soda_curation.pipeline.openai_utils import call_openai_with_fallback
+from src.soda_curation.pipeline.response_cache import (
+    ResponseCache,
+    get_response_cache,
+    make_cache_key,
+)
+
+
+class Answer(BaseModel):
+    label: str
+    score: float
+
+
+MESSAGES = [
+    {"role": "system", "content": "You are a curator."},
+    {"role": "user", "content": "Label this figure."},
+]
+
+
+def openai_response(label="A"):
+    message = MagicMock()
+    message.content = f'{{"label": "{label}", "score": 0.5}}'
+    message.parsed = Answer(label=label, score=0.5)
+    response = MagicMock()
+    response.choices = [MagicMock(message=message)]
+    response.usage = MagicMock(
+        prompt_tokens=100, completion_tokens=20, total_tokens=120
+    )
+    response.model = "gpt-4o"
+    return response
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(path=str(tmp_path / "responses.sqlite"))
+
+
+def test_cache_key_covers_model_messages_params_and_schema():
+    key = make_cache_key("openai", "gpt-4o", MESSAGES, {"temperature": 0.1}, Answer)
+    assert key == make_cache_key(
+        "openai", "gpt-4o", MESSAGES, {"temperature": 0.1}, Answer
+    )
+    assert key != make_cache_key(
+        "openai", "gpt-5", MESSAGES, {"temperature": 0.1}, Answer
+    )
+    assert key != make_cache_key(
+        "openai", "gpt-4o", MESSAGES[:1], {"temperature": 0.1}, Answer
+    )
+    assert key != make_cache_key(
+        "openai", "gpt-4o", MESSAGES, {"temperature": 0.2}, Answer
+    )
+    assert key != make_cache_key("openai", "gpt-4o", MESSAGES, {"temperature": 0.1})
+
+
+def test_hit_replays_parsed_response_with_zero_usage(cache):
+    key = make_cache_key("openai", "gpt-4o", MESSAGES, {}, Answer)
+    assert cache.lookup(key, Answer) is None
+
+    live = openai_response()
+    stored = cache.store(key, live)
+    # A miss hands back the provider's own response, tagged
+    assert stored is live
+    assert stored.cache_status == "miss"
+    assert stored.usage.prompt_tokens == 100
+
+    replayed = cache.lookup(key, Answer)
+    assert replayed.cache_status == "hit"
+    assert replayed.choices[0].message.parsed == Answer(label="A", score=0.5)
+    assert replayed.usage.total_tokens == 0
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_expired_entries_are_not_replayed(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "responses.sqlite"), ttl_seconds=-1)
+    cache.set("key", {"content": "x"})
+    assert cache.get("key") is None
+
+
+def test_least_recently_used_entries_are_evicted_by_size(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "responses.sqlite"), max_size_bytes=150)
+    cache.set("old", {"content": "a" * 40})
+    cache.set("recent", {"content": "b" * 40})
+    assert cache.get("old") is not None  # touch "old" so "recent" is evicted first
+    cache.set("new", {"content": "c" * 40})
+
+    assert cache.get("recent") is None
+    assert cache.get("old") is not None
+    assert cache.get("new") is not None
+    assert cache.stats()["size_bytes"] <= 150
+
+
+def test_update_token_usage_counts_hits_and_misses(cache):
+    key = make_cache_key("openai", "gpt-4o", MESSAGES, {}, Answer)
+    usage = TokenUsage()
+    update_token_usage(usage, cache.store(key, openai_response()), "gpt-4o")
+    update_token_usage(usage, cache.lookup(key, Answer), "gpt-4o")
+
+    assert usage.cache_misses == 1
+    assert usage.cache_hits == 1
+    assert usage.prompt_tokens == 100
+    assert usage.cost > 0
+
+
+def test_get_response_cache_is_opt_in_per_step(tmp_path):
+    config = {
+        "pipeline": {
+            "extract_sections": {"openai": {"model": "gpt-4o", "cache": True}},
+            "assign_panel_source": {"openai": {"model": "gpt-4o"}},
+        },
+        "response_cache": {"path": str(tmp_path / "shared.sqlite")},
+    }
+    cache = get_response_cache(config, "extract_sections", "openai")
+    assert isinstance(cache, ResponseCache)
+    assert get_response_cache(config, "extract_sections", "openai") is cache
+    assert get_response_cache(config, "assign_panel_source", "openai") is None
+    assert get_response_cache(config, "extract_sections", "anthropic") is None
+
+
+def test_call_openai_with_fallback_replays_identical_request(cache):
+    client = MagicMock()
+    client.beta.chat.completions.parse.return_value = openai_response()
+
+    with patch(
+        "src.soda_curation.pipeline.openai_utils.count_messages_tokens",
+        return_value=10,
+    ):
+        first = call_openai_with_fallback(
+            client, "gpt-4o", MESSAGES, response_format=Answer, cache=cache
+        )
+        second = call_openai_with_fallback(
+            client, "gpt-4o", MESSAGES, response_format=Answer, cache=cache
+        )
+
+    assert client.beta.chat.completions.parse.call_count == 1
+    assert first.cache_status == "miss"
+    assert second.cache_status == "hit"
+    assert second.choices[0].message.parsed.label == "A"
+
+
+def test_call_anthropic_replays_identical_request(cache):
+    block = MagicMock(type="tool_use", input={"label": "B", "score": 0.9})
+    block.name = "structured_output"
+    api_response = MagicMock(content=[block], model="claude-sonnet-4-6")
+    api_response.usage = MagicMock(input_tokens=50, output_tokens=5)
+    client = MagicMock()
+    client.messages.create.return_value = api_response
+
+    first = call_anthropic(
+        client, "claude-sonnet-4-6", MESSAGES, response_format=Answer, cache=cache
+    )
+    second = call_anthropic(
+        client, "claude-sonnet-4-6", MESSAGES, response_format=Answer, cache=cache
+    )
+
+    assert client.messages.create.call_count == 1
+    assert first.usage.prompt_tokens == 50
+    assert second.choices[0].message.parsed == Answer(label="B", score=0.9)
+    assert second.usage.total_tokens == 0
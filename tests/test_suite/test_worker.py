@@ -0,0 +1,181 @@
+"""Tests for the long-running worker and its job queues."""
+
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.soda_curation.main import StepFailure
+from src.soda_curation.worker import (
+    DirectoryJobQueue,
+    Job,
+    SQLiteJobQueue,
+    Worker,
+    create_queue,
+)
+
+
+@pytest.fixture(params=["directory", "sqlite"])
+def job_queue(request, tmp_path):
+    if request.param == "directory":
+        return DirectoryJobQueue(str(tmp_path / "queue"))
+    return SQLiteJobQueue(str(tmp_path / "queue.db"))
+
+
+def test_queue_claims_jobs_in_submission_order(job_queue):
+    first = job_queue.submit("/data/a.zip", "/out/a.json")
+    second = job_queue.submit("/data/b.zip")
+
+    job = job_queue.claim()
+    assert job.job_id == first
+    assert job.resolved_output_path() == "/out/a.json"
+
+    job = job_queue.claim()
+    assert job.job_id == second
+    assert job.resolved_output_path() == "/data/b.json"
+
+    assert job_queue.claim() is None
+
+
+def test_stale_claims_are_requeued(job_queue):
+    job_id = job_queue.submit("/data/a.zip")
+    job_queue.claim()
+
+    assert job_queue.claim(stale_after=3600) is None
+    time.sleep(0.01)
+    # The worker holding the claim is presumed dead after the timeout
+    assert job_queue.claim(stale_after=0.001).job_id == job_id
+
+
+def test_heartbeats_keep_a_claim(job_queue):
+    job_queue.submit("/data/a.zip")
+    job = job_queue.claim()
+    time.sleep(0.05)
+
+    assert job_queue.heartbeat(job)
+    assert job_queue.claim(stale_after=0.04) is None
+
+
+def test_only_the_current_claim_finishes_a_requeued_job(job_queue):
+    job_queue.submit("/data/a.zip")
+    slow = job_queue.claim()
+    time.sleep(0.01)
+    retry = job_queue.claim(stale_after=0.001)
+    assert retry.job_id == slow.job_id
+
+    # The first worker is still running; its outcome must not end the retry
+    assert not job_queue.heartbeat(slow)
+    job_queue.complete(slow, {"elapsed_s": 1.0})
+    assert job_queue.heartbeat(retry)
+
+    job_queue.fail(retry, "boom")
+    assert not job_queue.heartbeat(retry)
+    assert job_queue.claim() is None
+
+
+def test_directory_queue_records_outcome(tmp_path):
+    job_queue = DirectoryJobQueue(str(tmp_path))
+    job_id = job_queue.submit("/data/a.zip")
+    job = job_queue.claim()
+    job_queue.fail(job, "boom")
+
+    assert not list((tmp_path / "processing").iterdir())
+    payload = json.loads((tmp_path / "failed" / f"{job_id}.json").read_text())
+    assert payload["error"] == "boom"
+    assert payload["zip_path"] == "/data/a.zip"
+
+
+def test_sqlite_queue_records_outcome(tmp_path):
+    job_queue = SQLiteJobQueue(str(tmp_path / "queue.db"))
+    job_queue.submit("/data/a.zip")
+    job = job_queue.claim()
+    job_queue.complete(job, {"elapsed_s": 1.0})
+
+    # A second handle on the same file sees the finished job
+    other = SQLiteJobQueue(str(tmp_path / "queue.db"))
+    assert other.claim() is None
+
+
+def test_create_queue_requires_backend():
+    with pytest.raises(ValueError):
+        create_queue(None, None)
+
+
+def test_worker_reuses_resources_and_isolates_failures(job_queue):
+    resources = MagicMock()
+    job_queue.submit("/data/good.zip")
+    job_queue.submit("/data/bad.zip")
+    job_queue.submit("/data/partial.zip")
+
+    def fake_run_pipeline(zip_path, resources_, output_path, run_id, **kwargs):
+        assert resources_ is resources
+        if zip_path.endswith("bad.zip"):
+            raise RuntimeError("corrupt archive")
+        if zip_path.endswith("partial.zip"):
+            kwargs["recoverable_failures"].append(
+                StepFailure(step="assign_panel_source", reason="timeout")
+            )
+        return "{}"
+
+    job_queue.complete = MagicMock(wraps=job_queue.complete)
+    job_queue.fail = MagicMock(wraps=job_queue.fail)
+
+    with patch(
+        "src.soda_curation.worker.run_pipeline", side_effect=fake_run_pipeline
+    ) as mock_run:
+        worker = Worker(job_queue, resources, poll_interval=0)
+        worker.run(exit_when_idle=True)
+
+    assert mock_run.call_count == 3
+    assert worker.processed == 2
+    assert worker.failed == 1
+    assert job_queue.fail.call_args.args[1] == "corrupt archive"
+    partial_result = job_queue.complete.call_args_list[1].args[1]
+    assert partial_result["recoverable_failures"] == [
+        {"step": "assign_panel_source", "reason": "timeout"}
+    ]
+
+
+def test_worker_stops_after_max_jobs(tmp_path):
+    job_queue = DirectoryJobQueue(str(tmp_path))
+    for name in ["a", "b", "c"]:
+        job_queue.submit(f"/data/{name}.zip")
+
+    with patch("src.soda_curation.worker.run_pipeline", return_value="{}"):
+        worker = Worker(job_queue, MagicMock(), poll_interval=0)
+        worker.run(max_jobs=2)
+
+    assert worker.processed == 2
+    assert isinstance(job_queue.claim(), Job)
+
+
+def test_worker_passes_resume_to_the_pipeline(tmp_path):
+    job_queue = DirectoryJobQueue(str(tmp_path))
+    job_queue.submit("/data/a.zip")
+
+    with patch("src.soda_curation.worker.run_pipeline", return_value="{}") as run:
+        Worker(job_queue, MagicMock(), poll_interval=0, resume=True).run(
+            exit_when_idle=True
+        )
+
+    assert run.call_args.kwargs["resume"] is True
+
+
+def test_worker_refreshes_the_claim_while_a_job_runs(tmp_path):
+    job_queue = DirectoryJobQueue(str(tmp_path))
+    job_queue.submit("/data/a.zip")
+    job_queue.heartbeat = MagicMock(wraps=job_queue.heartbeat)
+
+    with patch(
+        "src.soda_curation.worker.run_pipeline",
+        side_effect=lambda *args, **kwargs: time.sleep(0.1),
+    ):
+        worker = Worker(
+            job_queue, MagicMock(), poll_interval=0, heartbeat_interval=0.01
+        )
+        worker.run(exit_when_idle=True)
+
+    assert job_queue.heartbeat.call_count >= 2
+    assert worker.processed == 1
+    assert len(list((tmp_path / "done").iterdir())) == 1
@@ -0,0 +1,145 @@
+"""Tests for on-demand extraction of submission ZIP members."""
+
+import io
+import zipfile
+
+import pytest
+
+from src.soda_curation.pipeline.manuscript_structure import zip_filesystem
+from src.soda_curation.pipeline.manuscript_structure.zip_filesystem import (
+    ZipFileSystem,
+    list_zip_members,
+    materialize_path,
+    open_path,
+    path_exists,
+)
+
+MANUSCRIPT_ID = "EMBOJ-2024-12345"
+
+
+@pytest.fixture
+def submission(tmp_path):
+    inner = io.BytesIO()
+    with zipfile.ZipFile(inner, "w") as zf:
+        zf.writestr("panel_a.xlsx", "a")
+        zf.writestr("panel_b.csv", "b")
+
+    zip_path = tmp_path / "submission.zip"
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(f"{MANUSCRIPT_ID}.xml", "<article/>")
+        zf.writestr(f"{MANUSCRIPT_ID}/graphic/Figure 1.tif", "image")
+        zf.writestr(f"{MANUSCRIPT_ID}/pdf/manuscript.pdf", "pdf")
+        zf.writestr("suppl_data/Figure 1.zip", inner.getvalue())
+        zf.writestr("../escape.txt", "unsafe")
+
+    root = tmp_path / "extract" / MANUSCRIPT_ID
+    root.mkdir(parents=True)
+    filesystem = ZipFileSystem(str(zip_path), root, strip_prefix=MANUSCRIPT_ID)
+    yield filesystem.register()
+    filesystem.close()
+
+
+def test_members_are_listed_without_extraction(submission):
+    assert submission.exists("graphic/Figure 1.tif")
+    assert submission.size("graphic/Figure 1.tif") == len("image")
+    assert submission.glob("pdf", "*.pdf") == ["pdf/manuscript.pdf"]
+    assert "../escape.txt" not in submission.members
+    assert not any(submission.root.iterdir())
+
+
+def test_materialize_extracts_once(submission):
+    path = submission.materialize("graphic/Figure 1.tif")
+
+    assert path == submission.root / "graphic/Figure 1.tif"
+    assert path.read_text() == "image"
+    assert submission.materialize(path) == path
+    assert submission.materialized_bytes == len("image")
+    with pytest.raises(FileNotFoundError):
+        submission.materialize("graphic/missing.tif")
+
+
+def test_path_helpers_resolve_through_registered_archive(submission, tmp_path):
+    nested = submission.root / "suppl_data/Figure 1.zip"
+
+    assert path_exists(nested)
+    with open_path(nested) as handle, zipfile.ZipFile(handle) as zf:
+        assert zf.namelist() == ["panel_a.xlsx", "panel_b.csv"]
+    # Listing a nested archive does not write it to disk
+    assert not nested.exists()
+
+    assert materialize_path(submission.root / "graphic/Figure 1.tif").exists()
+    # Paths outside the archive are left to the caller
+    outside = tmp_path / "elsewhere.tif"
+    assert materialize_path(outside) == outside
+    assert not path_exists(outside)
+
+
+def test_close_unregisters_archive(submission):
+    path = submission.root / "graphic/Figure 1.tif"
+    submission.close()
+
+    assert not path_exists(path)
+    assert materialize_path(path) == path
+
+
+@pytest.fixture
+def nested_archives(tmp_path):
+    """Outer archive holding the same source data ZIP stored and deflated."""
+    inner = io.BytesIO()
+    with zipfile.ZipFile(inner, "w", zipfile.ZIP_DEFLATED) as zf:
+        for index in range(200):
+            zf.writestr(f"Figure 1/panel_{index}.csv", f"{index}," * 2000)
+
+    zip_path = tmp_path / "submission.zip"
+    with zipfile.ZipFile(zip_path, "w") as zf:
+        zf.writestr(f"{MANUSCRIPT_ID}.xml", "<article/>")
+        zf.writestr(
+            "suppl_data/stored.zip", inner.getvalue(), compress_type=zipfile.ZIP_STORED
+        )
+        zf.writestr(
+            "suppl_data/deflated.zip",
+            inner.getvalue(),
+            compress_type=zipfile.ZIP_DEFLATED,
+        )
+
+    root = tmp_path / "extract" / MANUSCRIPT_ID
+    root.mkdir(parents=True)
+    filesystem = ZipFileSystem(str(zip_path), root, strip_prefix=MANUSCRIPT_ID)
+    yield filesystem.register()
+    filesystem.close()
+
+
+@pytest.fixture(autouse=True)
+def empty_listing_cache():
+    zip_filesystem._listing_cache.clear()
+    yield
+    zip_filesystem._listing_cache.clear()
+
+
+@pytest.mark.parametrize("member", ["stored.zip", "deflated.zip"])
+def test_nested_zip_listed_without_writing_to_disk(nested_archives, member):
+    expected = [f"Figure 1/panel_{index}.csv" for index in range(200)]
+
+    names = list_zip_members(nested_archives.root / "suppl_data" / member)
+
+    assert names == expected
+    assert not (nested_archives.root / "suppl_data").exists()
+
+
+def test_nested_zip_falls_back_when_tail_is_too_small(nested_archives, monkeypatch):
+    monkeypatch.setattr(zip_filesystem, "NESTED_TAIL_BYTES", 1024)
+
+    names = nested_archives.list_nested_zip("suppl_data/deflated.zip")
+
+    assert len(names) == 200
+
+
+def test_nested_zip_listing_cached_by_crc(nested_archives, monkeypatch):
+    first = nested_archives.list_nested_zip("suppl_data/stored.zip")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("listing should come from the cache")
+
+    monkeypatch.setattr(ZipFileSystem, "_read_nested_names", fail)
+    # Same bytes under another name share the cache entry
+    assert nested_archives.list_nested_zip("suppl_data/deflated.zip") == first